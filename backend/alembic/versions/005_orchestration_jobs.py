@@ -0,0 +1,56 @@
+"""orchestration_jobs queue + execution_history queued/started/finished timestamps
+
+Revision ID: 005_orchestration_jobs
+Revises: 004_cluster_secrets
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "005_orchestration_jobs"
+down_revision = "004_cluster_secrets"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    insp = sa.inspect(bind)
+    if "execution_history" in insp.get_table_names():
+        have = {c["name"] for c in insp.get_columns("execution_history")}
+        for name in ("queued_at", "started_at", "finished_at"):
+            if name not in have:
+                op.add_column("execution_history", sa.Column(name, sa.DateTime(), nullable=True))
+    if "orchestration_jobs" in insp.get_table_names():
+        return
+    op.create_table(
+        "orchestration_jobs",
+        sa.Column("id", sa.String(64), primary_key=True),
+        sa.Column("kind", sa.String(20), nullable=False),
+        sa.Column("lane", sa.String(20), nullable=False, server_default="interactive"),
+        sa.Column("priority", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+        sa.Column("submitted_by", sa.String(255), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("history_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+        sa.Column("worker", sa.String(255), nullable=True),
+        sa.Column("cancel_requested", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("returncode", sa.Integer(), nullable=True),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_orchestration_jobs_status", "orchestration_jobs", ["status"])
+    op.create_index("ix_orchestration_jobs_submitted_by", "orchestration_jobs", ["submitted_by"])
+    op.create_index(
+        "ix_orchestration_jobs_status_priority", "orchestration_jobs", ["status", "priority", "created_at"]
+    )
+
+
+def downgrade():
+    op.drop_table("orchestration_jobs")
+    for name in ("finished_at", "started_at", "queued_at"):
+        op.drop_column("execution_history", name)
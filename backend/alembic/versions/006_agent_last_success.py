@@ -0,0 +1,34 @@
+"""agent_last_success: last successful live puppet agent run per certname
+
+Revision ID: 006_agent_last_success
+Revises: 005_orchestration_jobs
+Create Date: 2026-10-19
+
+Rows are filled from execution_history at application startup while the
+table is empty (services.agent_runs.backfill_agent_last_success).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "006_agent_last_success"
+down_revision = "005_orchestration_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if "agent_last_success" in sa.inspect(bind).get_table_names():
+        return
+    op.create_table(
+        "agent_last_success",
+        sa.Column("certname", sa.String(255), primary_key=True),
+        sa.Column("short_name", sa.String(255), nullable=False),
+        sa.Column("last_success_at", sa.DateTime(), nullable=False),
+        sa.Column("history_id", sa.Integer(), nullable=True),
+    )
+    op.create_index("ix_agent_last_success_short_name", "agent_last_success", ["short_name"])
+
+
+def downgrade():
+    op.drop_table("agent_last_success")
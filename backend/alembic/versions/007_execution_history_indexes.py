@@ -0,0 +1,33 @@
+"""execution_history composite indexes for the history window and per-user scans
+
+Revision ID: 007_execution_history_indexes
+Revises: 006_agent_last_success
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "007_execution_history_indexes"
+down_revision = "006_agent_last_success"
+branch_labels = None
+depends_on = None
+
+_INDEXES = {
+    "ix_execution_history_executed_at_status": ["executed_at", "status"],
+    "ix_execution_history_executed_by_executed_at": ["executed_by", "executed_at"],
+}
+
+
+def upgrade():
+    insp = sa.inspect(op.get_bind())
+    if "execution_history" not in insp.get_table_names():
+        return
+    have = {ix["name"] for ix in insp.get_indexes("execution_history")}
+    for name, columns in _INDEXES.items():
+        if name not in have:
+            op.create_index(name, "execution_history", columns)
+
+
+def downgrade():
+    for name in _INDEXES:
+        op.drop_index(name, table_name="execution_history")
@@ -0,0 +1,38 @@
+"""execution_results: compressed full per-target output of execution history rows
+
+Revision ID: 008_execution_results
+Revises: 007_execution_history_indexes
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "008_execution_results"
+down_revision = "007_execution_history_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if "execution_results" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "execution_results",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("history_id", sa.Integer(), nullable=False),
+        sa.Column("target", sa.String(255), nullable=False, server_default=""),
+        sa.Column("status", sa.String(20), nullable=True),
+        sa.Column("codec", sa.String(10), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("stored_size", sa.Integer(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_execution_results_history_target", "execution_results", ["history_id", "target"], unique=True
+    )
+    op.create_index("ix_execution_results_created_at", "execution_results", ["created_at"])
+
+
+def downgrade():
+    op.drop_table("execution_results")
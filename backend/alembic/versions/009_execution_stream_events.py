@@ -0,0 +1,35 @@
+"""execution_stream_events: live Bolt output shared between workers and consoles
+
+Revision ID: 009_execution_stream_events
+Revises: 008_execution_results
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "009_execution_stream_events"
+down_revision = "008_execution_results"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if "execution_stream_events" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "execution_stream_events",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("execution_id", sa.String(64), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("event", sa.String(20), nullable=False),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_execution_stream_events_exec_seq", "execution_stream_events", ["execution_id", "seq"], unique=True
+    )
+    op.create_index("ix_execution_stream_events_created_at", "execution_stream_events", ["created_at"])
+
+
+def downgrade():
+    op.drop_table("execution_stream_events")
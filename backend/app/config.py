@@ -120,6 +120,81 @@ class Settings(BaseSettings):
     data_dir: str = "/opt/openvox-gui/data"
     log_dir: str = "/opt/openvox-gui/logs"
 
+    # ── Metric history retention (Host / Server / OpenVoxDB Health) ──
+    # Raw samples keep their fixed ~1h ring; older data is rolled up into
+    # min/avg/max/last buckets. Horizon per rollup tier; 0 disables a tier.
+    metrics_rollup_1m_hours: float = 24.0
+    metrics_rollup_10m_days: float = 7.0
+    metrics_rollup_1h_days: float = 90.0
+
+    # ── Remote reads on the serving estate (logs, infra, host metrics) ──
+    # "bolt" = one Bolt process per read (default). "ssh" = pooled asyncssh
+    # connections (pip install asyncssh), falling back to Bolt on failure.
+    remote_transport: str = "bolt"
+    remote_ssh_user: str = "root"  # non-root users run commands via sudo -n
+    remote_ssh_port: int = 22
+    remote_ssh_identity_file: Optional[str] = None
+    # Empty = ~/.ssh/known_hosts of the service user (host keys always checked)
+    remote_ssh_known_hosts: Optional[str] = None
+    remote_ssh_channels_per_host: int = 4
+    remote_ssh_idle_sec: int = 300
+    remote_ssh_connect_timeout: float = 10.0
+
+    # ── Cluster health prober (Settings → Cluster, ovox infra health) ──
+    # Probes run in the background; the health endpoints serve the cache.
+    cluster_probe_interval_sec: int = 30
+    cluster_probe_timeout_sec: float = 20.0  # per target, including the hedge
+    cluster_probe_hedge_after_sec: float = 3.0
+    cluster_probe_ha_every: int = 4  # pcs / drbdadm every Nth cycle
+
+    # ── Bolt fan-out (command / task runs on large target sets) ──
+    # Above the threshold, resolved targets run as chunks of chunk_size
+    # (keep ≤ Bolt's --concurrency, default 100, so a chunk takes about as
+    # long as its slowest target), at most `parallel` chunks at once.
+    bolt_fanout_threshold: int = 200  # resolved targets; 0 = never fan out
+    bolt_fanout_chunk_size: int = 100
+    bolt_fanout_parallel: int = 4
+
+    # ── Orchestration job queue (POST /api/bolt/jobs/*) ──
+    # Jobs live in the app DB; this console's workers claim them in priority
+    # order. jobs_workers and jobs_scheduled_slots are per host: all uvicorn
+    # worker processes of a console share them. Scheduled jobs never take
+    # more than jobs_scheduled_slots workers, so interactive runs find one free.
+    # All limits are re-checked by the claim itself, so concurrent claims from
+    # sibling workers or other consoles cannot overshoot them.
+    jobs_workers: int = 4
+    jobs_global_limit: int = 0  # running across all consoles; 0 = workers per console only
+    jobs_per_user: int = 2  # running at once per submitter; 0 = unlimited
+    jobs_scheduled_slots: int = 2
+    jobs_poll_sec: float = 2.0
+    jobs_stale_sec: int = 120  # running job with no heartbeat → failed
+
+    # ── Full execution results (GET /api/execution-history/{id}/results) ──
+    # Per-target Bolt output, compressed in the app DB; history rows keep
+    # only a 500-char preview. "auto" = zstd when the zstandard package is
+    # installed, else gzip.
+    execution_results_enabled: bool = True
+    execution_results_codec: str = "auto"  # auto | zstd | gzip
+    execution_results_retention_days: int = 30  # 0 = keep as long as the history row
+    execution_results_max_mb: int = 64  # uncompressed per run; larger runs keep the first targets
+
+    # ── App database maintenance (retention + compaction) ──
+    # Expired rows are deleted in short batched transactions, then SQLite is
+    # incrementally vacuumed (PostgreSQL: VACUUM (ANALYZE)). Runs in one
+    # worker per host. 0 h = disabled.
+    db_maintenance_interval_hours: float = 1.0
+    db_maintenance_batch_rows: int = 1000
+    db_maintenance_batch_pause_sec: float = 0.05
+    # History (and finished jobs) older than this are deleted; 0 = keep forever.
+    # Keep it above the audit export window (up to 365 days) if you use it.
+    execution_history_retention_days: int = 0
+    # Opt-in one-time full VACUUM that switches an existing SQLite file to
+    # auto_vacuum=INCREMENTAL (without it freed pages are reused but the file
+    # never shrinks). It locks the database for its whole run and needs about
+    # twice the file size free; skipped when that space is missing. Also
+    # available on demand: POST /api/execution-history/cleanup/maintenance.
+    db_sqlite_incremental_vacuum: bool = False
+
     # Optional bootstrap token for unauthenticated installer script routes
     # (OPENVOX_GUI_BOOTSTRAP_TOKEN). Empty = no token required.
     bootstrap_token: Optional[str] = None
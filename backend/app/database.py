@@ -127,11 +127,55 @@ async def init_db():
             await conn.execute(text("PRAGMA wal_autocheckpoint = 2000"))
 
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
 
         if not is_postgres_url(settings.database_url):
             await conn.execute(text("PRAGMA wal_checkpoint(PASSIVE)"))
 
 
+# Nullable columns added after a table first shipped. create_all() never
+# alters an existing table, and installs that were only ``alembic stamp``ed
+# would otherwise miss them (the alembic migration adds the same columns).
+_LATE_COLUMNS = {
+    "execution_history": ("queued_at", "started_at", "finished_at"),
+}
+
+
+# Indexes added to existing tables (create_all skips them for the same reason).
+_LATE_INDEXES = {
+    "execution_history": (
+        "ix_execution_history_executed_at_status",
+        "ix_execution_history_executed_by_executed_at",
+    ),
+}
+
+
+def _add_missing_columns(sync_conn) -> None:
+    from sqlalchemy import inspect
+
+    insp = inspect(sync_conn)
+    tables = set(insp.get_table_names())
+    for table, names in _LATE_INDEXES.items():
+        if table not in tables:
+            continue
+        have = {ix["name"] for ix in insp.get_indexes(table)}
+        for index in Base.metadata.tables[table].indexes:
+            if index.name in names and index.name not in have:
+                index.create(sync_conn)
+                logger.info("Created index %s", index.name)
+    for table, columns in _LATE_COLUMNS.items():
+        if table not in tables:
+            continue
+        have = {c["name"] for c in insp.get_columns(table)}
+        for name in columns:
+            if name in have:
+                continue
+            col = Base.metadata.tables[table].c[name]
+            ddl = col.type.compile(dialect=sync_conn.dialect)
+            sync_conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+            logger.info("Added column %s.%s", table, name)
+
+
 async def checkpoint_database() -> None:
     """Force a FULL WAL checkpoint.
 
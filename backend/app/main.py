@@ -164,6 +164,14 @@ async def lifespan(app: FastAPI):
     except Exception as exc:
         logger.warning(f"Token denylist prune failed: {exc}")
 
+    # Per-certname last live agent success (Nodes status overlay); filled
+    # from execution history once, on the first start after upgrade
+    try:
+        from .services.agent_runs import backfill_agent_last_success
+        await backfill_agent_last_success()
+    except Exception as exc:
+        logger.warning(f"Last agent run backfill failed: {exc}")
+
     # Start the background collector for OpenVox Server Health metrics.
     # This makes the JVM / Catalog Route Mean / Total Req Mean charts have
     # history populated *before* a user visits the page (persistent collection).
@@ -173,12 +181,47 @@ async def lifespan(app: FastAPI):
     except Exception as exc:
         logger.warning(f"Failed to start PS health background collector: {exc}")
 
+    # OpenVoxDB command-queue / JVM history on every PuppetDB node
+    try:
+        await metrics_router.start_pdb_health_collector()
+    except Exception as exc:
+        logger.warning(f"Failed to start OpenVoxDB health background collector: {exc}")
+
     # Serving-estate host metrics (/proc + sysstat/pidstat when present; agents excluded)
     try:
         await metrics_router.start_host_metrics_collector()
     except Exception as exc:
         logger.warning(f"Failed to start host metrics background collector: {exc}")
 
+    # Estate health probes on a schedule; health endpoints read the cache
+    try:
+        from .services.cluster_health_prober import start_cluster_prober
+        await start_cluster_prober()
+    except Exception as exc:
+        logger.warning(f"Failed to start cluster health prober: {exc}")
+
+    # Bolt task / plan / inventory listings load in the background so the
+    # first Orchestration page open does not wait on three Bolt processes
+    try:
+        from .services.bolt_catalog import bolt_catalog
+        bolt_catalog.schedule_prewarm()
+    except Exception as exc:
+        logger.warning(f"Failed to schedule Bolt catalog pre-warm: {exc}")
+
+    # Queued Bolt runs (/api/bolt/jobs); also fails jobs a dead console left running
+    try:
+        from .services.job_queue import start_job_queue
+        await start_job_queue()
+    except Exception as exc:
+        logger.warning(f"Failed to start orchestration job queue: {exc}")
+
+    # Retention deletes + SQLite incremental vacuum / PostgreSQL VACUUM (ANALYZE)
+    try:
+        from .services.db_maintenance import start_db_maintenance
+        await start_db_maintenance()
+    except Exception as exc:
+        logger.warning(f"Failed to start DB maintenance: {exc}")
+
     # --- Maintenance Mode Stale State Handling (post-3.7 maintenance feature) ---
     # The maintenance flag (maintenance.json + .flag) is intentionally persistent
     # so deploy scripts can keep the GUI "down" during updates. However, this
@@ -220,6 +263,30 @@ async def lifespan(app: FastAPI):
         await metrics_router.stop_host_metrics_collector()
     except Exception:
         pass
+    try:
+        await metrics_router.stop_pdb_health_collector()
+    except Exception:
+        pass
+    try:
+        from .services.cluster_health_prober import stop_cluster_prober
+        await stop_cluster_prober()
+    except Exception:
+        pass
+    try:
+        from .services.job_queue import stop_job_queue
+        await stop_job_queue()
+    except Exception:
+        pass
+    try:
+        from .services.db_maintenance import stop_db_maintenance
+        await stop_db_maintenance()
+    except Exception:
+        pass
+    try:
+        from .services.ssh_pool import close_pool
+        await close_pool()
+    except Exception:
+        pass
 
     # Database durability: force WAL checkpoint on shutdown (P0 hardening).
     # Ensures all committed ENC/auth/history writes are in the main .db file
@@ -445,7 +512,8 @@ async def prometheus_metrics():
     Unauthenticated by design for scraper access (same class as /health).
     Allowed through maintenance middleware allowlist. Exposes control-plane
     signals: maintenance state, deploy-in-progress, SQLite row counts (best
-    effort), package mirror last-sync age, app version info.
+    effort), package mirror last-sync age, app version info, DB maintenance
+    (rows deleted, bytes reclaimed).
     """
     from fastapi.responses import PlainTextResponse
     from .utils.maintenance import get_maintenance_info, is_deploy_in_progress
@@ -506,15 +574,53 @@ async def prometheus_metrics():
         lines.append(f"# TYPE openvox_gui_sqlite_rows_{table} gauge")
         lines.append(f"openvox_gui_sqlite_rows_{table} {count}")
 
-    # PS health ring size if collector is running
+    # PS health ring size (all compilers) if collector is running
     try:
-        ring_len = len(getattr(metrics_router, "_ps_health_ring", []) or [])
+        from .services.ps_health_history import ps_health_history
+
+        ring_len = ps_health_history.sample_count(raw=True)
     except Exception:
         ring_len = 0
     lines.append("# HELP openvox_gui_ps_health_ring_samples In-memory Puppet Server health ring buffer length")
     lines.append("# TYPE openvox_gui_ps_health_ring_samples gauge")
     lines.append(f"openvox_gui_ps_health_ring_samples {ring_len}")
 
+    try:
+        from .services.pdb_health_history import pdb_health_history
+
+        pdb_samples = pdb_health_history.sample_count()
+    except Exception:
+        pdb_samples = 0
+    lines.append("# HELP openvox_gui_pdb_health_samples In-memory OpenVoxDB health series rows (all tiers)")
+    lines.append("# TYPE openvox_gui_pdb_health_samples gauge")
+    lines.append(f"openvox_gui_pdb_health_samples {pdb_samples}")
+
+    try:
+        from .services.ssh_pool import pool_stats
+
+        ssh_conns = pool_stats()["connections"]
+    except Exception:
+        ssh_conns = 0
+    lines.append("# HELP openvox_gui_ssh_pool_connections Open pooled SSH connections (remote_transport=ssh)")
+    lines.append("# TYPE openvox_gui_ssh_pool_connections gauge")
+    lines.append(f"openvox_gui_ssh_pool_connections {ssh_conns}")
+
+    # Upstream latency histograms / in-flight / pool utilisation / SLO
+    try:
+        from .utils.upstream_metrics import upstream_metrics
+
+        lines.extend(upstream_metrics.render_prometheus())
+    except Exception as exc:
+        logger.debug("upstream metrics export failed: %s", exc)
+
+    # Retention deletes / reclaimed space from the scheduled DB maintenance
+    try:
+        from .services.db_maintenance import db_maintenance
+
+        lines.extend(db_maintenance.render_prometheus())
+    except Exception as exc:
+        logger.debug("DB maintenance metrics export failed: %s", exc)
+
     # Best-effort active CommandExecutionService jobs (process-local; not multi-worker)
     try:
         from .services.command_execution import get_active_job_count
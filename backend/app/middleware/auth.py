@@ -30,14 +30,14 @@ Session tracking:
 """
 import asyncio
 import hashlib
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
 from typing import Optional, Dict, Any
 import logging
 
-from sqlalchemy import select, delete
+from sqlalchemy import select
 from .auth_base import AuthBackend
 
 logger = logging.getLogger(__name__)
@@ -135,13 +135,9 @@ async def _track_session(request: Request, user: Dict[str, Any]):
                     ip_address=ip,
                 ))
 
-            # Purge stale sessions that have not been seen in the last
-            # 15 minutes. This keeps the table small and ensures the
-            # "active users" count on the dashboard is accurate.
-            cutoff = now - timedelta(minutes=15)
-            await session.execute(
-                delete(ActiveSession).where(ActiveSession.last_seen < cutoff)
-            )
+            # Stale sessions (not seen for 15 minutes) are purged by the
+            # scheduled DB maintenance; the dashboard's "active users"
+            # count filters on last_seen itself.
             await session.commit()
     except Exception as e:
         # Session tracking is non-critical telemetry. A failure here
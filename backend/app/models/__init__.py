@@ -9,6 +9,10 @@ validation and serialization.
 - session.py - Active user sessions for tracking logged-in users
 - enc.py - External Node Classifier (ENC) hierarchical data model
 - execution_history.py - Bolt command/task/plan execution history
+- orchestration_job.py - Durable queue of Bolt runs (job IDs, lanes, cancellation)
+- agent_run.py - Last successful live puppet agent run per certname
+- execution_result.py - Compressed full per-target output of execution history rows
+- execution_stream.py - Live Bolt output events shared between workers
 
 **Pydantic Schemas:**
 - schemas.py - Request/response models for API endpoints
@@ -28,3 +32,7 @@ from .token_denylist import TokenDenylist
 from .api_token import ApiToken
 from .executive_report import ExecutiveReportRecipient, ExecutiveReportConfig
 from .cluster_secret import ClusterSecret
+from .orchestration_job import OrchestrationJob
+from .agent_run import AgentLastSuccess
+from .execution_result import ExecutionResult
+from .execution_stream import ExecutionStreamEvent
@@ -0,0 +1,26 @@
+"""Last successful live ``puppet agent`` run per certname (Nodes status overlay)."""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database import Base
+
+
+class AgentLastSuccess(Base):
+    """Denormalised from ``execution_history``: one row per certname.
+
+    ``certname`` is lower-case as Bolt reported it (FQDN or short name);
+    ``short_name`` is its first label, so every spelling of a host lands
+    on the same index entry. ``last_success_at`` is the run's
+    ``executed_at`` (start time), which the stale-failed-report window
+    in ``routers.nodes`` is calibrated against.
+    """
+
+    __tablename__ = "agent_last_success"
+
+    certname: Mapped[str] = mapped_column(String(255), primary_key=True)
+    short_name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    last_success_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    history_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
@@ -1,7 +1,7 @@
 """
 Database model for orchestration execution history.
 """
-from sqlalchemy import Column, String, DateTime, Integer, Text, JSON
+from sqlalchemy import Column, String, DateTime, Integer, Text, JSON, Index
 from datetime import datetime, timezone
 from ..database import Base
 
@@ -14,6 +14,12 @@ def _utc_naive() -> datetime:
 class ExecutionHistory(Base):
     """Tracks execution history for commands, tasks, and plans."""
     __tablename__ = "execution_history"
+    # History window (+ status filter / stats) and per-user audit scans.
+    # List pages order by (executed_at, id); PK is the keyset tie-break.
+    __table_args__ = (
+        Index("ix_execution_history_executed_at_status", "executed_at", "status"),
+        Index("ix_execution_history_executed_by_executed_at", "executed_by", "executed_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     execution_type = Column(String(20), nullable=False, index=True)  # 'command', 'task', or 'plan'
@@ -24,8 +30,12 @@ class ExecutionHistory(Base):
     environment = Column(String(255), nullable=True)  # For plans
     parameters = Column(JSON, nullable=True)  # Store any additional parameters
     result_format = Column(String(20), nullable=True)  # 'human', 'json', 'rainbow'
-    status = Column(String(20), nullable=False)  # 'success', 'failure', 'running', 'queued'
+    status = Column(String(20), nullable=False)  # 'success', 'failure', 'running', 'queued', 'cancelled'
     executed_at = Column(DateTime, nullable=False, index=True, default=_utc_naive)
+    # Job lifecycle (naive UTC). Direct runs: queued_at == started_at.
+    queued_at = Column(DateTime, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
     executed_by = Column(String(255), nullable=False)  # Username who executed
     duration_ms = Column(Integer, nullable=True)  # Execution duration in milliseconds
     error_message = Column(Text, nullable=True)  # Error message if failed
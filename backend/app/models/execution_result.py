@@ -0,0 +1,30 @@
+"""Compressed full output of an execution, one row per target."""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Index, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database import Base
+
+
+class ExecutionResult(Base):
+    """Full Bolt result for one target of an ``execution_history`` row.
+
+    ``target`` is the certname from Bolt's JSON items; the empty string
+    holds the run-level output (human-format stdout, stderr, return code).
+    ``data`` is the UTF-8 JSON document compressed with ``codec``.
+    """
+
+    __tablename__ = "execution_results"
+    __table_args__ = (Index("ix_execution_results_history_target", "history_id", "target", unique=True),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    history_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    target: Mapped[str] = mapped_column(String(255), nullable=False, default="")
+    status: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    codec: Mapped[str] = mapped_column(String(10), nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)  # uncompressed bytes
+    stored_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, index=True)
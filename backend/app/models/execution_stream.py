@@ -0,0 +1,28 @@
+"""Live output events of running Bolt executions, shared between workers."""
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database import Base
+
+
+class ExecutionStreamEvent(Base):
+    """One event of ``/api/bolt/executions/{id}/stream``.
+
+    The worker running the execution writes its events here in small
+    batches, so a subscriber whose request lands on another worker or
+    console replays them from the database. ``seq`` 0 is the ``open`` row
+    (owner and kind); rows are pruned by database maintenance.
+    """
+
+    __tablename__ = "execution_stream_events"
+    __table_args__ = (Index("ix_execution_stream_events_exec_seq", "execution_id", "seq", unique=True),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    execution_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)
+    event: Mapped[str] = mapped_column(String(20), nullable=False)
+    data: Mapped[Any] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, index=True)
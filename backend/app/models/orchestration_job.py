@@ -0,0 +1,40 @@
+"""Durable Bolt orchestration jobs (queue shared by every console on the DB)."""
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import JSON, Boolean, DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database import Base
+
+
+class OrchestrationJob(Base):
+    """One queued / running / finished Bolt command, task or plan.
+
+    ``id`` doubles as the live output execution ID
+    (``/api/bolt/executions/{id}/stream``). Workers claim a job with a
+    conditional UPDATE (``status='queued'``), so two consoles sharing a
+    PostgreSQL database never run the same job twice.
+    """
+
+    __tablename__ = "orchestration_jobs"
+    __table_args__ = (Index("ix_orchestration_jobs_status_priority", "status", "priority", "created_at"),)
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)  # command | task | plan
+    lane: Mapped[str] = mapped_column(String(20), nullable=False, default="interactive")
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # lower runs first
+    # queued | running | succeeded | failed | cancelled
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued", index=True)
+    submitted_by: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    payload: Mapped[Any] = mapped_column(JSON, nullable=False)
+    history_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    worker: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    returncode: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    result: Mapped[Optional[Any]] = mapped_column(JSON, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
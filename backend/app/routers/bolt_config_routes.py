@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
 from ..dependencies import require_role
+from ..services.bolt_catalog import bolt_catalog
 from ..utils.sudo import run_sudo
 from ..utils.validation import strip_control_chars
 
@@ -249,11 +250,13 @@ async def save_config(
     try:
         found.write_text(req.content, encoding="utf-8")
         logger.info("Bolt config file saved: %s by %s", found, current_user)
+        bolt_catalog.code_changed(f"{filename} saved")
         return {"status": "ok", "path": str(found), "message": f"{filename} saved successfully"}
     except PermissionError:
         ok, err = await _sudo_write(str(found), req.content)
         if ok:
             logger.info("Bolt config file saved via sudo install: %s by %s", found, current_user)
+            bolt_catalog.code_changed(f"{filename} saved")
             return {"status": "ok", "path": str(found), "message": f"{filename} saved successfully"}
         raise HTTPException(
             status_code=403,
@@ -304,6 +307,7 @@ async def sync_inventory_from_enc(
     try:
         inventory_path.write_text(yaml_content, encoding="utf-8")
         logger.info("Bolt inventory synced from ENC: %s by %s", inventory_path, current_user)
+        bolt_catalog.invalidate("inventory synced from ENC")
         return {
             "status": "ok",
             "path": str(inventory_path),
@@ -312,6 +316,7 @@ async def sync_inventory_from_enc(
     except PermissionError:
         ok, err = await _sudo_write(str(inventory_path), yaml_content)
         if ok:
+            bolt_catalog.invalidate("inventory synced from ENC")
             return {
                 "status": "ok",
                 "path": str(inventory_path),
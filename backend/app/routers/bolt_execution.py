@@ -2,17 +2,20 @@
 import asyncio
 import logging
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
 from ..dependencies import require_role
 from ..middleware.security import rate_limit_heavy, concurrency_heavy
+from ..services import bolt_fanout
+from ..services.bolt_catalog import bolt_catalog
 from ..services import bolt_orchestration as bolt_orch
 from ..services.bolt_orchestration import BoltRunResultModel
+from ..services.bolt_stream import BoltExecutionStream, bolt_streams
 from ..utils.audit import audit_event
 from ..utils.validation import validate_command, strip_ansi
 from .bolt_runtime import find_bolt, resolve_targets, run_bolt_command
@@ -54,6 +57,10 @@ class RunCommandRequest(BaseModel):
     targets: str
     run_as: Optional[str] = None
     format: Optional[str] = "human"
+    # Client-chosen ID to follow the run live (else one is assigned)
+    execution_id: Optional[str] = None
+    # Fan-out runs (bolt_fanout): seconds a target may take before it is reported as timed out
+    target_timeout: Optional[int] = Field(None, ge=10, le=3600)
 
 
 class RunTaskRequest(BaseModel):
@@ -62,12 +69,57 @@ class RunTaskRequest(BaseModel):
     params: Dict[str, Any] = Field(default_factory=dict)
     run_as: Optional[str] = None
     format: Optional[str] = "human"
+    # Client-chosen ID to follow the run live (else one is assigned)
+    execution_id: Optional[str] = None
+    target_timeout: Optional[int] = Field(None, ge=10, le=3600)
 
 
 class RunPlanRequest(BaseModel):
     plan: str
     params: Dict[str, Any] = Field(default_factory=dict)
     format: Optional[str] = "human"
+    # Client-chosen ID to follow the run live (else one is assigned)
+    execution_id: Optional[str] = None
+
+
+def _open_stream(execution_id: Optional[str], kind: str, user: str) -> BoltExecutionStream:
+    try:
+        return bolt_streams.create(user, kind, execution_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409 if "in use" in str(e) else 400, detail=str(e))
+
+
+def _finish_stream(
+    stream: BoltExecutionStream, model: BoltRunResultModel, result: Dict[str, Any]
+) -> BoltRunResultModel:
+    model.execution_id = stream.execution_id
+    stream.finish(model.model_dump(), result.get("stdout") or "")
+    return model
+
+
+async def _run_fanned_out(
+    stream: BoltExecutionStream, targets: List[str], build_args, target_timeout: int
+) -> Dict[str, Any]:
+    """Large target set: chunks via bolt_fanout, each reported on the stream as it lands."""
+
+    def _chunk(summary: Dict[str, Any], items: List[Dict[str, Any]]) -> None:
+        stream.targets_from(items)
+        stream.publish("chunk", summary)
+        stream.line(
+            f"Chunk {summary['chunk']}/{summary['chunks']} finished: {summary['succeeded']} ok, "
+            f"{summary['failed']} failed ({summary['duration_ms'] / 1000:.1f}s)"
+        )
+
+    stream.line(f"Fanning out over {len(targets)} targets")
+    return await bolt_fanout.run_fanout(
+        build_args, targets, target_timeout=target_timeout, on_chunk=_chunk
+    )
+
+
+def _abort_stream(stream: BoltExecutionStream) -> None:
+    if not stream.finished:
+        stream.finish({"returncode": -1, "output": "", "error": "Run failed. See journalctl -u openvox-gui."})
+
 
 @router.get("/status")
 async def bolt_status():
@@ -116,85 +168,58 @@ async def bolt_status():
 # ─── Task & Plan Discovery ────────────────────────────────
 
 @router.get("/tasks")
-async def list_tasks():
-    """List available Bolt tasks."""
-    result = await run_bolt_command(["task", "show", "--format", "json"])
-    if result["returncode"] != 0:
-        return {"tasks": [], "error": result["stderr"]}
-    import json
-    try:
-        data = json.loads(result["stdout"])
-        return {"tasks": data if isinstance(data, list) else []}
-    except json.JSONDecodeError:
-        # Fall back to line parsing
-        lines = result["stdout"].strip().split("\n")
-        tasks = []
-        for line in lines:
-            parts = line.strip().split(None, 1)
-            if parts and "::" in parts[0]:
-                tasks.append({"name": parts[0], "description": parts[1] if len(parts) > 1 else ""})
-        return {"tasks": tasks}
+async def list_tasks(refresh: bool = False):
+    """List available Bolt tasks (cached until modules or the project change)."""
+    return await bolt_catalog.get("tasks", refresh=refresh)
 
 
 @router.get("/plans")
-async def list_plans():
-    """List available Bolt plans."""
-    result = await run_bolt_command(["plan", "show", "--format", "json"])
-    if result["returncode"] != 0:
-        return {"plans": [], "error": result["stderr"]}
-    import json
-    try:
-        data = json.loads(result["stdout"])
-        return {"plans": data if isinstance(data, list) else []}
-    except json.JSONDecodeError:
-        lines = result["stdout"].strip().split("\n")
-        plans = []
-        for line in lines:
-            parts = line.strip().split(None, 1)
-            if parts and len(parts[0]) > 1:
-                plans.append({"name": parts[0], "description": parts[1] if len(parts) > 1 else ""})
-        return {"plans": plans}
+async def list_plans(refresh: bool = False):
+    """List available Bolt plans (cached until modules or the project change)."""
+    return await bolt_catalog.get("plans", refresh=refresh)
 
 
 @router.get("/inventory")
-async def get_inventory():
-    """Get Bolt inventory (targets)."""
-    result = await run_bolt_command(["inventory", "show", "--format", "json"])
-    if result["returncode"] != 0:
-        return {"targets": [], "error": result["stderr"]}
-    import json
-    try:
-        data = json.loads(result["stdout"])
-        return data
-    except json.JSONDecodeError:
-        return {"targets": [], "raw": result["stdout"]}
+async def get_inventory(refresh: bool = False):
+    """Get Bolt inventory (targets); cached, see services.bolt_catalog."""
+    return await bolt_catalog.get("inventory", refresh=refresh)
 
 
-@router.post("/run/command", response_model=BoltRunResultModel)
-@rate_limit_heavy()
-async def run_command(
-    request: Request,
-    req: RunCommandRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: str = Depends(require_role("admin", "operator")),
-    _ = Depends(concurrency_heavy),
-):
-    """Run an ad-hoc command on targets (orchestration via bolt_orchestration service)."""
-    try:
-        validate_command(req.command)
-    except ValueError as e:
-        # ValidationAppError subclasses ValueError; OpenVoxError handler also maps it.
-        raise HTTPException(status_code=400, detail=str(e))
-
+def command_format(req: RunCommandRequest) -> str:
     fmt = req.format if req.format in ("human", "json", "rainbow") else "human"
     # Puppet agent: always use JSON so exit 0/2 are reliable (human format says "Failed on… exit 2")
     if bolt_orch._is_puppet_agent_invocation(req.command) and fmt == "human":
         fmt = "json"
+    return fmt
+
+
+async def _history_row(db: AsyncSession, history_entry, **fields):
+    """Queued job row → running, else a new running row (direct POST)."""
+    if history_entry is not None:
+        await bolt_orch.mark_execution_running(db, history_entry)
+        return history_entry
+    return await bolt_orch.start_execution_history(db, **fields)
+
+
+async def execute_command(
+    db: AsyncSession,
+    req: RunCommandRequest,
+    current_user: str,
+    stream: BoltExecutionStream,
+    history_entry=None,
+) -> BoltRunResultModel:
+    """Run a validated ad-hoc command (POST /run/command and the job queue)."""
+    fmt = command_format(req)
     try:
         resolved_targets = await resolve_targets(req.targets, db)
+        target_list = [t for t in resolved_targets.split(",") if t]
+        fan_out = bolt_fanout.should_fan_out(len(target_list))
+        if fan_out:
+            fmt = "json"  # chunks merge into one Bolt JSON document
 
-        history_entry = await bolt_orch.start_execution_history(
+        history_entry = await _history_row(
             db,
+            history_entry,
             execution_type="command",
             node_name=req.targets,
             command_name=req.command,
@@ -202,6 +227,7 @@ async def run_command(
             executed_by=current_user,
             parameters={"run_as": req.run_as} if req.run_as else None,
         )
+        stream.history_id = getattr(history_entry, "id", None)
 
         start_time = time.time()
         normalized = bolt_orch.normalize_command_for_gui(req.command)
@@ -211,13 +237,20 @@ async def run_command(
         else:
             command, escalate = bolt_orch.apply_escalation(normalized, req.run_as)
 
-        args = ["command", "run", command, "--targets", resolved_targets, "--format", fmt]
-        if req.run_as and req.run_as != "root":
-            args.extend(["--run-as", req.run_as])
+        def _args(targets: str) -> List[str]:
+            args = ["command", "run", command, "--targets", targets, "--format", fmt]
+            if req.run_as and req.run_as != "root":
+                args.extend(["--run-as", req.run_as])
+            return args
 
         # Puppet agent may wait on lock; allow full waitforlock window + apply time
         cmd_timeout = 600 if bolt_orch._is_puppet_agent_invocation(command) else 300
-        result = await run_bolt_command(args, timeout=cmd_timeout)
+        if fan_out:
+            result = await _run_fanned_out(
+                stream, target_list, lambda chunk: _args(",".join(chunk)), req.target_timeout or cmd_timeout
+            )
+        else:
+            result = await run_bolt_command(_args(resolved_targets), timeout=cmd_timeout, on_line=stream.line)
         result = bolt_orch.reinterpret_puppet_agent_bolt_result(
             result, original_command=req.command
         )
@@ -241,16 +274,139 @@ async def run_command(
             format=fmt,
             escalate=escalate,
         )
-        return bolt_orch.sanitize_bolt_result(result)
+        return _finish_stream(stream, bolt_orch.sanitize_bolt_result(result), result)
     except HTTPException:
+        _abort_stream(stream)
         raise
     except Exception as e:
-        logger.error("POST /bolt/run/command failed: %s", e, exc_info=True)
-        return BoltRunResultModel(
+        logger.error("Bolt command run failed: %s", e, exc_info=True)
+        failed = BoltRunResultModel(
             returncode=-1,
             output="",
             error=f"Run failed: {e}. See journalctl -u openvox-gui.",
         )
+        return _finish_stream(stream, failed, {})
+    finally:
+        _abort_stream(stream)
+
+
+async def execute_task(
+    db: AsyncSession,
+    req: RunTaskRequest,
+    current_user: str,
+    stream: BoltExecutionStream,
+    history_entry=None,
+) -> BoltRunResultModel:
+    """Run a Bolt task (POST /run/task and the job queue)."""
+    fmt = req.format if req.format in ("human", "json", "rainbow") else "human"
+    try:
+        resolved_targets = await resolve_targets(req.targets, db)
+        target_list = [t for t in resolved_targets.split(",") if t]
+        fan_out = bolt_fanout.should_fan_out(len(target_list))
+        if fan_out:
+            fmt = "json"
+        history_entry = await _history_row(
+            db,
+            history_entry,
+            execution_type="task",
+            node_name=req.targets,
+            task_name=req.task,
+            result_format=fmt,
+            executed_by=current_user,
+            parameters={"params": req.params, "run_as": req.run_as} if req.params or req.run_as else None,
+        )
+        stream.history_id = getattr(history_entry, "id", None)
+        start_time = time.time()
+        def _args(targets: str) -> List[str]:
+            args = ["task", "run", req.task, "--targets", targets, "--format", fmt]
+            if req.run_as:
+                args.extend(["--run-as", req.run_as])
+            for k, v in req.params.items():
+                args.append(f"{k}={v}")
+            return args
+
+        if fan_out:
+            result = await _run_fanned_out(
+                stream, target_list, lambda chunk: _args(",".join(chunk)), req.target_timeout or 300
+            )
+        else:
+            result = await run_bolt_command(_args(resolved_targets), timeout=300, on_line=stream.line)
+        await bolt_orch.finish_execution_history(db, history_entry, result, start_time)
+        audit_event(
+            "bolt_task",
+            user=current_user,
+            targets=resolved_targets,
+            detail=req.task,
+            rc=result.get("returncode"),
+            success=result.get("returncode") == 0,
+            run_as=req.run_as or "",
+        )
+        return _finish_stream(stream, bolt_orch.sanitize_bolt_result(result), result)
+    finally:
+        _abort_stream(stream)
+
+
+async def execute_plan(
+    db: AsyncSession,
+    req: RunPlanRequest,
+    current_user: str,
+    stream: BoltExecutionStream,
+    history_entry=None,
+) -> BoltRunResultModel:
+    """Run a Bolt plan (POST /run/plan and the job queue)."""
+    fmt = req.format if req.format in ("human", "json", "rainbow") else "human"
+    try:
+        history_entry = await _history_row(
+            db,
+            history_entry,
+            execution_type="plan",
+            node_name="all",
+            plan_name=req.plan,
+            result_format=fmt,
+            executed_by=current_user,
+            parameters=req.params if req.params else None,
+        )
+        stream.history_id = getattr(history_entry, "id", None)
+        start_time = time.time()
+        args = ["plan", "run", req.plan, "--format", fmt]
+        for k, v in req.params.items():
+            args.append(f"{k}={v}")
+        result = await run_bolt_command(args, timeout=600, on_line=stream.line)
+        await bolt_orch.finish_execution_history(db, history_entry, result, start_time)
+        audit_event(
+            "bolt_plan",
+            user=current_user,
+            targets="plan",
+            detail=req.plan,
+            rc=result.get("returncode"),
+            success=result.get("returncode") == 0,
+        )
+        return _finish_stream(stream, bolt_orch.sanitize_bolt_result(result), result)
+    finally:
+        _abort_stream(stream)
+
+
+def validate_command_request(req: RunCommandRequest) -> None:
+    try:
+        validate_command(req.command)
+    except ValueError as e:
+        # ValidationAppError subclasses ValueError; OpenVoxError handler also maps it.
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/run/command", response_model=BoltRunResultModel)
+@rate_limit_heavy()
+async def run_command(
+    request: Request,
+    req: RunCommandRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: str = Depends(require_role("admin", "operator")),
+    _ = Depends(concurrency_heavy),
+):
+    """Run an ad-hoc command on targets (orchestration via bolt_orchestration service)."""
+    validate_command_request(req)
+    stream = _open_stream(req.execution_id, "command", current_user)
+    return await execute_command(db, req, current_user, stream)
 
 
 @router.post("/run/task", response_model=BoltRunResultModel)
@@ -263,35 +419,8 @@ async def run_task(
     _ = Depends(concurrency_heavy),
 ):
     """Run a Bolt task on targets."""
-    fmt = req.format if req.format in ("human", "json", "rainbow") else "human"
-    resolved_targets = await resolve_targets(req.targets, db)
-    history_entry = await bolt_orch.start_execution_history(
-        db,
-        execution_type="task",
-        node_name=req.targets,
-        task_name=req.task,
-        result_format=fmt,
-        executed_by=current_user,
-        parameters={"params": req.params, "run_as": req.run_as} if req.params or req.run_as else None,
-    )
-    start_time = time.time()
-    args = ["task", "run", req.task, "--targets", resolved_targets, "--format", fmt]
-    if req.run_as:
-        args.extend(["--run-as", req.run_as])
-    for k, v in req.params.items():
-        args.append(f"{k}={v}")
-    result = await run_bolt_command(args, timeout=300)
-    await bolt_orch.finish_execution_history(db, history_entry, result, start_time)
-    audit_event(
-        "bolt_task",
-        user=current_user,
-        targets=resolved_targets,
-        detail=req.task,
-        rc=result.get("returncode"),
-        success=result.get("returncode") == 0,
-        run_as=req.run_as or "",
-    )
-    return bolt_orch.sanitize_bolt_result(result)
+    stream = _open_stream(req.execution_id, "task", current_user)
+    return await execute_task(db, req, current_user, stream)
 
 
 @router.post("/run/plan", response_model=BoltRunResultModel)
@@ -304,28 +433,48 @@ async def run_plan(
     _ = Depends(concurrency_heavy),
 ):
     """Run a Bolt plan."""
-    fmt = req.format if req.format in ("human", "json", "rainbow") else "human"
-    history_entry = await bolt_orch.start_execution_history(
-        db,
-        execution_type="plan",
-        node_name="all",
-        plan_name=req.plan,
-        result_format=fmt,
-        executed_by=current_user,
-        parameters=req.params if req.params else None,
-    )
-    start_time = time.time()
-    args = ["plan", "run", req.plan, "--format", fmt]
-    for k, v in req.params.items():
-        args.append(f"{k}={v}")
-    result = await run_bolt_command(args, timeout=600)
-    await bolt_orch.finish_execution_history(db, history_entry, result, start_time)
-    audit_event(
-        "bolt_plan",
-        user=current_user,
-        targets="plan",
-        detail=req.plan,
-        rc=result.get("returncode"),
-        success=result.get("returncode") == 0,
+    stream = _open_stream(req.execution_id, "plan", current_user)
+    return await execute_plan(db, req, current_user, stream)
+
+
+@router.get("/executions/{execution_id}/stream")
+async def stream_execution(
+    request: Request,
+    execution_id: str,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: str = Depends(require_role("admin", "operator")),
+):
+    """Server-Sent Events for one run: ``line``, ``target`` and a final ``result``.
+
+    The browser may subscribe before its POST arrives (the run is awaited
+    for a few seconds). The run may belong to another worker or console;
+    its events are then replayed from the shared table. ``Last-Event-ID``
+    resumes after a reconnect. Only
+    the user who started the run (or an admin) can follow it.
+    """
+    import json
+
+    from fastapi.responses import StreamingResponse
+
+    stream = await bolt_streams.wait_for(execution_id)
+    user = getattr(request.state, "user", None) or {}
+    if stream is None or (stream.owner != current_user and user.get("role") != "admin"):
+        raise HTTPException(status_code=404, detail="Unknown execution_id")
+    try:
+        after = int(last_event_id or 0)
+    except ValueError:
+        after = 0
+
+    async def _generate():
+        async for ev in stream.follow(after):
+            if ev is None:
+                yield ": keepalive\n\n"
+                continue
+            seq, event, data = ev
+            yield f"id: {seq}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    return StreamingResponse(
+        _generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    return bolt_orch.sanitize_bolt_result(result)
@@ -1,6 +1,11 @@
 """Bolt file transfer + script run (srdev2 physical split)."""
+import asyncio
+import hashlib
 import logging
+import re
+import shlex
 from pathlib import Path
+from typing import List, Set, Tuple
 
 from fastapi import APIRouter, Depends, File as FastAPIFile, Form, HTTPException, Request, UploadFile
 from pydantic import BaseModel
@@ -16,6 +21,8 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 UPLOAD_STAGING_DIR = Path("/opt/openvox-gui/data/bolt-uploads")
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+_SHA256_RE = re.compile(r"\b([0-9a-f]{64})\b")
 
 
 class FileDownloadRequest(BaseModel):
@@ -23,11 +30,51 @@ class FileDownloadRequest(BaseModel):
     destination: str
     targets: str
 
+
+async def _stage_upload(file: UploadFile, dest: Path) -> Tuple[int, str]:
+    """Chunked copy of the spooled multipart file to ``dest``; returns (size, sha256 hex)."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(dest, "wb") as out:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+            await asyncio.to_thread(out.write, chunk)
+    return size, digest.hexdigest()
+
+
+def _remote_sha256_command(destination: str, filename: str) -> str:
+    """Shell for every target: sha256 of the file the upload would write (or nothing)."""
+    dest = shlex.quote(destination)
+    name = shlex.quote(filename)
+    return f"f={dest}; [ -d \"$f\" ] && f=\"$f\"/{name}; sha256sum \"$f\" 2>/dev/null || true"
+
+
+async def _targets_with_checksum(targets: str, destination: str, filename: str, sha256: str) -> Set[str]:
+    """One batched ``bolt command run`` → targets that already hold an identical copy."""
+    from ..services.bolt_orchestration import _iter_bolt_result_items
+
+    args = ["command", "run", _remote_sha256_command(destination, filename),
+            "--targets", targets, "--run-as", "root", "--format", "json"]
+    result = await run_bolt_command(args, timeout=300)
+    same: Set[str] = set()
+    for item in _iter_bolt_result_items(result.get("stdout") or ""):
+        value = item.get("value") if isinstance(item.get("value"), dict) else {}
+        m = _SHA256_RE.search(str(value.get("stdout") or "").lower())
+        if item.get("target") and m and m.group(1) == sha256:
+            same.add(str(item["target"]))
+    return same
+
+
 @router.post("/file/upload")
 async def upload_file_to_targets(
     file: UploadFile = FastAPIFile(..., description="The file to upload to remote targets"),
     targets: str = Form(..., description="Comma-separated certnames, 'all', or ENC group name"),
     destination: str = Form(..., description="Remote path where the file should be placed on targets"),
+    skip_unchanged: bool = Form(False, description="Skip targets that already have an identical file (sha256sum)"),
     db: AsyncSession = Depends(get_db),
     current_user: str = Depends(require_role("admin", "operator")),
 ):
@@ -43,6 +90,12 @@ async def upload_file_to_targets(
     Bolt's stdout, stderr, and exit code so the user can see exactly
     what happened on each target.
 
+    Starlette spools the multipart body to a temp file; it is copied
+    to the staging file in chunks (never read into memory whole) and
+    checksummed during the copy. With ``skip_unchanged``,
+    one batched remote ``sha256sum`` runs first and targets that
+    already hold an identical copy are left out of the push.
+
     Security: The destination path is validated to prevent path
     traversal attacks. The uploaded file is stored with a unique
     name to prevent collisions from concurrent uploads.
@@ -63,32 +116,46 @@ async def upload_file_to_targets(
     UPLOAD_STAGING_DIR.mkdir(parents=True, exist_ok=True)
     staging_subdir = UPLOAD_STAGING_DIR / uuid.uuid4().hex
     staging_subdir.mkdir(parents=True, exist_ok=True)
-    staged_path = staging_subdir / file.filename
+    filename = Path(file.filename or "upload").name or "upload"
+    staged_path = staging_subdir / filename
 
     try:
-        # Write the uploaded file content to the staging directory
-        content = await file.read()
-        staged_path.write_bytes(content)
-        logger.info(f"User '{current_user}' staged file '{file.filename}' "
-                    f"({len(content)} bytes) for upload to {resolved_targets}")
-
-        # Execute Bolt file upload: pushes the staged file to all targets.
-        # The destination can be a directory (file keeps its name) or a
-        # full path (file is renamed on the target).
-        # --run-as root ensures the file can be written to any destination
-        # regardless of the connecting user's permissions on the target.
-        args = ["file", "upload", str(staged_path), destination,
-                "--targets", resolved_targets, "--run-as", "root",
-                "--format", "human"]
-        result = await run_bolt_command(args, timeout=300)
+        size, sha256 = await _stage_upload(file, staged_path)
+        logger.info(f"User '{current_user}' staged file '{filename}' "
+                    f"({size} bytes, sha256 {sha256[:12]}) for upload to {resolved_targets}")
+
+        skipped: List[str] = []
+        push_targets = resolved_targets
+        if skip_unchanged and resolved_targets:
+            same = await _targets_with_checksum(resolved_targets, destination, filename, sha256)
+            all_targets = [t for t in resolved_targets.split(",") if t]
+            skipped = [t for t in all_targets if t in same]
+            push_targets = ",".join(t for t in all_targets if t not in same)
+
+        if not push_targets:
+            result = {"returncode": 0, "stdout": "All targets already have an identical copy; nothing uploaded.",
+                      "stderr": ""}
+        else:
+            # Execute Bolt file upload: pushes the staged file to all targets.
+            # The destination can be a directory (file keeps its name) or a
+            # full path (file is renamed on the target).
+            # --run-as root ensures the file can be written to any destination
+            # regardless of the connecting user's permissions on the target.
+            args = ["file", "upload", str(staged_path), destination,
+                    "--targets", push_targets, "--run-as", "root",
+                    "--format", "human"]
+            result = await run_bolt_command(args, timeout=300)
 
         return {
             "success": result["returncode"] == 0,
             "returncode": result["returncode"],
-            "filename": file.filename,
-            "size": len(content),
+            "filename": filename,
+            "size": size,
+            "sha256": sha256,
             "destination": destination,
             "targets": resolved_targets,
+            "uploaded_to": push_targets,
+            "skipped_unchanged": skipped,
             "output": strip_ansi(result.get("stdout", "")),
             "error": result["stderr"],
         }
@@ -0,0 +1,204 @@
+"""Queued Bolt runs: submit, poll, stream and cancel (``/api/bolt/jobs``)."""
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from ..dependencies import require_role
+from ..middleware.security import rate_limit_heavy
+from ..services.bolt_stream import KEEPALIVE_SEC, bolt_streams
+from ..services.job_queue import FINAL, LANES, job_queue, job_to_dict
+from ..utils.audit import audit_event
+from .bolt_execution import RunCommandRequest, RunPlanRequest, RunTaskRequest, validate_command_request
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+_LANE_PATTERN = "^(" + "|".join(LANES) + ")$"
+
+
+def _is_admin(request: Request) -> bool:
+    user = getattr(request.state, "user", None) or {}
+    return user.get("role") == "admin"
+
+
+async def _own_job(request: Request, job_id: str, current_user: str):
+    job = await job_queue.get(job_id)
+    if job is None or (job.submitted_by != current_user and not _is_admin(request)):
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job
+
+
+async def _submit(kind: str, req, lane: str, current_user: str) -> dict:
+    payload = req.model_dump(exclude={"execution_id"})
+    try:
+        job = await job_queue.submit(kind, payload, current_user, lane=lane)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    audit_event(
+        "bolt_job_submit",
+        user=current_user,
+        targets=payload.get("targets") or "plan",
+        detail=f"{kind} {payload.get('command') or payload.get('task') or payload.get('plan') or ''}"[:120],
+        job_id=job.id,
+        lane=lane,
+    )
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "lane": job.lane,
+        "history_id": job.history_id,
+        "stream_url": f"/api/bolt/jobs/{job.id}/stream",
+    }
+
+
+@router.post("/jobs/command")
+@rate_limit_heavy()
+async def submit_command_job(
+    request: Request,
+    req: RunCommandRequest,
+    lane: str = Query("interactive", pattern=_LANE_PATTERN),
+    current_user: str = Depends(require_role("admin", "operator")),
+):
+    """Queue an ad-hoc command; returns the job ID straight away."""
+    validate_command_request(req)
+    return await _submit("command", req, lane, current_user)
+
+
+@router.post("/jobs/task")
+@rate_limit_heavy()
+async def submit_task_job(
+    request: Request,
+    req: RunTaskRequest,
+    lane: str = Query("interactive", pattern=_LANE_PATTERN),
+    current_user: str = Depends(require_role("admin", "operator")),
+):
+    """Queue a Bolt task."""
+    return await _submit("task", req, lane, current_user)
+
+
+@router.post("/jobs/plan")
+@rate_limit_heavy()
+async def submit_plan_job(
+    request: Request,
+    req: RunPlanRequest,
+    lane: str = Query("interactive", pattern=_LANE_PATTERN),
+    current_user: str = Depends(require_role("admin", "operator")),
+):
+    """Queue a Bolt plan."""
+    return await _submit("plan", req, lane, current_user)
+
+
+@router.get("/jobs")
+async def list_jobs(
+    request: Request,
+    status: Optional[str] = Query(None, pattern="^(queued|running|succeeded|failed|cancelled)$"),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: str = Depends(require_role("admin", "operator")),
+):
+    """Recent jobs (your own; admins see everyone's) and this console's pool."""
+    jobs = await job_queue.list_jobs(
+        submitted_by=None if _is_admin(request) else current_user, status=status, limit=limit
+    )
+    return {
+        "jobs": [job_to_dict(j, include_result=False) for j in jobs],
+        "pool": job_queue.stats(),
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(
+    request: Request,
+    job_id: str,
+    current_user: str = Depends(require_role("admin", "operator")),
+):
+    """Poll one job; ``result`` is the run result once it has finished."""
+    job = await _own_job(request, job_id, current_user)
+    out = job_to_dict(job)
+    out["queue_position"] = await job_queue.position(job)
+    return out
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(
+    request: Request,
+    job_id: str,
+    current_user: str = Depends(require_role("admin", "operator")),
+):
+    """Cancel a queued job, or stop a running one (its Bolt process is terminated)."""
+    job = await _own_job(request, job_id, current_user)
+    if job.status in FINAL:
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    job = await job_queue.cancel(job_id, current_user)
+    audit_event("bolt_job_cancel", user=current_user, detail=job_id, status=job.status if job else None)
+    return job_to_dict(job, include_result=False) if job else {"job_id": job_id}
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_job(
+    request: Request,
+    job_id: str,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: str = Depends(require_role("admin", "operator")),
+):
+    """SSE for a job: ``status`` while it waits, then the live run events.
+
+    Once the job runs, ``line`` / ``target`` / ``result`` stream as
+    ``/api/bolt/executions/{id}/stream`` does, from this process or (for a
+    job another worker or console runs) from the shared event table.
+    """
+    job = await _own_job(request, job_id, current_user)
+    try:
+        after = int(last_event_id or 0)
+    except ValueError:
+        after = 0
+    poll = max(0.5, job_queue.poll_sec)
+
+    def _sse(event: str, data: dict, seq: Optional[int] = None) -> str:
+        head = f"id: {seq}\n" if seq is not None else ""
+        return f"{head}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    async def _generate():
+        current = job
+        last_status = None
+        idle = 0.0
+        while True:
+            stream = bolt_streams.get(job_id)
+            if stream is None and current.status == "running":
+                stream = await bolt_streams.find(job_id)
+            if stream is not None:
+                async for ev in stream.follow(after):
+                    if ev is None:
+                        yield ": keepalive\n\n"
+                        continue
+                    seq, event, data = ev
+                    yield _sse(event, data, seq)
+                return
+            if current.status in FINAL:
+                result = current.result or {"returncode": current.returncode, "output": "", "error": current.error}
+                yield _sse("result", {**result, "execution_id": job_id, "history_id": current.history_id,
+                                      "job_status": current.status})
+                return
+            if current.status != last_status:
+                last_status = current.status
+                idle = 0.0
+                yield _sse("status", {"status": current.status, "queue_position": await job_queue.position(current),
+                                      "worker": current.worker})
+            elif idle >= KEEPALIVE_SEC:
+                idle = 0.0
+                yield ": keepalive\n\n"
+            await asyncio.sleep(poll)
+            idle += poll
+            refreshed = await job_queue.get(job_id)
+            if refreshed is None:
+                return
+            current = refreshed
+
+    return StreamingResponse(
+        _generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -4,12 +4,13 @@ from __future__ import annotations
 import os
 import shutil
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..services.execution import resolve_targets as execution_resolve_targets
 from ..utils.sudo import run_sudo
+from ..utils.upstream_metrics import observe
 
 BOLT_PATHS = [
     "/opt/puppetlabs/bolt/bin/bolt",
@@ -235,7 +236,12 @@ def sanitize_bolt_inventory(
             return dest
 
 
-async def run_bolt_command(args: List[str], timeout: int = 120) -> Dict[str, Any]:
+async def run_bolt_command(
+    args: List[str],
+    timeout: int = 120,
+    on_line: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """Run Bolt as the bolt user; ``on_line`` receives stdout lines live (see bolt_stream)."""
     bolt = find_bolt()
     if not bolt:
         return {"returncode": -1, "stdout": "", "stderr": "OpenBolt is not installed"}
@@ -265,7 +271,11 @@ async def run_bolt_command(args: List[str], timeout: int = 120) -> Dict[str, Any
     bypass = _estate_no_proxy(env)
     env["NO_PROXY"] = bypass
     env["no_proxy"] = bypass
-    result = await run_sudo(bolt_args, timeout=timeout, env=env)
+    # "task run", "plan show", ... (never the command text or targets)
+    verb = " ".join([a for a in args[:2] if not a.startswith("-")]) or "bolt"
+    async with observe("bolt", verb) as obs:
+        result = await run_sudo(bolt_args, timeout=timeout, env=env, on_line=on_line)
+        obs.exit(result)
     from ..utils.validation import strip_ansi
 
     if isinstance(result.get("stdout"), str):
@@ -6,7 +6,7 @@ import json
 import re
 import socket
 import logging
-from fastapi import Request, APIRouter, Depends, HTTPException
+from fastapi import Request, APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -360,10 +360,13 @@ async def get_services_status():
     }
     if is_clustered():
         try:
-            from ..services.cluster_health import probe_cluster_members, probe_cluster_full
+            from ..services.cluster_health import members_from_doc
+            from ..services.cluster_health_prober import cluster_prober
 
-            payload["cluster_members"] = await probe_cluster_members(cfg)
-            payload["cluster_health"] = await probe_cluster_full(cfg)
+            # One cached document serves both views (was two full probes)
+            health = await cluster_prober.get()
+            payload["cluster_members"] = members_from_doc(health)
+            payload["cluster_health"] = health
         except Exception as e:
             logger.exception("cluster health probe failed")
             errors.append(f"cluster: {e}")
@@ -381,17 +384,19 @@ async def get_cluster_config():
 
 
 @router.get("/cluster/health")
-async def get_cluster_health():
+async def get_cluster_health(
+    fresh: bool = Query(False, description="Probe now instead of serving the background prober's document"),
+):
     """
     Full cluster health document (clustered mode).
 
     Includes per-FQDN PuppetDB/compiler/CA API probes and Pacemaker HA summary
-    (primary / VIP node / online list) when available.
+    (primary / VIP node / online list) when available. Served from the
+    background prober; ``probe`` reports the document's age.
     """
-    from ..services.cluster_config import load_cluster_config, is_clustered
-    from ..services.cluster_health import probe_cluster_full
+    from ..services.cluster_config import is_clustered
+    from ..services.cluster_health_prober import cluster_prober
 
-    cfg = load_cluster_config()
     if not is_clustered():
         return {
             "deployment_mode": "single",
@@ -403,7 +408,7 @@ async def get_cluster_health():
             "ha": None,
             "summary": {},
         }
-    return await probe_cluster_full(cfg)
+    return await cluster_prober.get(fresh=fresh)
 
 
 class ClusterConfigUpdate(BaseModel):
@@ -538,6 +543,15 @@ async def update_cluster_config(
         logger.exception("Unexpected error saving cluster config")
         raise HTTPException(status_code=500, detail=f"Failed to save cluster config: {e}")
 
+    # Background estate probes run only in clustered mode (this worker now;
+    # the others pick it up on their next restart)
+    try:
+        from ..services.cluster_health_prober import start_cluster_prober
+
+        await start_cluster_prober()
+    except Exception as e:
+        logger.warning("Failed to start cluster health prober: %s", e)
+
     seeded: List[str] = []
     seed_error: Optional[str] = None
     if saved.get("deployment_mode") == "clustered" and seed:
@@ -6,6 +6,7 @@ import logging
 import re
 import socket
 import subprocess
+import time
 from pathlib import Path
 from fastapi import APIRouter, HTTPException, Request, Depends
 from fastapi.responses import PlainTextResponse
@@ -27,6 +28,8 @@ R10K_DEPLOY_SCRIPT = "/opt/openvox-gui/scripts/r10k-deploy.sh"
 
 class DeployRequest(BaseModel):
     environment: Optional[str] = None  # None = all environments
+    # Client-chosen ID to follow the deploy live (/api/bolt/executions/{id}/stream)
+    execution_id: Optional[str] = None
 
 
 def _run_command(cmd: List[str], timeout: int = 300) -> dict:
@@ -72,7 +75,44 @@ def _r10k_cmd(environment: Optional[str] = None) -> List[str]:
     return cmd
 
 
-async def _run_r10k_deploy(environment: Optional[str] = None, timeout: int = R10K_DEPLOY_TIMEOUT) -> dict:
+async def _run_r10k_deploy(
+    environment: Optional[str] = None,
+    timeout: int = R10K_DEPLOY_TIMEOUT,
+    stream: Any = None,
+) -> dict:
+    """Run r10k for Code Deployment (see ``_r10k_deploy``).
+
+    ``stream`` (a ``bolt_stream`` execution stream) receives output lines and
+    per-compiler progress while the deploy runs. Modules may have changed
+    either way, so the cached Bolt task / plan listings are dropped and
+    reloaded in the background.
+    """
+    started = time.monotonic()
+    try:
+        result = await _r10k_deploy(environment, timeout, stream)
+        result["duration_ms"] = int((time.monotonic() - started) * 1000)
+        return result
+    finally:
+        _code_deployed(f"r10k deploy {environment or 'all'}")
+
+
+def _stream_lines(stream: Any):
+    """``on_line`` for run_sudo that forwards r10k output to ``stream`` (credentials scrubbed)."""
+    if stream is None:
+        return None
+    return lambda line: stream.line(_CREDS_RE.sub(r"\1\2:***@", line))
+
+
+def _code_deployed(reason: str) -> None:
+    try:
+        from ..services.bolt_catalog import bolt_catalog
+
+        bolt_catalog.code_changed(reason)
+    except Exception as e:
+        logger.debug("Bolt catalog invalidation skipped: %s", e)
+
+
+async def _r10k_deploy(environment: Optional[str], timeout: int, stream: Any = None) -> dict:
     """Run r10k for Code Deployment.
 
     * **Clustered** (Settings → Cluster): OpenBolt runs ``r10k deploy environment -pv``
@@ -101,7 +141,9 @@ async def _run_r10k_deploy(environment: Optional[str] = None, timeout: int = R10
                     "hosts": [],
                     "output": [],
                 }
-            cluster = await _run_live_r10k_on_targets(environment, targets, timeout=timeout)
+            cluster = await _run_live_r10k_on_targets(
+                environment, targets, timeout=timeout, stream=stream
+            )
             # Normalize to the shape trigger_deployment expects + pass hosts through.
             out_lines = list(cluster.get("output") or [])
             return {
@@ -127,7 +169,7 @@ async def _run_r10k_deploy(environment: Optional[str] = None, timeout: int = R10
         }
 
     cmd = _r10k_cmd(environment)
-    result = await run_sudo(cmd, timeout=timeout)
+    result = await run_sudo(cmd, timeout=timeout, on_line=_stream_lines(stream))
     rc = result.get("returncode", -1)
     try:
         exit_code = int(rc) if rc is not None else -1
@@ -368,6 +410,8 @@ async def webhook_deploy(request: Request):
         output_lines=len(out_preview.splitlines()),
         output_preview=out_preview,
         commit=commit_msg,
+        duration_ms=result.get("duration_ms"),
+        hosts=result.get("hosts"),
     )
     try:
         from ..database import async_session
@@ -379,6 +423,8 @@ async def webhook_deploy(request: Request):
                 success=result["success"],
                 exit_code=result["exit_code"],
                 output_preview=out_preview,
+                duration_ms=result.get("duration_ms"),
+                hosts=result.get("hosts"),
             )
     except Exception:
         pass
@@ -411,8 +457,17 @@ async def run_deployment(
     """
     Trigger an r10k deployment.
     Requires admin or operator role (srdev2 A7 — Depends, not inline RBAC).
+
+    Output and per-compiler progress are published on the execution stream
+    (``execution_id``) while the deploy runs; the POST returns the final result.
     """
+    from ..services.bolt_stream import bolt_streams
+
     username = current_user or "anonymous"
+    try:
+        stream = bolt_streams.create(username, "deploy", deploy.execution_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409 if "in use" in str(e) else 400, detail=str(e))
 
     try:
         cmd = _r10k_cmd(deploy.environment)
@@ -423,6 +478,7 @@ async def run_deployment(
         result = await _run_r10k_deploy(
             environment=deploy.environment,
             timeout=R10K_DEPLOY_TIMEOUT,
+            stream=stream,
         )
 
         from ..utils.audit import audit_event
@@ -457,6 +513,8 @@ async def run_deployment(
             exit_code=result["exit_code"],
             output_lines=len(log_lines),
             output_preview=preview,
+            duration_ms=result.get("duration_ms"),
+            hosts=result.get("hosts"),
         )
         # Dual-write SQLite execution_history (srdev2 A6)
         try:
@@ -470,6 +528,8 @@ async def run_deployment(
                     exit_code=result["exit_code"],
                     output_preview=preview,
                     error_message=None if result["success"] else (result.get("stderr") or "")[:500],
+                    duration_ms=result.get("duration_ms"),
+                    hosts=result.get("hosts"),
                 )
         except Exception as db_exc:
             logger.warning("deploy execution_history dual-write failed: %s", db_exc)
@@ -483,10 +543,14 @@ async def run_deployment(
             "mode": result.get("mode") or "single-host",
             "hosts": result.get("hosts") or [],
             "targets": result.get("targets") or [],
+            "duration_ms": result.get("duration_ms"),
+            "execution_id": stream.execution_id,
         }
+        stream.finish(response)
         return response
     except Exception as e:
         logger.error("Deployment error: %s", e, exc_info=True)
+        stream.finish({"success": False, "exit_code": -1, "output": [], "error": str(e)})
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -702,6 +766,20 @@ def _flatten_bolt_json(
     return rc, lines, hosts
 
 
+def _timing_lines(hosts: List[dict]) -> List[str]:
+    """Per-host durations, slowest first (the compiler holding up the deploy)."""
+    timed = [h for h in hosts if h.get("duration_ms") is not None]
+    if not timed:
+        return []
+    timed.sort(key=lambda h: h["duration_ms"], reverse=True)
+    width = max(len(str(h["host"])) for h in timed)
+    return ["", "Per-host timing (slowest first):"] + [
+        f"  {str(h['host']).ljust(width)}  {'ok  ' if h.get('success') else 'FAIL'}  "
+        f"{h['duration_ms'] / 1000:.1f}s"
+        for h in timed
+    ]
+
+
 def _cluster_env_args(mode: str, environment: Optional[str]) -> List[str]:
     """Build [mode] or [mode, env]. Treat All Environments as no env name."""
     args = [mode]
@@ -797,8 +875,17 @@ async def _run_live_r10k_on_targets(
     environment: Optional[str],
     targets: List[str],
     timeout: int = R10K_DEPLOY_TIMEOUT,
+    stream: Any = None,
 ) -> dict:
-    """``r10k deploy environment -pv`` on every compiler via OpenBolt (clustered Deploy Now)."""
+    """``r10k deploy environment -pv`` on every compiler via OpenBolt (clustered Deploy Now).
+
+    After one shared SSH probe, one Bolt process runs r10k on every
+    compiler (Bolt's own concurrency, one Ruby start-up, one ``timeout``
+    for the whole deploy). Its JSON items are read as Bolt prints them, so
+    every host is reported on ``stream`` as it finishes and its
+    ``duration_ms`` (since the run started) is kept; the slow compiler is
+    visible.
+    """
     from ..routers.bolt_runtime import find_bolt, run_bolt_command
 
     try:
@@ -890,6 +977,8 @@ async def _run_live_r10k_on_targets(
                 ],
             )
 
+        from ..services.bolt_stream import _ItemScanner
+
         cmd_args = [
             "command", "run", remote_cmd,
             "--targets", ",".join(targets),
@@ -899,8 +988,47 @@ async def _run_live_r10k_on_targets(
             "--no-host-key-check",
             "--format", "json",
         ]
+        scanner = _ItemScanner()
+        durations: Dict[str, int] = {}
+        started = time.monotonic()
+
+        def _on_line(line: str) -> None:
+            items = [i for i in scanner.feed(line) if i.get("target")]
+            if not items:
+                return
+            duration_ms = int((time.monotonic() - started) * 1000)
+            names = [str(i["target"]) for i in items]
+            for name in names:
+                durations[name] = duration_ms
+            if stream is None:
+                return
+            _, host_out, host_rows = _flatten_bolt_json(
+                {"returncode": 0, "stdout": json.dumps({"items": items})},
+                names,
+                via="bolt-live-r10k",
+            )
+            for ln in host_out:
+                if ln:
+                    stream.line(ln)
+            for row in host_rows:
+                stream.target_state(
+                    row["host"],
+                    "success" if row["success"] else "failure",
+                    exit_code=row["exit_code"],
+                    duration_ms=duration_ms,
+                )
+            stream.publish("progress", {
+                "done": len(durations),
+                "total": len(targets),
+                "hosts": names,
+                "duration_ms": duration_ms,
+            })
+
+        if stream is not None:
+            stream.line(f"r10k running on {len(targets)} compiler(s)…")
+            stream.publish("progress", {"done": 0, "total": len(targets), "hosts": [], "duration_ms": 0})
         try:
-            result = await run_bolt_command(cmd_args, timeout=timeout)
+            result = await run_bolt_command(cmd_args, timeout=timeout, on_line=_on_line)
         except Exception as e:
             logger.error("clustered-live bolt command raised: %s", e, exc_info=True)
             return _cluster_result(
@@ -913,18 +1041,22 @@ async def _run_live_r10k_on_targets(
                 [{"host": t, "success": False, "via": "bolt", "exit_code": -1} for t in targets],
             )
         rc, out, hosts = _flatten_bolt_json(result, targets, via="bolt-live-r10k")
+        for host in hosts:
+            host["duration_ms"] = durations.get(host["host"])
         return _cluster_result(
             "clustered-live",
             environment,
             targets,
             rc == 0,
             0 if rc == 0 else 1,
-            header + out,
+            header + out + _timing_lines(hosts),
             hosts,
         )
 
     # Local-only (console is also the only target)
-    local = await run_sudo(_r10k_cmd(environment), timeout=timeout)
+    started = time.monotonic()
+    local = await run_sudo(_r10k_cmd(environment), timeout=timeout, on_line=_stream_lines(stream))
+    duration_ms = int((time.monotonic() - started) * 1000)
     rc = local.get("returncode")
     rc = -1 if rc is None else int(rc)
     out = ((local.get("stdout") or "") + "\n" + (local.get("stderr") or "")).splitlines()
@@ -936,7 +1068,13 @@ async def _run_live_r10k_on_targets(
         rc == 0,
         0 if rc == 0 else 1,
         header + [ln for ln in out if ln is not None],
-        [{"host": host_label, "success": rc == 0, "via": "local", "exit_code": rc}],
+        [{
+            "host": host_label,
+            "success": rc == 0,
+            "via": "local",
+            "exit_code": rc,
+            "duration_ms": duration_ms,
+        }],
     )
 
 
@@ -1151,6 +1289,7 @@ async def _cluster_deploy(kind: str, deploy: ClusterDeployRequest, current_user:
             ],
             [{"host": t, "success": False, "via": "error", "exit_code": -1} for t in targets],
         )
+    _code_deployed(f"cluster {kind} {deploy.environment or 'all'}")
     audit_event(
         f"deploy_{kind}",
         user=current_user,
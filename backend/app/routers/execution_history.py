@@ -1,17 +1,22 @@
 """
 API endpoints for execution history management.
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, and_, desc
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, and_, or_, desc, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
+import csv
+import io
+import json
 import time
 
 from ..database import get_db
 from ..models import ExecutionHistory
 from ..dependencies import get_current_user, require_role
+from ..services import result_store
 import logging
 
 logger = logging.getLogger(__name__)
@@ -56,6 +61,9 @@ class ExecutionHistoryResponse(BaseModel):
     result_format: Optional[str]
     status: str
     executed_at: datetime
+    queued_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
     executed_by: str
     duration_ms: Optional[int]
     error_message: Optional[str]
@@ -137,6 +145,10 @@ def _cutoff_naive(days: int) -> datetime:
     return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)
 
 
+def _naive_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
 @router.get("", response_model=List[ExecutionHistoryResponse], include_in_schema=False)
 @router.get("/", response_model=List[ExecutionHistoryResponse])
 async def get_execution_history(
@@ -145,23 +157,42 @@ async def get_execution_history(
     node_name: Optional[str] = Query(None, description="Filter by node name"),
     status: Optional[str] = Query(None, description="Filter by status"),
     limit: int = Query(500, ge=1, le=1000, description="Maximum number of entries to return"),
+    before: Optional[datetime] = Query(None, description="Keyset cursor: executed_at of the last entry already shown"),
+    before_id: Optional[int] = Query(None, description="Keyset cursor: id of the last entry already shown"),
     db: AsyncSession = Depends(get_db),
     current_user: str = Depends(get_current_user)
 ):
-    """Get execution history for the last N days."""
+    """Get execution history for the last N days, newest first.
+
+    Pages with a keyset cursor: pass the last entry's ``executed_at`` and
+    ``id`` as ``before`` / ``before_id`` for the next (older) page. Rows
+    are ordered by (executed_at, id), so the cursor never skips or
+    repeats rows, and each page is an index range scan however deep.
+    """
+    if before_id is not None and before is None:
+        raise HTTPException(status_code=400, detail="before_id requires before")
     cutoff_date = _cutoff_naive(days)
 
     try:
         query = select(ExecutionHistory).where(
             ExecutionHistory.executed_at >= cutoff_date
         )
+        if before is not None:
+            before = _naive_utc(before)
+            if before_id is None:
+                query = query.where(ExecutionHistory.executed_at < before)
+            else:
+                query = query.where(or_(
+                    ExecutionHistory.executed_at < before,
+                    and_(ExecutionHistory.executed_at == before, ExecutionHistory.id < before_id),
+                ))
         if execution_type:
             query = query.where(ExecutionHistory.execution_type == execution_type)
         if node_name:
             query = query.where(ExecutionHistory.node_name == node_name)
         if status:
             query = query.where(ExecutionHistory.status == status)
-        query = query.order_by(desc(ExecutionHistory.executed_at)).limit(limit)
+        query = query.order_by(desc(ExecutionHistory.executed_at), desc(ExecutionHistory.id)).limit(limit)
         result = await db.execute(query)
         entries = list(result.scalars().all())
         # Normalize JSON params that may be strings after SQLite→PG migration
@@ -187,6 +218,9 @@ async def get_execution_history(
                     result_format=e.result_format,
                     status=e.status,
                     executed_at=e.executed_at,
+                    queued_at=e.queued_at,
+                    started_at=e.started_at,
+                    finished_at=e.finished_at,
                     executed_by=e.executed_by,
                     duration_ms=e.duration_ms,
                     error_message=e.error_message,
@@ -218,40 +252,50 @@ async def get_execution_stats(
     """Get execution statistics for the last N days."""
     cutoff_date = _cutoff_naive(days)
 
+    # Aggregated in the database: the window can hold millions of rows
+    by_status: Dict[str, int] = {}
+    by_type = {'command': 0, 'task': 0, 'plan': 0}
+    top_nodes: List[Any] = []
+    duration_sum = 0
+    duration_count = 0
     try:
+        in_window = ExecutionHistory.executed_at >= cutoff_date
         result = await db.execute(
-            select(ExecutionHistory).where(
-                ExecutionHistory.executed_at >= cutoff_date
+            select(
+                ExecutionHistory.status,
+                ExecutionHistory.execution_type,
+                func.count(),
+                func.sum(ExecutionHistory.duration_ms),
+                func.count(ExecutionHistory.duration_ms),
             )
+            .where(in_window)
+            .group_by(ExecutionHistory.status, ExecutionHistory.execution_type)
         )
-        entries = list(result.scalars().all())
+        for status, execution_type, count, dur_sum, dur_count in result.all():
+            by_status[status] = by_status.get(status, 0) + count
+            if execution_type in by_type:
+                by_type[execution_type] += count
+            duration_sum += dur_sum or 0
+            duration_count += dur_count or 0
+
+        node_count = func.count().label("n")
+        result = await db.execute(
+            select(ExecutionHistory.node_name, node_count)
+            .where(in_window)
+            .group_by(ExecutionHistory.node_name)
+            .order_by(desc(node_count), ExecutionHistory.node_name)
+            .limit(10)
+        )
+        top_nodes = result.all()
     except Exception as e:
         logger.exception("get_execution_stats failed: %s", e)
-        entries = []
-    
-    # Calculate statistics
-    total_executions = len(entries)
-    successful = sum(1 for e in entries if e.status == 'success')
-    failed = sum(1 for e in entries if e.status == 'failure')
-    running = sum(1 for e in entries if e.status == 'running')
-    
-    # Group by type
-    by_type = {
-        'command': sum(1 for e in entries if e.execution_type == 'command'),
-        'task': sum(1 for e in entries if e.execution_type == 'task'),
-        'plan': sum(1 for e in entries if e.execution_type == 'plan')
-    }
-    
-    # Most active nodes
-    node_counts = {}
-    for entry in entries:
-        node_counts[entry.node_name] = node_counts.get(entry.node_name, 0) + 1
-    top_nodes = sorted(node_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-    
-    # Average duration
-    durations = [e.duration_ms for e in entries if e.duration_ms is not None]
-    avg_duration = sum(durations) / len(durations) if durations else 0
-    
+
+    total_executions = sum(by_status.values())
+    successful = by_status.get('success', 0)
+    failed = by_status.get('failure', 0)
+    running = by_status.get('running', 0)
+    avg_duration = duration_sum / duration_count if duration_count else 0
+
     return {
         "period_days": days,
         "total_executions": total_executions,
@@ -264,6 +308,59 @@ async def get_execution_stats(
     }
 
 
+async def _own_history(request: Request, db: AsyncSession, history_id: int, current_user: str) -> None:
+    """Full results are the user's own runs only (admins: any run).
+
+    They can hold command output, task results and secrets echoed by
+    scripts; the history list only ever showed a 500-char preview.
+    """
+    executed_by = (
+        await db.execute(select(ExecutionHistory.executed_by).where(ExecutionHistory.id == history_id))
+    ).scalar_one_or_none()
+    user = getattr(request.state, "user", None) or {}
+    if executed_by is None or (executed_by != current_user and user.get("role") != "admin"):
+        raise HTTPException(status_code=404, detail="Execution history entry not found")
+
+
+@router.get("/{history_id}/results")
+async def get_execution_results(
+    history_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+):
+    """Targets with a stored full result for this run (sizes only, no output).
+
+    Only the user who ran it, or an admin.
+    """
+    await _own_history(request, db, history_id, current_user)
+    return await result_store.list_results(db, history_id)
+
+
+@router.get("/{history_id}/results/output")
+async def get_execution_result_output(
+    history_id: int,
+    request: Request,
+    target: str = Query("", max_length=255, description="Certname; empty = run-level stdout/stderr"),
+    offset: int = Query(0, ge=0, description="Byte offset into the stored JSON document"),
+    length: Optional[int] = Query(None, ge=1, le=16 * 1024 * 1024, description="Bytes to return; default all"),
+    db: AsyncSession = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+):
+    """Full stored result for one target, decompressed on demand.
+
+    Only the user who ran it, or an admin.
+    """
+    await _own_history(request, db, history_id, current_user)
+    try:
+        out = await result_store.read_result(db, history_id, target, offset, length)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if out is None:
+        raise HTTPException(status_code=404, detail="No stored result for this target (expired or never stored)")
+    return out
+
+
 @router.delete("/{history_id}")
 async def delete_execution_history(
     history_id: int,
@@ -280,6 +377,7 @@ async def delete_execution_history(
         raise HTTPException(status_code=404, detail="Execution history entry not found")
     
     logger.info(f"Execution history entry {history_id} deleted by admin {current_user}")
+    await result_store.delete_results(db, [history_id])
     await db.delete(entry)
     await db.commit()
     
@@ -289,71 +387,156 @@ async def delete_execution_history(
 @router.delete("/cleanup/old")
 async def cleanup_old_history(
     days: int = Query(90, ge=30, le=365, description="Delete entries older than N days"),
-    db: AsyncSession = Depends(get_db),
     current_user: str = Depends(require_role("admin"))
 ):
-    """Delete execution history entries older than N days."""
-    cutoff_date = _cutoff_naive(days)
+    """Delete execution history entries older than N days.
 
-    count_result = await db.execute(
-        select(ExecutionHistory).where(
-            ExecutionHistory.executed_at < cutoff_date
-        )
-    )
-    count = len(count_result.scalars().all())
-
-    logger.info(f"Admin {current_user} cleaning up {count} execution history entries older than {days} days")
+    Runs in short batched transactions (see services.db_maintenance), so a
+    large cleanup does not hold the database write lock.
+    """
+    from ..database import async_session
+    from ..services.db_maintenance import purge_execution_history
 
-    await db.execute(
-        ExecutionHistory.__table__.delete().where(
-            ExecutionHistory.executed_at < cutoff_date
-        )
-    )
-    await db.commit()
+    cutoff_date = _cutoff_naive(days)
+    count = await purge_execution_history(async_session, cutoff_date)
+    logger.info(f"Admin {current_user} deleted {count} execution history entries older than {days} days")
 
     return {
         "message": f"Deleted {count} execution history entries older than {days} days"
     }
 
 
+@router.post("/cleanup/maintenance")
+async def run_db_maintenance(
+    convert_sqlite: bool = Query(
+        False, description="Also run the one-time full VACUUM to auto_vacuum=INCREMENTAL (SQLite)"
+    ),
+    current_user: str = Depends(require_role("admin"))
+):
+    """Run the scheduled DB maintenance pass now; returns its report.
+
+    ``convert_sqlite`` locks the database for the whole VACUUM; it is
+    skipped (``convert_skipped``) when the disk lacks room for the copy.
+    """
+    from ..services.db_maintenance import db_maintenance
+
+    logger.info(f"Admin {current_user} started DB maintenance (convert_sqlite={convert_sqlite})")
+    return await db_maintenance.run_once(convert_sqlite=convert_sqlite)
+
+
+# Rows fetched per round trip while streaming an export
+EXPORT_BATCH = 1000
+
+_EXPORT_FIELDS = (
+    "id", "execution_type", "node_name", "command_name", "task_name", "plan_name",
+    "environment", "status", "executed_at", "executed_by", "duration_ms",
+    "error_message", "result_preview",
+)
+
+_EXPORT_MEDIA = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _export_row(e: ExecutionHistory) -> Dict[str, Any]:
+    row = {name: getattr(e, name) for name in _EXPORT_FIELDS}
+    row["executed_at"] = e.executed_at.isoformat() if e.executed_at else None
+    return row
+
+
+async def _export_batches(cutoff_date: datetime):
+    """Yield lists of export rows, newest first, one keyset page at a time.
+
+    Uses its own session: the export outlives the request's ``get_db``
+    session, and short per-batch queries keep SQLite readers from holding
+    one snapshot for the whole download.
+    """
+    from ..database import async_session
+
+    cursor = None
+    while True:
+        query = select(ExecutionHistory).where(ExecutionHistory.executed_at >= cutoff_date)
+        if cursor is not None:
+            query = query.where(or_(
+                ExecutionHistory.executed_at < cursor[0],
+                and_(ExecutionHistory.executed_at == cursor[0], ExecutionHistory.id < cursor[1]),
+            ))
+        query = query.order_by(desc(ExecutionHistory.executed_at), desc(ExecutionHistory.id)).limit(EXPORT_BATCH)
+        async with async_session() as db:
+            entries = list((await db.execute(query)).scalars().all())
+        if not entries:
+            return
+        yield [_export_row(e) for e in entries]
+        if len(entries) < EXPORT_BATCH:
+            return
+        cursor = (entries[-1].executed_at, entries[-1].id)
+
+
+async def _export_body(fmt: str, header: Dict[str, Any], batches):
+    """Export chunks; a failure mid-stream is marked, never passed off as complete.
+
+    The status line is already sent by then: ``json`` closes with
+    ``"truncated": true`` and the error, ``ndjson`` ends with a marker line,
+    and ``csv`` (no room for one) aborts the response.
+    """
+    count = 0
+    error = None
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=_EXPORT_FIELDS)
+        writer.writeheader()
+        yield buf.getvalue()
+    elif fmt == "json":
+        yield json.dumps(header)[:-1] + ', "entries": ['
+    try:
+        async for rows in batches:
+            if fmt == "csv":
+                buf = io.StringIO()
+                writer = csv.DictWriter(buf, fieldnames=_EXPORT_FIELDS)
+                writer.writerows(rows)
+                yield buf.getvalue()
+            elif fmt == "ndjson":
+                yield "".join(json.dumps(r) + "\n" for r in rows)
+            else:
+                yield ("," if count else "") + ",".join(json.dumps(r) for r in rows)
+            count += len(rows)
+    except Exception as e:
+        logger.warning("execution history export truncated after %d rows: %s", count, e)
+        if fmt == "csv":
+            raise
+        error = f"export failed after {count} rows ({type(e).__name__}); see the server log"
+    if fmt == "ndjson" and error:
+        yield json.dumps({"truncated": True, "error": error, "count": count}) + "\n"
+    elif fmt == "json":
+        tail = f', "truncated": true, "error": {json.dumps(error)}' if error else ""
+        yield f'], "count": {count}{tail}}}'
+
+
 @router.get("/audit/export")
 async def export_audit_history(
     days: int = Query(30, ge=1, le=365, description="Export entries from last N days"),
-    db: AsyncSession = Depends(get_db),
+    format: str = Query("json", pattern="^(json|ndjson|csv)$", description="json, ndjson or csv"),
     current_user: str = Depends(require_role("admin"))
 ):
     """Basic audit export endpoint for execution history (per enterprise architect P1.7).
     Returns structured JSON with actor, timestamps, etc. for Bolt, etc.
     Can be extended for deploys, certs, ENC, config, logins.
+
+    Streams in batches of ``EXPORT_BATCH`` rows. ``json`` keeps the
+    original document shape (``count`` now follows ``entries``); ``ndjson``
+    and ``csv`` are one row per line for SIEM / spreadsheet imports.
     """
-    cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
-    result = await db.execute(
-        select(ExecutionHistory).where(
-            ExecutionHistory.executed_at >= cutoff_date
-        ).order_by(desc(ExecutionHistory.executed_at))
-    )
-    entries = result.scalars().all()
-    return {
+    cutoff_date = _cutoff_naive(days)
+    header = {
         "exported_at": datetime.now(timezone.utc).isoformat(),
         "exported_by": current_user,
         "period_days": days,
-        "count": len(entries),
-        "entries": [
-            {
-                "id": e.id,
-                "execution_type": e.execution_type,
-                "node_name": e.node_name,
-                "command_name": e.command_name,
-                "task_name": e.task_name,
-                "plan_name": e.plan_name,
-                "environment": e.environment,
-                "status": e.status,
-                "executed_at": e.executed_at.isoformat(),
-                "executed_by": e.executed_by,
-                "duration_ms": e.duration_ms,
-                "error_message": e.error_message,
-                "result_preview": e.result_preview,
-            }
-            for e in entries
-        ],
-    }
\ No newline at end of file
+    }
+    filename = f"execution-history-{datetime.now(timezone.utc):%Y%m%d}.{format}"
+    return StreamingResponse(
+        _export_body(format, header, _export_batches(cutoff_date)),
+        media_type=_EXPORT_MEDIA[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -2,10 +2,16 @@
 Facts Explorer API — Browse and query PuppetDB facts across the fleet.
 Supports nested fact queries like "os.family" to access structured fact data.
 """
+import json
+import logging
+
 from fastapi import APIRouter, HTTPException, Query
-from typing import Any, Dict, List
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional
 from ..services.puppetdb import puppetdb_service
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/facts", tags=["facts"])
 
 
@@ -84,48 +90,92 @@ async def get_fact_names(include_paths: bool = Query(False, description="Include
         raise HTTPException(status_code=502, detail=f"PuppetDB error: {e}")
 
 
+async def _legacy_fact_values(base_fact: str, nested_path: Optional[str]) -> List[Dict]:
+    """Download the whole base fact and walk it (non-leaf paths)."""
+    facts = await puppetdb_service.get_facts(fact_name=base_fact)
+    results = []
+    for f in facts:
+        value = f.get("value")
+        if nested_path:
+            value = get_nested_value(value, nested_path)
+            # Skip nodes that don't have this nested value
+            if value is None:
+                continue
+        results.append({
+            "certname": f.get("certname", ""),
+            "value": value,
+            "environment": f.get("environment", ""),
+        })
+    return results
+
+
 @router.get("/values/{fact_path:path}")
 async def get_fact_values(fact_path: str):
     """
     Return certname + value for every node that has the given fact.
     Supports nested facts using dot notation (e.g., "os.family").
+
+    Dotted paths are answered from ``fact_contents`` for that exact path and
+    streamed through, so ``networking.ip`` does not pull every node's whole
+    ``networking`` tree. Paths that are not leaves (e.g. ``os.release``) have
+    no fact_contents rows and fall back to walking the base fact.
     """
+    parts = fact_path.split('.')
+    base_fact = parts[0]
+    nested_path = '.'.join(parts[1:]) if len(parts) > 1 else None
+    header = {
+        "fact_path": fact_path,
+        "base_fact": base_fact,
+        "nested_path": nested_path,
+    }
+
     try:
-        # Split the path to get base fact and nested path
-        parts = fact_path.split('.')
-        base_fact = parts[0]
-        nested_path = '.'.join(parts[1:]) if len(parts) > 1 else None
-        
-        # Get the base fact from PuppetDB
-        facts = await puppetdb_service.get_facts(fact_name=base_fact)
-        
-        results = []
-        for f in facts:
-            value = f.get("value")
-            
-            # If we have a nested path, extract the nested value
-            if nested_path:
-                value = get_nested_value(value, nested_path)
-                # Skip nodes that don't have this nested value
-                if value is None:
-                    continue
-            
-            results.append({
-                "certname": f.get("certname", ""),
-                "value": value,
-                "environment": f.get("environment", ""),
-            })
-        
-        return {
-            "fact_path": fact_path,
-            "base_fact": base_fact,
-            "nested_path": nested_path,
-            "count": len(results),
-            "results": results
-        }
+        rows = puppetdb_service.stream_fact_path_values(fact_path)
+        first = None
+        async for row in rows:
+            if row.get("value") is not None:
+                first = row
+                break
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"PuppetDB error: {e}")
 
+    if first is None:
+        await rows.aclose()
+        if not nested_path:
+            return {**header, "count": 0, "results": []}
+        try:
+            results = await _legacy_fact_values(base_fact, nested_path)
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"PuppetDB error: {e}")
+        return {**header, "count": len(results), "results": results}
+
+    def _item(row: Dict) -> str:
+        return json.dumps({
+            "certname": row.get("certname", ""),
+            "value": row.get("value"),
+            "environment": row.get("environment", ""),
+        })
+
+    async def _body():
+        yield json.dumps(header)[:-1] + ', "results": [' + _item(first)
+        count = 1
+        try:
+            async for row in rows:
+                if row.get("value") is None:
+                    continue
+                yield "," + _item(row)
+                count += 1
+        except Exception as e:
+            # Headers are gone; close the document and log the truncation.
+            logger.warning("fact values stream for %s truncated: %s", fact_path, e)
+        finally:
+            await rows.aclose()
+        yield f'], "count": {count}}}'
+
+    return StreamingResponse(_body(), media_type="application/json")
+
 
 @router.get("/structure/{fact_name}")
 async def get_fact_structure(fact_name: str, sample_count: int = Query(5, ge=1, le=20)):
@@ -134,7 +184,8 @@ async def get_fact_structure(fact_name: str, sample_count: int = Query(5, ge=1,
     Useful for understanding what nested paths are available.
     """
     try:
-        facts = await puppetdb_service.get_facts(fact_name=fact_name)
+        # Bounded in PuppetDB: check a few more rows than needed for variety.
+        facts = await puppetdb_service.sample_fact_values(fact_name, limit=sample_count * 3)
         
         if not facts:
             raise HTTPException(status_code=404, detail=f"Fact '{fact_name}' not found")
@@ -143,7 +194,7 @@ async def get_fact_structure(fact_name: str, sample_count: int = Query(5, ge=1,
         structures = []
         seen_structures = set()
         
-        for f in facts[:sample_count * 3]:  # Check more to find variety
+        for f in facts:
             value = f.get("value")
             if value is None:
                 continue
@@ -8,7 +8,7 @@ Provides endpoints that power `ovox infra health` and `ovox infra tune`.
 
 import logging
 from pathlib import Path
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 
@@ -28,7 +28,10 @@ _AUTH = require_role(*READ_ROLES)
 
 
 @router.get("/health")
-async def infra_health(_user: str = Depends(_AUTH)):
+async def infra_health(
+    fresh: bool = Query(False, description="Probe now instead of serving the background prober's document"),
+    _user: str = Depends(_AUTH),
+):
     """Aggregated estate health for ``ovox infra health``.
 
     Discovers the full serving estate (each compiler **and** compiler VIP,
@@ -37,9 +40,10 @@ async def infra_health(_user: str = Depends(_AUTH)):
     Local GUI systemd rows are included for the console you are talking to.
 
     Never 500s on partial probe failure — returns degraded rows instead.
+    The estate probe comes from the background prober (``probe`` = age).
     """
     from ..services.cluster_config import is_clustered
-    from ..services.estate_inventory import cluster_cfg_for_probes, discover_serving_estate
+    from ..services.estate_inventory import discover_serving_estate
     from ..services.puppetserver import puppetserver_service
 
     warnings: List[str] = []
@@ -49,9 +53,9 @@ async def infra_health(_user: str = Depends(_AUTH)):
 
     # Always probe full inventory (members + VIPs), not only .env VIP
     try:
-        from ..services.cluster_health import probe_cluster_full
+        from ..services.cluster_health_prober import cluster_prober
 
-        ch = await probe_cluster_full(cluster_cfg_for_probes())
+        ch = await cluster_prober.get(fresh=fresh)
     except Exception as e:
         logger.exception("estate health probe failed")
         warnings.append(f"estate probe: {e}")
@@ -205,10 +209,59 @@ async def infra_health(_user: str = Depends(_AUTH)):
             for r in rows
         ],
         "summary": ch.get("summary") if isinstance(ch, dict) else {},
+        "probe": ch.get("probe") if isinstance(ch, dict) else None,
         "warnings": warnings,
     }
 
 
+@router.get("/health/history")
+async def infra_health_history(
+    target: Optional[str] = Query(None, description="One target, e.g. compiler:ovc1.example.com"),
+    _user: str = Depends(_AUTH),
+):
+    """Recent per-target probe results and healthy ↔ unhealthy transitions."""
+    from ..services.cluster_health_prober import cluster_prober
+
+    return cluster_prober.history(target)
+
+
+@router.get("/health/stream")
+async def infra_health_stream(_user: str = Depends(_AUTH)):
+    """Server-Sent Events: ``transition`` per target state change.
+
+    Opens with a ``summary`` event of the cached document; a comment line
+    every 15 s keeps proxies from closing an idle stream.
+    """
+    import asyncio
+    import json
+
+    from fastapi.responses import StreamingResponse
+
+    from ..services.cluster_health_prober import cluster_prober
+
+    async def _generate():
+        q = cluster_prober.subscribe()
+        try:
+            doc = cluster_prober.doc or {}
+            first = {"summary": doc.get("summary") or {}, "probe": {"probed_at": cluster_prober.probed_at}}
+            yield f"event: summary\ndata: {json.dumps(first, default=str)}\n\n"
+            while True:
+                try:
+                    ev = await asyncio.wait_for(q.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: transition\ndata: {json.dumps(ev, default=str)}\n\n"
+        finally:
+            cluster_prober.unsubscribe(q)
+
+    return StreamingResponse(
+        _generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/settings")
 async def get_infra_settings(
     component: Optional[str] = None,
@@ -16,7 +16,7 @@ import socket
 import subprocess
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
@@ -626,17 +626,43 @@ async def _bolt_run(args: List[str], timeout: int = 45) -> Dict[str, Any]:
     return await run_bolt_command(args, timeout=timeout)
 
 
+async def _bolt_command_lines(host: str, cmd: str) -> Tuple[List[str], str]:
+    bolt = await _bolt_run(
+        ["command", "run", cmd, "--targets", host, "--run-as", "root", "--format", "json"],
+    )
+    item = _first_bolt_item(bolt)
+    return _bolt_stdout_lines(bolt, item), _bolt_item_error(bolt, item)
+
+
+async def _ssh_command_lines(host: str, cmd: str) -> Tuple[List[str], str]:
+    """Pooled SSH runner; raises when the transport is off or failed (→ Bolt)."""
+    from ..services.ssh_pool import remote_shell
+
+    res = await remote_shell(host, cmd, timeout=45)
+    if res is None:
+        raise RuntimeError("ssh transport unavailable")
+    text = res.get("stdout") or ""
+    lines = [ln for ln in text.splitlines() if ln and "-- No entries --" not in ln]
+    err = "" if res.get("returncode") == 0 else (res.get("stderr") or "").strip()
+    return lines, err
+
+
 async def _fetch_remote_logs_via_command(
     source: str,
     host: str,
     lines: int,
     since: Optional[str],
     grep: Optional[str],
+    run: Optional[Callable[[str, str], Awaitable[Tuple[List[str], str]]]] = None,
 ) -> Dict[str, Any]:
     """CIS compilers often break `bolt script run` (noexec /tmp, missing
     /home/bolt/.bolt/tmp, no python3). ``command run`` of journalctl/tail
     only needs SSH + sudo.
+
+    ``run(host, cmd) -> (lines, error)`` executes one command; Bolt
+    ``command run`` by default, pooled SSH when enabled.
     """
+    run = run or _bolt_command_lines
     cfg = _LOG_SOURCES.get(source) or _LOG_SOURCES["puppetserver"]
     units = list(cfg.get("units") or ([cfg.get("unit")] if cfg.get("unit") else []))
     files = list(cfg.get("files") or [])
@@ -647,17 +673,12 @@ async def _fetch_remote_logs_via_command(
         cmd = f"/usr/bin/journalctl --no-pager -n {n} --output short-iso"
         if since:
             cmd += f" --since {since!r}"
-        bolt = await _bolt_run(
-            ["command", "run", cmd, "--targets", host, "--run-as", "root", "--format", "json"],
-        )
-        item = _first_bolt_item(bolt)
-        got = _bolt_stdout_lines(bolt, item)
+        got, err = await run(host, cmd)
         if got:
             if grep:
                 g = grep.lower()
                 got = [ln for ln in got if g in ln.lower()]
             return {"source": source, "host": host, "lines": got, "mode": "syslog", "unit": None, "file": None}
-        err = _bolt_item_error(bolt, item)
         if err:
             errors.append(err)
 
@@ -665,11 +686,7 @@ async def _fetch_remote_logs_via_command(
         cmd = f"/usr/bin/journalctl -u {unit} --no-pager -n {n} --output short-iso"
         if since:
             cmd += f" --since {since!r}"
-        bolt = await _bolt_run(
-            ["command", "run", cmd, "--targets", host, "--run-as", "root", "--format", "json"],
-        )
-        item = _first_bolt_item(bolt)
-        got = _bolt_stdout_lines(bolt, item)
+        got, err = await run(host, cmd)
         if got:
             if grep:
                 g = grep.lower()
@@ -682,17 +699,12 @@ async def _fetch_remote_logs_via_command(
                 "unit": unit,
                 "file": None,
             }
-        err = _bolt_item_error(bolt, item)
         if err:
             errors.append(f"{unit}: {err}")
 
     for path in files:
         cmd = f"/usr/bin/tail -n {n} {path}"
-        bolt = await _bolt_run(
-            ["command", "run", cmd, "--targets", host, "--run-as", "root", "--format", "json"],
-        )
-        item = _first_bolt_item(bolt)
-        got = _bolt_stdout_lines(bolt, item)
+        got, err = await run(host, cmd)
         if got:
             if grep:
                 g = grep.lower()
@@ -705,7 +717,6 @@ async def _fetch_remote_logs_via_command(
                 "unit": None,
                 "file": path,
             }
-        err = _bolt_item_error(bolt, item)
         if err:
             errors.append(f"{path}: {err}")
 
@@ -736,6 +747,21 @@ async def _fetch_remote_logs(
     script_err = ""
     transport_errors: List[str] = []
 
+    # Pooled SSH (opt-in): journalctl/tail over a warm connection, no Bolt
+    # start-up. Anything short of lines falls through to the Bolt paths.
+    from ..services.ssh_pool import ssh_enabled
+
+    if ssh_enabled():
+        try:
+            via_ssh = await _fetch_remote_logs_via_command(
+                source, host, lines, since, grep, run=_ssh_command_lines
+            )
+            if via_ssh.get("lines"):
+                via_ssh["transport"] = "ssh"
+                return via_ssh
+        except Exception as e:
+            logger.debug("remote logs via ssh for %s: %s", host, e)
+
     if _SCRIPT.is_file():
         remote_source = _REMOTE_SOURCE_ALIAS.get(source, source)
         args = [
@@ -12,6 +12,7 @@ Provides aggregated data for the Metrics section:
   8. Class coverage
 """
 import asyncio
+import hashlib
 import json
 import logging
 import time as _time
@@ -78,7 +79,7 @@ async def get_compliance(
     from ..services.fleet_insights import compute_trends
     from ..services.fleet_scope import (
         filter_nodes_by_scope,
-        filter_reports_by_scope,
+        get_scoped_reports,
         resolve_scope,
     )
 
@@ -138,11 +139,13 @@ async def get_compliance(
     # Rolling census trend for this scope (sum of series ≈ scoped fleet size)
     since = (datetime.now(timezone.utc) - timedelta(hours=float(hours))).isoformat()
     try:
-        reports = await puppetdb_service.get_reports(
-            query=f'[">" , "receive_time" , "{since}"]',
+        # Scope is pushed into the query so small scopes are not crowded
+        # out of the fleet-wide top 10k by busier hosts.
+        reports = await get_scoped_reports(
+            scope_result,
+            base_query=[">", "receive_time", since],
             limit=10000,
         )
-        reports = filter_reports_by_scope(reports, scope_result)
         # compute_trends expects ascending apply order via bucket sort
         trend_raw = compute_trends(nodes, reports)
         # Map node-status keys to compliance chart keys for the area chart
@@ -238,31 +241,113 @@ async def get_fleet_events(
 
 
 # ─── 4. Fact Distribution ─────────────────────────────────
+# Values are counted in PuppetDB (fact_contents ... group by value); the
+# counts are cheap and cached for _CACHE_TTL. Per-node value lookups (the
+# expensive part) are cached per path, keyed on that path's counts, so
+# volatile facts elsewhere (uptime, free memory) do not invalidate them.
+# Whole-fact downloads are only the fallback for non-leaf paths or an
+# OpenVoxDB that rejects the aggregate.
 
-@router.get("/fact-distribution/{fact_path:path}")
-async def get_fact_distribution(
-    fact_path: str,
-    _user: str = Depends(_AUTH),
-):
-    """Get value distribution for a fact across all nodes."""
+_FACT_VALUES_TTL = 600  # bounds a change that leaves a path's counts unchanged
+_FACT_CONCURRENCY = 6
+
+
+def _fact_str(value: Any) -> str:
+    """Display key for a fact value (dict/list stringified, as before)."""
+    return str(value)
+
+
+def _counts_fingerprint(counts: Dict[str, int]) -> str:
+    """Digest of one path's value counts (key for its per-node lookups)."""
+    h = hashlib.sha1()
+    for value, n in sorted(counts.items()):
+        h.update(f"{value}\0{n}\n".encode())
+    return h.hexdigest()
+
+
+async def _legacy_fact_values(fact_path: str) -> Dict[str, str]:
+    """certname → value string by downloading the base fact (fallback)."""
     from .facts import get_nested_value
 
     parts = fact_path.split(".")
     base_fact = parts[0]
     nested_path = ".".join(parts[1:]) if len(parts) > 1 else None
-
     facts = await puppetdb_service.get_facts(fact_name=base_fact)
-
-    counts: Counter = Counter()
+    node_values: Dict[str, str] = {}
     for f in facts:
         value = f.get("value")
         if nested_path:
             value = get_nested_value(value, nested_path)
             if value is None:
                 continue
-        if isinstance(value, (dict, list)):
-            value = str(value)
-        counts[str(value)] += 1
+        node_values[f.get("certname", "")] = _fact_str(value)
+    return node_values
+
+
+async def _fact_counts(fact_path: str) -> Dict[str, Any]:
+    """{"counts": {value_str: n}, "raw": {value_str: value}, "node_values": …}.
+
+    ``node_values`` is only filled on the legacy path (already downloaded).
+    """
+    async def _build() -> Dict[str, Any]:
+        try:
+            rows = await puppetdb_service.get_fact_value_counts(fact_path)
+        except Exception as e:
+            logger.debug("fact aggregate failed for %s: %s", fact_path, e)
+            rows = []
+        if rows:
+            counts: Dict[str, int] = {}
+            raw: Dict[str, Any] = {}
+            for row in rows:
+                key = _fact_str(row["value"])
+                counts[key] = counts.get(key, 0) + row["count"]
+                raw.setdefault(key, row["value"])
+            return {"counts": counts, "raw": raw, "node_values": None}
+        node_values = await _legacy_fact_values(fact_path)
+        return {
+            "counts": dict(Counter(node_values.values())),
+            "raw": {},
+            "node_values": node_values,
+        }
+
+    from ..utils import ttl_cache
+
+    return await ttl_cache.get_or_set(f"fact_agg:counts:{fact_path}", _CACHE_TTL, _build)
+
+
+async def _fact_node_values(
+    fact_path: str, counts: Dict[str, int], raw_values: Optional[List[Any]] = None
+) -> Dict[str, str]:
+    """certname → value string for one leaf path (optionally only some values).
+
+    Cached until the path's ``counts`` change (or _FACT_VALUES_TTL).
+    """
+    from ..utils import ttl_cache
+
+    async def _build() -> Dict[str, str]:
+        rows = await puppetdb_service.get_fact_path_values(fact_path, values=raw_values)
+        return {
+            str(r.get("certname") or ""): _fact_str(r.get("value"))
+            for r in rows
+            if r.get("value") is not None
+        }
+
+    key = json.dumps(raw_values, sort_keys=True, default=str) if raw_values else "*"
+    fp = _counts_fingerprint(counts)
+    return await ttl_cache.get_or_set(f"fact_agg:values:{fact_path}:{fp}:{key}", _FACT_VALUES_TTL, _build)
+
+
+@router.get("/fact-distribution/{fact_path:path}")
+async def get_fact_distribution(
+    fact_path: str,
+    _user: str = Depends(_AUTH),
+):
+    """Get value distribution for a fact across all nodes."""
+    try:
+        agg = await _fact_counts(fact_path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    counts = agg["counts"]
 
     full_distribution = sorted(
         [{"value": k, "count": v} for k, v in counts.items()],
@@ -291,6 +376,111 @@ async def get_fact_distribution(
 
 # ─── 4b. Fleet Fact Overview ───────────────────────────────
 
+# Facts to analyze — common fleet-differentiating facts
+_FACT_OVERVIEW_PATHS = [
+    "os.family", "os.name", "os.release.full", "kernelrelease",
+    "processors.count", "memory.system.total", "networking.domain",
+    "system_uptime.days", "virtual", "is_virtual",
+    "os.architecture", "ruby.version", "aio_agent_build",
+]
+
+
+async def _fact_overview_entry(fact_path: str) -> Optional[Dict[str, Any]]:
+    """Distribution, outliers and (numeric) scatter for one fact path."""
+    agg = await _fact_counts(fact_path)
+    counts: Dict[str, int] = agg["counts"]
+    node_values: Optional[Dict[str, str]] = agg["node_values"]
+    if not counts:
+        return None
+
+    total = sum(counts.values())
+    unique = len(counts)
+
+    # Skip uniform facts (only 1 value = boring)
+    if unique < 2:
+        return None
+
+    # Detect if values are numeric
+    numeric_values = []
+    for val_str in counts:
+        try:
+            numeric_values.append(float(val_str))
+        except (ValueError, TypeError):
+            numeric_values = []
+            break
+    is_numeric = len(numeric_values) > 0
+
+    # Sort by count descending
+    sorted_dist = sorted(
+        [{"value": k, "count": v} for k, v in counts.items()],
+        key=lambda x: x["count"],
+        reverse=True,
+    )
+
+    # Top 7 + Other for chart
+    if len(sorted_dist) > 7:
+        top = sorted_dist[:7]
+        other_count = sum(d["count"] for d in sorted_dist[7:])
+        top.append({"value": "Other", "count": other_count})
+        chart_dist = top
+    else:
+        chart_dist = sorted_dist
+
+    # Find outliers: values with <= 2 nodes
+    outlier_list = [
+        {"value": d["value"], "count": d["count"]}
+        for d in sorted_dist if d["count"] <= 2 and d["value"] != "Other"
+    ]
+    # Sort outliers by value high-to-low (numeric-aware)
+    try:
+        outlier_list.sort(key=lambda x: float(x["value"]), reverse=True)
+    except (ValueError, TypeError):
+        outlier_list.sort(key=lambda x: x["value"], reverse=True)
+    outliers = outlier_list[:10]
+
+    # Numeric scatter needs every node's value; outliers only their hosts.
+    if node_values is None and is_numeric:
+        node_values = await _fact_node_values(fact_path, counts)
+    if node_values is None and outliers:
+        raw = agg["raw"]
+        node_values = await _fact_node_values(
+            fact_path, counts, [raw[o["value"]] for o in outliers if o["value"] in raw]
+        )
+    node_values = node_values or {}
+    for o in outliers:
+        o["nodes"] = [cn for cn, v in node_values.items() if v == o["value"]]
+
+    # Interestingness score: more unique values + outliers = more interesting
+    score = unique + len(outliers) * 2
+
+    # Dominant value
+    dominant = sorted_dist[0] if sorted_dist else None
+    dominant_pct = round(dominant["count"] / total * 100, 1) if dominant else 0
+
+    # For numeric facts, include per-node values for scatter plot
+    scatter_data = []
+    if is_numeric:
+        scatter_data = sorted(
+            [{"certname": cn, "value": float(v)} for cn, v in node_values.items()],
+            key=lambda x: x["value"],
+            reverse=True,
+        )
+
+    return {
+        "fact": fact_path,
+        "total_nodes": total,
+        "unique_values": unique,
+        "score": score,
+        "is_numeric": is_numeric,
+        "dominant": dominant,
+        "dominant_pct": dominant_pct,
+        "chart_distribution": chart_dist,
+        "distribution": sorted_dist[:20],
+        "outliers": outliers,
+        "scatter": scatter_data[:200] if is_numeric else [],
+    }
+
+
 @router.get("/fact-overview")
 async def get_fact_overview(_user: str = Depends(_AUTH)):
     """Auto-detect interesting facts and return distributions with outliers."""
@@ -298,125 +488,23 @@ async def get_fact_overview(_user: str = Depends(_AUTH)):
     if cached is not None:
         return cached
 
-    from .facts import get_nested_value
-
-    # Facts to analyze — common fleet-differentiating facts
-    fact_paths = [
-        "os.family", "os.name", "os.release.full", "kernelrelease",
-        "processors.count", "memory.system.total", "networking.domain",
-        "system_uptime.days", "virtual", "is_virtual",
-        "os.architecture", "ruby.version", "aio_agent_build",
-    ]
-
-    results = []
-    for fact_path in fact_paths:
-        try:
-            parts = fact_path.split(".")
-            base_fact = parts[0]
-            nested_path = ".".join(parts[1:]) if len(parts) > 1 else None
-
-            facts = await puppetdb_service.get_facts(fact_name=base_fact)
-            counts: Counter = Counter()
-            node_values: Dict[str, str] = {}
-
-            for f in facts:
-                value = f.get("value")
-                if nested_path:
-                    value = get_nested_value(value, nested_path)
-                    if value is None:
-                        continue
-                if isinstance(value, (dict, list)):
-                    value = str(value)
-                val_str = str(value)
-                counts[val_str] += 1
-                node_values[f.get("certname", "")] = val_str
-
-            if not counts:
-                continue
-
-            total = sum(counts.values())
-            unique = len(counts)
-
-            # Skip uniform facts (only 1 value = boring)
-            if unique < 2:
-                continue
+    sem = asyncio.Semaphore(_FACT_CONCURRENCY)
 
-            # Detect if values are numeric
-            numeric_values = []
-            for val_str, cnt in counts.items():
-                try:
-                    numeric_values.append(float(val_str))
-                except (ValueError, TypeError):
-                    numeric_values = []
-                    break
-            is_numeric = len(numeric_values) > 0
-
-            # Sort by count descending
-            sorted_dist = sorted(
-                [{"value": k, "count": v} for k, v in counts.items()],
-                key=lambda x: x["count"],
-                reverse=True,
-            )
-
-            # Top 7 + Other for chart
-            if len(sorted_dist) > 7:
-                top = sorted_dist[:7]
-                other_count = sum(d["count"] for d in sorted_dist[7:])
-                top.append({"value": "Other", "count": other_count})
-                chart_dist = top
-            else:
-                chart_dist = sorted_dist
-
-            # Find outliers: values with <= 2 nodes
-            outlier_list = [
-                {"value": d["value"], "count": d["count"],
-                 "nodes": [cn for cn, v in node_values.items() if v == d["value"]]}
-                for d in sorted_dist if d["count"] <= 2 and d["value"] != "Other"
-            ]
-            # Sort outliers by value high-to-low (numeric-aware)
+    async def _one(fact_path: str) -> Optional[Dict[str, Any]]:
+        async with sem:
             try:
-                outlier_list.sort(key=lambda x: float(x["value"]), reverse=True)
-            except (ValueError, TypeError):
-                outlier_list.sort(key=lambda x: x["value"], reverse=True)
-            outliers = outlier_list[:10]
-
-            # Interestingness score: more unique values + outliers = more interesting
-            score = unique + len(outliers) * 2
-
-            # Dominant value
-            dominant = sorted_dist[0] if sorted_dist else None
-            dominant_pct = round(dominant["count"] / total * 100, 1) if dominant else 0
-
-            # For numeric facts, include per-node values for scatter plot
-            scatter_data = []
-            if is_numeric:
-                scatter_data = sorted(
-                    [{"certname": cn, "value": float(v)} for cn, v in node_values.items()],
-                    key=lambda x: x["value"],
-                    reverse=True,
-                )
-
-            results.append({
-                "fact": fact_path,
-                "total_nodes": total,
-                "unique_values": unique,
-                "score": score,
-                "is_numeric": is_numeric,
-                "dominant": dominant,
-                "dominant_pct": dominant_pct,
-                "chart_distribution": chart_dist,
-                "distribution": sorted_dist[:20],
-                "outliers": outliers,
-                "scatter": scatter_data[:200] if is_numeric else [],
-            })
-        except Exception as e:
-            logger.warning(f"Fact overview failed for {fact_path}: {e}")
-            continue
+                return await _fact_overview_entry(fact_path)
+            except Exception as e:
+                logger.warning(f"Fact overview failed for {fact_path}: {e}")
+                return None
+
+    entries = await asyncio.gather(*(_one(p) for p in _FACT_OVERVIEW_PATHS))
+    results = [e for e in entries if e]
 
     # Sort by interestingness
     results.sort(key=lambda x: x["score"], reverse=True)
 
-    response = {"facts": results, "total_facts_analyzed": len(fact_paths)}
+    response = {"facts": results, "total_facts_analyzed": len(_FACT_OVERVIEW_PATHS)}
     _set_cached("fact_overview", response)
     return response
 
@@ -725,14 +813,51 @@ async def get_puppetdb_health(_user: str = Depends(_AUTH)):
     return result
 
 
+# Longest chart window the history endpoints accept (the 1h rollup horizon
+# is configurable; a window past it just returns what is retained).
+_HISTORY_WINDOW_MAX = 400 * 86400
+
+
+@router.get("/puppetdb-health/history")
+async def get_puppetdb_health_history(
+    window: int = Query(3600, ge=60, le=_HISTORY_WINDOW_MAX, description="Seconds of history"),
+    host: Optional[str] = Query(None, description="One PuppetDB node (default: all)"),
+    _user: str = Depends(_AUTH),
+):
+    """Command-queue / JVM time series per PuppetDB node plus a fleet roll-up.
+
+    Served from the background collector; windows beyond ~1h come from the
+    1m / 10m / 1h rollups.
+    """
+    from ..services.pdb_health_history import pdb_health_history
+
+    return pdb_health_history.get_history(window_sec=window, host=(host or "").strip().lower() or None)
+
+
+async def start_pdb_health_collector():
+    """Started from app lifespan — OpenVoxDB queue/JVM history on every node."""
+    from ..services import pdb_health_history as pdbh
+
+    await pdbh.start_pdb_health_collector()
+
+
+async def stop_pdb_health_collector():
+    from ..services import pdb_health_history as pdbh
+
+    await pdbh.stop_pdb_health_collector()
+
+
 # ─── PuppetServer Health & Performance (Metrics | PuppetServer Health) ───
 
-# In-memory ring buffer for shared server-side history (Phase 3).
-# Populated both by page-driven calls AND a background collector task so that
-# history is already present (persistent collection) when a user first opens
-# the OpenVox Server Health page. Matches the "no waiting" UX of Run Performance.
-_ps_health_history: List[Dict[str, Any]] = []
-_PS_HISTORY_MAX = 360  # ~1h at 10s polls
+# Shared server-side history (Phase 3), one fixed-size ring per compiler.
+# Populated by a background collector task so that history is already present
+# (persistent collection) when a user first opens the OpenVox Server Health
+# page. Matches the "no waiting" UX of Run Performance. Rings live in
+# services.ps_health_history and are persisted under data_dir across restarts.
+# One uvicorn worker per host polls and saves; the others follow its
+# published points (HostSeriesStore.lead / publish / follow).
+_PS_POLL_INTERVAL = 10  # seconds
+_PS_PERSIST_EVERY = 6  # ticks (~1 min)
 
 # Background collector control
 _ps_health_collector_task: Optional[asyncio.Task] = None
@@ -740,44 +865,13 @@ _ps_health_stop = False
 
 
 async def _append_ps_health_point():
-    """Build one point from snapshot and append to the shared ring (with dedup safety)."""
-    global _ps_health_history
+    """Poll every Puppet Server once and append a point to each host's ring."""
+    from ..services.ps_health_history import ps_health_history
+
     try:
-        snapshot = await puppetserver_service.get_ps_health_snapshot()
-        now = _time.time()
-        jvmh = snapshot.get("jvm_heap") or {}
-        jvmnh = snapshot.get("jvm_nonheap") or {}
-        gcy = snapshot.get("gc_young") or {}
-        gco = snapshot.get("gc_old") or {}
-        osstat = snapshot.get("os") or {}
-        point = {
-            "ts": now,
-            "time": datetime.now().strftime("%H:%M:%S"),
-            "heap_used_mb": jvmh.get("used_mb"),
-            "heap_pct": jvmh.get("pct"),
-            "nonheap_used_mb": jvmnh.get("used_mb"),
-            "nonheap_pct": jvmnh.get("pct"),
-            "compile_time_ms": snapshot.get("compile_time_ms"),
-            "jruby_active": snapshot.get("jruby_active"),
-            "gc_young_time": gcy.get("time_ms"),
-            "gc_young_count": gcy.get("count"),
-            "gc_old_time": gco.get("time_ms"),
-            "gc_old_count": gco.get("count"),
-            "process_cpu_load": osstat.get("process_cpu_load"),
-            "open_fds": osstat.get("open_file_descriptors"),
-        }
-        # carry current route means when present
-        for hm in (snapshot.get("http_metrics") or []):
-            r = (hm.get("route") or "").lower()
-            if "catalog" in r:
-                point["http_catalog_mean"] = hm.get("mean")
-            elif "report" in r:
-                point["http_report_mean"] = hm.get("mean")
-            elif "file" in r:
-                point["http_file_mean"] = hm.get("mean")
-        _ps_health_history.append(point)
-        if len(_ps_health_history) > _PS_HISTORY_MAX:
-            del _ps_health_history[0]
+        hosts = puppetserver_service.ps_health_hosts()
+        ps_health_history.retain(hosts)
+        await ps_health_history.poll(hosts, lambda h: puppetserver_service.get_ps_health_snapshot(host=h))
     except Exception as e:
         # Non-fatal; collector keeps running
         logger.debug(f"PS health collector point failed: {e}")
@@ -785,23 +879,39 @@ async def _append_ps_health_point():
 
 async def _ps_health_collector_loop():
     """Background loop: collect every ~10s regardless of whether anyone is viewing the page."""
-    global _ps_health_stop
+    from ..services.ps_health_history import ps_health_history
+
     logger.info("PS health background collector starting (persistent history for OpenVox Server Health)")
-    # Prime once quickly
-    await _append_ps_health_point()
-    while not _ps_health_stop:
-        await asyncio.sleep(10)
-        await _append_ps_health_point()
+    ps_health_history.load()
+    tick = 0
+    try:
+        while not _ps_health_stop:
+            if ps_health_history.lead():
+                await _append_ps_health_point()
+                await asyncio.to_thread(ps_health_history.publish)
+                tick += 1
+                if tick % _PS_PERSIST_EVERY == 0:
+                    await asyncio.to_thread(ps_health_history.save)
+            else:
+                await asyncio.to_thread(ps_health_history.follow)
+            await asyncio.sleep(_PS_POLL_INTERVAL)
+    finally:
+        if ps_health_history.leader:
+            ps_health_history.save()
+        ps_health_history.release()
     logger.info("PS health background collector stopped")
 
 
+def _ps_health_collector_running() -> bool:
+    return bool(_ps_health_collector_task and not _ps_health_collector_task.done())
+
+
 async def start_ps_health_collector():
     """Idempotent starter for the background collection task. Safe to call from lifespan."""
     global _ps_health_collector_task, _ps_health_stop
     _ps_health_stop = False
-    if _ps_health_collector_task and not _ps_health_collector_task.done():
+    if _ps_health_collector_running():
         return
-    import asyncio
     _ps_health_collector_task = asyncio.create_task(_ps_health_collector_loop())
 
 
@@ -812,7 +922,7 @@ async def stop_ps_health_collector():
         _ps_health_collector_task.cancel()
         try:
             await _ps_health_collector_task
-        except Exception:
+        except (asyncio.CancelledError, Exception):
             pass
         _ps_health_collector_task = None
 
@@ -823,19 +933,55 @@ async def get_puppetserver_health(_user: str = Depends(_AUTH)):
     Includes expanded metrics: more http routes, catalog/puppetdb phases, GC, nonheap, OS, etc.
     DB-related (puppetdb_* and http_client_*) are also present here but primarily surfaced
     on the OpenVoxDB Health page.
+
+    ``history`` is the fleet aggregate across compilers (per-tick mean, max
+    for heap %); ``hosts`` carries each compiler's own series and latest
+    status so a single slow JVM is visible instead of being averaged away.
     """
+    from ..services.ps_health_history import ps_health_history
+
     snapshot = await puppetserver_service.get_ps_health_snapshot()
 
-    # Append via shared helper (also used by background collector). Snapshot already contains
-    # the rich fields from service extraction.
-    await _append_ps_health_point()
+    # Without the collector (e.g. disabled in tests) take one sample now so
+    # the page still gets a series.
+    if not _ps_health_collector_running():
+        await _append_ps_health_point()
 
-    snapshot["history"] = _ps_health_history[-_PS_HISTORY_MAX:]
+    hosts = puppetserver_service.ps_health_hosts()
+    snapshot["history"] = ps_health_history.fleet_series(hosts)
+    errors = ps_health_history.errors()
+    snapshot["hosts"] = [
+        {
+            "host": h,
+            "status": (ps_health_history.latest(h) or {}).get("status"),
+            "error": errors.get(h),
+            "history": ps_health_history.host_series(h),
+        }
+        for h in hosts
+    ]
     snapshot["server_time"] = datetime.now(timezone.utc).isoformat()
 
     return snapshot
 
 
+@router.get("/puppetserver-health/history")
+async def get_puppetserver_health_history(
+    window: int = Query(3600, ge=60, le=_HISTORY_WINDOW_MAX, description="Seconds of history"),
+    host: Optional[str] = Query(None, description="One compiler (default: all)"),
+    stat: str = Query("avg", pattern="^(min|avg|max|last)$", description="Rollup statistic"),
+    _user: str = Depends(_AUTH),
+):
+    """Per-compiler JVM / compile history plus the fleet aggregate for ``window``.
+
+    The tier is chosen from the window: raw 10s points for the last hour,
+    1m / 10m / 1h rollups beyond that.
+    """
+    from ..services.ps_health_history import ps_health_history
+
+    hosts = [host.strip().lower()] if host and host.strip() else puppetserver_service.ps_health_hosts()
+    return ps_health_history.history(window_sec=window, hosts=hosts, stat=stat)
+
+
 @router.get("/puppetserver-metrics-list")
 async def list_puppetserver_metrics(_user: str = Depends(_AUTH)):
     """List available mbeans from Puppet Server /metrics/v2."""
@@ -1238,6 +1384,31 @@ async def get_host_health(
     return await hm.get_host_health(refresh=refresh, include_remote=include_remote)
 
 
+@router.get("/host-health/history")
+async def get_host_health_history(
+    host: str = Query(..., description="Serving-estate host (certname or short name)"),
+    window: int = Query(3600, ge=60, le=_HISTORY_WINDOW_MAX, description="Seconds of history"),
+    stat: str = Query("avg", pattern="^(min|avg|max|last)$", description="Rollup statistic"),
+    bounds: bool = Query(False, description="Add <field>_min/<field>_max per rollup bucket"),
+    _user: str = Depends(_AUTH),
+):
+    """One host's CPU / load / memory series for ``window`` from the cheapest adequate tier."""
+    from ..services import host_metrics as hm
+
+    return hm.get_series_history(host, window_sec=window, stat=stat, bounds=bounds)
+
+
+@router.get("/upstream-latency")
+async def get_upstream_latency(
+    window: int = Query(900, ge=60, le=3600, description="Seconds (per-minute ring, last hour)"),
+    _user: str = Depends(_AUTH),
+):
+    """Per-dependency p50/p95/p99, error rate, SLO compliance and pool use (this worker)."""
+    from ..utils.upstream_metrics import upstream_metrics
+
+    return upstream_metrics.summary(window_sec=window)
+
+
 @router.get("/host-health/targets")
 async def get_host_health_targets(_user: str = Depends(_AUTH)):
     """List serving-estate hosts that Host Health will attempt to cover."""
@@ -13,14 +13,13 @@ to prevent PQL injection attacks.
 import logging
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from ..database import get_db
 from ..services.puppetdb import puppetdb_service
 from ..services.enc import enc_service
+from ..services.agent_runs import live_success_times
 from ..models.schemas import NodeSummary, NodeDetail
-from ..models.execution_history import ExecutionHistory
 from ..dependencies import require_role
 from ..utils.validation import validate_pql_value as _validate_pql_value_raw
 
@@ -46,57 +45,22 @@ async def apply_live_run_status(nodes: List[dict], db: AsyncSession) -> None:
     """If Bolt recorded a newer successful puppet agent run, do not keep Failed.
 
     PDB latest_report can stay failed when the compiler never stored this
-    run's report. Execution history is the live run we just showed as green.
+    run's report. Execution history is the live run we just showed as green;
+    ``agent_last_success`` keeps its latest time per certname.
     """
     if not nodes:
         return
     try:
-        result = await db.execute(
-            select(ExecutionHistory)
-            .where(ExecutionHistory.status == "success")
-            .where(ExecutionHistory.command_name.ilike("%puppet agent%"))
-            .order_by(desc(ExecutionHistory.executed_at))
-        )
-        rows = list(result.scalars().all())
+        latest_ok = await live_success_times(db, [n.get("certname") for n in nodes])
     except Exception as e:
         logger.warning("live-run status lookup failed: %s", e)
         return
 
-    latest_ok: dict[str, datetime] = {}
-    short_hits: dict[str, list] = {}
-    for row in rows:
-        # node_name may be a single certname or a comma list / "all"
-        for part in str(row.node_name or "").split(","):
-            key = part.strip().lower()
-            if not key or key in ("all", "ungrouped"):
-                continue
-            if not row.executed_at:
-                continue
-            ts = row.executed_at
-            if getattr(ts, "tzinfo", None):
-                ts = ts.replace(tzinfo=None)
-            if key not in latest_ok or ts > latest_ok[key]:
-                latest_ok[key] = ts
-            short_hits.setdefault(key.split(".")[0], []).append((key, ts))
-
     if not latest_ok:
         return
 
     for node in nodes:
-        key = str(node.get("certname") or "").strip().lower()
-        live_at = latest_ok.get(key)
-        if not live_at:
-            # Same host, other spelling (ovca1.pdxc-it… vs ovca1.pdxc-it.corp.int-x.ai)
-            for hk, ts in latest_ok.items():
-                if key == hk or (key.startswith(hk + ".") and hk.count(".") >= 1):
-                    live_at = ts
-                    break
-        if not live_at:
-            # Short name only if it maps to exactly one certname (not both sites)
-            hits = short_hits.get(key.split(".")[0]) or []
-            fqdns = {h[0] for h in hits}
-            if len(fqdns) == 1:
-                live_at = max(h[1] for h in hits)
+        live_at = latest_ok.get(str(node.get("certname") or "").strip().lower())
         if not live_at:
             continue
         report_at = _parse_ts(node.get("report_timestamp"))
@@ -12,15 +12,22 @@ Security note: the /node/{certname} endpoint validates the certname
 against a strict allowlist before interpolating it into PQL queries to
 prevent injection attacks.
 """
+import asyncio
 import re
 import time
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional, List, Dict, Any
 from collections import defaultdict
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import logging
 
 from ..services.puppetdb import puppetdb_service
+from ..services.run_sketches import (
+    NODE_EPOCH_HOURS,
+    run_sketch_store,
+    summarize as summarize_sketches,
+    top_groups,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -98,6 +105,7 @@ def _extract_metrics(report: Dict) -> Dict[str, Any]:
         "certname": report.get("certname", ""),
         "status": report.get("status", ""),
         "environment": report.get("environment", ""),
+        "producer": report.get("producer", ""),
         "start_time": start,
         "end_time": end,
         "run_duration": run_duration,
@@ -109,6 +117,73 @@ def _extract_metrics(report: Dict) -> Dict[str, Any]:
     }
 
 
+# ─── Percentile sketches (incremental) ───────────────────
+# Reports are folded into run_sketch_store once; each refresh only asks
+# PuppetDB for reports at/after the store's receive_time watermark.
+# Refreshes run in a background task that pages until PuppetDB returns a
+# short page: requests read whatever the store holds and report "warming"
+# until that catch-up has reached the newest report.
+_SKETCH_REFRESH_S = 30
+_SKETCH_PAGE = 2500
+_sketch_lock = asyncio.Lock()
+_sketch_task: Optional[asyncio.Task] = None
+
+
+def _kick_run_sketches() -> bool:
+    """Start a background sketch refresh if one is due; True until the store has caught up."""
+    global _sketch_task
+    store = run_sketch_store
+    if (_sketch_task is None or _sketch_task.done()) and time.time() - store.refreshed_at >= _SKETCH_REFRESH_S:
+        _sketch_task = asyncio.create_task(_refresh_run_sketches())
+    return not store.caught_up
+
+
+async def _refresh_run_sketches() -> None:
+    """Ingest reports newer than the sketch watermark (single-flight)."""
+    store = run_sketch_store
+    if time.time() - store.refreshed_at < _SKETCH_REFRESH_S:
+        return
+    async with _sketch_lock:
+        if time.time() - store.refreshed_at < _SKETCH_REFRESH_S:
+            return
+        if store.watermark:
+            mark = store.watermark.replace('"', "")
+            query = f'[">=", "receive_time", "{mark}"]'
+        else:
+            cutoff = (
+                datetime.now(timezone.utc) - timedelta(hours=store.retention_hours)
+            ).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            query = f'[">", "receive_time", "{cutoff}"]'
+        page = 0
+        try:
+            while True:
+                rows = await puppetdb_service.get_reports(
+                    query=query,
+                    limit=_SKETCH_PAGE,
+                    offset=page * _SKETCH_PAGE,
+                    order_by="receive_time",
+                    order_dir="asc",
+                ) or []
+                for r in rows:
+                    store.ingest(_extract_metrics(r), str(r.get("receive_time") or ""))
+                if len(rows) < _SKETCH_PAGE:
+                    store.caught_up = True
+                    break
+                page += 1
+        except Exception as e:
+            logger.warning("Run percentile sketch refresh failed: %s", e)
+        store.prune()
+        store.refreshed_at = time.time()
+
+
+def _node_tail(certname: str) -> Dict[str, Any]:
+    total = run_sketch_store.node(certname).get("total")
+    if total is None or not total.count:
+        return {"p95_total": None, "p99_total": None}
+    summary = total.summary()
+    return {"p95_total": summary["p95"], "p99_total": summary["p99"]}
+
+
 @router.get("/overview")
 async def performance_overview(
     hours: float = Query(48, ge=0.25, le=168, description="Hours of history to include (fractional OK)"),
@@ -127,7 +202,7 @@ async def performance_overview(
     Comprehensive performance overview for a host scope.
     Cached briefly to reduce PuppetDB load.
     """
-    from ..services.fleet_scope import filter_reports_by_scope, resolve_scope
+    from ..services.fleet_scope import get_scoped_reports, resolve_scope
 
     cn_list = [c.strip() for c in (certnames or "").split(",") if c.strip()]
     cache_key = (
@@ -149,14 +224,17 @@ async def performance_overview(
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e)) from e
 
-        # Pull a wider report sample when scoped so small sets still get data
-        fetch_limit = limit if scope_result.scope_id == "all" else min(2000, max(limit, 800))
-        reports = await puppetdb_service.get_reports(
-            limit=fetch_limit,
+        sketches_warming = _kick_run_sketches()
+
+        # Scope is filtered in PuppetDB, so `limit` is in-scope runs. The
+        # wider sample is only for the Python-filter fallback.
+        reports = await get_scoped_reports(
+            scope_result,
+            limit=limit,
+            fallback_limit=limit if scope_result.scope_id == "all" else min(2000, max(limit, 800)),
             order_by="receive_time",
             order_dir="desc",
         )
-        reports = filter_reports_by_scope(reports, scope_result)
 
         if not reports:
             empty = {
@@ -215,6 +293,7 @@ async def performance_overview(
                 "failed_runs": failed_runs,
                 "changed_runs": changed_runs,
                 "last_run": max(r["start_time"] for r in runs if r["start_time"]),
+                **_node_tail(certname),
             })
 
         # ── 3. Timing Breakdown (all-node averages for pie/bar) ──
@@ -276,7 +355,24 @@ async def performance_overview(
                 "noop": p["noop"],
             })
 
-        # ── 6. Global Stats ──
+        # ── 6. Percentiles (sketches; fleet/producer/env honour `hours`,
+        #       scoped views merge per-node sketches of the scope's hosts) ──
+        if scope_result.scope_id == "all":
+            scope_sketches = run_sketch_store.fleet(hours)
+        else:
+            scope_sketches = run_sketch_store.nodes(scope_result.certnames)
+        scope_pcts = summarize_sketches(scope_sketches)
+        percentiles = {
+            "window_hours": hours,
+            "node_window_hours": [NODE_EPOCH_HOURS, NODE_EPOCH_HOURS * 2],
+            "scope": scope_pcts,
+            "by_producer": top_groups(run_sketch_store.by_dimension("producer", hours)),
+            "by_environment": top_groups(run_sketch_store.by_dimension("environment", hours)),
+            "warming": sketches_warming,
+        }
+        total_pct = scope_pcts.get("total") or {}
+
+        # ── 7. Global Stats ──
         total_runs = len(processed)
         all_totals = [p["timing"].get("total", 0) for p in processed if p["timing"].get("total")]
         stats = {
@@ -288,6 +384,9 @@ async def performance_overview(
             "failed_runs": sum(1 for p in processed if p["status"] == "failed"),
             "changed_runs": sum(1 for p in processed if p["status"] == "changed"),
             "noop_runs": sum(1 for p in processed if p["noop"]),
+            "p50_run_time": total_pct.get("p50"),
+            "p95_run_time": total_pct.get("p95"),
+            "p99_run_time": total_pct.get("p99"),
         }
 
         scope_dict = scope_result.as_dict()
@@ -300,9 +399,11 @@ async def performance_overview(
             "resource_summary": resource_summary,
             "recent_runs": recent_runs,
             "stats": stats,
+            "percentiles": percentiles,
             "scope": scope_dict,
         }
-        _set_cached(cache_key, result)
+        if not sketches_warming:  # don't pin partial percentiles for the cache TTL
+            _set_cached(cache_key, result)
         return result
 
     except Exception as e:
@@ -323,6 +424,7 @@ async def node_performance(
     """
     certname = validate_pql_value(certname, "certname")
     try:
+        sketches_warming = _kick_run_sketches()
         reports = await puppetdb_service.get_reports(
             query=f'["=", "certname", "{certname}"]',
             limit=limit,
@@ -357,8 +459,18 @@ async def node_performance(
             "max_run_time": round(max(all_totals), 2) if all_totals else 0,
             "min_run_time": round(min(all_totals), 2) if all_totals else 0,
         }
-
-        return {"run_history": run_history, "stats": stats}
+        node_pcts = summarize_sketches(run_sketch_store.node(certname))
+        node_total = node_pcts.get("total") or {}
+        stats["p50_run_time"] = node_total.get("p50")
+        stats["p95_run_time"] = node_total.get("p95")
+        stats["p99_run_time"] = node_total.get("p99")
+
+        return {
+            "run_history": run_history,
+            "stats": stats,
+            "percentiles": node_pcts,
+            "percentiles_warming": sketches_warming,
+        }
 
     except Exception as e:
         logger.error(f"Node performance error for {certname}: {e}", exc_info=True)
@@ -0,0 +1,191 @@
+"""
+Last successful live ``puppet agent`` run per certname.
+
+``routers.nodes.apply_live_run_status`` overlays this on PuppetDB status for
+every Nodes list, Dashboard build and Compliance call. Instead of scanning
+all successful execution history rows each time, ``finish_execution_history``
+records puppet agent successes into ``agent_last_success`` (one row per
+certname, indexed by short name) and the overlay reads just the rows whose
+short name matches a node being shown.
+
+Install upgrades fill the table once from existing history
+(``backfill_agent_last_success``, run at startup while the table is empty).
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import desc, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import ExecutionHistory
+from ..models.agent_run import AgentLastSuccess
+from .bolt_orchestration import (
+    PUPPET_AGENT_SUCCESS_EXIT_CODES,
+    _is_puppet_agent_invocation,
+    _iter_bolt_result_items,
+    _target_exit_code,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bolt target lists that are not certnames
+_GROUP_TARGETS = frozenset({"all", "ungrouped"})
+# Keep IN (...) lists well below SQLite's bound-parameter limit
+IN_CHUNK = 500
+
+
+def _naive(ts: datetime) -> datetime:
+    return ts.replace(tzinfo=None) if getattr(ts, "tzinfo", None) else ts
+
+
+def short_name(certname: str) -> str:
+    return certname.split(".")[0]
+
+
+def targets_from_node_name(node_name: Optional[str]) -> List[str]:
+    """History ``node_name`` (one certname or a comma list) → lower-case certnames."""
+    out: List[str] = []
+    for part in str(node_name or "").split(","):
+        key = part.strip().lower()
+        if key and key not in _GROUP_TARGETS and key not in out:
+            out.append(key)
+    return out
+
+
+def succeeded_targets(node_name: Optional[str], result: Dict[str, Any]) -> List[str]:
+    """Targets a successful puppet agent run reached.
+
+    ``--format json`` names every target (so a run on ``all`` still lands
+    per host); human output falls back to the requested targets.
+    """
+    items = _iter_bolt_result_items(result.get("stdout") or "")
+    if not items:
+        return targets_from_node_name(node_name)
+    out: List[str] = []
+    for item in items:
+        key = str(item.get("target") or "").strip().lower()
+        if not key or key in out:
+            continue
+        exit_code = _target_exit_code(item)
+        if (item.get("status") or "").lower() == "success" or exit_code in PUPPET_AGENT_SUCCESS_EXIT_CODES:
+            out.append(key)
+    return out
+
+
+def _chunks(keys: List[str]) -> Iterable[List[str]]:
+    for i in range(0, len(keys), IN_CHUNK):
+        yield keys[i : i + IN_CHUNK]
+
+
+async def upsert_last_success(
+    db: AsyncSession, certnames: List[str], at: datetime, history_id: Optional[int] = None
+) -> None:
+    """Move ``last_success_at`` forward for ``certnames`` (caller commits)."""
+    at = _naive(at)
+    for keys in _chunks(certnames):
+        rows = await db.execute(select(AgentLastSuccess).where(AgentLastSuccess.certname.in_(keys)))
+        existing = {r.certname: r for r in rows.scalars().all()}
+        for key in keys:
+            row = existing.get(key)
+            if row is None:
+                db.add(AgentLastSuccess(
+                    certname=key, short_name=short_name(key), last_success_at=at, history_id=history_id
+                ))
+            elif row.last_success_at is None or _naive(row.last_success_at) < at:
+                row.last_success_at = at
+                row.history_id = history_id
+
+
+async def record_agent_success(db: AsyncSession, history_entry: ExecutionHistory, result: Dict[str, Any]) -> None:
+    """Called once a history row is final; no-op unless it is a successful puppet agent run.
+
+    Best-effort: the history row is already committed, and the overlay is
+    only a hint on top of PuppetDB.
+    """
+    if history_entry.status != "success" or not _is_puppet_agent_invocation(history_entry.command_name or ""):
+        return
+    targets = succeeded_targets(history_entry.node_name, result)
+    if not targets or history_entry.executed_at is None:
+        return
+    try:
+        await upsert_last_success(db, targets, history_entry.executed_at, history_entry.id)
+        await db.commit()
+    except Exception as e:
+        logger.warning("agent_last_success update failed: %s", e, exc_info=True)
+        try:
+            await db.rollback()
+        except Exception:
+            pass
+
+
+async def live_success_times(db: AsyncSession, certnames: List[str]) -> Dict[str, datetime]:
+    """``certname.lower()`` → time of its last successful live agent run.
+
+    Matches the exact certname first, then a recorded FQDN prefix of it
+    (``ovca1.pdxc-it`` for ``ovca1.pdxc-it.corp.int-x.ai``), then the short
+    name when it maps to exactly one recorded certname (not both sites).
+    All three share the short-name index, so this is one query.
+    """
+    keys = {str(c or "").strip().lower() for c in certnames}
+    keys.discard("")
+    if not keys:
+        return {}
+    shorts = sorted({short_name(k) for k in keys})
+    query = select(AgentLastSuccess.certname, AgentLastSuccess.short_name, AgentLastSuccess.last_success_at)
+    if len(shorts) <= IN_CHUNK:
+        query = query.where(AgentLastSuccess.short_name.in_(shorts))
+    # else: a whole-estate list, and the table holds one row per host anyway
+    by_short: Dict[str, Dict[str, datetime]] = {}
+    for cert, short, at in (await db.execute(query)).all():
+        if at is not None:
+            by_short.setdefault(short, {})[cert] = _naive(at)
+
+    out: Dict[str, datetime] = {}
+    for key in keys:
+        recorded = by_short.get(short_name(key))
+        if not recorded:
+            continue
+        live_at = recorded.get(key)
+        if live_at is None:
+            prefixes = [at for cert, at in recorded.items() if "." in cert and key.startswith(cert + ".")]
+            live_at = max(prefixes) if prefixes else None
+        if live_at is None and len(recorded) == 1:
+            live_at = next(iter(recorded.values()))
+        if live_at is not None:
+            out[key] = live_at
+    return out
+
+
+async def backfill_agent_last_success(session_factory=None) -> int:
+    """Fill an empty ``agent_last_success`` from execution history; returns rows written."""
+    if session_factory is None:
+        from ..database import async_session as session_factory
+
+    async with session_factory() as db:
+        if (await db.execute(select(func.count()).select_from(AgentLastSuccess))).scalar():
+            return 0
+        result = await db.stream(
+            select(ExecutionHistory.node_name, ExecutionHistory.executed_at)
+            .where(ExecutionHistory.status == "success")
+            .where(or_(
+                ExecutionHistory.command_name.ilike("%puppet agent%"),
+                ExecutionHistory.command_name.ilike("%puppet-agent%"),
+            ))
+            .order_by(desc(ExecutionHistory.executed_at))
+        )
+        latest: Dict[str, datetime] = {}
+        async for node_name, executed_at in result:
+            if executed_at is None:
+                continue
+            for key in targets_from_node_name(node_name):
+                # newest first: the first time we see a certname is its latest run
+                latest.setdefault(key, _naive(executed_at))
+        for key, at in latest.items():
+            db.add(AgentLastSuccess(certname=key, short_name=short_name(key), last_success_at=at))
+        await db.commit()
+    if latest:
+        logger.info("Backfilled last successful agent run for %d certname(s)", len(latest))
+    return len(latest)
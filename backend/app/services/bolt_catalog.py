@@ -0,0 +1,241 @@
+"""
+Cached Bolt task / plan / inventory listings (``/api/bolt/tasks|plans|inventory``).
+
+Each listing is a ``bolt … show --format json`` process: several seconds of
+Ruby start-up on every Orchestration page open, for an answer that only
+changes when modules are deployed or the project changes. Results are kept
+per listing together with a fingerprint of what Bolt reads:
+
+- ``/etc/puppetlabs/bolt`` project files (bolt-project.yaml, inventory.yaml,
+  Puppetfile, bolt-defaults.yaml)
+- every modulepath directory, its modules and their ``tasks`` / ``plans``
+  directories (mtime + size; unreadable paths count as a fixed token)
+- for the inventory, the estate hosts written into the generated inventory
+
+A changed fingerprint reloads on the next read. r10k deploys and Bolt config
+saves invalidate everything and pre-warm in the background. ``MAX_AGE_SEC``
+(and the shorter ``INVENTORY_MAX_AGE_SEC``: the ENC inventory plugin reads
+groups from the DB) bounds staleness the fingerprint cannot see.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BOLT_PROJECT_DIR = Path("/etc/puppetlabs/bolt")
+PROJECT_FILES = ("bolt-project.yaml", "inventory.yaml", "Puppetfile", "bolt-defaults.yaml")
+DEFAULT_MODULEPATH = ("modules", ".modules")
+MAX_AGE_SEC = 3600.0
+INVENTORY_MAX_AGE_SEC = 300.0
+KINDS = ("tasks", "plans", "inventory")
+
+_ARGS = {
+    "tasks": ["task", "show", "--format", "json"],
+    "plans": ["plan", "show", "--format", "json"],
+    "inventory": ["inventory", "show", "--format", "json"],
+}
+
+
+def _stat_token(path: Path) -> str:
+    try:
+        st = path.stat()
+        return f"{st.st_mtime_ns}:{st.st_size}"
+    except OSError:
+        return "-"
+
+
+def modulepath(project_dir: Path = BOLT_PROJECT_DIR) -> List[Path]:
+    """Modulepath from bolt-project.yaml (relative entries are project-relative).
+
+    The file is usually root:bolt 0640; when it is unreadable, fall back to
+    the layout enable-console-orchestration.sh writes.
+    """
+    from ..config import settings
+
+    codedir = Path(settings.puppet_codedir)
+    entries: List[Any] = list(DEFAULT_MODULEPATH) + [
+        codedir / "modules",
+        codedir / "environments" / "production" / "modules",
+    ]
+    try:
+        import yaml
+
+        doc = yaml.safe_load((project_dir / "bolt-project.yaml").read_text(encoding="utf-8")) or {}
+        mp = doc.get("modulepath") if isinstance(doc, dict) else None
+        if isinstance(mp, str):
+            mp = mp.split(os.pathsep)
+        if isinstance(mp, list) and mp:
+            entries = [str(e) for e in mp if e] + [".modules"]
+    except Exception:
+        pass
+    out: List[Path] = []
+    for e in entries:
+        p = Path(str(e)).expanduser()
+        p = p if p.is_absolute() else project_dir / p
+        if p not in out:
+            out.append(p)
+    return out
+
+
+def fingerprint(kind: str, project_dir: Path = BOLT_PROJECT_DIR) -> str:
+    """Digest of the files and directories Bolt reads for ``kind``."""
+    h = hashlib.sha256()
+    for name in PROJECT_FILES:
+        h.update(f"{name}={_stat_token(project_dir / name)};".encode())
+    if kind == "inventory":
+        try:
+            from ..routers.bolt_runtime import _estate_target_uris
+
+            h.update(",".join(_estate_target_uris()).encode())
+        except Exception:
+            pass
+        return h.hexdigest()
+    for root in modulepath(project_dir):
+        h.update(f"{root}={_stat_token(root)};".encode())
+        try:
+            modules = sorted(os.scandir(root), key=lambda d: d.name)
+        except OSError:
+            continue
+        for mod in modules:
+            if not mod.is_dir(follow_symlinks=True):
+                continue
+            base = Path(mod.path)
+            h.update(f"{mod.name}={_stat_token(base)}".encode())
+            for sub in ("tasks", "plans"):
+                h.update(f"/{sub}={_stat_token(base / sub)}".encode())
+            h.update(b";")
+    return h.hexdigest()
+
+
+def _parse_listing(kind: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Bolt ``show`` output → the API payload (line parsing when JSON fails)."""
+    if result.get("returncode") != 0:
+        empty_key = "targets" if kind == "inventory" else kind
+        return {empty_key: [], "error": result.get("stderr")}
+    stdout = result.get("stdout") or ""
+    try:
+        data = json.loads(stdout)
+    except json.JSONDecodeError:
+        if kind == "inventory":
+            return {"targets": [], "raw": stdout}
+        items = []
+        for line in stdout.strip().split("\n"):
+            parts = line.strip().split(None, 1)
+            if not parts:
+                continue
+            if (kind == "tasks" and "::" in parts[0]) or (kind == "plans" and len(parts[0]) > 1):
+                items.append({"name": parts[0], "description": parts[1] if len(parts) > 1 else ""})
+        return {kind: items}
+    if kind == "inventory":
+        return data
+    return {kind: data if isinstance(data, list) else []}
+
+
+class BoltCatalogCache:
+    """Fingerprinted listings with single-flight loads."""
+
+    def __init__(
+        self,
+        runner: Optional[Callable[..., Awaitable[Dict[str, Any]]]] = None,
+        fingerprint_fn: Optional[Callable[[str], str]] = None,
+        max_age: float = MAX_AGE_SEC,
+        inventory_max_age: float = INVENTORY_MAX_AGE_SEC,
+    ):
+        self._runner = runner
+        self._fingerprint = fingerprint_fn or fingerprint
+        self.max_age = max_age
+        self.inventory_max_age = inventory_max_age
+        # kind -> (fingerprint, loaded_at, payload)
+        self._entries: Dict[str, Tuple[str, float, Dict[str, Any]]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._prewarm_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidated_at: Optional[float] = None
+        self.invalidated_by: Optional[str] = None
+
+    async def _run(self, args: List[str]) -> Dict[str, Any]:
+        if self._runner is None:
+            from ..routers.bolt_runtime import run_bolt_command
+
+            self._runner = run_bolt_command
+        return await self._runner(args)
+
+    def _fresh(self, kind: str, fp: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(kind)
+        if entry is None or entry[0] != fp:
+            return None
+        limit = self.inventory_max_age if kind == "inventory" else self.max_age
+        if time.time() - entry[1] > limit:
+            return None
+        return entry[2]
+
+    async def get(self, kind: str, refresh: bool = False) -> Dict[str, Any]:
+        """Listing for ``kind``; errors are returned but never cached."""
+        fp = await asyncio.to_thread(self._fingerprint, kind)
+        if not refresh:
+            cached = self._fresh(kind, fp)
+            if cached is not None:
+                self.hits += 1
+                return cached
+        lock = self._locks.setdefault(kind, asyncio.Lock())
+        async with lock:
+            # Another request may have loaded it while we waited
+            if not refresh:
+                cached = self._fresh(kind, fp)
+                if cached is not None:
+                    self.hits += 1
+                    return cached
+            self.misses += 1
+            payload = _parse_listing(kind, await self._run(_ARGS[kind]))
+            if "error" not in payload:
+                self._entries[kind] = (fp, time.time(), payload)
+            return payload
+
+    def invalidate(self, reason: str = "") -> None:
+        self._entries.clear()
+        self.invalidated_at = time.time()
+        self.invalidated_by = reason or None
+        logger.info("Bolt task/plan/inventory cache invalidated (%s)", reason or "manual")
+
+    async def prewarm(self) -> None:
+        for kind in KINDS:
+            try:
+                await self.get(kind)
+            except Exception as e:
+                logger.warning("Bolt %s pre-warm failed: %s", kind, e)
+
+    def schedule_prewarm(self) -> None:
+        """Reload in the background (after a deploy) so the next page open is instant."""
+        if self._prewarm_task and not self._prewarm_task.done():
+            self._prewarm_task.cancel()
+        try:
+            self._prewarm_task = asyncio.get_running_loop().create_task(self.prewarm())
+        except RuntimeError:
+            self._prewarm_task = None
+
+    def code_changed(self, reason: str) -> None:
+        self.invalidate(reason)
+        self.schedule_prewarm()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": {k: round(now - e[1], 1) for k, e in self._entries.items()},
+            "invalidated_at": self.invalidated_at,
+            "invalidated_by": self.invalidated_by,
+        }
+
+
+# Singleton
+bolt_catalog = BoltCatalogCache()
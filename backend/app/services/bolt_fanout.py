@@ -0,0 +1,177 @@
+"""
+Chunked fan-out for Bolt command / task runs on large target sets.
+
+``resolve_targets("all")`` can hand thousands of certnames to one ``bolt``
+process: nothing comes back until the slowest node finishes and one hung
+target holds the whole result. Above ``bolt_fanout_threshold`` targets the
+run is split into chunks of ``bolt_fanout_chunk_size`` that run with at most
+``bolt_fanout_parallel`` Bolt processes at once:
+
+- every chunk runs with ``--format json``; its items are reported (live
+  ``target`` and ``chunk`` stream events) as soon as that chunk finishes
+- each chunk is bounded by the per-target timeout (targets inside a chunk
+  run concurrently); targets with no result by then are reported as timed
+  out, and items Bolt had already printed are kept
+- the chunks merge into one Bolt JSON document, so history,
+  ``reinterpret_puppet_agent_bolt_result`` and ``sanitize_bolt_result``
+  treat it like a single run
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..config import settings
+from .bolt_orchestration import _iter_bolt_result_items
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SLACK_SEC = 30  # Bolt start-up + inventory + connect on top of the target timeout
+TIMEOUT_KIND = "openvox-gui/target-timeout"
+
+ArgsBuilder = Callable[[List[str]], List[str]]
+ChunkCallback = Callable[[Dict[str, Any], List[Dict[str, Any]]], None]
+
+
+def should_fan_out(n_targets: int) -> bool:
+    threshold = int(settings.bolt_fanout_threshold or 0)
+    return threshold > 0 and n_targets > threshold
+
+
+def chunk_targets(targets: List[str], size: int) -> List[List[str]]:
+    size = max(1, int(size))
+    return [targets[i : i + size] for i in range(0, len(targets), size)]
+
+
+def salvage_items(stdout: str) -> List[Dict[str, Any]]:
+    """Bolt JSON items, including the complete ones from a run that was killed.
+
+    Bolt prints ``{ "items": [`` first and each item as its target finishes,
+    so a timed-out chunk leaves a truncated document.
+    """
+    items = _iter_bolt_result_items(stdout)
+    if items or not stdout:
+        return items
+    start = stdout.find('"items"')
+    start = stdout.find("[", start) if start >= 0 else -1
+    if start < 0:
+        return []
+    decoder = json.JSONDecoder()
+    pos, out = start + 1, []
+    while True:
+        while pos < len(stdout) and stdout[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(stdout) or stdout[pos] != "{":
+            return out
+        try:
+            obj, pos = decoder.raw_decode(stdout, pos)
+        except json.JSONDecodeError:
+            return out
+        if isinstance(obj, dict):
+            out.append(obj)
+
+
+def _missing_item(target: str, kind: str, msg: str) -> Dict[str, Any]:
+    return {
+        "target": target,
+        "status": "failure",
+        "value": {"_error": {"kind": kind, "msg": msg, "details": {}}},
+    }
+
+
+async def run_fanout(
+    build_args: ArgsBuilder,
+    targets: List[str],
+    *,
+    target_timeout: int,
+    chunk_size: Optional[int] = None,
+    parallel: Optional[int] = None,
+    on_line: Optional[Callable[[str], None]] = None,
+    on_chunk: Optional[ChunkCallback] = None,
+    runner: Optional[Callable[..., Awaitable[Dict[str, Any]]]] = None,
+) -> Dict[str, Any]:
+    """Run ``build_args(chunk)`` per chunk; returns one run_bolt_command-style dict."""
+    if runner is None:
+        from ..routers.bolt_runtime import run_bolt_command as runner
+
+    size = int(chunk_size or settings.bolt_fanout_chunk_size)
+    chunks = chunk_targets(targets, size)
+    parallel = max(1, int(parallel or settings.bolt_fanout_parallel))
+    sem = asyncio.Semaphore(parallel)
+    chunk_timeout = int(target_timeout) + CHUNK_SLACK_SEC
+    started = time.monotonic()
+    done = 0
+
+    async def _one(index: int, chunk: List[str]) -> Dict[str, Any]:
+        nonlocal done
+        async with sem:
+            lines: List[str] = []
+
+            def _line(text: str) -> None:
+                lines.append(text)
+                if on_line is not None:
+                    on_line(text)
+
+            t0 = time.monotonic()
+            res = await runner(build_args(chunk), timeout=chunk_timeout, on_line=_line)
+            stdout = res.get("stdout") or "\n".join(lines)
+            rc = res.get("returncode")
+            timed_out = rc == -1 and "timed out" in str(res.get("stderr") or "").lower()
+            items = salvage_items(stdout)
+            seen = {str(i.get("target")) for i in items}
+            missing = [t for t in chunk if t not in seen]
+            for t in missing:
+                if timed_out:
+                    items.append(_missing_item(t, TIMEOUT_KIND, f"No result from {t} within {target_timeout}s"))
+                else:
+                    err = (res.get("stderr") or "").strip().splitlines()
+                    items.append(_missing_item(
+                        t, "openvox-gui/no-result", err[-1][:300] if err else "Bolt returned no result for this target"
+                    ))
+            done += 1
+            summary = {
+                "chunk": index + 1,
+                "chunks": len(chunks),
+                "targets": len(chunk),
+                "returncode": rc,
+                "succeeded": sum(1 for i in items if (i.get("status") or "").lower() == "success"),
+                "failed": sum(1 for i in items if (i.get("status") or "").lower() != "success"),
+                "timed_out": missing if timed_out else [],
+                "duration_ms": int((time.monotonic() - t0) * 1000),
+                "chunks_done": done,
+            }
+            if on_chunk is not None:
+                try:
+                    on_chunk(summary, items)
+                except Exception as e:  # a broken subscriber must not break the run
+                    logger.debug("fan-out chunk callback failed: %s", e)
+            return {"summary": summary, "items": items, "stderr": (res.get("stderr") or "").strip()}
+
+    results = await asyncio.gather(*(_one(i, c) for i, c in enumerate(chunks)))
+
+    items = [item for r in results for item in r["items"]]
+    timed_out = [t for r in results for t in r["summary"]["timed_out"]]
+    rcs = [r["summary"]["returncode"] for r in results]
+    all_ok = all(rc == 0 for rc in rcs) and all((i.get("status") or "").lower() == "success" for i in items)
+    # Bolt: 1 = error, 2 = failed on some targets
+    returncode = 0 if all_ok else next((rc for rc in rcs if rc not in (0, -1, None)), 2)
+    stderr = "\n".join(
+        f"[chunk {r['summary']['chunk']}/{len(chunks)}] {r['stderr']}" for r in results if r["stderr"]
+    )
+    if timed_out:
+        stderr = (f"{len(timed_out)} target(s) returned no result within {target_timeout}s\n" + stderr).strip()
+    doc = {
+        "items": items,
+        "target_count": len(targets),
+        "elapsed_time": round(time.monotonic() - started, 1),
+        "fanout": {
+            "chunks": len(chunks),
+            "chunk_size": size,
+            "parallel": parallel,
+            "timed_out": timed_out,
+        },
+    }
+    return {"returncode": returncode, "stdout": json.dumps(doc), "stderr": stderr}
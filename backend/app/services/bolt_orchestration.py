@@ -17,6 +17,7 @@ from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import ExecutionHistory
+from ..models.execution_history import _utc_naive
 from ..utils.validation import strip_ansi
 
 logger = logging.getLogger(__name__)
@@ -67,6 +68,8 @@ class BoltRunResultModel(BaseModel):
     returncode: int
     output: str = ""
     error: str = ""
+    # Live output for this run: GET /api/bolt/executions/{execution_id}/stream
+    execution_id: Optional[str] = None
 
 
 def _is_puppet_agent_invocation(command: str) -> bool:
@@ -378,12 +381,14 @@ async def start_execution_history(
     plan_name: Optional[str] = None,
     result_format: Optional[str] = None,
     parameters: Optional[Dict[str, Any]] = None,
+    status: str = "running",
 ) -> Optional[ExecutionHistory]:
-    """Insert running ExecutionHistory row and commit.
+    """Insert a running (or ``queued``) ExecutionHistory row and commit.
 
     Best-effort: a missing table or locked SQLite must not 500 the Run button.
     """
     try:
+        now = _utc_naive()
         history_entry = ExecutionHistory(
             execution_type=execution_type,
             node_name=node_name,
@@ -391,9 +396,11 @@ async def start_execution_history(
             task_name=task_name,
             plan_name=plan_name,
             result_format=result_format,
-            status="running",
+            status=status,
             executed_by=executed_by,
             parameters=parameters,
+            queued_at=now,
+            started_at=now if status == "running" else None,
         )
         db.add(history_entry)
         await db.commit()
@@ -408,6 +415,22 @@ async def start_execution_history(
         return None
 
 
+async def mark_execution_running(db: AsyncSession, history_entry: Optional[ExecutionHistory]) -> None:
+    """Queued row → running (a job worker picked it up)."""
+    if history_entry is None:
+        return
+    history_entry.status = "running"
+    history_entry.started_at = _utc_naive()
+    try:
+        await db.commit()
+    except Exception as e:
+        logger.warning("execution_history start failed: %s", e, exc_info=True)
+        try:
+            await db.rollback()
+        except Exception:
+            pass
+
+
 async def finish_execution_history(
     db: AsyncSession,
     history_entry: Optional[ExecutionHistory],
@@ -434,6 +457,7 @@ async def finish_execution_history(
             pass
     history_entry.status = "success" if ok else "failure"
     history_entry.duration_ms = duration_ms
+    history_entry.finished_at = _utc_naive()
     stderr = result.get("stderr") or ""
     stdout = result.get("stdout") or ""
     if not ok:
@@ -447,6 +471,12 @@ async def finish_execution_history(
             await db.rollback()
         except Exception:
             pass
+        return
+    from .agent_runs import record_agent_success
+    from .result_store import store_results
+
+    await store_results(db, history_entry.id, result)
+    await record_agent_success(db, history_entry, result)
 
 
 def summarize_bolt_item_failures(stdout: str) -> str:
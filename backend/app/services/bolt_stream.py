@@ -0,0 +1,413 @@
+"""
+Live Bolt output streams (``/api/bolt/executions/{id}/stream``).
+
+``POST /api/bolt/run/{command,task,plan}`` still returns the final result,
+but a run can take minutes (``puppet agent`` waits for the agent lock). The
+run reads Bolt's stdout as it arrives and publishes it here, keyed by an
+execution ID the client picks (or the server assigns), so the browser can
+follow along over SSE while the POST is pending:
+
+- ``line``   — one line of Bolt output (ANSI stripped)
+- ``target`` — a target started / finished / failed, as it happens: from
+  the human / rainbow ``Started on`` lines, or from each item of a
+  ``--format json`` run as Bolt prints it (the document opens with
+  ``{ "items": [`` and every target's item follows when it finishes)
+- ``chunk``  — a fanned-out run finished one chunk of targets (bolt_fanout)
+- ``progress`` — a clustered r10k deploy finished one compiler
+  (``POST /api/deploy/run`` streams here too, as kind ``deploy``)
+- ``result`` — the same payload the POST returns; ends the stream
+
+Every event carries a sequence number (the SSE ``id``), so a reconnect with
+``Last-Event-ID`` or a subscriber that connects late replays what it missed
+from the per-run buffer. Finished runs are kept for ``RETAIN_SEC``.
+
+The app runs several uvicorn workers (and clustered consoles share one
+database), so the GET may land on a process that is not running the
+execution. The shared registry therefore also writes every event to
+``execution_stream_events`` every ``FLUSH_SEC``; ``find`` falls back to a
+``RemoteExecutionStream`` that replays and polls those rows.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from ..utils.validation import strip_ansi
+
+logger = logging.getLogger(__name__)
+
+MAX_EVENTS = 5000  # per run; the oldest lines are dropped first (also caps stored lines)
+MAX_STREAMS = 200
+RETAIN_SEC = 600
+KEEPALIVE_SEC = 15.0
+FLUSH_SEC = 0.5  # event batches to the shared table
+POLL_SEC = 0.5  # remote subscribers
+WAIT_QUERY_MAX_SEC = 2.0  # shared-table lookups while a subscriber waits for an unknown ID
+REMOTE_QUIET_SEC = 3600.0  # a remote run silent this long is treated as gone
+
+_ID_RE = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+_TARGET_RE = re.compile(r"^(Started|Finished|Failed) on (\S+?)(?::|\.\.\.)?(?:\s.*)?$")
+_TARGET_STATE = {"Started": "started", "Finished": "success", "Failed": "failure"}
+
+Event = Tuple[int, str, Dict[str, Any]]
+
+
+class _ItemScanner:
+    """Complete items of a Bolt ``--format json`` document as its lines arrive."""
+
+    def __init__(self):
+        self._buf = ""
+        self._in_items = False
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        self._buf += text + "\n"
+        if not self._in_items:
+            start = self._buf.find('"items"')
+            start = self._buf.find("[", start) if start >= 0 else -1
+            if start < 0:
+                return []
+            self._in_items = True
+            self._buf = self._buf[start + 1:]
+        # An item can only have completed on a line that closes an object
+        if not text.rstrip().rstrip(",").endswith("}"):
+            return []
+        out: List[Dict[str, Any]] = []
+        pos = 0
+        while True:
+            while pos < len(self._buf) and self._buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(self._buf) or self._buf[pos] != "{":
+                break
+            try:
+                obj, pos = self._decoder.raw_decode(self._buf, pos)
+            except json.JSONDecodeError:
+                break  # item still being printed
+            if isinstance(obj, dict):
+                out.append(obj)
+        self._buf = self._buf[pos:]
+        return out
+
+
+class BoltExecutionStream:
+    """Event buffer and subscribers for one Bolt run."""
+
+    def __init__(self, execution_id: str, owner: str, kind: str):
+        self.execution_id = execution_id
+        self.owner = owner
+        self.kind = kind
+        self.created = time.time()
+        self.finished_at: Optional[float] = None
+        self.history_id: Optional[int] = None
+        self.events: List[Event] = []
+        self.dropped = 0
+        self._seq = 0
+        self._targets: Dict[str, str] = {}
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._too_slow: Set[asyncio.Queue] = set()
+        self._scanner: Optional[_ItemScanner] = None
+        self._seen_output = False
+        # Events not yet written to execution_stream_events (shared registry only)
+        self.persist = False
+        self.unsaved: List[Event] = []
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def publish(self, event: str, data: Dict[str, Any]) -> None:
+        self._seq += 1
+        ev: Event = (self._seq, event, data)
+        self.events.append(ev)
+        if len(self.events) > MAX_EVENTS:
+            del self.events[0]
+            self.dropped += 1
+        if self.persist and (event != "line" or self._seq <= MAX_EVENTS):
+            self.unsaved.append(ev)
+        for q in list(self._subscribers):
+            try:
+                q.put_nowait(ev)
+            except asyncio.QueueFull:
+                # Slow client: drop it; EventSource reconnects with Last-Event-ID
+                self._subscribers.discard(q)
+                self._too_slow.add(q)
+
+    def line(self, text: str) -> None:
+        """``run_sudo`` on_line callback."""
+        text = strip_ansi(text).rstrip()
+        if not text:
+            return
+        if not self._seen_output:
+            self._seen_output = True
+            if text.lstrip().startswith("{"):
+                self._scanner = _ItemScanner()
+        self.publish("line", {"line": text})
+        if self._scanner is not None:
+            self.targets_from(self._scanner.feed(text))
+            return
+        m = _TARGET_RE.match(text.strip())
+        if m:
+            self._target(m.group(2), _TARGET_STATE[m.group(1)])
+
+    def target_state(self, target: str, state: str, **extra: Any) -> None:
+        """``target`` event from a caller that tracks its own hosts (clustered deploy)."""
+        self._target(target, state, **extra)
+
+    def _target(self, target: str, state: str, **extra: Any) -> None:
+        if self._targets.get(target) == state:
+            return
+        self._targets[target] = state
+        self.publish("target", {"target": target, "state": state, **extra})
+
+    def targets_from(self, items: List[Dict[str, Any]]) -> None:
+        """``target`` events for Bolt JSON items not already reported as finished."""
+        from .bolt_orchestration import _target_exit_code
+
+        for item in items:
+            target = item.get("target")
+            if not target or self._targets.get(target) in ("success", "failure"):
+                continue
+            state = "success" if (item.get("status") or "").lower() == "success" else "failure"
+            self._target(str(target), state, exit_code=_target_exit_code(item))
+
+    def finish(self, result: Dict[str, Any], stdout: str = "") -> None:
+        """Per-target events from Bolt JSON not already streamed, then ``result``."""
+        if self.finished:
+            return
+        from .bolt_orchestration import _iter_bolt_result_items
+
+        self.targets_from(_iter_bolt_result_items(stdout))
+        self.publish("result", {**result, "execution_id": self.execution_id, "history_id": self.history_id})
+        self.finished_at = time.time()
+
+    async def follow(self, after: int = 0) -> AsyncIterator[Optional[Event]]:
+        """Buffered events after ``after``, then live ones; None = keepalive."""
+        q: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        self._subscribers.add(q)
+        try:
+            last = after
+            for ev in list(self.events):
+                if ev[0] > last:
+                    last = ev[0]
+                    yield ev
+            while not (self.finished and last >= self._seq):
+                if q in self._too_slow:
+                    return
+                try:
+                    ev = await asyncio.wait_for(q.get(), timeout=KEEPALIVE_SEC)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if ev[0] > last:
+                    last = ev[0]
+                    yield ev
+        finally:
+            self._subscribers.discard(q)
+            self._too_slow.discard(q)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "execution_id": self.execution_id,
+            "kind": self.kind,
+            "owner": self.owner,
+            "history_id": self.history_id,
+            "started": self.created,
+            "finished": self.finished_at,
+            "events": self._seq,
+            "dropped": self.dropped,
+            "targets": dict(self._targets),
+        }
+
+
+class RemoteExecutionStream:
+    """A run owned by another worker or console, replayed from the shared table."""
+
+    def __init__(self, registry: "BoltStreamRegistry", execution_id: str, owner: str, kind: str):
+        self.execution_id = execution_id
+        self.owner = owner
+        self.kind = kind
+        self._registry = registry
+
+    async def _rows(self, after: int) -> List[Event]:
+        from sqlalchemy import select
+
+        from ..models.execution_stream import ExecutionStreamEvent as E
+
+        async with self._registry._session() as db:
+            rows = await db.execute(
+                select(E.seq, E.event, E.data)
+                .where(E.execution_id == self.execution_id, E.seq > after)
+                .order_by(E.seq)
+                .limit(500)
+            )
+            return [(seq, event, data) for seq, event, data in rows.all()]
+
+    async def follow(self, after: int = 0) -> AsyncIterator[Optional[Event]]:
+        """Stored events after ``after``, then newly written ones; None = keepalive."""
+        last, idle, quiet = max(0, after), 0.0, 0.0
+        while quiet < REMOTE_QUIET_SEC:
+            rows = await self._rows(last)
+            for ev in rows:
+                last = ev[0]
+                yield ev
+                if ev[1] == "result":
+                    return
+            if rows:
+                idle = quiet = 0.0
+                continue
+            await asyncio.sleep(POLL_SEC)
+            idle += POLL_SEC
+            quiet += POLL_SEC
+            if idle >= KEEPALIVE_SEC:
+                idle = 0.0
+                yield None
+
+
+class BoltStreamRegistry:
+    """Runs by execution ID.
+
+    Process-local unless ``shared``: the app's registry also writes events
+    to ``execution_stream_events`` so other workers can serve the stream.
+    """
+
+    def __init__(self, session_factory=None, shared: bool = False):
+        self._streams: Dict[str, BoltExecutionStream] = {}
+        self._session_factory = session_factory
+        self.shared = shared or session_factory is not None
+        self._flusher: Optional[asyncio.Task] = None
+
+    def _session(self):
+        if self._session_factory is None:
+            from ..database import async_session
+
+            self._session_factory = async_session
+        return self._session_factory()
+
+    def prune(self, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        for key, s in list(self._streams.items()):
+            if s.finished and now - (s.finished_at or now) > RETAIN_SEC:
+                del self._streams[key]
+
+    def create(self, owner: str, kind: str, execution_id: Optional[str] = None) -> BoltExecutionStream:
+        """New stream; raises ValueError for a malformed or already used ID."""
+        self.prune()
+        if execution_id is None:
+            execution_id = uuid.uuid4().hex
+        elif not _ID_RE.match(execution_id):
+            raise ValueError("execution_id must be 8-64 characters of A-Z, a-z, 0-9, _ or -")
+        if execution_id in self._streams:
+            raise ValueError(f"execution_id {execution_id} is already in use")
+        if len(self._streams) >= MAX_STREAMS:
+            oldest = min(
+                (s for s in self._streams.values() if s.finished),
+                key=lambda s: s.finished_at or 0.0,
+                default=None,
+            )
+            if oldest is not None:
+                del self._streams[oldest.execution_id]
+        stream = self._streams[execution_id] = BoltExecutionStream(execution_id, owner, kind)
+        if self.shared:
+            stream.persist = True
+            stream.unsaved.append((0, "open", {"owner": owner, "kind": kind}))
+            self._start_flusher()
+        return stream
+
+    def get(self, execution_id: str) -> Optional[BoltExecutionStream]:
+        return self._streams.get(execution_id)
+
+    async def find(self, execution_id: str):
+        """This process's stream, else a ``RemoteExecutionStream`` when another one opened it."""
+        stream = self._streams.get(execution_id)
+        if stream is not None or not self.shared or not _ID_RE.match(execution_id):
+            return stream
+        from sqlalchemy import select
+
+        from ..models.execution_stream import ExecutionStreamEvent as E
+
+        try:
+            async with self._session() as db:
+                opened = (await db.execute(
+                    select(E.data).where(E.execution_id == execution_id, E.seq == 0)
+                )).scalar_one_or_none()
+        except Exception as e:
+            logger.debug("Shared stream lookup for %s failed: %s", execution_id, e)
+            return None
+        if not isinstance(opened, dict):
+            return None
+        return RemoteExecutionStream(self, execution_id, opened.get("owner") or "", opened.get("kind") or "")
+
+    async def wait_for(self, execution_id: str, timeout: float = 10.0):
+        """The stream, waiting briefly: the browser subscribes before its POST lands.
+
+        This process's streams are checked every 0.2 s, the shared table on a
+        doubling interval (up to ``WAIT_QUERY_MAX_SEC``), so an unknown ID
+        costs a handful of queries. A malformed ID is refused at once.
+        """
+        if not _ID_RE.match(execution_id):
+            return None
+        now = time.monotonic()
+        deadline, next_query, gap = now + timeout, now, 0.2
+        while True:
+            if now >= next_query:
+                stream = await self.find(execution_id)
+                next_query, gap = now + gap, min(gap * 2, WAIT_QUERY_MAX_SEC)
+            else:
+                stream = self._streams.get(execution_id)
+            if stream is not None or now >= deadline:
+                return stream
+            await asyncio.sleep(0.2)
+            now = time.monotonic()
+
+    # ─── Shared table ───────────────────────────────────────
+
+    def _start_flusher(self) -> None:
+        if self._flusher is not None and not self._flusher.done():
+            return
+        try:
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+        except RuntimeError:
+            self._flusher = None  # no loop (sync caller); the next create retries
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(FLUSH_SEC)
+            await self.flush()
+            if all(s.finished and not s.unsaved for s in self._streams.values()):
+                return
+
+    async def flush(self) -> None:
+        """Write every stream's unsaved events in one transaction."""
+        from ..models.execution_stream import ExecutionStreamEvent
+
+        batch: List[Tuple[str, Event]] = []
+        for stream in list(self._streams.values()):
+            if stream.unsaved:
+                batch.extend((stream.execution_id, ev) for ev in stream.unsaved)
+                stream.unsaved = []
+        if not batch:
+            return
+        try:
+            async with self._session() as db:
+                db.add_all([
+                    ExecutionStreamEvent(
+                        execution_id=eid, seq=seq, event=event,
+                        data=json.loads(json.dumps(data, default=str)),
+                    )
+                    for eid, (seq, event, data) in batch
+                ])
+                await db.commit()
+        except Exception as e:
+            # Local subscribers are unaffected; only other workers miss these
+            logger.warning("Could not store %d live output events: %s", len(batch), e)
+
+    def active(self) -> List[Dict[str, Any]]:
+        return [s.summary() for s in self._streams.values() if not s.finished]
+
+
+bolt_streams = BoltStreamRegistry(shared=True)
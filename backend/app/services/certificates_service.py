@@ -26,6 +26,7 @@ import httpx
 
 from ..config import settings
 from ..utils.sudo import run_sudo
+from ..utils.upstream_metrics import InstrumentedTransport
 
 logger = logging.getLogger(__name__)
 
@@ -248,7 +249,9 @@ async def _ca_http_request(
         return 0, None, f"CA mTLS context failed: {e}"
     try:
         async with httpx.AsyncClient(
-            verify=ctx, timeout=timeout, trust_env=False
+            timeout=timeout,
+            transport=InstrumentedTransport("ca", verify=ctx, track_pool=False),
+            trust_env=False,
         ) as client:
             resp = await client.request(
                 method,
@@ -10,6 +10,9 @@ When deployment_mode is clustered, operators need more than a VIP ping:
 Probes use mTLS certs from settings (same as other GUI → Puppet paths).
 PCS is run locally when ``pcs`` is available (GUI on a CA node), otherwise
 via ``bolt command run`` against the first configured CA FQDN.
+
+Readers normally get the document from ``cluster_health_prober`` (background
+schedule, cached); ``probe_cluster_full`` is the one-shot probe it drives.
 """
 from __future__ import annotations
 
@@ -19,7 +22,7 @@ import re
 import shutil
 import ssl
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 import httpx
 
@@ -459,7 +462,11 @@ async def probe_ha_cluster(cfg: Dict[str, Any]) -> Dict[str, Any]:
 
 async def probe_cluster_members(cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Backward-compatible flat list used by Services UI (summary rows)."""
-    full = await probe_cluster_full(cfg)
+    return members_from_doc(await probe_cluster_full(cfg))
+
+
+def members_from_doc(full: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Summary rows (compilers, PuppetDB, CA members) of a health document."""
     rows: List[Dict[str, Any]] = []
     for m in full.get("compilers") or []:
         rows.append(
@@ -533,7 +540,18 @@ async def probe_gui_console(client: httpx.AsyncClient, fqdn: str) -> Dict[str, A
     }
 
 
-async def probe_cluster_full(cfg: Dict[str, Any]) -> Dict[str, Any]:
+TargetProbe = Callable[[Callable[..., Awaitable[Dict[str, Any]]], httpx.AsyncClient, str], Awaitable[Dict[str, Any]]]
+
+
+async def _probe_direct(fn, client: httpx.AsyncClient, fqdn: str) -> Dict[str, Any]:
+    return await fn(client, fqdn)
+
+
+async def probe_cluster_full(
+    cfg: Dict[str, Any],
+    probe: Optional[TargetProbe] = None,
+    ha: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
     """Full estate health document for APIs, UI, and ``ovox infra health``.
 
     Probes **members and VIPs**:
@@ -541,7 +559,12 @@ async def probe_cluster_full(cfg: Dict[str, Any]) -> Dict[str, Any]:
       - puppetdb_nodes + puppetdb_vips (8081)
       - ca_nodes + ca_vips (8140)
       - consoles + console_vips (4567) when provided
+
+    ``probe(fn, client, fqdn)`` wraps each target probe (the background
+    prober adds timeouts / hedging); ``ha`` reuses an earlier pcs/DRBD result
+    instead of running ``probe_ha_cluster`` again.
     """
+    run = probe or _probe_direct
     # Prefer expanded inventory when caller passed raw cluster_config only
     compilers = list(cfg.get("compilers") or [])
     compiler_vips = list(cfg.get("compiler_vips") or [])
@@ -574,14 +597,14 @@ async def probe_cluster_full(cfg: Dict[str, Any]) -> Dict[str, Any]:
     async with httpx.AsyncClient(
         verify=verify, timeout=timeout, trust_env=False
     ) as client:
-        c_tasks = [probe_compiler(client, f) for f in compilers]
-        cv_tasks = [probe_compiler(client, f) for f in compiler_vips]
-        p_tasks = [probe_puppetdb(client, f) for f in pdb_nodes]
-        pv_tasks = [probe_puppetdb(client, f) for f in pdb_vips]
-        ca_tasks = [probe_ca(client, f) for f in ca_nodes]
-        vip_tasks = [probe_ca(client, f) for f in ca_vips]
-        gui_tasks = [probe_gui_console(client, f) for f in consoles]
-        guiv_tasks = [probe_gui_console(client, f) for f in console_vips]
+        c_tasks = [run(probe_compiler, client, f) for f in compilers]
+        cv_tasks = [run(probe_compiler, client, f) for f in compiler_vips]
+        p_tasks = [run(probe_puppetdb, client, f) for f in pdb_nodes]
+        pv_tasks = [run(probe_puppetdb, client, f) for f in pdb_vips]
+        ca_tasks = [run(probe_ca, client, f) for f in ca_nodes]
+        vip_tasks = [run(probe_ca, client, f) for f in ca_vips]
+        gui_tasks = [run(probe_gui_console, client, f) for f in consoles]
+        guiv_tasks = [run(probe_gui_console, client, f) for f in console_vips]
 
         (
             c_res,
@@ -613,7 +636,8 @@ async def probe_cluster_full(cfg: Dict[str, Any]) -> Dict[str, Any]:
                 out.append(rr)
         return out
 
-    ha = await probe_ha_cluster(cfg)
+    if ha is None:
+        ha = await probe_ha_cluster(cfg)
 
     c_list = list(c_res) if c_res else []
     cv_list = _tag(cv_res, "compiler-vip")
@@ -0,0 +1,400 @@
+"""
+Background cluster health prober (Settings → Cluster, ``ovox infra health``).
+
+``probe_cluster_full`` used to run on every read of ``/api/config/cluster/health``,
+``/api/config/services`` and ``/api/infra/health``: a few open browser tabs
+multiplied HTTP probes across the estate and ``pcs``/``drbdadm`` subprocesses
+(or Bolt runs) on the CA. The prober runs it on a schedule instead and the
+endpoints read the cached document.
+
+Per cycle:
+
+- every target is probed with a hard timeout; start times are jittered so
+  the estate does not see one synchronized burst
+- a probe still running after ``hedge_after`` seconds gets a second,
+  concurrent attempt (first healthy answer wins); a fast unhealthy answer is
+  retried once, so one dropped packet does not flip a member to failed
+- pcs / DRBD only every ``ha_every`` cycles (the result is reused between)
+
+The latest document, a short per-target history and healthy ↔ unhealthy
+transitions are kept in memory; transitions are also pushed to SSE
+subscribers (``/api/infra/health/stream``).
+
+The schedule only runs in clustered mode, and only one uvicorn worker per
+console probes: the holder of the ``cluster_prober`` worker lock publishes
+its state to ``<data_dir>/cluster_health.json`` after each cycle and the
+other workers adopt that file (replaying new transitions to their own SSE
+subscribers) instead of probing the estate again.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from ..config import settings
+from ..utils.worker_lock import WorkerLock
+
+logger = logging.getLogger(__name__)
+
+HISTORY_MAX = 120  # per target (~1h at 30s)
+TRANSITIONS_MAX = 200
+HA_TIMEOUT_SEC = 60.0
+
+# Document groups and the role each row is reported under.
+GROUPS = (
+    ("compilers", "compiler"),
+    ("compiler_vips", "compiler-vip"),
+    ("puppetdb_nodes", "puppetdb"),
+    ("puppetdb_vips", "puppetdb-vip"),
+    ("ca_nodes", "ca"),
+    ("ca_vips", "ca-vip"),
+    ("consoles", "console"),
+    ("console_vips", "console-vip"),
+)
+_ROLE_BY_PROBE = {
+    "probe_compiler": "compiler",
+    "probe_puppetdb": "puppetdb",
+    "probe_ca": "ca",
+    "probe_gui_console": "console",
+}
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+def target_states(doc: Dict[str, Any]) -> Dict[str, Tuple[bool, Optional[str], Optional[float]]]:
+    """``role:fqdn`` → (healthy, error, probe_ms) for every row of a document."""
+    out: Dict[str, Tuple[bool, Optional[str], Optional[float]]] = {}
+    for key, role in GROUPS:
+        for row in doc.get(key) or []:
+            if isinstance(row, dict) and row.get("fqdn"):
+                out[f"{role}:{row['fqdn']}"] = (bool(row.get("healthy")), row.get("error"), row.get("probe_ms"))
+    ha = doc.get("ha")
+    if isinstance(ha, dict) and ha.get("method"):
+        out["ha:pcs"] = (bool(ha.get("available")), ha.get("error"), None)
+    return out
+
+
+class ClusterHealthProber:
+    """Scheduled ``probe_cluster_full`` with a cached document and transitions."""
+
+    def __init__(
+        self,
+        interval_sec: Optional[float] = None,
+        timeout_sec: Optional[float] = None,
+        hedge_after_sec: Optional[float] = None,
+        ha_every: Optional[int] = None,
+        jitter: float = 0.1,
+        state_dir: Optional[str] = None,
+    ):
+        self.interval_sec = float(interval_sec if interval_sec is not None else settings.cluster_probe_interval_sec)
+        self.timeout_sec = float(timeout_sec if timeout_sec is not None else settings.cluster_probe_timeout_sec)
+        self.hedge_after_sec = float(
+            hedge_after_sec if hedge_after_sec is not None else settings.cluster_probe_hedge_after_sec
+        )
+        self.ha_every = max(1, int(ha_every if ha_every is not None else settings.cluster_probe_ha_every))
+        self.jitter = jitter
+        self.doc: Optional[Dict[str, Any]] = None
+        self.probed_at: Optional[float] = None
+        self.duration_ms: Optional[int] = None
+        self._cycle = 0
+        self._ha: Optional[Dict[str, Any]] = None
+        self._state: Dict[str, bool] = {}
+        self._history: Dict[str, Deque[Tuple[float, bool, Optional[float], Optional[str]]]] = {}
+        self._transitions: Deque[Dict[str, Any]] = deque(maxlen=TRANSITIONS_MAX)
+        self._events = 0  # transitions recorded so far; followers replay the new ones
+        self._state_dir = state_dir
+        self._leader = WorkerLock("cluster_prober", lock_dir=state_dir)
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = False
+
+    # ─── One target ─────────────────────────────────────────
+
+    def _timeout_row(self, fn, fqdn: str) -> Dict[str, Any]:
+        return {
+            "fqdn": fqdn,
+            "role": _ROLE_BY_PROBE.get(getattr(fn, "__name__", ""), "unknown"),
+            "healthy": False,
+            "simple": {},
+            "error": f"probe timed out after {self.timeout_sec:g}s",
+        }
+
+    async def probe_target(self, fn, client: httpx.AsyncClient, fqdn: str) -> Dict[str, Any]:
+        """``fn(client, fqdn)`` with jitter, a hedged second attempt and a deadline."""
+        if self.jitter:
+            await asyncio.sleep(random.uniform(0, self.jitter * min(self.interval_sec, 10.0)))
+        start = time.monotonic()
+        deadline = start + self.timeout_sec
+        pending: Set[asyncio.Task] = {asyncio.ensure_future(fn(client, fqdn))}
+        attempts = 1
+        best: Optional[Dict[str, Any]] = None
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                wait = min(remaining, self.hedge_after_sec) if attempts == 1 else remaining
+                done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        row = task.result()
+                    except Exception as e:
+                        row = {**self._timeout_row(fn, fqdn), "error": str(e) or type(e).__name__}
+                    if row.get("healthy"):
+                        best = row
+                        pending.clear()
+                        break
+                    best = best or row
+                if best is not None and best.get("healthy"):
+                    break
+                if attempts == 1:
+                    # Slow (hedge) or fast-but-unhealthy (retry): one more attempt
+                    pending.add(asyncio.ensure_future(fn(client, fqdn)))
+                    attempts += 1
+        finally:
+            for task in pending:
+                task.cancel()
+        row = dict(best) if best is not None else self._timeout_row(fn, fqdn)
+        row["probe_ms"] = round((time.monotonic() - start) * 1000, 1)
+        row["attempts"] = attempts
+        return row
+
+    # ─── Cycle ──────────────────────────────────────────────
+
+    async def probe_once(self, cfg: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Probe the estate now (single-flight) and update the cache."""
+        from .cluster_health import probe_cluster_full, probe_ha_cluster
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        started = time.time()
+        async with self._lock:
+            # A concurrent caller just finished a probe: share its result
+            if self.probed_at is not None and self.probed_at >= started and self.doc is not None:
+                return self.doc
+            if cfg is None:
+                from .estate_inventory import cluster_cfg_for_probes
+
+                cfg = cluster_cfg_for_probes()
+            ha = self._ha if (self._ha is not None and self._cycle % self.ha_every) else None
+            if ha is None:
+                try:
+                    ha = await asyncio.wait_for(probe_ha_cluster(cfg), timeout=HA_TIMEOUT_SEC)
+                except asyncio.TimeoutError:
+                    ha = {"available": False, "method": None, "pcs": None, "drbd": None,
+                          "error": f"HA probe timed out after {HA_TIMEOUT_SEC:g}s"}
+                self._ha = ha
+            self._cycle += 1
+            t0 = time.monotonic()
+            doc = await probe_cluster_full(cfg, probe=self.probe_target, ha=ha)
+            self.duration_ms = int((time.monotonic() - t0) * 1000)
+            self.probed_at = time.time()
+            self.doc = doc
+            self._record(doc, self.probed_at)
+            return doc
+
+    def _record(self, doc: Dict[str, Any], ts: float) -> List[Dict[str, Any]]:
+        events: List[Dict[str, Any]] = []
+        states = target_states(doc)
+        for key, (healthy, error, probe_ms) in states.items():
+            ring = self._history.get(key)
+            if ring is None:
+                ring = self._history[key] = deque(maxlen=HISTORY_MAX)
+            ring.append((ts, healthy, probe_ms, error))
+            prev = self._state.get(key)
+            self._state[key] = healthy
+            if prev is not None and prev != healthy:
+                role, _, target = key.partition(":")
+                events.append({
+                    "time": _iso(ts),
+                    "target": key,
+                    "role": role,
+                    "fqdn": target,
+                    "from": "healthy" if prev else "unhealthy",
+                    "to": "healthy" if healthy else "unhealthy",
+                    "error": error,
+                })
+        # Targets removed from the inventory stop being tracked
+        for key in [k for k in self._history if k not in states]:
+            del self._history[key]
+            self._state.pop(key, None)
+        for ev in events:
+            self._transitions.append(ev)
+            self._events += 1
+            self._notify(ev)
+        return events
+
+    def _notify(self, ev: Dict[str, Any]) -> None:
+        for q in list(self._subscribers):
+            try:
+                q.put_nowait(ev)
+            except asyncio.QueueFull:
+                pass  # slow SSE client; it will see the next document anyway
+
+    # ─── Sharing between workers ────────────────────────────
+
+    def _state_path(self) -> Path:
+        base = self._state_dir if self._state_dir is not None else settings.data_dir
+        return Path(base) / "cluster_health.json"
+
+    def publish(self) -> None:
+        """Leader: write the document, history and transitions for the other workers."""
+        state = {
+            "doc": self.doc,
+            "probed_at": self.probed_at,
+            "duration_ms": self.duration_ms,
+            "events": self._events,
+            "history": {k: list(ring) for k, ring in self._history.items()},
+            "transitions": list(self._transitions),
+        }
+        path = self._state_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state, default=str), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def follow(self) -> bool:
+        """Follower: adopt the leader's published state when it is newer than ours."""
+        try:
+            state = json.loads(self._state_path().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        probed_at = state.get("probed_at")
+        if not probed_at or (self.probed_at is not None and probed_at <= self.probed_at):
+            return False
+        self.doc = state.get("doc")
+        self.probed_at = probed_at
+        self.duration_ms = state.get("duration_ms")
+        self._history = {
+            k: deque((tuple(r) for r in rows), maxlen=HISTORY_MAX)
+            for k, rows in (state.get("history") or {}).items()
+        }
+        # So a follower that later takes the lock reports transitions from here
+        self._state = {k: bool(ring[-1][1]) for k, ring in self._history.items() if ring}
+        transitions = list(state.get("transitions") or [])
+        events = int(state.get("events") or 0)
+        fresh = min(len(transitions), events - self._events)
+        self._transitions = deque(transitions, maxlen=TRANSITIONS_MAX)
+        self._events = events
+        for ev in transitions[len(transitions) - fresh:] if fresh > 0 else ():
+            self._notify(ev)
+        return True
+
+    # ─── Readers ────────────────────────────────────────────
+
+    def is_fresh(self, max_age: Optional[float] = None) -> bool:
+        limit = 3 * self.interval_sec if max_age is None else max_age
+        return self.probed_at is not None and (time.time() - self.probed_at) <= limit
+
+    async def get(self, fresh: bool = False, cfg: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Cached document (probing now when stale, missing or ``fresh``)."""
+        cached = not fresh and self.doc is not None and self.is_fresh()
+        doc = self.doc if cached else await self.probe_once(cfg)
+        age = round(time.time() - (self.probed_at or time.time()), 1)
+        return {
+            **doc,
+            "probe": {
+                "cached": cached,
+                "probed_at": _iso(self.probed_at) if self.probed_at else None,
+                "age_sec": age,
+                "duration_ms": self.duration_ms,
+                "interval_sec": self.interval_sec,
+                "background": self.running(),
+                "leader": self._leader.held,
+            },
+        }
+
+    def history(self, target: Optional[str] = None) -> Dict[str, Any]:
+        keys = [target] if target else sorted(self._history)
+        return {
+            "targets": {
+                k: [
+                    {"time": _iso(ts), "healthy": h, "probe_ms": ms, "error": err}
+                    for ts, h, ms, err in self._history.get(k, ())
+                ]
+                for k in keys
+            },
+            "transitions": list(self._transitions),
+        }
+
+    def subscribe(self) -> asyncio.Queue:
+        q: asyncio.Queue = asyncio.Queue(maxsize=100)
+        self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue) -> None:
+        self._subscribers.discard(q)
+
+    # ─── Schedule ───────────────────────────────────────────
+
+    def running(self) -> bool:
+        return bool(self._task and not self._task.done())
+
+    async def _loop(self) -> None:
+        from .cluster_config import is_clustered
+
+        logger.info("Cluster health prober started (every ~%ss)", int(self.interval_sec))
+        try:
+            while not self._stop:
+                try:
+                    if not is_clustered():
+                        logger.info("Cluster health prober stopped (deployment_mode is not clustered)")
+                        return
+                    # One worker per console probes; the others read its results
+                    if self._leader.acquire():
+                        await self.probe_once()
+                        await asyncio.to_thread(self.publish)
+                    else:
+                        await asyncio.to_thread(self.follow)
+                except Exception as e:
+                    logger.warning("Cluster health probe cycle failed: %s", e)
+                # ±jitter so several consoles behind a VIP drift apart
+                spread = self.interval_sec * self.jitter
+                await asyncio.sleep(max(1.0, self.interval_sec + random.uniform(-spread, spread)))
+        finally:
+            self._leader.release()
+
+    async def start(self) -> None:
+        self._stop = False
+        if self.running():
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        self._stop = True
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+# Singleton
+cluster_prober = ClusterHealthProber()
+
+
+async def start_cluster_prober() -> None:
+    """Start the schedule in clustered mode (single-console health is read on demand)."""
+    from .cluster_config import is_clustered
+
+    if is_clustered():
+        await cluster_prober.start()
+
+
+async def stop_cluster_prober() -> None:
+    await cluster_prober.stop()
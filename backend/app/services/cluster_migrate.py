@@ -124,6 +124,10 @@ def migrate_sqlite_file_to_postgres(
     from ..models import cluster_secret as _cs  # noqa: F401
     from ..models import token_denylist as _td  # noqa: F401
     from ..models import executive_report as _er  # noqa: F401
+    from ..models import orchestration_job as _oj  # noqa: F401
+    from ..models import agent_run as _ar  # noqa: F401
+    from ..models import execution_result as _xr  # noqa: F401
+    from ..models import execution_stream as _xs  # noqa: F401
 
     Base.metadata.create_all(dst)
 
@@ -170,7 +174,7 @@ def migrate_sqlite_file_to_postgres(
             dconn.execute(
                 text(
                     "INSERT INTO alembic_version (version_num) "
-                    "VALUES ('004_cluster_secrets')"
+                    "VALUES ('009_execution_stream_events')"
                 )
             )
     except Exception as e:
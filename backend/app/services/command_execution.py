@@ -9,13 +9,14 @@ Goals:
 - Record to ExecutionHistory with timing, who, cmd, result.
 - Use run_sudo uniformly.
 - Support dry_run / simulate mode (for future UI preview).
-- Pluggable transport (today LocalSudoTransport; stub for SSH/remote).
+- Pluggable transport (LocalSudoTransport; SSHRemoteTransport over pooled SSH).
 - Best-effort in-process job counter for /metrics (not a full Celery queue).
 
 Orchestration Run Command still uses routers/bolt.run_bolt_command for lab-proven
 behavior; other callers should migrate to default_service.execute(...).
 """
 import time
+import shlex
 import asyncio
 import threading
 from typing import Dict, Any, List, Optional, Protocol
@@ -71,22 +72,37 @@ class LocalSudoTransport:
 
 class SSHRemoteTransport:
     """
-    Stub for future remote-host support (srsysarch1 P2 / remote-host prep).
-
-    Not wired to production callers yet. Raises NotImplementedError so any
-    accidental use fails loudly rather than silently running local sudo.
+    Remote-host execution over the pooled SSH connections (services.ssh_pool).
+
+    Transports with the same ``identity_file`` and ``user`` share one
+    registered pool (``ssh_pool.get_pool``), so one persistent connection
+    per (user, host) serves every instance; each call is a new channel on
+    it. Needs the optional
+    ``asyncssh`` package; connection failures raise ``SSHTransportError``
+    so callers can fall back to Bolt.
     """
 
-    def __init__(self, host: str, user: str = "root", identity_file: Optional[str] = None):
+    def __init__(
+        self,
+        host: str,
+        user: Optional[str] = None,
+        identity_file: Optional[str] = None,
+        pool=None,
+    ):
+        from .ssh_pool import get_pool
+
         self.host = host
         self.user = user
         self.identity_file = identity_file
+        self._pool = pool or get_pool(identity_file=identity_file, user=user)
 
     async def run(self, args: List[str], timeout: int = 300, rainbow: bool = False) -> Dict[str, Any]:
-        raise NotImplementedError(
-            "SSHRemoteTransport is a stub for remote-host v2; configure LocalSudoTransport "
-            f"(attempted host={self.host!r} user={self.user!r})."
-        )
+        # argv is quoted for the remote shell; no local shell is involved.
+        return await self.run_shell(shlex.join(str(a) for a in args), timeout=timeout)
+
+    async def run_shell(self, command: str, timeout: int = 300) -> Dict[str, Any]:
+        """Run a shell snippet (the same strings ``bolt command run`` takes)."""
+        return await self._pool.run(self.host, command, timeout=timeout, user=self.user)
 
 
 # Known service-token roles / scopes (stored in api_tokens.role).
@@ -0,0 +1,390 @@
+"""
+Scheduled app-database maintenance: retention deletes and compaction.
+
+Every ``db_maintenance_interval_hours``, in one uvicorn worker per host
+(``WorkerLock``; the others skip the pass):
+
+- expired rows are deleted in batches of ``db_maintenance_batch_rows``, each
+  batch its own short transaction (select keys, delete by key, commit,
+  pause), so request writers never wait behind one long DELETE:
+
+  - execution history older than ``execution_history_retention_days``
+    (with its stored results; off by default)
+  - stored execution results past ``execution_results_retention_days``
+  - finished orchestration jobs older than the history retention
+  - live output events (``execution_stream_events``) older than
+    ``STREAM_EVENTS_KEEP_HOURS``
+  - active-session rows not seen for ``SESSION_IDLE_MIN`` minutes
+  - token denylist rows whose JWT has expired anyway
+
+- the database is compacted: on SQLite ``PRAGMA incremental_vacuum``,
+  ``PRAGMA optimize`` and a WAL truncate; on PostgreSQL ``VACUUM (ANALYZE)``
+  on the tables rows were deleted from.
+
+An existing SQLite file only shrinks once switched to
+``auto_vacuum=INCREMENTAL``, which takes a full ``VACUUM``: it holds an
+exclusive lock for its whole run and writes a copy of the file. It is
+opt-in (``db_sqlite_incremental_vacuum``, or the admin "run maintenance"
+action with ``convert_sqlite``) and skipped when the disk holding the
+database has less than ``VACUUM_FREE_FACTOR`` × its size free.
+
+Rows deleted and bytes reclaimed are exported on ``/metrics``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import shutil
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, select, text
+
+from ..config import settings
+from ..utils.worker_lock import WorkerLock
+
+logger = logging.getLogger(__name__)
+
+SESSION_IDLE_MIN = 15  # same window the dashboard counts as "active"
+STREAM_EVENTS_KEEP_HOURS = 24  # live output replay; the run's history row keeps the result
+FIRST_RUN_DELAY_SEC = 300.0  # keep startup quiet
+VACUUM_FREE_FACTOR = 2  # a full VACUUM writes a copy of the file (plus journal)
+# Tables compacted / analysed on PostgreSQL after deletes
+_PG_TABLES = {
+    "execution_history": "execution_history",
+    "execution_results": "execution_results",
+    "execution_stream_events": "execution_stream_events",
+    "orchestration_jobs": "orchestration_jobs",
+    "active_sessions": "active_sessions",
+    "token_denylist": "token_denylist",
+}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def delete_in_batches(
+    session_factory,
+    key_col,
+    *where,
+    batch: Optional[int] = None,
+    pause: Optional[float] = None,
+    children: tuple = (),
+) -> int:
+    """Delete rows of ``key_col``'s table matching ``where``, ``batch`` keys per transaction.
+
+    ``children`` are foreign-key-like columns (``ExecutionResult.history_id``)
+    whose rows are deleted with each batch of parent keys.
+    """
+    batch = max(1, int(batch or settings.db_maintenance_batch_rows))
+    pause = settings.db_maintenance_batch_pause_sec if pause is None else pause
+    table = key_col.table
+    total = 0
+    while True:
+        async with session_factory() as db:
+            keys = [r[0] for r in (await db.execute(select(key_col).where(*where).limit(batch))).all()]
+            if not keys:
+                break
+            for child in children:
+                await db.execute(delete(child.table).where(child.in_(keys)))
+            await db.execute(delete(table).where(key_col.in_(keys)))
+            await db.commit()
+        total += len(keys)
+        if len(keys) < batch:
+            break
+        await asyncio.sleep(pause)
+    return total
+
+
+async def purge_execution_history(session_factory, cutoff: datetime) -> int:
+    """History rows older than ``cutoff`` and their stored results."""
+    from ..models import ExecutionHistory, ExecutionResult
+
+    return await delete_in_batches(
+        session_factory,
+        ExecutionHistory.id,
+        ExecutionHistory.executed_at < cutoff,
+        children=(ExecutionResult.history_id,),
+    )
+
+
+async def _sqlite_pages(conn) -> Dict[str, int]:
+    out = {}
+    for pragma in ("page_size", "page_count", "freelist_count", "auto_vacuum"):
+        out[pragma] = int((await conn.execute(text(f"PRAGMA {pragma}"))).scalar() or 0)
+    return out
+
+
+def vacuum_space_problem(engine, size_bytes: int) -> Optional[str]:
+    """Why a full VACUUM should not run now (None = enough free disk)."""
+    path = engine.url.database
+    if not path or path == ":memory:":
+        return None
+    try:
+        free = shutil.disk_usage(Path(path).resolve().parent).free
+    except OSError as e:
+        return f"cannot check free disk space: {e}"
+    need = size_bytes * VACUUM_FREE_FACTOR
+    if free < need:
+        return f"needs {need // 1048576} MiB free next to the database, {free // 1048576} MiB available"
+    return None
+
+
+async def compact_sqlite(engine, convert: bool = False) -> Dict[str, Any]:
+    """incremental_vacuum + optimize; returns bytes reclaimed from the file.
+
+    ``convert`` runs the one-time full VACUUM to ``auto_vacuum=INCREMENTAL``
+    when the file is not in that mode yet and the disk has room for it.
+    """
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        before = await _sqlite_pages(conn)
+        converted = False
+        skipped = None
+        if before["auto_vacuum"] != 2 and convert:
+            skipped = vacuum_space_problem(engine, before["page_count"] * before["page_size"])
+            if skipped:
+                logger.warning("Not switching SQLite to auto_vacuum=INCREMENTAL: %s", skipped)
+        if before["auto_vacuum"] != 2 and convert and not skipped:
+            # auto_vacuum only changes on an existing file through a full VACUUM
+            logger.info("Switching SQLite database to auto_vacuum=INCREMENTAL (one-time VACUUM)")
+            await conn.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+            await conn.execute(text("VACUUM"))
+            converted = True
+        elif before["auto_vacuum"] == 2 and before["freelist_count"]:
+            # Frees one page per sqlite3_step; a plain execute() steps once
+            # and SQLAlchemy cannot iterate a column-less result, so run it
+            # as a script on the driver connection (steps to completion).
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.executescript("PRAGMA incremental_vacuum;")
+        await conn.execute(text("PRAGMA optimize"))
+        await conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        after = await _sqlite_pages(conn)
+    reclaimed = max(0, before["page_count"] - after["page_count"]) * after["page_size"]
+    return {
+        "reclaimed_bytes": reclaimed,
+        "size_bytes": after["page_count"] * after["page_size"],
+        "free_bytes": after["freelist_count"] * after["page_size"],
+        "converted_to_incremental": converted,
+        "convert_skipped": skipped,
+    }
+
+
+async def compact_postgres(engine, tables: List[str]) -> Dict[str, Any]:
+    """VACUUM (ANALYZE) the tables rows were deleted from.
+
+    Plain VACUUM makes the space reusable rather than returning it to the
+    OS, so ``reclaimed_bytes`` is usually 0; the size gauge shows growth.
+    """
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+        async def _size() -> int:
+            return int((await conn.execute(text("SELECT pg_database_size(current_database())"))).scalar() or 0)
+
+        before = await _size()
+        for table in tables:
+            await conn.execute(text(f"VACUUM (ANALYZE) {_PG_TABLES[table]}"))
+        after = await _size()
+    return {"reclaimed_bytes": max(0, before - after), "size_bytes": after, "free_bytes": None}
+
+
+class DbMaintenance:
+    """Periodic retention + compaction with counters for /metrics."""
+
+    def __init__(self, session_factory=None, engine=None, interval_sec: Optional[float] = None):
+        self._session_factory = session_factory
+        self._engine = engine
+        self.interval_sec = (
+            interval_sec if interval_sec is not None else float(settings.db_maintenance_interval_hours) * 3600
+        )
+        self._task: Optional[asyncio.Task] = None
+        self._stop = False
+        self._lock = asyncio.Lock()
+        self._leader = WorkerLock("db_maintenance")
+        self.runs = 0
+        self.failures = 0
+        self.deleted_total: Dict[str, int] = {}
+        self.reclaimed_bytes_total = 0
+        self.last: Optional[Dict[str, Any]] = None
+
+    def _db(self):
+        if self._session_factory is None:
+            from ..database import async_session
+
+            self._session_factory = async_session
+        if self._engine is None:
+            from ..database import engine
+
+            self._engine = engine
+        return self._session_factory, self._engine
+
+    async def purge(self) -> Dict[str, int]:
+        """Retention deletes; returns rows deleted per table."""
+        from ..models import ActiveSession, OrchestrationJob, TokenDenylist
+        from ..models.execution_result import ExecutionResult
+        from ..models.execution_stream import ExecutionStreamEvent
+        from .job_queue import FINAL
+        from .result_store import retention_cutoff
+
+        factory, _ = self._db()
+        now = _now()
+        deleted: Dict[str, int] = {}
+        days = int(settings.execution_history_retention_days or 0)
+        if days > 0:
+            cutoff = now - timedelta(days=days)
+            deleted["execution_history"] = await purge_execution_history(factory, cutoff)
+            deleted["orchestration_jobs"] = await delete_in_batches(
+                factory,
+                OrchestrationJob.id,
+                OrchestrationJob.status.in_(FINAL),
+                OrchestrationJob.created_at < cutoff,
+            )
+        results_cutoff = retention_cutoff()
+        if results_cutoff is not None:
+            deleted["execution_results"] = await delete_in_batches(
+                factory, ExecutionResult.id, ExecutionResult.created_at < results_cutoff
+            )
+        deleted["execution_stream_events"] = await delete_in_batches(
+            factory,
+            ExecutionStreamEvent.id,
+            ExecutionStreamEvent.created_at < now - timedelta(hours=STREAM_EVENTS_KEEP_HOURS),
+        )
+        # last_seen is written tz-aware by the auth middleware; compare like it does
+        idle_cutoff = datetime.now(timezone.utc) - timedelta(minutes=SESSION_IDLE_MIN)
+        deleted["active_sessions"] = await delete_in_batches(
+            factory, ActiveSession.token_hash, ActiveSession.last_seen < idle_cutoff
+        )
+        deleted["token_denylist"] = await delete_in_batches(
+            factory, TokenDenylist.jti, TokenDenylist.expires_at < now
+        )
+        return deleted
+
+    async def compact(self, touched: List[str], convert_sqlite: bool = False) -> Dict[str, Any]:
+        from ..database import is_postgres_url
+
+        _, engine = self._db()
+        if is_postgres_url(str(engine.url)):
+            return await compact_postgres(engine, touched)
+        return await compact_sqlite(engine, convert=convert_sqlite)
+
+    async def run_once(self, convert_sqlite: Optional[bool] = None) -> Dict[str, Any]:
+        """One maintenance pass; concurrent calls wait for the running one.
+
+        ``convert_sqlite`` defaults to ``db_sqlite_incremental_vacuum``.
+        """
+        if convert_sqlite is None:
+            convert_sqlite = settings.db_sqlite_incremental_vacuum
+        async with self._lock:
+            started = time.time()
+            report: Dict[str, Any] = {"started_at": started}
+            try:
+                deleted = await self.purge()
+                report["deleted"] = deleted
+                for table, n in deleted.items():
+                    self.deleted_total[table] = self.deleted_total.get(table, 0) + n
+                report.update(await self.compact([t for t, n in deleted.items() if n], convert_sqlite))
+                self.reclaimed_bytes_total += report.get("reclaimed_bytes") or 0
+                self.runs += 1
+            except Exception as e:
+                self.failures += 1
+                report["error"] = str(e)
+                logger.warning("DB maintenance failed: %s", e, exc_info=True)
+            report["duration_sec"] = round(time.time() - started, 3)
+            self.last = report
+            if report.get("deleted") and any(report["deleted"].values()):
+                logger.info(
+                    "DB maintenance: deleted %s, reclaimed %d bytes in %.1fs",
+                    {k: v for k, v in report["deleted"].items() if v},
+                    report.get("reclaimed_bytes") or 0,
+                    report["duration_sec"],
+                )
+            return report
+
+    def render_prometheus(self) -> List[str]:
+        last = self.last or {}
+        lines = [
+            "# HELP openvox_gui_db_maintenance_runs_total Completed DB maintenance passes",
+            "# TYPE openvox_gui_db_maintenance_runs_total counter",
+            f"openvox_gui_db_maintenance_runs_total {self.runs}",
+            "# HELP openvox_gui_db_maintenance_failures_total DB maintenance passes that raised",
+            "# TYPE openvox_gui_db_maintenance_failures_total counter",
+            f"openvox_gui_db_maintenance_failures_total {self.failures}",
+            "# HELP openvox_gui_db_maintenance_last_run_timestamp_seconds Start of the last pass (0 = none yet)",
+            "# TYPE openvox_gui_db_maintenance_last_run_timestamp_seconds gauge",
+            f"openvox_gui_db_maintenance_last_run_timestamp_seconds {last.get('started_at') or 0}",
+            "# HELP openvox_gui_db_maintenance_last_duration_seconds Duration of the last pass",
+            "# TYPE openvox_gui_db_maintenance_last_duration_seconds gauge",
+            f"openvox_gui_db_maintenance_last_duration_seconds {last.get('duration_sec') or 0}",
+            "# HELP openvox_gui_db_maintenance_deleted_rows_total Rows removed by retention, per table",
+            "# TYPE openvox_gui_db_maintenance_deleted_rows_total counter",
+        ]
+        for table, n in sorted(self.deleted_total.items()):
+            lines.append(f'openvox_gui_db_maintenance_deleted_rows_total{{table="{table}"}} {n}')
+        lines += [
+            "# HELP openvox_gui_db_reclaimed_bytes_total Bytes returned by vacuum / compaction",
+            "# TYPE openvox_gui_db_reclaimed_bytes_total counter",
+            f"openvox_gui_db_reclaimed_bytes_total {self.reclaimed_bytes_total}",
+            "# HELP openvox_gui_db_last_reclaimed_bytes Bytes reclaimed by the last pass",
+            "# TYPE openvox_gui_db_last_reclaimed_bytes gauge",
+            f"openvox_gui_db_last_reclaimed_bytes {last.get('reclaimed_bytes') or 0}",
+        ]
+        if last.get("size_bytes") is not None:
+            lines += [
+                "# HELP openvox_gui_db_size_bytes App database size after the last maintenance pass",
+                "# TYPE openvox_gui_db_size_bytes gauge",
+                f"openvox_gui_db_size_bytes {last['size_bytes']}",
+            ]
+        if last.get("free_bytes") is not None:
+            lines += [
+                "# HELP openvox_gui_db_free_bytes Free pages left in the SQLite file after the last pass",
+                "# TYPE openvox_gui_db_free_bytes gauge",
+                f"openvox_gui_db_free_bytes {last['free_bytes']}",
+            ]
+        return lines
+
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _loop(self) -> None:
+        logger.info("DB maintenance scheduled every %.1fh", self.interval_sec / 3600)
+        try:
+            await asyncio.sleep(min(FIRST_RUN_DELAY_SEC, self.interval_sec))
+            while not self._stop:
+                # One worker per host runs the pass; the others retry each interval
+                if self._leader.acquire():
+                    await self.run_once()
+                await asyncio.sleep(self.interval_sec)
+        finally:
+            self._leader.release()
+
+    async def start(self) -> None:
+        self._stop = False
+        if self.running() or self.interval_sec <= 0:
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        self._stop = True
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+# Singleton
+db_maintenance = DbMaintenance()
+
+
+async def start_db_maintenance() -> None:
+    await db_maintenance.start()
+
+
+async def stop_db_maintenance() -> None:
+    await db_maintenance.stop()
@@ -3,6 +3,8 @@ Deploy history — JSON file (legacy UI) + SQLite execution_history (srdev2 A6).
 
 Keeps the existing deploy_history.json contract for GET /api/deploy/history
 while also recording type=deploy rows in ExecutionHistory for unified audit.
+Clustered deploys also keep each compiler's result and duration (``hosts``),
+so a slow or failing compiler shows up in history.
 """
 from __future__ import annotations
 
@@ -57,6 +59,20 @@ def add_json_history_entry(entry: dict) -> None:
         save_json_history(history)
 
 
+def host_timings(hosts: Optional[List[dict]]) -> List[dict]:
+    """Per-host rows kept in history (no output, just outcome and duration)."""
+    return [
+        {
+            "host": h.get("host"),
+            "success": bool(h.get("success")),
+            "exit_code": h.get("exit_code"),
+            "duration_ms": h.get("duration_ms"),
+        }
+        for h in hosts or []
+        if isinstance(h, dict) and h.get("host")
+    ]
+
+
 async def record_deploy_execution(
     db,
     *,
@@ -67,6 +83,8 @@ async def record_deploy_execution(
     output_preview: str = "",
     error_message: Optional[str] = None,
     parameters: Optional[Dict[str, Any]] = None,
+    duration_ms: Optional[int] = None,
+    hosts: Optional[List[dict]] = None,
 ) -> None:
     """Insert ExecutionHistory row with execution_type='deploy' (best-effort)."""
     if db is None:
@@ -74,6 +92,8 @@ async def record_deploy_execution(
     try:
         from ..models import ExecutionHistory
 
+        if hosts:
+            parameters = {**(parameters or {}), "hosts": host_timings(hosts)}
         row = ExecutionHistory(
             execution_type="deploy",
             node_name=environment or "all",
@@ -85,8 +105,8 @@ async def record_deploy_execution(
             executed_at=datetime.now(timezone.utc),
             error_message=(error_message or "")[:500] or None,
             result_preview=(output_preview or "")[:500] or None,
+            duration_ms=duration_ms,
         )
-        # duration unknown for sync subprocess path — leave null
         db.add(row)
         await db.commit()
     except Exception as exc:
@@ -108,6 +128,8 @@ def record_deploy(
     commit: Optional[str] = None,
     db=None,
     extra_json: Optional[dict] = None,
+    duration_ms: Optional[int] = None,
+    hosts: Optional[List[dict]] = None,
 ) -> dict:
     """
     Synchronous JSON append + schedule note for async DB (caller awaits record_deploy_execution).
@@ -124,6 +146,10 @@ def record_deploy(
     }
     if commit is not None:
         entry["commit"] = commit
+    if duration_ms is not None:
+        entry["duration_ms"] = duration_ms
+    if hosts:
+        entry["hosts"] = host_timings(hosts)
     if extra_json:
         entry.update(extra_json)
     add_json_history_entry(entry)
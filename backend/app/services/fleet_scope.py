@@ -4,13 +4,26 @@ Fleet metric scopes for Insights (location fact + certname REGEX packs).
 Resolves a scope id or explicit filters into a set of certnames drawn from
 the live fleet (active PuppetDB). Used by Compliance,
 Performance, and the Monitoring wallboard.
+
+Membership comes from ``ScopeIndex``: per-pack, per-location and per-regex
+bitsets over the sorted live fleet, rebuilt only when the live certnames or
+``location`` facts change. Resolving or intersecting scopes is a lookup.
+
+``scope_query`` compiles a resolved scope into a PuppetDB AST predicate
+(``certname in [...]``, ``certname ~ regex`` or a ``location`` fact
+subquery) so report queries return only in-scope rows.
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
 import re
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Set
+from typing import AbstractSet, Any, Dict, FrozenSet, List, Optional, Set, Tuple
 
 from .puppetdb import puppetdb_service
 
@@ -54,7 +67,7 @@ class ScopeResult:
     scope_id: str
     label: str
     kind: str  # all | location | pack | custom | regex
-    certnames: Set[str] = field(default_factory=set)
+    certnames: AbstractSet[str] = field(default_factory=frozenset)
     location: Optional[str] = None
     certname_re: Optional[str] = None
 
@@ -79,6 +92,11 @@ class ScopeResult:
         }
 
 
+# Largest certname array we inline into a GET query string. Bigger scopes
+# fall back to the pack regex / location subquery (or no pushdown).
+_PQL_IN_MAX_CHARS = 3000
+
+
 def _norm_cn(cn: str) -> str:
     return (cn or "").strip().lower()
 
@@ -114,48 +132,172 @@ async def _location_by_certname() -> Dict[str, str]:
     return out
 
 
+# ─── Membership index ──────────────────────────────────────
+# Certnames get a stable position in the sorted live fleet; each pack,
+# location and recently used custom regex is an int bitset over those
+# positions. Rebuilt only when the live fleet or location facts change.
+_INDEX_TTL = 15.0  # matches the get_live_nodes() cache
+_REGEX_CACHE_MAX = 32
+
+
+def _iter_bits(bits: int):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class ScopeIndex:
+    """Precomputed scope membership over one snapshot of the live fleet."""
+
+    def __init__(self, live: Set[str], loc_map: Dict[str, str]):
+        self.certnames: Tuple[str, ...] = tuple(sorted(live))
+        self.position: Dict[str, int] = {cn: i for i, cn in enumerate(self.certnames)}
+        self.locations: Dict[str, str] = {
+            cn: loc for cn, loc in loc_map.items() if cn in self.position
+        }
+        self.fingerprint = _fingerprint(self.certnames, self.locations)
+        self.built_at = time.monotonic()
+        self.all_bits = (1 << len(self.certnames)) - 1
+        self.live: FrozenSet[str] = frozenset(self.certnames)
+
+        self.pack_bits: Dict[str, int] = {}
+        for pack_id, meta in BUILTIN_PACKS.items():
+            try:
+                self.pack_bits[pack_id] = self._match_bits(re.compile(meta["pattern"], re.IGNORECASE))
+            except re.error:
+                continue
+
+        # Keyed by the fact value as listed (scope ids keep their case);
+        # matching is case-insensitive via _location_match.
+        self.location_bits: Dict[str, int] = {}
+        self._location_match: Dict[str, int] = {}
+        for cn, loc in self.locations.items():
+            bit = 1 << self.position[cn]
+            self.location_bits[loc] = self.location_bits.get(loc, 0) | bit
+            self._location_match[loc.upper()] = self._location_match.get(loc.upper(), 0) | bit
+
+        self._regex_bits: "OrderedDict[str, int]" = OrderedDict()
+        self._members: Dict[int, FrozenSet[str]] = {self.all_bits: self.live}
+
+    def location_match_bits(self, location: str) -> int:
+        """Bitset for a location, compared case-insensitively."""
+        return self._location_match.get(location.strip().upper(), 0)
+
+    def _match_bits(self, cre: "re.Pattern[str]") -> int:
+        bits = 0
+        for i, cn in enumerate(self.certnames):
+            if cre.search(cn):
+                bits |= 1 << i
+        return bits
+
+    def regex_bits(self, pattern: str) -> int:
+        """Bitset for a certname regex (packs precomputed, others LRU-cached)."""
+        for pack_id, meta in BUILTIN_PACKS.items():
+            if meta["pattern"] == pattern and pack_id in self.pack_bits:
+                return self.pack_bits[pack_id]
+        if pattern in self._regex_bits:
+            self._regex_bits.move_to_end(pattern)
+            return self._regex_bits[pattern]
+        try:
+            cre = re.compile(pattern, re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(f"Invalid certname regex: {e}") from e
+        bits = self._match_bits(cre)
+        self._regex_bits[pattern] = bits
+        while len(self._regex_bits) > _REGEX_CACHE_MAX:
+            self._regex_bits.popitem(last=False)
+        return bits
+
+    def members(self, bits: int) -> FrozenSet[str]:
+        """Certname set for a bitset (memoised per distinct bitset)."""
+        hit = self._members.get(bits)
+        if hit is None:
+            hit = frozenset(self.certnames[i] for i in _iter_bits(bits))
+            if len(self._members) < 256:
+                self._members[bits] = hit
+        return hit
+
+
+def _fingerprint(certnames: Tuple[str, ...], locations: Dict[str, str]) -> str:
+    h = hashlib.sha1()
+    for cn in certnames:
+        h.update(cn.encode())
+        h.update(b"\0")
+        h.update(locations.get(cn, "").encode())
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+_index: Optional[ScopeIndex] = None
+_index_lock: Optional[asyncio.Lock] = None
+
+
+async def get_scope_index() -> ScopeIndex:
+    """Current membership index; re-checks the fleet at most every _INDEX_TTL."""
+    global _index, _index_lock
+    if _index is not None and time.monotonic() - _index.built_at < _INDEX_TTL:
+        return _index
+    if _index_lock is None:
+        _index_lock = asyncio.Lock()
+    async with _index_lock:
+        if _index is not None and time.monotonic() - _index.built_at < _INDEX_TTL:
+            return _index
+        live = await _live_certnames()
+        loc_map = await _location_by_certname()
+        certnames = tuple(sorted(live))
+        fp = _fingerprint(certnames, {cn: v for cn, v in loc_map.items() if cn in live})
+        if _index is not None and _index.fingerprint == fp:
+            _index.built_at = time.monotonic()
+        else:
+            _index = ScopeIndex(live, loc_map)
+            logger.debug(
+                "fleet_scope: rebuilt membership index (%d hosts, %d locations)",
+                len(_index.certnames),
+                len(_index.location_bits),
+            )
+        return _index
+
+
+def invalidate_scope_index() -> None:
+    """Force the next lookup to re-read the live fleet and location facts."""
+    global _index
+    _index = None
+
+
 async def list_scopes() -> Dict[str, Any]:
     """Catalog of scopes for the UI (built-in packs + live locations)."""
-    live = await _live_certnames()
-    loc_map = await _location_by_certname()
+    idx = await get_scope_index()
 
     scopes: List[Dict[str, Any]] = [
         {
             "id": "all",
             "label": "All live fleet",
             "kind": "all",
-            "count": len(live),
+            "count": len(idx.certnames),
         }
     ]
 
     for pack_id, meta in BUILTIN_PACKS.items():
-        try:
-            cre = re.compile(meta["pattern"], re.IGNORECASE)
-        except re.error:
+        if pack_id not in idx.pack_bits:
             continue
-        count = sum(1 for cn in live if cre.search(cn))
         scopes.append({
             "id": f"pack:{pack_id}",
             "label": meta["label"],
             "kind": "pack",
             "pattern": meta["pattern"],
-            "count": count,
+            "count": bin(idx.pack_bits[pack_id]).count("1"),
         })
 
     # Distinct locations with at least one live host that has the fact
-    loc_counts: Dict[str, int] = {}
-    for cn in live:
-        loc = loc_map.get(cn)
-        if not loc:
-            continue
-        loc_counts[loc] = loc_counts.get(loc, 0) + 1
-    for loc in sorted(loc_counts.keys()):
+    locations = sorted(idx.location_bits)
+    for loc in locations:
         scopes.append({
             "id": f"location:{loc}",
             "label": f"Location {loc}",
             "kind": "location",
             "location": loc,
-            "count": loc_counts[loc],
+            "count": bin(idx.location_bits[loc]).count("1"),
         })
 
     scopes.append({
@@ -167,8 +309,8 @@ async def list_scopes() -> Dict[str, Any]:
 
     return {
         "scopes": scopes,
-        "live_total": len(live),
-        "locations": sorted(loc_counts.keys()),
+        "live_total": len(idx.certnames),
+        "locations": locations,
         "packs": [
             {"id": k, "label": v["label"], "pattern": v["pattern"]}
             for k, v in BUILTIN_PACKS.items()
@@ -188,7 +330,8 @@ async def resolve_scope(
       1. scope=location:ATLC | pack:compilers | all | custom
       2. Explicit location= / certname_re= / certnames= if scope is all/empty
     """
-    live = await _live_certnames()
+    idx = await get_scope_index()
+    live = idx.live
     scope = (scope or "all").strip()
     location = (location or "").strip() or None
     certname_re = (certname_re or "").strip() or None
@@ -252,27 +395,19 @@ async def resolve_scope(
         label = f"Regex /{certname_re}/"
         scope_id = f"regex:{certname_re}"
 
-    result_set = set(live)
-
     if kind == "custom":
-        result_set = {c for c in custom if c in live}
+        result_set: FrozenSet[str] = frozenset(c for c in custom if c in live)
         label = f"Custom ({len(result_set)} hosts)"
     else:
+        bits = idx.all_bits
         if loc_filter:
-            loc_map = await _location_by_certname()
-            result_set = {
-                cn for cn in result_set
-                if loc_map.get(cn, "").upper() == loc_filter.upper()
-            }
+            bits &= idx.location_match_bits(loc_filter)
         if pattern:
-            try:
-                cre = re.compile(pattern, re.IGNORECASE)
-            except re.error as e:
-                raise ValueError(f"Invalid certname regex: {e}") from e
-            result_set = {cn for cn in result_set if cre.search(cn)}
+            bits &= idx.regex_bits(pattern)
+        result_set = idx.members(bits)
         if custom and kind != "custom":
             # optional further intersect
-            result_set &= custom
+            result_set = result_set & custom
 
     return ScopeResult(
         scope_id=scope_id,
@@ -296,3 +431,89 @@ def filter_reports_by_scope(reports: List[Dict], scope: ScopeResult) -> List[Dic
         r for r in reports
         if scope.contains(str(r.get("certname", "")))
     ]
+
+
+def _pdb_regex(pattern: str) -> str:
+    """Case-insensitive PuppetDB (PostgreSQL ARE) form of a certname regex."""
+    return pattern if pattern.startswith("(?i)") else f"(?i){pattern}"
+
+
+def scope_query(scope: ScopeResult) -> Optional[List[Any]]:
+    """PuppetDB AST predicate matching *scope* on ``certname`` (None = all).
+
+    Prefers an exact ``in`` array (precise and live-fleet correct) while it
+    fits in a query string; otherwise the location fact subquery and/or the
+    certname regex. Callers still run ``filter_reports_by_scope`` on the
+    result — the predicate narrows the fetch, it does not replace the check.
+    """
+    if scope.kind == "all" and not scope.location and not scope.certname_re:
+        return None
+    names = sorted(scope.certnames)
+    if not names:
+        # Resolved to nothing: match nothing rather than fetch the fleet.
+        return ["in", "certname", ["array", [""]]]
+    in_list = ["in", "certname", ["array", names]]
+    if len(json.dumps(in_list)) <= _PQL_IN_MAX_CHARS:
+        return in_list
+    if scope.kind == "custom":
+        return None
+
+    preds: List[Any] = []
+    if scope.location:
+        preds.append([
+            "in", "certname",
+            ["extract", "certname",
+             ["select_facts",
+              ["and",
+               ["=", "name", "location"],
+               ["~", "value", f"(?i)^{re.escape(scope.location)}$"]]]],
+        ])
+    if scope.certname_re:
+        preds.append(["~", "certname", _pdb_regex(scope.certname_re)])
+    if not preds:
+        return None
+    return preds[0] if len(preds) == 1 else ["and", *preds]
+
+
+def combine_query(*preds: Optional[List[Any]]) -> Optional[str]:
+    """AND together AST predicates (skipping None) into a query string."""
+    parts = [p for p in preds if p]
+    if not parts:
+        return None
+    return json.dumps(parts[0] if len(parts) == 1 else ["and", *parts])
+
+
+async def get_scoped_reports(
+    scope: ScopeResult,
+    base_query: Optional[List[Any]] = None,
+    fallback_limit: Optional[int] = None,
+    **kwargs: Any,
+) -> List[Dict]:
+    """Reports for *scope*, filtered in PuppetDB where possible.
+
+    *kwargs* go to ``puppetdb_service.get_reports`` (limit, order_by, …).
+    When the scope cannot be pushed down (a custom in-list too large for
+    the query) or PuppetDB rejects the predicate (e.g. a custom regex that
+    is valid Python but not PostgreSQL), fetch with *base_query* only and
+    *fallback_limit*, filtering in Python as before.
+    """
+    pred = scope_query(scope)
+    if pred is not None:
+        try:
+            rows = await puppetdb_service.get_reports(
+                query=combine_query(base_query, pred), **kwargs
+            ) or []
+            return filter_reports_by_scope(rows, scope)
+        except Exception as e:
+            logger.warning(
+                "fleet_scope: PuppetDB scope pushdown failed for %s (%s); "
+                "filtering in Python",
+                scope.scope_id,
+                e,
+            )
+    if fallback_limit:
+        kwargs["limit"] = fallback_limit
+    rows = await puppetdb_service.get_reports(
+        query=combine_query(base_query), **kwargs
+    ) or []
+    return filter_reports_by_scope(rows, scope)
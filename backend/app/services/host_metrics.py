@@ -1,20 +1,30 @@
 """
-Control-plane host metrics for Insights (sysstat / pidstat /proc).
+Control-plane host metrics for Insights (/proc deltas, optional sysstat).
 
 Scope: **OpenVox serving estate only** — GUI host, catalog compilers,
 OpenVoxDB nodes, and CA members from cluster config. Agent fleet
 collection is intentionally out of scope (future extension).
 
 Sources (best-effort, no hard failure if tools missing):
-  - /proc/loadavg, meminfo, stat, diskstats  (always)
-  - ``sar`` / ``mpstat`` / ``pidstat`` when sysstat is installed
+  - /proc/loadavg, meminfo, stat, diskstats, <pid>/stat  (always; CPU, disk
+    and per-process values are interval deltas, see proc_sampler)
+  - ``sar`` as an occasional cross-check when sysstat is installed
   - Remote hosts via Bolt command run when inventory can reach them
+
+History: the raw ring (``HISTORY_MAX`` points) is mirrored into a
+``TieredSeries`` per host whose 1m / 10m / 1h rollups (horizons from
+settings) back the long chart windows of ``get_series_history``.
+
+Under several uvicorn workers only the holder of ``WorkerLock("host_metrics")``
+collects and writes the ring and rollup files; the other workers re-read the
+rings each interval (``_follow_rings``) and never write them.
 """
 from __future__ import annotations
 
 import asyncio
 import json
 import logging
+import math
 import os
 import re
 import socket
@@ -24,6 +34,10 @@ from pathlib import Path
 from typing import Any, Deque, Dict, List, Optional, Set, Tuple
 
 from ..config import settings
+from ..utils.ring_file import RingFile, nan_if_none
+from ..utils.tiered_series import TieredSeries, configured_tiers
+from ..utils.worker_lock import WorkerLock
+from .proc_sampler import ProcDeltaSampler
 
 logger = logging.getLogger(__name__)
 
@@ -37,10 +51,15 @@ ROLE_COMPILER = "compiler"
 ROLE_PUPPETDB = "puppetdb"
 ROLE_CA = "ca"
 
+SYSSTAT_ENRICH_SEC = 300  # sar is an occasional cross-check, not the sampler
+SERIES_PERSIST_EVERY = 4  # collector ticks between rollup saves (~1 min)
+
 _history: Dict[str, Deque[Dict[str, Any]]] = defaultdict(lambda: deque(maxlen=HISTORY_MAX))
 _latest: Dict[str, Dict[str, Any]] = {}
 _collector_task: Optional[asyncio.Task] = None
 _collector_stop = False
+_proc_sampler = ProcDeltaSampler(PROCESS_PATTERN)
+_sysstat_last = 0.0
 
 
 def _local_hostname() -> str:
@@ -168,31 +187,6 @@ def _parse_cpu_stat(text: str) -> Dict[str, float]:
     return {}
 
 
-def _parse_diskstats_busy(text: str) -> Dict[str, Any]:
-    """Rough disk activity: sum read/write sectors for major disks."""
-    read_sec = 0
-    write_sec = 0
-    devices = 0
-    for line in text.splitlines():
-        parts = line.split()
-        if len(parts) < 14:
-            continue
-        name = parts[2]
-        # skip partitions like sda1, keep sda/nvme0n1/vda/dm-*
-        if re.match(r"^(sd[a-z]+|vd[a-z]+|nvme\d+n\d+|dm-\d+|xvd[a-z]+)$", name):
-            try:
-                read_sec += int(parts[5])
-                write_sec += int(parts[9])
-                devices += 1
-            except ValueError:
-                continue
-    return {
-        "disk_read_sectors": read_sec,
-        "disk_write_sectors": write_sec,
-        "disk_devices": devices,
-    }
-
-
 async def _run_cmd(cmd: List[str], timeout: int = 8) -> Tuple[int, str, str]:
     try:
         proc = await asyncio.create_subprocess_exec(
@@ -229,107 +223,6 @@ def _which_sync(name: str) -> Optional[str]:
     return None
 
 
-def _parse_pidstat(text: str) -> List[Dict[str, Any]]:
-    """Parse pidstat -urd output for matching processes."""
-    procs: List[Dict[str, Any]] = []
-    for line in text.splitlines():
-        line = line.strip()
-        if not line or line.startswith("#") or line.startswith("Linux") or "UID" in line and "PID" in line:
-            continue
-        # Average: lines or timestamp lines
-        parts = line.split()
-        if len(parts) < 8:
-            continue
-        # Try to find PID and Command at end
-        # Formats vary: time UID PID %usr %system %guest %CPU CPU minflt/s ... Command
-        try:
-            # Find first integer that looks like PID (after optional time/uid)
-            pid = None
-            cmd = parts[-1]
-            # Prefer rows whose command matches our estate processes
-            if not re.search(PROCESS_PATTERN, cmd, re.I):
-                continue
-            for i, tok in enumerate(parts):
-                if tok.isdigit() and i + 1 < len(parts):
-                    # next token often %usr float
-                    try:
-                        float(parts[i + 1].replace("%", ""))
-                        pid = int(tok)
-                        # heuristic: %CPU is often a few columns after PID
-                        cpu_idx = None
-                        for j in range(i + 1, min(i + 8, len(parts))):
-                            if parts[j].replace(".", "", 1).isdigit():
-                                # skip, look for column named in header — use largest small float as cpu?
-                                pass
-                        # Common pidstat -u: UID PID %usr %system %guest %wait %CPU CPU Command
-                        # After PID: parts[i+1]=%usr ... parts[i+6]=%CPU for newer pidstat with %wait
-                        pct_cpu = 0.0
-                        for j in range(i + 1, min(i + 8, len(parts) - 1)):
-                            try:
-                                val = float(parts[j])
-                                if 0 <= val <= 100:
-                                    pct_cpu = max(pct_cpu, val)
-                            except ValueError:
-                                break
-                        rss = None
-                        # pidstat -r has RSS later; optional
-                        procs.append(
-                            {
-                                "pid": pid,
-                                "command": cmd[:80],
-                                "cpu_pct": round(pct_cpu, 1),
-                                "rss_kb": rss,
-                            }
-                        )
-                        break
-                    except ValueError:
-                        continue
-        except Exception:
-            continue
-    # de-dupe by pid keep max cpu
-    by_pid: Dict[int, Dict[str, Any]] = {}
-    for p in procs:
-        pid = p["pid"]
-        if pid not in by_pid or p["cpu_pct"] > by_pid[pid]["cpu_pct"]:
-            by_pid[pid] = p
-    return sorted(by_pid.values(), key=lambda x: -x["cpu_pct"])[:15]
-
-
-def _parse_pidstat_simple(text: str) -> List[Dict[str, Any]]:
-    """Simpler parse: look for lines with process names we care about."""
-    out: List[Dict[str, Any]] = []
-    for line in text.splitlines():
-        if not re.search(PROCESS_PATTERN, line, re.I):
-            continue
-        if "UID" in line and "PID" in line:
-            continue
-        parts = line.split()
-        if len(parts) < 5:
-            continue
-        cmd = parts[-1]
-        pid = None
-        floats: List[float] = []
-        for tok in parts:
-            if tok.isdigit() and pid is None and int(tok) > 1:
-                pid = int(tok)
-            else:
-                try:
-                    floats.append(float(tok))
-                except ValueError:
-                    pass
-        if pid is None:
-            continue
-        # pick a plausible %CPU among floats (0-100)
-        cands = [f for f in floats if 0 <= f <= 100]
-        cpu = max(cands) if cands else 0.0
-        out.append({"pid": pid, "command": cmd[:80], "cpu_pct": round(cpu, 1)})
-    # unique by pid
-    seen = {}
-    for p in out:
-        seen[p["pid"]] = p
-    return sorted(seen.values(), key=lambda x: -x["cpu_pct"])[:15]
-
-
 async def collect_local_snapshot() -> Dict[str, Any]:
     """Collect host + process metrics on the local GUI host."""
     host = _local_hostname()
@@ -345,16 +238,21 @@ async def collect_local_snapshot() -> Dict[str, Any]:
 
     load = _parse_loadavg(_read_text("/proc/loadavg"))
     mem = _parse_meminfo(_read_text("/proc/meminfo"))
-    cpu = _parse_cpu_stat(_read_text("/proc/stat"))
-    disk = _parse_diskstats_busy(_read_text("/proc/diskstats"))
     snap.update(load)
     snap.update(mem)
-    snap.update(cpu)
-    snap.update(disk)
 
-    # Optional sysstat
+    # CPU / disk / per-process from /proc counter deltas (no subprocesses).
+    # The first sample after start has no interval yet and reports since-boot ratios.
+    delta = await asyncio.to_thread(_proc_sampler.sample)
+    processes: List[Dict[str, Any]] = delta.pop("processes", [])
+    snap.update(delta)
+
+    # Optional sysstat enrichment, at most every SYSSTAT_ENRICH_SEC: sar's view
+    # is kept alongside (sar_*), the /proc interval values stay authoritative.
+    global _sysstat_last
     sar = _which_sync("sar")
-    if sar:
+    if sar and ts - _sysstat_last >= SYSSTAT_ENRICH_SEC:
+        _sysstat_last = ts
         rc, out, err = await _run_cmd([sar, "-u", "1", "1"], timeout=6)
         if rc == 0 and out:
             snap["tools"]["sysstat"] = True
@@ -362,7 +260,6 @@ async def collect_local_snapshot() -> Dict[str, Any]:
             for line in reversed(out.splitlines()):
                 if "Average" in line or re.match(r"^\d{2}:\d{2}:\d{2}", line):
                     parts = line.split()
-                    # find floats near the end
                     try:
                         # classic: ... %user %nice %system %iowait %steal %idle
                         if len(parts) >= 8:
@@ -371,37 +268,13 @@ async def collect_local_snapshot() -> Dict[str, Any]:
                             snap["sar_iowait"] = float(parts[-3])
                             snap["sar_steal"] = float(parts[-2])
                             snap["sar_idle"] = float(parts[-1])
-                            # Prefer sar deltas over /proc boot averages when present
-                            snap["cpu_user_pct"] = snap["sar_user"]
-                            snap["cpu_system_pct"] = snap["sar_system"]
-                            snap["cpu_iowait_pct"] = snap["sar_iowait"]
-                            snap["cpu_steal_pct"] = snap["sar_steal"]
-                            snap["cpu_idle_pct"] = snap["sar_idle"]
-                            snap["cpu_used_pct"] = round(100.0 - snap["sar_idle"], 1)
                     except (ValueError, IndexError):
                         pass
                     break
         else:
             snap["errors"].append(f"sar: {err or rc}")
-
-    pidstat = _which_sync("pidstat")
-    processes: List[Dict[str, Any]] = []
-    if pidstat:
-        rc, out, err = await _run_cmd(
-            [pidstat, "-u", "-h", "1", "1"],
-            timeout=8,
-        )
-        if rc == 0 and out:
-            snap["tools"]["pidstat"] = True
-            processes = _parse_pidstat_simple(out)
-        else:
-            # try without -h
-            rc, out, err = await _run_cmd([pidstat, "-u", "1", "1"], timeout=8)
-            if rc == 0 and out:
-                snap["tools"]["pidstat"] = True
-                processes = _parse_pidstat_simple(out)
-            else:
-                snap["errors"].append(f"pidstat: {err or rc}")
+    elif sar:
+        snap["tools"]["sysstat"] = True
 
     if not processes:
         # Fallback: top-ish from /proc — lightweight scan of cmdline
@@ -490,22 +363,22 @@ def _saturation_badge(snap: Dict[str, Any]) -> Dict[str, Any]:
     return {"level": level, "reasons": reasons}
 
 
-async def collect_remote_via_bolt(host: str) -> Dict[str, Any]:
-    """
-    Collect a minimal remote snapshot via Bolt.
-    Uses a shell one-liner that only needs /proc (no sysstat required remotely).
-    """
-    script = (
-        "echo HOST:$(hostname -f); "
-        "echo LOAD:$(cat /proc/loadavg); "
-        "echo MEMTOTAL:$(awk '/MemTotal/{print $2}' /proc/meminfo); "
-        "echo MEMAVAIL:$(awk '/MemAvailable/{print $2}' /proc/meminfo); "
-        "echo SWAPTOTAL:$(awk '/SwapTotal/{print $2}' /proc/meminfo); "
-        "echo SWAPFREE:$(awk '/SwapFree/{print $2}' /proc/meminfo); "
-        "head -1 /proc/stat"
-    )
-    ts = time.time()
-    base: Dict[str, Any] = {
+# Shell one-liner that only needs /proc (no sysstat required remotely).
+_REMOTE_SCRIPT = (
+    "echo HOST:$(hostname -f); "
+    "echo LOAD:$(cat /proc/loadavg); "
+    "echo MEMTOTAL:$(awk '/MemTotal/{print $2}' /proc/meminfo); "
+    "echo MEMAVAIL:$(awk '/MemAvailable/{print $2}' /proc/meminfo); "
+    "echo SWAPTOTAL:$(awk '/SwapTotal/{print $2}' /proc/meminfo); "
+    "echo SWAPFREE:$(awk '/SwapFree/{print $2}' /proc/meminfo); "
+    "head -1 /proc/stat"
+)
+REMOTE_BOLT_CONCURRENCY = 16
+REMOTE_BOLT_TIMEOUT_SEC = 90
+
+
+def _remote_base(host: str, ts: float) -> Dict[str, Any]:
+    return {
         "host": host,
         "ts": ts,
         "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)),
@@ -514,68 +387,222 @@ async def collect_remote_via_bolt(host: str) -> Dict[str, Any]:
         "processes": [],
         "errors": [],
     }
+
+
+def _parse_remote_text(base: Dict[str, Any], text: str) -> bool:
+    """Fill ``base`` from the one-liner's output. True if load was found."""
+    load_m = re.search(r"LOAD:([0-9.]+)\s+([0-9.]+)\s+([0-9.]+)", text)
+    if load_m:
+        base["load1"] = float(load_m.group(1))
+        base["load5"] = float(load_m.group(2))
+        base["load15"] = float(load_m.group(3))
+    mt = re.search(r"MEMTOTAL:(\d+)", text)
+    ma = re.search(r"MEMAVAIL:(\d+)", text)
+    if mt and ma:
+        total = float(mt.group(1))
+        avail = float(ma.group(1))
+        used = max(total - avail, 0)
+        base["mem_total_mb"] = round(total / 1024.0, 1)
+        base["mem_available_mb"] = round(avail / 1024.0, 1)
+        base["mem_used_mb"] = round(used / 1024.0, 1)
+        base["mem_used_pct"] = round((used / total) * 100.0, 1) if total else 0.0
+    for line in text.splitlines():
+        if line.startswith("cpu "):
+            base.update(_parse_cpu_stat(line + "\n"))
+            break
+    return bool(load_m)
+
+
+def _item_target_key(item: Dict[str, Any]) -> str:
+    """Bolt result target name, normalised (``ssh://host:22`` → ``host``)."""
+    name = str(item.get("target") or item.get("node") or "").strip().lower()
+    if "://" in name:
+        name = name.split("://", 1)[1]
+    return name.split("@")[-1].split(":")[0]
+
+
+async def collect_remotes_via_bolt(hosts: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Collect minimal remote snapshots for many hosts with ONE Bolt run.
+
+    All targets go in a single ``bolt command run --targets a,b,c`` and Bolt
+    fans out with its own ``--concurrency``, so the Ruby/Bolt start-up cost
+    is paid once per collection instead of once per host. Per-target result
+    items are matched back to the requested host names.
+
+    With the pooled SSH transport enabled, hosts are read over their warm
+    connections first and only the ones SSH could not reach go to Bolt.
+    """
+    ts = time.time()
+    out = {h: _remote_base(h, ts) for h in hosts}
+    if not hosts:
+        return out
+    hosts = await _collect_remotes_via_ssh(out, hosts)
+    if not hosts:
+        return out
     try:
         from ..routers.bolt import run_bolt_command
+        from .bolt_orchestration import _iter_bolt_result_items
 
         args = [
             "command",
             "run",
-            script,
+            _REMOTE_SCRIPT,
             "--targets",
-            host,
+            ",".join(hosts),
+            "--concurrency",
+            str(min(REMOTE_BOLT_CONCURRENCY, len(hosts))),
             "--format",
             "json",
         ]
-        result = await run_bolt_command(args, timeout=60)
-        stdout = result.get("stdout") or ""
-        # bolt json or raw
-        text = stdout
-        try:
-            data = json.loads(stdout)
-            items = data.get("items") or data.get("result") or []
-            if isinstance(items, list) and items:
-                item = items[0]
-                # value/stdout keys vary by bolt version
-                text = (
-                    item.get("value", {}).get("stdout")
-                    if isinstance(item.get("value"), dict)
-                    else None
-                ) or item.get("stdout") or json.dumps(item)
-        except Exception:
-            pass
-
-        load_m = re.search(r"LOAD:([0-9.]+)\s+([0-9.]+)\s+([0-9.]+)", text)
-        if load_m:
-            base["load1"] = float(load_m.group(1))
-            base["load5"] = float(load_m.group(2))
-            base["load15"] = float(load_m.group(3))
-        mt = re.search(r"MEMTOTAL:(\d+)", text)
-        ma = re.search(r"MEMAVAIL:(\d+)", text)
-        if mt and ma:
-            total = float(mt.group(1))
-            avail = float(ma.group(1))
-            used = max(total - avail, 0)
-            base["mem_total_mb"] = round(total / 1024.0, 1)
-            base["mem_available_mb"] = round(avail / 1024.0, 1)
-            base["mem_used_mb"] = round(used / 1024.0, 1)
-            base["mem_used_pct"] = round((used / total) * 100.0, 1) if total else 0.0
-        cpu_line = None
-        for line in text.splitlines():
-            if line.startswith("cpu "):
-                cpu_line = line
-                break
-        if cpu_line:
-            base.update(_parse_cpu_stat(cpu_line + "\n"))
-        if result.get("returncode") not in (0, None) and not load_m:
-            base["errors"].append(result.get("stderr") or f"bolt rc={result.get('returncode')}")
+        result = await run_bolt_command(args, timeout=REMOTE_BOLT_TIMEOUT_SEC)
+        items = _iter_bolt_result_items(result.get("stdout") or "")
+
+        # Requested name, then short name, so "ovdb1" matches "ovdb1.example.com"
+        lookup: Dict[str, str] = {}
+        for h in hosts:
+            lookup.setdefault(h.lower(), h)
+            lookup.setdefault(h.lower().split(".")[0], h)
+        seen: Set[str] = set()
+        for item in items:
+            key = _item_target_key(item)
+            host = lookup.get(key) or lookup.get(key.split(".")[0])
+            if host is None or host in seen:
+                continue
+            seen.add(host)
+            base = out[host]
+            value = item.get("value") if isinstance(item.get("value"), dict) else {}
+            # value/stdout keys vary by bolt version
+            text = value.get("stdout") or item.get("stdout") or ""
+            found = _parse_remote_text(base, text)
+            if item.get("status") not in (None, "success") and not found:
+                err = (value.get("_error") or {}).get("msg") if isinstance(value.get("_error"), dict) else None
+                base["errors"].append(err or value.get("stderr") or f"bolt status={item.get('status')}")
+                base["source"] = "bolt_error"
+
+        for host in hosts:
+            if host in seen:
+                continue
+            base = out[host]
+            base["errors"].append(
+                (result.get("stderr") or "").strip()[:500]
+                or f"no Bolt result for target (rc={result.get('returncode')})"
+            )
             base["source"] = "bolt_error"
     except Exception as e:
-        logger.warning("Remote host metrics via Bolt failed for %s: %s", host, e)
-        base["errors"].append(str(e))
-        base["source"] = "bolt_error"
+        logger.warning("Remote host metrics via Bolt failed for %s: %s", ",".join(hosts), e)
+        for host in hosts:
+            out[host]["errors"].append(str(e))
+            out[host]["source"] = "bolt_error"
+
+    for base in out.values():
+        base["saturation"] = _saturation_badge(base)
+    return out
+
 
-    base["saturation"] = _saturation_badge(base)
-    return base
+async def _collect_remotes_via_ssh(out: Dict[str, Dict[str, Any]], hosts: List[str]) -> List[str]:
+    """Fill ``out`` over pooled SSH; returns the hosts still needing Bolt."""
+    from .ssh_pool import remote_shell, ssh_enabled
+
+    if not ssh_enabled():
+        return hosts
+    sem = asyncio.Semaphore(REMOTE_BOLT_CONCURRENCY)
+
+    async def _one(host: str) -> bool:
+        async with sem:
+            res = await remote_shell(host, _REMOTE_SCRIPT, timeout=REMOTE_BOLT_TIMEOUT_SEC)
+        if res is None or not _parse_remote_text(out[host], res.get("stdout") or ""):
+            return False
+        out[host]["source"] = "ssh"
+        out[host]["saturation"] = _saturation_badge(out[host])
+        return True
+
+    done = await asyncio.gather(*(_one(h) for h in hosts))
+    return [h for h, ok in zip(hosts, done) if not ok]
+
+
+async def collect_remote_via_bolt(host: str) -> Dict[str, Any]:
+    """Collect a minimal remote snapshot for one host (pooled SSH or Bolt)."""
+    return (await collect_remotes_via_bolt([host]))[host]
+
+
+# Point layout of the on-disk rings (see utils.ring_file). Append-only:
+# a changed list re-creates the files, keeping matching columns.
+HISTORY_FIELDS = (
+    "ts", "load1", "load5", "load15",
+    "cpu_used_pct", "cpu_user_pct", "cpu_system_pct", "cpu_iowait_pct",
+    "cpu_steal_pct", "cpu_idle_pct",
+    "mem_used_pct", "mem_used_mb", "mem_available_mb", "swap_used_mb",
+    "saturation",
+)
+_SATURATION_CODES = {"green": 0.0, "yellow": 1.0, "red": 2.0}
+_SATURATION_NAMES = {v: k for k, v in _SATURATION_CODES.items()}
+
+# primary host key → open ring file (aliases never get their own file)
+_ring_files: Dict[str, RingFile] = {}
+# host key → multi-resolution series; aliases share the primary's object
+_series: Dict[str, TieredSeries] = {}
+_SERIES_FIELDS = HISTORY_FIELDS[1:]
+_persisted_loaded = False
+# held by the one worker that collects and writes the ring files
+_leader = WorkerLock("host_metrics")
+# follower: primary host key → ts of the newest ring row already read
+_followed: Dict[str, float] = {}
+
+
+def _history_dir() -> Path:
+    return Path(settings.data_dir) / "host_metrics"
+
+
+def _point_row(point: Dict[str, Any]) -> Tuple[float, ...]:
+    sat = _SATURATION_CODES.get(point.get("saturation") or "")
+    return tuple(
+        (sat if sat is not None else math.nan) if f == "saturation" else nan_if_none(point.get(f))
+        for f in HISTORY_FIELDS
+    )
+
+
+def _row_point(row: Tuple[float, ...]) -> Dict[str, Any]:
+    point: Dict[str, Any] = {}
+    for f, v in zip(HISTORY_FIELDS, row):
+        if f == "saturation":
+            point[f] = None if math.isnan(v) else _SATURATION_NAMES.get(v)
+        else:
+            point[f] = None if math.isnan(v) else v
+    ts = point.get("ts")
+    point["time"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)) if ts else None
+    return point
+
+
+def _ring_path(host: str) -> Path:
+    return _history_dir() / f"{host.replace('/', '_')}.ring"
+
+
+def _is_writer() -> bool:
+    """True in the worker that owns the ring files (takes the lock if it is free)."""
+    return _leader.acquire()
+
+
+def _ring_file(host: str) -> RingFile:
+    rf = _ring_files.get(host)
+    if rf is None:
+        rf = RingFile(_ring_path(host), HISTORY_FIELDS, HISTORY_MAX)
+        rf.open()
+        _ring_files[host] = rf
+    return rf
+
+
+def _read_ring(host: str) -> List[Tuple[float, ...]]:
+    """Rows of a ring another worker writes, oldest first (read-only)."""
+    rows = RingFile(_ring_path(host), HISTORY_FIELDS, HISTORY_MAX).read()
+    return [r for r in rows[-HISTORY_MAX:] if not math.isnan(r[0])]
+
+
+def _series_for(host: str) -> TieredSeries:
+    series = _series.get(host)
+    if series is None:
+        series = _series[host] = TieredSeries(_SERIES_FIELDS, configured_tiers(HISTORY_MAX))
+    return series
 
 
 def _store(
@@ -585,8 +612,12 @@ def _store(
 ) -> None:
     """Append a sample to the in-memory ring (and optionally disk).
 
-    ``also_keys`` aliases the same point under extra hostnames (certname vs
+    ``also_keys`` aliases the host's ring under extra hostnames (certname vs
     short name vs bolt target) so Node Detail sparklines can resolve them.
+    Aliases share the primary ring object; the point is stored once.
+
+    Outside the writing worker nothing goes to disk, and persisted hosts'
+    rollups are left to ``_follow_rings`` so they follow the ring file.
     """
     host = (snap.get("host") or "unknown").lower()
     point = {
@@ -607,51 +638,162 @@ def _store(
         "swap_used_mb": snap.get("swap_used_mb"),
         "saturation": (snap.get("saturation") or {}).get("level"),
     }
-    keys = [host]
+    writer = persist and _is_writer()
+    ring = _history[host]
+    ring.append(point)
+    row = _point_row(point)
+    series = _series_for(host)
+    if point["ts"] and (writer or not persist):
+        series.add(point["ts"], row[1:])
+    _latest[host] = snap
     for k in also_keys or []:
         kl = str(k or "").strip().lower()
-        if kl and kl not in keys:
-            keys.append(kl)
-
-    for k in keys:
-        _history[k].append(dict(point))
-        _latest[k] = snap
-
-    # Persist ring buffer under primary host key only (best effort)
-    if not persist:
+        if not kl or kl == host:
+            continue
+        if _history.get(kl) is not ring:
+            _history[kl] = ring
+        _series[kl] = series
+        _latest[kl] = snap
+
+    # Persist under the primary host key only (best effort): one fixed-size
+    # record written into the mmap'd ring, not a rewrite of the history.
+    if not writer:
         return
     try:
-        path = Path(settings.data_dir) / "host_metrics"
-        path.mkdir(parents=True, exist_ok=True)
-        hist_file = path / f"{host.replace('/', '_')}.json"
-        hist_file.write_text(
-            json.dumps(list(_history[host]), indent=None),
-            encoding="utf-8",
-        )
+        _ring_file(host).append(row)
     except Exception as e:
         logger.debug("host metrics persist failed: %s", e)
 
 
 def _load_persisted() -> None:
+    """Map every persisted ring into memory (once per process).
+
+    Legacy ``<host>.json`` histories are converted to ring files on the way.
+    Saved rollups (``<host>.tiers``) are restored and the raw rows replayed
+    on top, which re-opens the current buckets. Workers that do not write
+    the rings only read them.
+    """
+    global _persisted_loaded
+    if _persisted_loaded:
+        return
+    _persisted_loaded = True
     try:
-        path = Path(settings.data_dir) / "host_metrics"
+        path = _history_dir()
         if not path.is_dir():
             return
-        for f in path.glob("*.json"):
+        writer = _is_writer()
+        for f in path.glob("*.json") if writer else ():
             try:
                 data = json.loads(f.read_text(encoding="utf-8"))
-                if isinstance(data, list):
-                    host = f.stem.replace("_", ".")
-                    # stem may be fqdn with dots kept
-                    host = f.stem
-                    d: Deque[Dict[str, Any]] = deque(data[-HISTORY_MAX:], maxlen=HISTORY_MAX)
-                    _history[host] = d
+                if isinstance(data, list) and not f.with_suffix(".ring").exists():
+                    rf = _ring_file(f.stem)
+                    for point in data[-HISTORY_MAX:]:
+                        if isinstance(point, dict):
+                            rf.append(_point_row(point))
+                f.unlink()
+            except Exception:
+                continue
+        for f in path.glob("*.ring"):
+            try:
+                host = f.stem
+                if writer:
+                    rf = _ring_files.get(host)
+                    rows = rf.rows() if rf is not None else _ring_file(host).rows()
+                else:
+                    rows = _read_ring(host)
+                if host not in _history or not _history[host]:
+                    _history[host] = deque((_row_point(r) for r in rows), maxlen=HISTORY_MAX)
+                series = _series_for(host)
+                series.load(f.with_suffix(".tiers"))
+                for r in rows:
+                    if not math.isnan(r[0]):
+                        series.add(r[0], r[1:])
+                        _followed[host] = r[0]
             except Exception:
                 continue
     except Exception as e:
         logger.debug("load persisted host metrics: %s", e)
 
 
+def _follow_rings() -> None:
+    """Follower: take the rows the writing worker appended since the last read.
+
+    The host's in-memory ring is replaced by the file's rows (dropping any
+    unpersisted request-time samples); only the new rows enter the rollups.
+    """
+    path = _history_dir()
+    if not path.is_dir():
+        return
+    for f in path.glob("*.ring"):
+        host = f.stem
+        try:
+            rows = _read_ring(host)
+        except Exception:
+            continue
+        last = _followed.get(host)
+        if not rows or rows[-1][0] == last:
+            continue
+        ring = _history[host]  # aliases share this deque: update it in place
+        ring.clear()
+        ring.extend(_row_point(r) for r in rows)
+        series = _series_for(host)
+        for r in rows:
+            if last is None or r[0] > last:
+                series.add(r[0], r[1:])
+        _followed[host] = rows[-1][0]
+
+
+def _save_series() -> None:
+    """Persist rollup tiers for every primary host (raw stays in the ring files)."""
+    seen: Set[int] = set()
+    for host, series in list(_series.items()):
+        if id(series) in seen:
+            continue
+        seen.add(id(series))
+        try:
+            series.save(_history_dir() / f"{host.replace('/', '_')}.tiers")
+        except Exception as e:
+            logger.debug("host metrics rollup save %s failed: %s", host, e)
+
+
+def get_series_history(
+    host: str,
+    window_sec: float = 3600,
+    stat: str = "avg",
+    bounds: bool = False,
+    now: Optional[float] = None,
+) -> Dict[str, Any]:
+    """One host's chart points for ``window_sec`` from the cheapest adequate tier.
+
+    Rollup points carry ``stat`` of each bucket; ``saturation`` reports the
+    worst level seen in the bucket.
+    """
+    now = time.time() if now is None else now
+    key = (host or "").strip().lower()
+    series = _series.get(key)
+    out: Dict[str, Any] = {"host": key, "window_sec": window_sec, "stat": stat}
+    if series is None:
+        out.update({"tier": 0, "step_sec": COLLECT_INTERVAL_SEC, "points": []})
+        return out
+    res = series.query(window_sec, now, stat=stat, bounds=True)
+    points: List[Dict[str, Any]] = []
+    for p in res["points"]:
+        code = p.get("saturation_max", p.get("saturation"))
+        p["saturation"] = _SATURATION_NAMES.get(round(code)) if code is not None else None
+        if not bounds:
+            p = {k: v for k, v in p.items() if not k.endswith(("_min", "_max"))}
+        p["time"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(p["ts"]))
+        points.append(p)
+    out.update({"tier": res["tier"], "step_sec": res["step"] or COLLECT_INTERVAL_SEC, "points": points})
+    return out
+
+
+def _close_ring_files() -> None:
+    for rf in _ring_files.values():
+        rf.close()
+    _ring_files.clear()
+
+
 async def collect_serving_estate(include_remote: bool = True) -> Dict[str, Any]:
     """Collect metrics for all serving-estate hosts. Local always; remote via Bolt optional."""
     targets = serving_estate_targets()
@@ -661,6 +803,11 @@ async def collect_serving_estate(include_remote: bool = True) -> Dict[str, Any]:
     local_snap = await collect_local_snapshot()
     _store(local_snap)
 
+    remote_snaps: Dict[str, Dict[str, Any]] = {}
+    if include_remote:
+        remote_hosts = [t["host"] for t in targets if not (t["is_local"] or t["host"] == local)]
+        remote_snaps = await collect_remotes_via_bolt(remote_hosts)
+
     for t in targets:
         host = t["host"]
         entry = {
@@ -675,7 +822,7 @@ async def collect_serving_estate(include_remote: bool = True) -> Dict[str, Any]:
             if local in _history:
                 entry["history"] = list(_history[local])
         elif include_remote:
-            snap = await collect_remote_via_bolt(host)
+            snap = remote_snaps[host]
             _store(snap)
             entry["latest"] = snap
             entry["history"] = list(_history.get(host, []))
@@ -735,19 +882,27 @@ async def get_host_health(refresh: bool = True, include_remote: bool = True) ->
 
 
 async def _collector_loop():
-    """Local every interval; full estate (Bolt remotes) every 4th tick."""
-    global _collector_stop
+    """Local every interval; full estate (Bolt remotes) every 4th tick.
+
+    Only the ``host_metrics`` lock holder collects; the other workers follow
+    its ring files and take over the lock when it exits.
+    """
     logger.info("Host metrics collector started (serving estate; agents excluded)")
     _load_persisted()
     tick = 0
     while not _collector_stop:
         try:
-            tick += 1
-            if tick % 4 == 0:
-                await collect_serving_estate(include_remote=True)
+            if _is_writer():
+                tick += 1
+                if tick % 4 == 0:
+                    await collect_serving_estate(include_remote=True)
+                else:
+                    snap = await collect_local_snapshot()
+                    _store(snap)
+                if tick % SERIES_PERSIST_EVERY == 0:
+                    await asyncio.to_thread(_save_series)
             else:
-                snap = await collect_local_snapshot()
-                _store(snap)
+                await asyncio.to_thread(_follow_rings)
         except Exception as e:
             logger.warning("Host metrics collect tick failed: %s", e)
         await asyncio.sleep(COLLECT_INTERVAL_SEC)
@@ -768,6 +923,10 @@ async def stop_host_metrics_collector():
         _collector_task.cancel()
         try:
             await _collector_task
-        except Exception:
+        except (asyncio.CancelledError, Exception):
             pass
         _collector_task = None
+    if _leader.held:
+        _save_series()
+    _close_ring_files()
+    _leader.release()
@@ -63,11 +63,9 @@ def _parse_bolt_stdout(bolt: Dict[str, Any]) -> str:
 
 
 async def bolt_cat_remote(host: str, paths: List[str], timeout: int = 45) -> Dict[str, Any]:
-    """Cat conf files on *host* as root via Bolt."""
+    """Cat conf files on *host* as root via pooled SSH when enabled, else Bolt."""
     from ..routers.bolt_runtime import find_bolt, run_bolt_command
-
-    if not find_bolt():
-        return {"host": host, "ok": False, "error": "bolt not installed on console"}
+    from .ssh_pool import remote_shell
 
     quoted = " ".join(f'"{p}"' for p in paths)
     # Prefer openvox-server sysconfig name if present
@@ -78,6 +76,20 @@ async def bolt_cat_remote(host: str, paths: List[str], timeout: int = 45) -> Dic
         f'  if [ -r "$f" ]; then cat "$f"; else echo "(missing or unreadable)"; fi; '
         f"done"
     )
+    ssh = await remote_shell(host, cmd, timeout=timeout)
+    if ssh is not None and "=====" in (ssh.get("stdout") or ""):
+        return {
+            "host": host,
+            "ok": True,
+            "stdout": ssh["stdout"],
+            "error": "",
+            "returncode": ssh.get("returncode"),
+            "transport": "ssh",
+        }
+
+    if not find_bolt():
+        return {"host": host, "ok": False, "error": "bolt not installed on console"}
+
     bolt = await run_bolt_command(
         [
             "command",
@@ -0,0 +1,619 @@
+"""
+Durable Bolt orchestration job queue (``/api/bolt/jobs``).
+
+``POST /api/bolt/run/*`` holds an HTTP request (and a heavy-concurrency slot)
+open for the whole run, so a browser refresh or proxy timeout loses the
+result and nothing stops twenty users from starting twenty ``puppet agent``
+fan-outs at once. Jobs are rows in ``orchestration_jobs`` instead:
+
+- submit stores the request, a ``queued`` ExecutionHistory row, and returns
+  the job ID (also the live output execution ID)
+- each console runs a small worker pool that claims queued jobs in priority
+  order with a conditional UPDATE, so consoles sharing PostgreSQL never run
+  the same job twice
+- limits: ``jobs_workers`` per console (host: shared by all uvicorn workers
+  of that host), ``jobs_global_limit`` across consoles, ``jobs_per_user`` running per submitter, and the ``scheduled``
+  lane never takes more than ``jobs_scheduled_slots`` workers. The claim
+  UPDATE re-counts running jobs in its WHERE clause, and on PostgreSQL claims
+  take a transaction advisory lock, so concurrent claims cannot overshoot
+- running jobs heartbeat; a job whose worker died (stale heartbeat, or a
+  process on this host that no longer exists) is marked failed (Bolt runs
+  are not idempotent, so it is never re-run automatically)
+- cancel: a queued job is dropped at once; a running one is flagged and the
+  console running it terminates the Bolt process
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.orm import aliased
+
+from ..config import settings
+from ..models.execution_history import ExecutionHistory, _utc_naive
+from ..models.orchestration_job import OrchestrationJob
+from . import bolt_orchestration as bolt_orch
+from .bolt_stream import BoltExecutionStream, bolt_streams
+
+logger = logging.getLogger(__name__)
+
+LANES = {"interactive": 0, "scheduled": 10}  # priority; lower runs first
+KINDS = ("command", "task", "plan")
+ACTIVE = ("queued", "running")
+FINAL = ("succeeded", "failed", "cancelled")
+HEARTBEAT_SEC = 10.0
+RESULT_OUTPUT_MAX = 256 * 1024  # stored output per job; the history row keeps a preview
+_CLAIM_LOCK_KEY = 0x6F76_6A6F62  # pg_advisory_xact_lock key for claims ("ovjob")
+
+Runner = Callable[[Any, OrchestrationJob, BoltExecutionStream, Optional[ExecutionHistory]], Awaitable[Any]]
+
+
+def _local_pid(worker: Optional[str], host_prefix: str) -> Optional[int]:
+    """PID of a ``host:pid`` worker ID on this host (None for other hosts)."""
+    if not worker or not worker.startswith(host_prefix):
+        return None
+    try:
+        return int(worker[len(host_prefix):])
+    except ValueError:
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by someone else
+    return True
+
+
+def job_to_dict(job: OrchestrationJob, *, include_result: bool = True) -> Dict[str, Any]:
+    def iso(dt):
+        return dt.isoformat() + "Z" if dt else None
+
+    out = {
+        "job_id": job.id,
+        "kind": job.kind,
+        "lane": job.lane,
+        "priority": job.priority,
+        "status": job.status,
+        "submitted_by": job.submitted_by,
+        "history_id": job.history_id,
+        "created_at": iso(job.created_at),
+        "started_at": iso(job.started_at),
+        "finished_at": iso(job.finished_at),
+        "worker": job.worker,
+        "cancel_requested": bool(job.cancel_requested),
+        "returncode": job.returncode,
+        "error": job.error,
+        "payload": job.payload,
+    }
+    if include_result:
+        out["result"] = job.result
+    return out
+
+
+def _history_fields(kind: str, payload: Dict[str, Any], user: str) -> Dict[str, Any]:
+    fmt = payload.get("format") or "human"
+    if kind == "command":
+        return dict(
+            execution_type="command",
+            node_name=payload.get("targets") or "",
+            command_name=payload.get("command"),
+            result_format=fmt,
+            executed_by=user,
+            parameters={"run_as": payload["run_as"]} if payload.get("run_as") else None,
+        )
+    if kind == "task":
+        params = payload.get("params") or {}
+        run_as = payload.get("run_as")
+        return dict(
+            execution_type="task",
+            node_name=payload.get("targets") or "",
+            task_name=payload.get("task"),
+            result_format=fmt,
+            executed_by=user,
+            parameters={"params": params, "run_as": run_as} if params or run_as else None,
+        )
+    return dict(
+        execution_type="plan",
+        node_name="all",
+        plan_name=payload.get("plan"),
+        result_format=fmt,
+        executed_by=user,
+        parameters=payload.get("params") or None,
+    )
+
+
+async def run_job(db, job: OrchestrationJob, stream: BoltExecutionStream, history_entry) -> Any:
+    """Default runner: the same code path as ``POST /api/bolt/run/*``."""
+    from ..routers import bolt_execution as bx
+
+    payload = {k: v for k, v in (job.payload or {}).items() if k != "execution_id"}
+    if job.kind == "command":
+        req = bx.RunCommandRequest(**payload)
+        return await bx.execute_command(db, req, job.submitted_by, stream, history_entry)
+    if job.kind == "task":
+        return await bx.execute_task(db, bx.RunTaskRequest(**payload), job.submitted_by, stream, history_entry)
+    return await bx.execute_plan(db, bx.RunPlanRequest(**payload), job.submitted_by, stream, history_entry)
+
+
+class JobQueue:
+    """Worker pool for this console; state lives in the database."""
+
+    def __init__(
+        self,
+        session_factory=None,
+        *,
+        workers: Optional[int] = None,
+        global_limit: Optional[int] = None,
+        per_user: Optional[int] = None,
+        scheduled_slots: Optional[int] = None,
+        poll_sec: Optional[float] = None,
+        stale_sec: Optional[int] = None,
+        runner: Optional[Runner] = None,
+    ):
+        self._session_factory = session_factory
+        self.workers = max(1, int(workers if workers is not None else settings.jobs_workers))
+        self.global_limit = int(global_limit if global_limit is not None else settings.jobs_global_limit)
+        self.per_user = int(per_user if per_user is not None else settings.jobs_per_user)
+        self.scheduled_slots = int(
+            scheduled_slots if scheduled_slots is not None else settings.jobs_scheduled_slots
+        )
+        self.poll_sec = float(poll_sec if poll_sec is not None else settings.jobs_poll_sec)
+        self.stale_sec = int(stale_sec if stale_sec is not None else settings.jobs_stale_sec)
+        self.runner: Runner = runner or run_job
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.host_prefix = self.worker_id.rsplit(":", 1)[0] + ":"
+        self._running: Dict[str, asyncio.Task] = {}
+        self._lanes: Dict[str, str] = {}
+        self._streams: Dict[str, BoltExecutionStream] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = False
+        self._last_heartbeat = 0.0
+
+    def _session(self):
+        if self._session_factory is None:
+            from ..database import async_session
+
+            self._session_factory = async_session
+        return self._session_factory()
+
+    def wake(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    # ─── Submit / cancel / read ─────────────────────────────
+
+    async def submit(
+        self, kind: str, payload: Dict[str, Any], submitted_by: str, lane: str = "interactive"
+    ) -> OrchestrationJob:
+        """Store a job and its queued history row; raises ValueError for a bad kind/lane."""
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+        if lane not in LANES:
+            raise ValueError(f"lane must be one of {', '.join(LANES)}")
+        async with self._session() as db:
+            history = await bolt_orch.start_execution_history(
+                db, status="queued", **_history_fields(kind, payload, submitted_by)
+            )
+            job = OrchestrationJob(
+                id=uuid.uuid4().hex,
+                kind=kind,
+                lane=lane,
+                priority=LANES[lane],
+                status="queued",
+                submitted_by=submitted_by,
+                payload=payload,
+                history_id=getattr(history, "id", None),
+                created_at=_utc_naive(),
+                cancel_requested=False,
+            )
+            db.add(job)
+            await db.commit()
+        self.wake()
+        return job
+
+    async def get(self, job_id: str) -> Optional[OrchestrationJob]:
+        async with self._session() as db:
+            return await db.get(OrchestrationJob, job_id)
+
+    async def list_jobs(
+        self, submitted_by: Optional[str] = None, status: Optional[str] = None, limit: int = 50
+    ) -> List[OrchestrationJob]:
+        q = select(OrchestrationJob)
+        if submitted_by:
+            q = q.where(OrchestrationJob.submitted_by == submitted_by)
+        if status:
+            q = q.where(OrchestrationJob.status == status)
+        q = q.order_by(OrchestrationJob.created_at.desc()).limit(max(1, min(limit, 500)))
+        async with self._session() as db:
+            return list((await db.execute(q)).scalars().all())
+
+    async def position(self, job: OrchestrationJob) -> Optional[int]:
+        """1-based place in the queue (jobs that would be claimed first), None unless queued."""
+        if job.status != "queued":
+            return None
+        async with self._session() as db:
+            ahead = await db.scalar(
+                select(func.count())
+                .select_from(OrchestrationJob)
+                .where(OrchestrationJob.status == "queued")
+                .where(
+                    (OrchestrationJob.priority < job.priority)
+                    | (
+                        (OrchestrationJob.priority == job.priority)
+                        & (OrchestrationJob.created_at < job.created_at)
+                    )
+                )
+            )
+        return int(ahead or 0) + 1
+
+    async def cancel(self, job_id: str, by: str) -> Optional[OrchestrationJob]:
+        """Queued → cancelled now; running → flagged and stopped by its console."""
+        now = _utc_naive()
+        async with self._session() as db:
+            res = await db.execute(
+                update(OrchestrationJob)
+                .where(OrchestrationJob.id == job_id, OrchestrationJob.status == "queued")
+                .values(
+                    status="cancelled",
+                    cancel_requested=True,
+                    finished_at=now,
+                    error=f"Cancelled by {by} before it started",
+                )
+            )
+            if res.rowcount != 1:
+                await db.execute(
+                    update(OrchestrationJob)
+                    .where(OrchestrationJob.id == job_id, OrchestrationJob.status == "running")
+                    .values(cancel_requested=True)
+                )
+            await db.commit()
+            job = await db.get(OrchestrationJob, job_id)
+            if job is not None and res.rowcount == 1:
+                await self._close_history(db, job.history_id, "cancelled", job.error)
+        if job is not None and job.status == "running":
+            self._cancel_local(job_id, f"Cancelled by {by}")
+        return job
+
+    def _cancel_local(self, job_id: str, reason: str) -> None:
+        task = self._running.get(job_id)
+        if task is None or task.done():
+            return
+        stream = self._streams.get(job_id)
+        if stream is not None and not stream.finished:
+            stream.finish({"returncode": -1, "output": "", "error": reason, "cancelled": True})
+        task.cancel()
+
+    # ─── Claiming ───────────────────────────────────────────
+
+    async def claim_next(self) -> Optional[OrchestrationJob]:
+        """Claim the best eligible queued job for this console (None if none/full)."""
+        if len(self._running) >= self.workers:
+            return None
+        async with self._session() as db:
+            rows = (
+                await db.execute(
+                    select(OrchestrationJob.submitted_by, OrchestrationJob.worker, OrchestrationJob.lane)
+                    .where(OrchestrationJob.status == "running")
+                )
+            ).all()
+            running_by_user: Dict[str, int] = {}
+            for user, _, _ in rows:
+                running_by_user[user] = running_by_user.get(user, 0) + 1
+            if self.global_limit > 0 and len(rows) >= self.global_limit:
+                return None
+            # Per-console limits count every uvicorn worker of this host
+            here = [lane for _, worker, lane in rows if (worker or "").startswith(self.host_prefix)]
+            if len(here) >= self.workers:
+                return None
+            scheduled_local = sum(1 for lane in here if lane == "scheduled")
+            q = select(OrchestrationJob).where(
+                OrchestrationJob.status == "queued", OrchestrationJob.cancel_requested.is_(False)
+            )
+            if scheduled_local >= self.scheduled_slots:
+                q = q.where(OrchestrationJob.lane != "scheduled")
+            q = q.order_by(OrchestrationJob.priority, OrchestrationJob.created_at).limit(50)
+            candidates = list((await db.execute(q)).scalars().all())
+            now = _utc_naive()
+            for job in candidates:
+                if self.per_user > 0 and running_by_user.get(job.submitted_by, 0) >= self.per_user:
+                    continue
+                await self._lock_claims(db)
+                res = await db.execute(
+                    update(OrchestrationJob)
+                    .where(OrchestrationJob.id == job.id, OrchestrationJob.status == "queued")
+                    .where(*self._limits(job))
+                    .values(status="running", worker=self.worker_id, started_at=now, heartbeat_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                if res.rowcount == 1:
+                    await db.refresh(job)
+                    return job
+        return None
+
+    def _limits(self, job: OrchestrationJob) -> List[Any]:
+        """Claim conditions re-counting running jobs at UPDATE time.
+
+        The counts read before the claim are stale by the time it runs:
+        sibling workers and other consoles claim in between.
+        """
+        running = aliased(OrchestrationJob)
+
+        def count(*where):
+            return (
+                select(func.count())
+                .select_from(running)
+                .where(running.status == "running", *where)
+                .scalar_subquery()
+            )
+
+        here = running.worker.startswith(self.host_prefix, autoescape=True)
+        limits = [count(here) < self.workers]
+        if job.lane == "scheduled":
+            limits.append(count(here, running.lane == "scheduled") < self.scheduled_slots)
+        if self.global_limit > 0:
+            limits.append(count() < self.global_limit)
+        if self.per_user > 0:
+            limits.append(count(running.submitted_by == job.submitted_by) < self.per_user)
+        return limits
+
+    async def _lock_claims(self, db) -> None:
+        """PostgreSQL: one claim at a time across consoles, until the commit.
+
+        Under READ COMMITTED two claims would each count the other's job as
+        still queued; SQLite already runs one writer at a time.
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _CLAIM_LOCK_KEY})
+
+    def _spawn(self, job: OrchestrationJob) -> None:
+        self._lanes[job.id] = job.lane
+        task = asyncio.create_task(self._execute(job))
+        self._running[job.id] = task
+
+        def _done(_t: asyncio.Task, job_id: str = job.id) -> None:
+            self._running.pop(job_id, None)
+            self._lanes.pop(job_id, None)
+            self._streams.pop(job_id, None)
+            self.wake()
+
+        task.add_done_callback(_done)
+
+    async def _execute(self, job: OrchestrationJob) -> None:
+        try:
+            stream = bolt_streams.create(job.submitted_by, job.kind, job.id)
+        except ValueError:
+            stream = BoltExecutionStream(job.id, job.submitted_by, job.kind)
+        self._streams[job.id] = stream
+        status, error, result, rc = "failed", None, None, None
+        try:
+            async with self._session() as db:
+                history = await db.get(ExecutionHistory, job.history_id) if job.history_id else None
+                model = await self.runner(db, job, stream, history)
+                result = model.model_dump() if hasattr(model, "model_dump") else dict(model or {})
+                rc = result.get("returncode")
+                ok = rc == 0 or (history is not None and history.status == "success")
+                status = "succeeded" if ok else "failed"
+                error = result.get("error") or None
+        except asyncio.CancelledError:
+            cancelled = await self._cancel_requested(job.id)
+            status = "cancelled" if cancelled else "failed"
+            error = "Cancelled while running" if cancelled else "Console shut down while the job was running"
+            await self._finalize(job, status, error, None, None)
+            raise
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            logger.error("Orchestration job %s failed: %s", job.id, detail, exc_info=True)
+            error = f"Run failed: {detail}"
+            if not stream.finished:
+                stream.finish({"returncode": -1, "output": "", "error": error})
+        await self._finalize(job, status, error, result, rc)
+
+    async def _cancel_requested(self, job_id: str) -> bool:
+        try:
+            async with self._session() as db:
+                return bool(
+                    await db.scalar(
+                        select(OrchestrationJob.cancel_requested).where(OrchestrationJob.id == job_id)
+                    )
+                )
+        except Exception:
+            return False
+
+    async def _finalize(
+        self,
+        job: OrchestrationJob,
+        status: str,
+        error: Optional[str],
+        result: Optional[Dict[str, Any]],
+        rc: Optional[int],
+    ) -> None:
+        if result and isinstance(result.get("output"), str) and len(result["output"]) > RESULT_OUTPUT_MAX:
+            result = {**result, "output": result["output"][-RESULT_OUTPUT_MAX:], "truncated": True}
+        try:
+            async with self._session() as db:
+                await db.execute(
+                    update(OrchestrationJob)
+                    .where(OrchestrationJob.id == job.id)
+                    .values(
+                        status=status,
+                        finished_at=_utc_naive(),
+                        returncode=rc,
+                        result=result,
+                        error=(error or "")[:4000] or None,
+                    )
+                )
+                await db.commit()
+                if status == "cancelled" or result is None:
+                    await self._close_history(db, job.history_id, status, error)
+        except Exception as e:
+            logger.warning("Could not record job %s outcome: %s", job.id, e)
+
+    @staticmethod
+    async def _close_history(db, history_id: Optional[int], status: str, error: Optional[str]) -> None:
+        """History row for a job that never reached finish_execution_history."""
+        if history_id is None:
+            return
+        await db.execute(
+            update(ExecutionHistory)
+            .where(ExecutionHistory.id == history_id, ExecutionHistory.status.in_(ACTIVE))
+            .values(
+                status="cancelled" if status == "cancelled" else "failure",
+                finished_at=_utc_naive(),
+                error_message=error,
+            )
+        )
+        await db.commit()
+
+    # ─── Liveness ───────────────────────────────────────────
+
+    async def heartbeat(self) -> None:
+        """Refresh our running jobs, honour remote cancels, fail jobs of dead consoles."""
+        now = _utc_naive()
+        async with self._session() as db:
+            ids = list(self._running)
+            if ids:
+                await db.execute(
+                    update(OrchestrationJob)
+                    .where(OrchestrationJob.id.in_(ids), OrchestrationJob.status == "running")
+                    .values(heartbeat_at=now)
+                )
+                flagged = (
+                    await db.execute(
+                        select(OrchestrationJob.id).where(
+                            OrchestrationJob.id.in_(ids), OrchestrationJob.cancel_requested.is_(True)
+                        )
+                    )
+                ).scalars().all()
+                for job_id in flagged:
+                    self._cancel_local(job_id, "Cancelled")
+            await db.commit()
+        await self.fail_stale()
+
+    async def fail_stale(self) -> int:
+        """Mark running jobs with no live worker failed; returns how many.
+
+        A job is lost after ``stale_sec`` without a heartbeat, or at once when
+        its worker was a process on this host that no longer exists (a
+        restart). Sibling uvicorn workers of this host are alive and skipped.
+        """
+        cutoff = _utc_naive() - timedelta(seconds=self.stale_sec)
+        n = 0
+        async with self._session() as db:
+            running = (
+                await db.execute(select(OrchestrationJob).where(OrchestrationJob.status == "running"))
+            ).scalars().all()
+            for job in running:
+                if job.id in self._running or job.worker == self.worker_id:
+                    continue
+                pid = _local_pid(job.worker, self.host_prefix)
+                dead = pid is not None and not _pid_alive(pid)
+                if not dead and job.heartbeat_at is not None and job.heartbeat_at >= cutoff:
+                    continue
+                error = f"Worker {job.worker or '?'} stopped before the job finished; not re-run"
+                res = await db.execute(
+                    update(OrchestrationJob)
+                    .where(OrchestrationJob.id == job.id, OrchestrationJob.status == "running")
+                    .values(status="failed", finished_at=_utc_naive(), error=error)
+                )
+                await db.commit()
+                if res.rowcount == 1:
+                    n += 1
+                    await self._close_history(db, job.history_id, "failed", error)
+        if n:
+            logger.warning("Marked %d orchestration job(s) failed (worker lost)", n)
+        return n
+
+    # ─── Loop ───────────────────────────────────────────────
+
+    async def tick(self) -> int:
+        """Claim and start as many jobs as the limits allow; returns how many."""
+        started = 0
+        while True:
+            job = await self.claim_next()
+            if job is None:
+                break
+            self._spawn(job)
+            started += 1
+        if time.monotonic() - self._last_heartbeat >= HEARTBEAT_SEC:
+            self._last_heartbeat = time.monotonic()
+            await self.heartbeat()
+        return started
+
+    async def _loop(self) -> None:
+        logger.info(
+            "Orchestration job queue started (%d workers, %s per user)",
+            self.workers,
+            self.per_user or "unlimited",
+        )
+        try:
+            await self.fail_stale()
+        except Exception as e:
+            logger.warning("Job queue recovery failed: %s", e)
+        while not self._stop:
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.warning("Job queue cycle failed: %s", e)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_sec)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def running(self) -> bool:
+        return bool(self._task and not self._task.done())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker": self.worker_id,
+            "workers": self.workers,
+            "running": len(self._running),
+            "running_scheduled": sum(1 for lane in self._lanes.values() if lane == "scheduled"),
+        }
+
+    async def start(self) -> None:
+        self._stop = False
+        if self.running():
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        self._stop = True
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        tasks = list(self._running.values())
+        for t in tasks:
+            t.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Singleton
+job_queue = JobQueue()
+
+
+async def start_job_queue() -> None:
+    await job_queue.start()
+
+
+async def stop_job_queue() -> None:
+    await job_queue.stop()
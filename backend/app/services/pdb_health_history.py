@@ -0,0 +1,208 @@
+"""
+OpenVoxDB (PuppetDB) JVM and command-queue history for the OpenVoxDB Health page.
+
+A background collector samples a fixed set of mbeans on every PuppetDB node
+(cluster config ``puppetdb_nodes``, else the configured host) in one Jolokia
+bulk read per node, and keeps a multi-resolution series per node:
+
+    raw 10s samples  × 360   (~1 h)
+    1 min / 10 min / 1 h rollups, horizons from settings
+    (``metrics_rollup_*``; default 24 h / 7 d / 90 d)
+
+Monotonic counters (processed / retried) are turned into per-second rates
+at sample time, so "queue depth vs. processing rate" is directly chartable
+and survives rollup. Storage, fleet roll-up and persistence are
+``HostSeriesStore`` (shared with the Puppet Server health history); series
+are saved under ``settings.data_dir/pdb_health`` every few ticks and on
+shutdown, so long windows survive a restart. One uvicorn worker per host
+collects and saves; the others follow its published points.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.host_series import HostSeriesStore
+
+logger = logging.getLogger(__name__)
+
+COLLECT_INTERVAL_SEC = 10
+POLL_CONCURRENCY = 4
+POLL_TIMEOUT_SEC = 15.0
+RAW_MAX = 360  # ~1h of raw samples
+PERSIST_EVERY = 6  # ticks between saves (~1 min)
+
+_MQ = "puppetlabs.puppetdb.mq:name=global."
+MBEANS = {
+    "depth": _MQ + "depth",
+    "processed": _MQ + "processed",
+    "retried": _MQ + "retried",
+    "discarded": _MQ + "discarded",
+    "processing_time": _MQ + "processing-time",
+    "queue_time": _MQ + "queue-time",
+    "dlo_messages": "puppetlabs.puppetdb.dlo:name=global.messages",
+    "dlo_filesize": "puppetlabs.puppetdb.dlo:name=global.filesize",
+    "store_report": "puppetlabs.puppetdb.storage:name=store-report-time",
+    "replace_catalog": "puppetlabs.puppetdb.storage:name=replace-catalog-time",
+    "replace_facts": "puppetlabs.puppetdb.storage:name=replace-facts-time",
+    "write_pending": "puppetlabs.puppetdb.database:name=PDBWritePool.pool.PendingConnections",
+    "memory": "java.lang:type=Memory",
+}
+
+# Series fields and how the fleet view combines nodes for one timestamp.
+FIELDS: Dict[str, str] = {
+    "queue_depth": "sum",
+    "processed_rate": "sum",
+    "retried_rate": "sum",
+    "discarded": "sum",
+    "processing_ms": "mean",
+    "queue_time_ms": "mean",
+    "dlo_messages": "sum",
+    "dlo_mb": "sum",
+    "store_report_ms": "mean",
+    "replace_catalog_ms": "mean",
+    "replace_facts_ms": "mean",
+    "write_pool_pending": "sum",
+    "heap_used_mb": "mean",
+    "heap_pct": "max",
+}
+
+_collector_task: Optional[asyncio.Task] = None
+_collector_stop = False
+
+
+def _attr(value: Any, *keys: str) -> Optional[float]:
+    """First numeric attribute of a Jolokia value (meters/timers/gauges differ)."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, dict):
+        for k in keys:
+            v = value.get(k)
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                return float(v)
+    return None
+
+
+def _rate(cur: Optional[float], prev: Optional[float], dt: float) -> Optional[float]:
+    if cur is None or prev is None or dt <= 0 or cur < prev:
+        return None  # first sample or counter reset (PuppetDB restart)
+    return round((cur - prev) / dt, 3)
+
+
+class PDBHealthHistory(HostSeriesStore):
+    """Per-node queue/JVM series plus the counter state behind the rates."""
+
+    def __init__(self, data_dir: Optional[str] = None):
+        super().__init__(FIELDS, "pdb_health", raw_max=RAW_MAX,
+                         interval_sec=COLLECT_INTERVAL_SEC, data_dir=data_dir)
+        # host → (ts, processed count, retried count) for rate calculation
+        self._counters: Dict[str, Tuple[float, Optional[float], Optional[float]]] = {}
+
+    def sample_from_metrics(self, host: str, values: Dict[str, Any], ts: float) -> Dict[str, Any]:
+        """Map one bulk mbean read onto series fields (updates rate state)."""
+        v = {key: values.get(mbean) for key, mbean in MBEANS.items()}
+        processed = _attr(v["processed"], "Count")
+        retried = _attr(v["retried"], "Count")
+        prev = self._counters.get(host)
+        self._counters[host] = (ts, processed, retried)
+        dt = ts - prev[0] if prev else 0.0
+
+        point: Dict[str, Any] = {
+            "queue_depth": _attr(v["depth"], "Count", "Value"),
+            "processed_rate": _rate(processed, prev[1], dt) if prev else None,
+            "retried_rate": _rate(retried, prev[2], dt) if prev else None,
+            "discarded": _attr(v["discarded"], "Count"),
+            "processing_ms": _attr(v["processing_time"], "Mean"),
+            "queue_time_ms": _attr(v["queue_time"], "Mean"),
+            "dlo_messages": _attr(v["dlo_messages"], "Count", "Value"),
+            "store_report_ms": _attr(v["store_report"], "Mean"),
+            "replace_catalog_ms": _attr(v["replace_catalog"], "Mean"),
+            "replace_facts_ms": _attr(v["replace_facts"], "Mean"),
+            "write_pool_pending": _attr(v["write_pending"], "Value"),
+        }
+        # No processed counter delta yet: the meter's own 1-minute rate is close enough
+        if point["processed_rate"] is None:
+            point["processed_rate"] = _attr(v["processed"], "OneMinuteRate")
+        dlo = _attr(v["dlo_filesize"], "Value")
+        point["dlo_mb"] = round(dlo / 1048576, 2) if dlo is not None else None
+        heap = (v["memory"] or {}).get("HeapMemoryUsage") if isinstance(v["memory"], dict) else None
+        if isinstance(heap, dict) and heap.get("max"):
+            point["heap_used_mb"] = round(heap.get("used", 0) / 1048576, 1)
+            point["heap_pct"] = round(heap.get("used", 0) / max(heap["max"], 1) * 100, 1)
+        return point
+
+    def retain(self, hosts: List[str], unlink: bool = True) -> List[str]:
+        gone = super().retain(hosts, unlink)
+        for host in gone:
+            self._counters.pop(host, None)
+        return gone
+
+    async def collect_once(self, hosts: Optional[List[str]] = None) -> None:
+        """Sample every PuppetDB node once (bounded parallelism, shared ``ts``)."""
+        from .puppetdb import puppetdb_service
+
+        hosts = hosts if hosts is not None else puppetdb_service.health_hosts()
+        self.retain(hosts)
+        mbeans = list(MBEANS.values())
+
+        async def _sample(host: str, ts: float) -> Dict[str, Any]:
+            values = await puppetdb_service.read_pdb_metrics(mbeans, host=host)
+            if not values:
+                raise RuntimeError("no metrics returned (check metrics/v2 access for this host)")
+            return self.sample_from_metrics(host, values, ts)
+
+        await self.poll(hosts, _sample, concurrency=POLL_CONCURRENCY, timeout=POLL_TIMEOUT_SEC)
+
+    def get_history(self, window_sec: float = 3600, host: Optional[str] = None,
+                    now: Optional[float] = None) -> Dict[str, Any]:
+        """Per-node series (and a fleet roll-up) for the chosen window."""
+        return self.history(window_sec, hosts=[host] if host else None, now=now)
+
+
+# Singleton
+pdb_health_history = PDBHealthHistory()
+
+
+async def _collector_loop():
+    logger.info("OpenVoxDB health collector started (command queue / JVM history)")
+    pdb_health_history.load()
+    tick = 0
+    try:
+        while not _collector_stop:
+            try:
+                if pdb_health_history.lead():
+                    await pdb_health_history.collect_once()
+                    await asyncio.to_thread(pdb_health_history.publish)
+                    tick += 1
+                    if tick % PERSIST_EVERY == 0:
+                        await asyncio.to_thread(pdb_health_history.save)
+                else:
+                    await asyncio.to_thread(pdb_health_history.follow)
+            except Exception as e:
+                logger.warning("OpenVoxDB health collect tick failed: %s", e)
+            await asyncio.sleep(COLLECT_INTERVAL_SEC)
+    finally:
+        if pdb_health_history.leader:
+            pdb_health_history.save()
+        pdb_health_history.release()
+
+
+async def start_pdb_health_collector():
+    global _collector_task, _collector_stop
+    _collector_stop = False
+    if _collector_task and not _collector_task.done():
+        return
+    _collector_task = asyncio.create_task(_collector_loop())
+
+
+async def stop_pdb_health_collector():
+    global _collector_stop, _collector_task
+    _collector_stop = True
+    if _collector_task:
+        _collector_task.cancel()
+        try:
+            await _collector_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        _collector_task = None
@@ -0,0 +1,207 @@
+"""
+In-process /proc delta sampler for Host Health (GUI host).
+
+``/proc/stat``, ``/proc/diskstats`` and ``/proc/<pid>/stat`` are cumulative
+counters; a single read only gives since-boot ratios. The sampler keeps the
+previous reading and reports true interval values between two calls:
+
+- CPU user / system / iowait / steal / idle %
+- per-device disk busy % (io_ticks) and read / write KiB/s
+- per-process CPU % and RSS for the OpenVox JVMs (puppetserver, puppetdb),
+  PostgreSQL and the other estate processes matching the caller's pattern
+
+No subprocesses. Process identity (comm / cmdline → role) is cached by
+``(pid, starttime)`` so cmdlines are read once per process lifetime.
+"""
+from __future__ import annotations
+
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_DISK_RE = re.compile(r"^(sd[a-z]+|vd[a-z]+|nvme\d+n\d+|dm-\d+|xvd[a-z]+)$")
+
+try:
+    _CLK_TCK = os.sysconf("SC_CLK_TCK")
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):  # non-Linux dev boxes
+    _CLK_TCK, _PAGE_SIZE = 100, 4096
+
+
+def _read(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as fh:
+            return fh.read()
+    except OSError:
+        return ""
+
+
+def _cpu_counters(text: str) -> Optional[Tuple[float, ...]]:
+    for line in text.splitlines():
+        if line.startswith("cpu "):
+            try:
+                nums = [float(x) for x in line.split()[1:]]
+            except ValueError:
+                return None
+            # user nice system idle iowait irq softirq steal (guest is inside user)
+            return tuple((nums + [0.0] * 8)[:8]) if len(nums) >= 4 else None
+    return None
+
+
+def _cpu_pcts(cur: Tuple[float, ...], prev: Optional[Tuple[float, ...]]) -> Dict[str, float]:
+    d = [c - p for c, p in zip(cur, prev)] if prev else list(cur)
+    if any(x < 0 for x in d):  # counter wrap / hotplug: use this reading alone
+        d = list(cur)
+    total = sum(d) or 1.0
+    user, nice, system, idle, iowait, irq, softirq, steal = d
+    return {
+        "cpu_user_pct": round(100.0 * (user + nice) / total, 1),
+        "cpu_system_pct": round(100.0 * (system + irq + softirq) / total, 1),
+        "cpu_idle_pct": round(100.0 * idle / total, 1),
+        "cpu_iowait_pct": round(100.0 * iowait / total, 1),
+        "cpu_steal_pct": round(100.0 * steal / total, 1),
+        "cpu_used_pct": round(100.0 * (1.0 - idle / total), 1),
+    }
+
+
+def _disk_counters(text: str) -> Dict[str, Tuple[int, int, int]]:
+    """device → (sectors read, sectors written, io_ticks ms)."""
+    out: Dict[str, Tuple[int, int, int]] = {}
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) < 14 or not _DISK_RE.match(parts[2]):
+            continue
+        try:
+            out[parts[2]] = (int(parts[5]), int(parts[9]), int(parts[12]))
+        except ValueError:
+            continue
+    return out
+
+
+def _pid_stat(text: str) -> Optional[Tuple[int, int, int]]:
+    """(utime+stime ticks, starttime, rss pages) from /proc/<pid>/stat."""
+    # comm may contain spaces/parens: fields resume after the last ')'
+    rp = text.rfind(")")
+    if rp < 0:
+        return None
+    rest = text[rp + 2:].split()
+    try:
+        # rest[0] is field 3 (state); utime=14, stime=15, starttime=22, rss=24
+        return int(rest[11]) + int(rest[12]), int(rest[19]), int(rest[21])
+    except (IndexError, ValueError):
+        return None
+
+
+def _role(comm: str, cmdline: str) -> str:
+    text = f"{comm} {cmdline}".lower()
+    if "puppetserver" in text or "puppet-server" in text:
+        return "puppetserver"
+    if "puppetdb" in text:
+        return "puppetdb"
+    if comm.startswith(("postgres", "postmaster")):
+        return "postgres"
+    return "other"
+
+
+class ProcDeltaSampler:
+    """Keeps the previous /proc counters; each ``sample()`` reports the interval."""
+
+    def __init__(self, process_pattern: str, proc_root: str = "/proc", max_processes: int = 15):
+        self._pattern = re.compile(process_pattern, re.I)
+        self.proc_root = proc_root
+        self.max_processes = max_processes
+        self._ts: Optional[float] = None
+        self._cpu: Optional[Tuple[float, ...]] = None
+        self._disk: Dict[str, Tuple[int, int, int]] = {}
+        # pid → (starttime, ticks)
+        self._pids: Dict[int, Tuple[int, int]] = {}
+        # (pid, starttime) → (command, role); non-matching pids remembered too
+        self._identity: Dict[Tuple[int, int], Tuple[str, str]] = {}
+        self._ignored: Set[Tuple[int, int]] = set()
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.proc_root, *parts)
+
+    def sample(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        dt = (now - self._ts) if self._ts is not None else 0.0
+        out: Dict[str, Any] = {"cpu_window": "interval" if self._cpu is not None else "boot"}
+
+        cpu = _cpu_counters(_read(self._path("stat")))
+        if cpu is not None:
+            out.update(_cpu_pcts(cpu, self._cpu))
+            self._cpu = cpu
+
+        disks = _disk_counters(_read(self._path("diskstats")))
+        out["disk_read_sectors"] = sum(v[0] for v in disks.values())
+        out["disk_write_sectors"] = sum(v[1] for v in disks.values())
+        out["disk_devices"] = len(disks)
+        if dt > 0 and self._disk:
+            per_dev: Dict[str, Dict[str, float]] = {}
+            for dev, (rd, wr, io_ms) in disks.items():
+                prev = self._disk.get(dev)
+                if prev is None or rd < prev[0] or wr < prev[1] or io_ms < prev[2]:
+                    continue
+                per_dev[dev] = {
+                    "busy_pct": round(min(100.0, (io_ms - prev[2]) / (dt * 10.0)), 1),
+                    "read_kbps": round((rd - prev[0]) * 512 / 1024 / dt, 1),
+                    "write_kbps": round((wr - prev[1]) * 512 / 1024 / dt, 1),
+                }
+            if per_dev:
+                busiest = max(per_dev, key=lambda d: per_dev[d]["busy_pct"])
+                out["disk_busy_pct"] = per_dev[busiest]["busy_pct"]
+                out["disk_busiest"] = busiest
+                out["disk_read_kbps"] = round(sum(v["read_kbps"] for v in per_dev.values()), 1)
+                out["disk_write_kbps"] = round(sum(v["write_kbps"] for v in per_dev.values()), 1)
+                out["disks"] = per_dev
+        self._disk = disks
+
+        out["processes"] = self._processes(dt)
+        self._ts = now
+        return out
+
+    def _processes(self, dt: float) -> List[Dict[str, Any]]:
+        seen: Dict[int, Tuple[int, int]] = {}
+        live_keys: Set[Tuple[int, int]] = set()
+        rows: List[Dict[str, Any]] = []
+        try:
+            entries = [e.name for e in os.scandir(self.proc_root) if e.name.isdigit()]
+        except OSError:
+            return rows
+        for name in entries:
+            pid = int(name)
+            stat = _pid_stat(_read(self._path(name, "stat")))
+            if stat is None:
+                continue
+            ticks, start, rss_pages = stat
+            key = (pid, start)
+            live_keys.add(key)
+            if key in self._ignored:
+                continue
+            ident = self._identity.get(key)
+            if ident is None:
+                comm = _read(self._path(name, "comm")).strip()
+                if not self._pattern.search(comm):
+                    self._ignored.add(key)
+                    continue
+                cmdline = _read(self._path(name, "cmdline")).replace("\0", " ").strip()
+                ident = self._identity[key] = (comm[:80], _role(comm, cmdline))
+            seen[pid] = (start, ticks)
+            prev = self._pids.get(pid)
+            cpu_pct = None
+            if prev is not None and prev[0] == start and dt > 0 and ticks >= prev[1]:
+                cpu_pct = round(100.0 * (ticks - prev[1]) / _CLK_TCK / dt, 1)
+            rows.append({
+                "pid": pid,
+                "command": ident[0],
+                "role": ident[1],
+                "cpu_pct": cpu_pct,
+                "rss_mb": round(rss_pages * _PAGE_SIZE / 1048576, 1),
+            })
+        self._pids = seen
+        # Forget identities of processes that exited
+        self._identity = {k: v for k, v in self._identity.items() if k in live_keys}
+        self._ignored &= live_keys
+        rows.sort(key=lambda r: (r["role"] == "other", -(r["cpu_pct"] or 0.0), -r["rss_mb"]))
+        return rows[: self.max_processes]
@@ -0,0 +1,122 @@
+"""
+Per-compiler Puppet Server health history (OpenVox Server Health page).
+
+The collector polls every Puppet Server in the cluster config (or the
+single configured server) on each tick, with bounded parallelism. Storage,
+fleet roll-up and persistence are ``HostSeriesStore`` (shared with the
+OpenVoxDB health history): a fixed-size raw ring per host plus 1m / 10m /
+1h rollups, saved under ``settings.data_dir/ps_health``.
+
+Fleet aggregate: all hosts of one tick share the tick's ``ts``, so the
+fleet series is the per-tick mean across hosts (max for heap %). The last
+full snapshot per host is kept for the per-compiler status cards.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from ..utils.host_series import HostSeriesStore
+
+HISTORY_MAX = 360  # ~1h at 10s polls
+POLL_CONCURRENCY = 4
+POLL_TIMEOUT_SEC = 20.0
+
+# Chartable fields. Saved series match columns by name, so a new field
+# just starts with an empty history.
+FIELDS = (
+    "heap_used_mb", "heap_pct", "nonheap_used_mb", "nonheap_pct",
+    "compile_time_ms", "jruby_active",
+    "gc_young_time", "gc_young_count", "gc_old_time", "gc_old_count",
+    "process_cpu_load", "open_fds",
+    "http_catalog_mean", "http_report_mean", "http_file_mean",
+)
+# Fleet aggregate takes the max of these instead of the mean.
+_MAX_FIELDS = frozenset({"heap_pct", "nonheap_pct"})
+
+
+def point_from_snapshot(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Chartable values of one ``get_ps_health_snapshot`` result."""
+    jvmh = snapshot.get("jvm_heap") or {}
+    jvmnh = snapshot.get("jvm_nonheap") or {}
+    gcy = snapshot.get("gc_young") or {}
+    gco = snapshot.get("gc_old") or {}
+    osstat = snapshot.get("os") or {}
+    values: Dict[str, Any] = {
+        "heap_used_mb": jvmh.get("used_mb"),
+        "heap_pct": jvmh.get("pct"),
+        "nonheap_used_mb": jvmnh.get("used_mb"),
+        "nonheap_pct": jvmnh.get("pct"),
+        "compile_time_ms": snapshot.get("compile_time_ms"),
+        "jruby_active": snapshot.get("jruby_active"),
+        "gc_young_time": gcy.get("time_ms"),
+        "gc_young_count": gcy.get("count"),
+        "gc_old_time": gco.get("time_ms"),
+        "gc_old_count": gco.get("count"),
+        "process_cpu_load": osstat.get("process_cpu_load"),
+        "open_fds": osstat.get("open_file_descriptors"),
+    }
+    # carry current route means when present
+    for hm in (snapshot.get("http_metrics") or []):
+        r = (hm.get("route") or "").lower()
+        if "catalog" in r:
+            values["http_catalog_mean"] = hm.get("mean")
+        elif "report" in r:
+            values["http_report_mean"] = hm.get("mean")
+        elif "file" in r:
+            values["http_file_mean"] = hm.get("mean")
+    return values
+
+
+class PSHealthHistory(HostSeriesStore):
+    """Per-host health series plus each host's latest full snapshot."""
+
+    def __init__(self, maxlen: int = HISTORY_MAX, data_dir: Optional[str] = None):
+        super().__init__(
+            {f: "max" if f in _MAX_FIELDS else "mean" for f in FIELDS},
+            "ps_health",
+            raw_max=maxlen,
+            data_dir=data_dir,
+        )
+        self._latest: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, host: str, snapshot: Dict[str, Any], ts: Optional[float] = None) -> None:
+        self.record(host, point_from_snapshot(snapshot), ts)
+        self._latest[host.lower()] = snapshot
+
+    def host_series(self, host: str) -> List[Dict[str, Any]]:
+        return self.raw_points(host)
+
+    def fleet_series(self, hosts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Per-tick mean across hosts (max for heap/non-heap %)."""
+        return self.fleet_raw(hosts)
+
+    def latest(self, host: str) -> Optional[Dict[str, Any]]:
+        return self._latest.get(host.lower())
+
+    def retain(self, hosts: List[str], unlink: bool = True) -> List[str]:
+        gone = super().retain(hosts, unlink)
+        for host in gone:
+            self._latest.pop(host, None)
+        return gone
+
+    def _live_extra(self) -> Dict[str, Any]:
+        return {"status": {h: snap.get("status") for h, snap in self._latest.items()}}
+
+    def _adopt_extra(self, extra: Dict[str, Any]) -> None:
+        self._latest = {h: {"status": status} for h, status in (extra.get("status") or {}).items()}
+
+    async def poll(self, hosts: List[str], fetch, concurrency: int = POLL_CONCURRENCY) -> None:
+        """Poll ``fetch(host)`` (a health snapshot) for every host."""
+
+        async def _sample(host: str, ts: float) -> Optional[Dict[str, Any]]:
+            snap = await fetch(host)
+            if not snap:
+                return None
+            self._latest[host.lower()] = snap
+            return point_from_snapshot(snap)
+
+        await super().poll(hosts, _sample, concurrency=concurrency, timeout=POLL_TIMEOUT_SEC)
+
+
+# Singleton
+ps_health_history = PSHealthHistory()
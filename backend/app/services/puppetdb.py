@@ -18,14 +18,16 @@ parameters, they are validated with a strict hex-only regex before
 interpolation to prevent PQL injection.
 """
 import asyncio
+import json
 import re
 import httpx
 import ssl
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from copy import deepcopy
 from ..config import settings
 from ..utils.ttl_cache import get_or_set as cache_get_or_set
+from ..utils.upstream_metrics import InstrumentedTransport
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +58,32 @@ def _cert_aliases(certname: str) -> List[str]:
     return names
 
 
+def _pql_fact_path(fact_path: str) -> str:
+    """Dotted fact path → PQL array literal for ``fact_contents`` ``path``.
+
+    ``os.release.full`` → ``["os", "release", "full"]``. Digit segments are
+    array indices (ints), matching facts.get_nested_value. Segments are
+    JSON-quoted so a user-supplied path cannot break out of the literal.
+    """
+    parts: List[Any] = []
+    for seg in (fact_path or "").split("."):
+        if not seg:
+            continue
+        parts.append(int(seg) if seg.isdigit() and parts else seg)
+    if not parts:
+        raise ValueError("Empty fact path")
+    return json.dumps(parts)
+
+
+def _pql_literal(value: Any) -> str:
+    """Scalar fact value → PQL literal (strings quoted, numbers/bools bare)."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return json.dumps(str(value))
+
+
 def _short_host(certname: str) -> str:
     return (certname or "").strip().lower().split(".")[0]
 
@@ -109,6 +137,8 @@ class PuppetDBService:
     def __init__(self):
         self.base_url = f"https://{settings.puppetdb_host}:{settings.puppetdb_port}"
         self._client: Optional[httpx.AsyncClient] = None
+        # Per-node clients for the health collector (keyed by host)
+        self._host_clients: Dict[str, httpx.AsyncClient] = {}
 
     def _create_ssl_context(self) -> ssl.SSLContext:
         ctx = ssl.create_default_context(cafile=settings.puppet_ssl_ca)
@@ -124,20 +154,61 @@ class PuppetDBService:
             # fan out to PuppetDB reuse TLS sessions instead of re-handshaking.
             self._client = httpx.AsyncClient(
                 base_url=self.base_url,
-                verify=self._create_ssl_context(),
                 timeout=httpx.Timeout(30.0, connect=5.0),
-                limits=httpx.Limits(
-                    max_connections=40,
-                    max_keepalive_connections=20,
-                    keepalive_expiry=30.0,
+                transport=InstrumentedTransport(
+                    "puppetdb",
+                    host=settings.puppetdb_host,
+                    verify=self._create_ssl_context(),
+                    limits=httpx.Limits(
+                        max_connections=40,
+                        max_keepalive_connections=20,
+                        keepalive_expiry=30.0,
+                    ),
                 ),
                 trust_env=False,
             )
         return self._client
 
+    async def _get_host_client(self, host: Optional[str]) -> httpx.AsyncClient:
+        """Client pinned to one PuppetDB node (default: the configured host)."""
+        if not host or host == settings.puppetdb_host:
+            return await self._get_client()
+        client = self._host_clients.get(host)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=f"https://{host}:{settings.puppetdb_port}",
+                timeout=httpx.Timeout(15.0, connect=5.0),
+                transport=InstrumentedTransport("puppetdb", host=host, verify=self._create_ssl_context()),
+                trust_env=False,
+            )
+            self._host_clients[host] = client
+        return client
+
     async def close(self):
         if self._client and not self._client.is_closed:
             await self._client.aclose()
+        for client in self._host_clients.values():
+            if not client.is_closed:
+                await client.aclose()
+        self._host_clients.clear()
+
+    def health_hosts(self) -> List[str]:
+        """PuppetDB nodes to sample for health: each cluster node, else the configured host."""
+        try:
+            from .cluster_config import is_clustered, load_cluster_config
+
+            if is_clustered():
+                hosts: List[str] = []
+                for h in load_cluster_config().get("puppetdb_nodes") or []:
+                    h = str(h).strip().lower()
+                    if h and h not in hosts:
+                        hosts.append(h)
+                if hosts:
+                    return hosts
+        except Exception:
+            pass
+        primary = (settings.puppetdb_host or "").strip().lower()
+        return [primary] if primary else []
 
     async def _query(self, endpoint: str, query: Optional[str] = None,
                      params: Optional[Dict] = None) -> Any:
@@ -499,6 +570,48 @@ class PuppetDBService:
         resp.raise_for_status()
         return resp.json()
 
+    async def stream_pql(self, query: str, limit: Optional[int] = None) -> AsyncIterator[Dict]:
+        """Yield PQL result rows as they arrive instead of buffering the body.
+
+        PuppetDB streams its JSON array; rows are decoded one object at a
+        time so large result sets never sit in memory as a single document.
+        """
+        client = await self._get_client()
+        params = {"query": query}
+        if limit:
+            params["limit"] = str(limit)
+        decoder = json.JSONDecoder()
+        async with client.stream("GET", "/pdb/query/v4", params=params) as resp:
+            if resp.status_code >= 400:
+                body = (await resp.aread()).decode(errors="replace")
+                logger.error(f"PuppetDB HTTP error: {resp.status_code} - {body[:500]}")
+                resp.raise_for_status()
+            buf = ""
+            started = False
+            async for chunk in resp.aiter_text():
+                buf += chunk
+                pos = 0
+                while True:
+                    while pos < len(buf) and buf[pos] in " \t\r\n,":
+                        pos += 1
+                    if pos >= len(buf):
+                        break
+                    if not started:
+                        if buf[pos] != "[":
+                            raise RuntimeError("PuppetDB returned a non-array PQL result")
+                        started = True
+                        pos += 1
+                        continue
+                    if buf[pos] == "]":
+                        return
+                    try:
+                        row, pos = decoder.raw_decode(buf, pos)
+                    except json.JSONDecodeError:
+                        break  # partial object — wait for the next chunk
+                    if isinstance(row, dict):
+                        yield row
+                buf = buf[pos:]
+
     async def get_latest_reports_by_certname(self) -> Dict[str, Dict]:
         """One newest report document per certname.
 
@@ -765,6 +878,64 @@ class PuppetDBService:
         """Get all known fact names."""
         return await self._query("fact-names")
 
+    async def get_fact_value_counts(self, fact_path: str) -> List[Dict]:
+        """``[{value, count}]`` for a (nested) fact path, counted in PuppetDB.
+
+        Uses ``fact_contents`` + ``group by value`` so only the distinct
+        leaf values travel, not every node's whole structured fact. Empty
+        when the path is not a leaf (e.g. ``os``) — callers fall back.
+        """
+        path = _pql_fact_path(fact_path)
+        rows = await self.pql(
+            f"fact_contents[value, count()] {{ path = {path} group by value }}",
+            limit=100000,
+        ) or []
+        out: List[Dict] = []
+        for row in rows:
+            if isinstance(row, dict) and row.get("value") is not None:
+                out.append({"value": row.get("value"), "count": int(row.get("count") or 0)})
+        return out
+
+    async def get_fact_path_values(
+        self,
+        fact_path: str,
+        values: Optional[List[Any]] = None,
+        limit: int = 100000,
+    ) -> List[Dict]:
+        """``[{certname, value}]`` for one leaf path (optionally only *values*)."""
+        path = _pql_fact_path(fact_path)
+        cond = f"path = {path}"
+        if values:
+            ors = " or ".join(f"value = {_pql_literal(v)}" for v in values)
+            cond += f" and ({ors})"
+        rows = await self.pql(
+            f"fact_contents[certname, value] {{ {cond} }}",
+            limit=limit,
+        ) or []
+        return [r for r in rows if isinstance(r, dict)]
+
+    def stream_fact_path_values(self, fact_path: str) -> AsyncIterator[Dict]:
+        """Stream ``{certname, value, environment}`` for one fact path.
+
+        A bare fact name reads ``facts``; a dotted path reads only that
+        leaf from ``fact_contents`` instead of each node's whole tree.
+        """
+        if "." not in (fact_path or ""):
+            name = json.dumps(fact_path or "")
+            return self.stream_pql(
+                f"facts[certname, value, environment] {{ name = {name} }}"
+            )
+        path = _pql_fact_path(fact_path)
+        return self.stream_pql(
+            f"fact_contents[certname, value, environment] {{ path = {path} }}"
+        )
+
+    async def sample_fact_values(self, fact_name: str, limit: int) -> List[Dict]:
+        """Up to *limit* ``{certname, value}`` rows for a base fact (PQL limit)."""
+        name = json.dumps(fact_name or "")
+        rows = await self.pql(f"facts[certname, value] {{ name = {name} }}", limit=limit) or []
+        return [r for r in rows if isinstance(r, dict)]
+
     # ─── Environments ───────────────────────────────────────
 
     async def get_environments(self) -> List[Dict]:
@@ -1013,10 +1184,10 @@ class PuppetDBService:
             logger.debug("PuppetDB version HTTP failed: %s", e)
         return None
 
-    async def get_pdb_metrics(self, metric_name: str) -> Dict:
+    async def get_pdb_metrics(self, metric_name: str, host: Optional[str] = None) -> Dict:
         """Query PuppetDB's JMX metrics endpoint."""
         try:
-            client = await self._get_client()
+            client = await self._get_host_client(host)
             resp = await client.get(f"/metrics/v2/read/{metric_name}")
             resp.raise_for_status()
             return resp.json()
@@ -1024,6 +1195,48 @@ class PuppetDBService:
             logger.warning(f"Failed to get PuppetDB metric {metric_name}: {e}", exc_info=True)
             return {}
 
+    async def read_pdb_metrics(self, mbeans: List[str], host: Optional[str] = None) -> Dict[str, Any]:
+        """Read several mbeans in one Jolokia bulk request (mbean → value).
+
+        Falls back to one GET per mbean when the bulk POST is refused
+        (older metrics/v2 auth rules only allow GET). Missing mbeans are
+        simply absent from the result.
+        """
+        out: Dict[str, Any] = {}
+        try:
+            client = await self._get_host_client(host)
+            resp = await client.post(
+                "/metrics/v2",
+                json=[{"type": "read", "mbean": m} for m in mbeans],
+            )
+            if resp.status_code == 200:
+                body = resp.json()
+                if isinstance(body, list):
+                    for item in body:
+                        if not isinstance(item, dict) or item.get("status") != 200:
+                            continue
+                        mbean = (item.get("request") or {}).get("mbean")
+                        if mbean:
+                            out[mbean] = item.get("value")
+                    return out
+        except Exception as e:
+            logger.debug("PuppetDB bulk metrics read on %s failed: %s", host or self.base_url, e)
+
+        async def _one(mbean: str) -> None:
+            try:
+                client = await self._get_host_client(host)
+                # Jolokia GET paths need "/" inside names escaped as "!/"
+                resp = await client.get(f"/metrics/v2/read/{mbean.replace('/', '!/')}")
+                if resp.status_code == 200:
+                    data = resp.json()
+                    if isinstance(data, dict) and "value" in data:
+                        out[mbean] = data["value"]
+            except Exception as e:
+                logger.debug("PuppetDB metric %s on %s failed: %s", mbean, host or self.base_url, e)
+
+        await asyncio.gather(*(_one(m) for m in mbeans))
+        return out
+
     # ─── System Inventory Report ────────────────────────────
 
     async def get_system_inventory(self) -> List[Dict]:
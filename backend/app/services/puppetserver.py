@@ -15,6 +15,8 @@ import httpx
 import ssl
 import urllib.parse
 from ..config import settings
+from ..utils.json_paths import LearnedPaths, find_key_path, find_list_paths, find_section_path
+from ..utils.upstream_metrics import InstrumentedTransport
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +86,14 @@ class PuppetServerService:
         # For metrics / health queries to Puppet Server (same mTLS certs as PuppetDB)
         self.ps_base_url = f"https://{settings.puppet_server_host}:{settings.puppet_server_port}"
         self._ps_client: Optional[httpx.AsyncClient] = None
+        # Per-compiler clients for the health collector (keyed by host)
+        self._ps_host_clients: Dict[str, httpx.AsyncClient] = {}
+        # Health snapshot schema learning: where each field sits in the status
+        # document (per host + server version), which status call answered
+        # last time, and which mbean name encoding /metrics/v2 accepts.
+        self._ps_paths = LearnedPaths()
+        self._ps_status_source: Dict[str, str] = {}
+        self._ps_metrics_encoding: Dict[str, int] = {}
 
     def _create_ps_ssl_context(self) -> ssl.SSLContext:
         """Create mTLS context using the Puppet agent's certs (same as PuppetDB)."""
@@ -94,12 +104,29 @@ class PuppetServerService:
         )
         return ctx
 
-    async def _get_ps_client(self) -> httpx.AsyncClient:
+    async def _get_ps_client(self, host: Optional[str] = None) -> httpx.AsyncClient:
+        if host and host != settings.puppet_server_host:
+            client = self._ps_host_clients.get(host)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    base_url=f"https://{host}:{settings.puppet_server_port}",
+                    timeout=15.0,
+                    transport=InstrumentedTransport(
+                        "puppetserver", host=host, verify=self._create_ps_ssl_context()
+                    ),
+                    trust_env=False,
+                )
+                self._ps_host_clients[host] = client
+            return client
         if self._ps_client is None or self._ps_client.is_closed:
             self._ps_client = httpx.AsyncClient(
                 base_url=self.ps_base_url,
-                verify=self._create_ps_ssl_context(),
                 timeout=30.0,
+                transport=InstrumentedTransport(
+                    "puppetserver",
+                    host=settings.puppet_server_host,
+                    verify=self._create_ps_ssl_context(),
+                ),
                 trust_env=False,
             )
         return self._ps_client
@@ -107,6 +134,10 @@ class PuppetServerService:
     async def close(self):
         if self._ps_client and not self._ps_client.is_closed:
             await self._ps_client.aclose()
+        for client in self._ps_host_clients.values():
+            if not client.is_closed:
+                await client.aclose()
+        self._ps_host_clients.clear()
 
     # ─── puppet.conf ────────────────────────────────────────
 
@@ -157,7 +188,10 @@ class PuppetServerService:
         try:
             ctx = self._create_ps_ssl_context()
             async with httpx.AsyncClient(
-                base_url=url, verify=ctx, timeout=8.0, trust_env=False
+                base_url=url,
+                timeout=8.0,
+                transport=InstrumentedTransport("puppetserver", verify=ctx, track_pool=False),
+                trust_env=False,
             ) as client:
                 resp = await client.get(
                     "/puppet/v3/environments",
@@ -355,6 +389,29 @@ class PuppetServerService:
             pass
         return hosts
 
+    def ps_health_hosts(self) -> List[str]:
+        """Puppet Servers to sample for health: each compiler when clustered.
+
+        The VIP is skipped in cluster mode — behind a load balancer it lands
+        on an arbitrary compiler, which is what made single-endpoint history
+        jump between JVMs.
+        """
+        try:
+            from .cluster_config import is_clustered, load_cluster_config
+
+            if is_clustered():
+                hosts: List[str] = []
+                for h in load_cluster_config().get("compilers") or []:
+                    h = str(h).strip().lower()
+                    if h and h not in hosts:
+                        hosts.append(h)
+                if hosts:
+                    return hosts
+        except Exception:
+            pass
+        primary = (settings.puppet_server_host or "").strip().lower()
+        return [primary] if primary else []
+
     async def _environment_classes_http(
         self, host: str, environment: str
     ) -> tuple[List[str], Optional[str]]:
@@ -364,7 +421,10 @@ class PuppetServerService:
             ctx = self._create_ps_ssl_context()
             # Short timeout: race several compilers; do not wait 20s each.
             async with httpx.AsyncClient(
-                base_url=url, verify=ctx, timeout=8.0, trust_env=False
+                base_url=url,
+                timeout=8.0,
+                transport=InstrumentedTransport("puppetserver", verify=ctx, track_pool=False),
+                trust_env=False,
             ) as client:
                 resp = await client.get(
                     "/puppet/v3/environment_classes",
@@ -845,14 +905,17 @@ class PuppetServerService:
 
     # ─── Puppet Server Metrics & Health (for Metrics | PuppetServer Health) ───
 
-    async def get_ps_status(self, service: str = "master", level: Optional[str] = None) -> Dict[str, Any]:
+    async def get_ps_status(
+        self, service: str = "master", level: Optional[str] = None, host: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Fetch Puppet Server status.
 
         service: usually "master"
         level: optionally "debug" to get more detail (passed as ?level=debug)
+        host: a specific compiler (default: the configured server / VIP)
         """
         try:
-            client = await self._get_ps_client()
+            client = await self._get_ps_client(host)
             url = f"/status/v1/services/{service}"
             params = {}
             if level:
@@ -864,24 +927,32 @@ class PuppetServerService:
             logger.warning(f"Failed to get Puppet Server status for {service}: {e}", exc_info=True)
             return {}
 
-    async def get_ps_metrics(self, mbean: str) -> Dict[str, Any]:
+    async def get_ps_metrics(self, mbean: str, host: Optional[str] = None) -> Dict[str, Any]:
         """Query a specific JMX/mbean from Puppet Server's /metrics/v2 (Jolokia-style).
 
         Tries both raw and URL-encoded mbean name for compatibility.
         """
-        client = await self._get_ps_client()
+        client = await self._get_ps_client(host)
         candidates = [
             mbean,
             urllib.parse.quote(mbean, safe=""),
             mbean.replace(":", "%3A").replace("=", "%3D").replace(",", "%2C"),
         ]
-        for name in candidates:
+        # Start with the encoding this server accepted last time (one round-trip)
+        learned = self._ps_metrics_encoding.get(host or "")
+        order = list(range(len(candidates)))
+        if learned is not None:
+            order.remove(learned)
+            order.insert(0, learned)
+        for idx in order:
+            name = candidates[idx]
             try:
                 resp = await client.get(f"/metrics/v2/read/{name}")
                 if resp.status_code == 200:
                     data = resp.json()
                     # Some responses wrap, some return value directly
                     if data and (isinstance(data, dict) and data.get("value") is not None or "HeapMemoryUsage" in str(data)):
+                        self._ps_metrics_encoding[host or ""] = idx
                         return data
             except Exception as e:
                 logger.debug(f"PS metrics attempt for {name} failed: {e}")
@@ -900,11 +971,12 @@ class PuppetServerService:
             logger.warning(f"Failed to list Puppet Server metrics: {e}", exc_info=True)
             return {"error": str(e)}
 
-    async def get_ps_health_snapshot(self) -> Dict[str, Any]:
+    async def get_ps_health_snapshot(self, host: Optional[str] = None) -> Dict[str, Any]:
         """Convenience snapshot combining status + key JVM/metrics for the health page.
 
         Tries basic status first, then with level=debug for richer data.
         Uses flexible key lookup because Puppet Server status structure varies by version/config.
+        ``host`` targets one compiler directly instead of the configured server / VIP.
         """
         result: Dict[str, Any] = {
             "status": None,
@@ -915,46 +987,39 @@ class PuppetServerService:
             "raw": {},
         }
 
-        def _find_key(obj: Any, keys: List[str]) -> Any:
-            """Recursively search for a key in nested dicts."""
-            if not isinstance(obj, dict):
-                return None
-            for k in keys:
-                if k in obj:
-                    return obj[k]
-            for v in obj.values():
-                found = _find_key(v, keys)
-                if found is not None:
-                    return found
-            return None
-
         # Fetch status - try full services list first (more reliable), prefer level=debug for rich data (info level often has empty "status")
-        status = None
-        try:
-            client = await self._get_ps_client()
+        async def _services_debug() -> Any:
+            client = await self._get_ps_client(host)
             resp = await client.get("/status/v1/services?level=debug")
             full = resp.json()
-            if isinstance(full, dict):
-                if "master" in full:
-                    status = full
-                else:
-                    status = full
-        except Exception:
-            pass
+            return full if isinstance(full, dict) else None
 
-        if not status:
-            status = await self.get_ps_status("master", level="debug")
+        async def _master_debug() -> Any:
+            return await self.get_ps_status("master", level="debug", host=host)
 
-        if not status:
+        async def _services() -> Any:
             # fallback without debug
+            client = await self._get_ps_client(host)
+            resp = await client.get("/status/v1/services")
+            full = resp.json()
+            return (full.get("master") or full) if isinstance(full, dict) else None
+
+        sources = {"services_debug": _services_debug, "master_debug": _master_debug, "services": _services}
+        order = list(sources)
+        learned_source = self._ps_status_source.get(host or "")
+        if learned_source in sources:
+            # Whichever call answered last time goes first (usually the only round-trip)
+            order.remove(learned_source)
+            order.insert(0, learned_source)
+        status = None
+        for name in order:
             try:
-                client = await self._get_ps_client()
-                resp = await client.get("/status/v1/services")
-                full = resp.json()
-                if isinstance(full, dict):
-                    status = full.get("master") or full
+                status = await sources[name]()
             except Exception:
-                pass
+                status = None
+            if status:
+                self._ps_status_source[host or ""] = name
+                break
 
         if status:
             master = status.get("master", {}) if isinstance(status, dict) else {}
@@ -970,9 +1035,32 @@ class PuppetServerService:
 
             result["raw"]["status"] = svc
 
+            # Learned paths are per host + Puppet Server version: a release that
+            # moves fields simply learns a new set on its first sample.
+            version = ""
+            for cand in (master, status):
+                if isinstance(cand, dict) and cand.get("service_version"):
+                    version = str(cand["service_version"])
+                    break
+            schema = f"{host or 'default'}|{version}"
+            self._ps_paths.begin(schema)
+            roots = {"svc": svc, "master": master, "status": status}
+
+            def _find_key(label: str, keys: List[str]) -> Any:
+                return self._ps_paths.find(
+                    schema, f"key:{label}:{','.join(keys)}", roots[label],
+                    lambda o: find_key_path(o, keys),
+                )
+
+            def _find_section(label: str, name: str) -> Any:
+                return self._ps_paths.find(
+                    schema, f"section:{label}:{name}", roots[label],
+                    lambda o: find_section_path(o, name),
+                )
+
             # Compile time - very common key, search broadly
             compile_val = None
-            for search_target in [svc, master, status]:
+            for search_target in ("svc", "master", "status"):
                 if compile_val is None:
                     compile_val = _find_key(search_target, [
                         "average_compile_time_ms", "avg_compile_time_ms",
@@ -984,7 +1072,7 @@ class PuppetServerService:
             # JRuby pool info - try common locations, search broadly
             jruby_active = None
             jruby_max = None
-            for search_target in [svc, master, status]:
+            for search_target in ("svc", "master", "status"):
                 if jruby_active is None:
                     jruby_active = _find_key(search_target, [
                         "num_jrubies", "current_jruby_instances", "jruby_instances",
@@ -995,7 +1083,7 @@ class PuppetServerService:
                         "max_jrubies", "max_active_jrubies", "max_jruby_instances"
                     ])
 
-            jruby_section = _find_key(svc, ["jruby", "jruby_puppet"]) or _find_key(master, ["jruby", "jruby_puppet"]) or {}
+            jruby_section = _find_key("svc", ["jruby", "jruby_puppet"]) or _find_key("master", ["jruby", "jruby_puppet"]) or {}
             if isinstance(jruby_section, dict):
                 jruby_active = jruby_active or jruby_section.get("num_jrubies") or jruby_section.get("active_instances") or jruby_section.get("current")
                 jruby_max = jruby_max or jruby_section.get("max_jrubies") or jruby_section.get("max_active_instances")
@@ -1053,21 +1141,13 @@ class PuppetServerService:
             # since traditional keys and /metrics/v2 may not be present/accessible.
             # Use catalog mean as compile proxy, total mean as activity.
             # Search the entire response tree for the http-metrics list
-            def _find_http_metrics(obj, results=None):
-                if results is None:
-                    results = []
-                if isinstance(obj, dict):
-                    for key in ["http-metrics", "http-client-metrics"]:
-                        if key in obj and isinstance(obj[key], list):
-                            results.append(obj[key])
-                    for v in obj.values():
-                        _find_http_metrics(v, results)
-                elif isinstance(obj, list):
-                    for item in obj:
-                        _find_http_metrics(item, results)
-                return results
-
-            http_metrics_lists = _find_http_metrics(status) or _find_http_metrics(svc) or _find_http_metrics(master) or []
+            def _find_http_metrics(label: str) -> List[Any]:
+                return self._ps_paths.find_all(
+                    schema, f"http:{label}", roots[label],
+                    lambda o: find_list_paths(o, ["http-metrics", "http-client-metrics"]),
+                )
+
+            http_metrics_lists = _find_http_metrics("status") or _find_http_metrics("svc") or _find_http_metrics("master") or []
             http_m = []
             for lst in http_metrics_lists:
                 if isinstance(lst, list):
@@ -1192,27 +1272,12 @@ class PuppetServerService:
             result["http_metrics"] = useful_http[:15]
 
             # Other experimental sections (DB ones will be surfaced on OpenVoxDB Health page)
-            def _find_section(obj, name):
-                if isinstance(obj, dict):
-                    if name in obj and isinstance(obj[name], (list, dict)):
-                        return obj[name]
-                    for v in obj.values():
-                        found = _find_section(v, name)
-                        if found is not None:
-                            return found
-                elif isinstance(obj, list):
-                    for item in obj:
-                        found = _find_section(item, name)
-                        if found is not None:
-                            return found
-                return None
-
             for sec_name in ["catalog-metrics", "puppetdb-metrics", "function-metrics", "resource-metrics"]:
-                sec_data = _find_section(status, sec_name)
+                sec_data = _find_section("status", sec_name)
                 if sec_data:
                     result[sec_name.replace("-", "_")] = sec_data if isinstance(sec_data, list) else [sec_data]
 
-            hc_list = _find_section(status, "http-client-metrics")
+            hc_list = _find_section("status", "http-client-metrics")
             if hc_list and isinstance(hc_list, list):
                 result["http_client_metrics"] = [
                     {
@@ -1224,7 +1289,7 @@ class PuppetServerService:
                 ]
 
             # Direct JRuby pool info
-            jruby_section = _find_key(svc, ["jruby", "jruby_puppet"]) or _find_key(master, ["jruby", "jruby_puppet"]) or {}
+            jruby_section = _find_key("svc", ["jruby", "jruby_puppet"]) or _find_key("master", ["jruby", "jruby_puppet"]) or {}
             if isinstance(jruby_section, dict) and jruby_section:
                 result["jruby_pool"] = {
                     "active": jruby_section.get("num_jrubies") or jruby_section.get("current_active") or jruby_section.get("active"),
@@ -1233,7 +1298,7 @@ class PuppetServerService:
 
             # OS stats
             try:
-                osb = await self.get_ps_metrics("java.lang:type=OperatingSystem")
+                osb = await self.get_ps_metrics("java.lang:type=OperatingSystem", host=host)
                 osval = (osb or {}).get("value", osb) if isinstance(osb, dict) else {}
                 if isinstance(osval, dict):
                     result["os"] = {
@@ -1247,7 +1312,7 @@ class PuppetServerService:
 
             # Threading
             try:
-                tb = await self.get_ps_metrics("java.lang:type=Threading")
+                tb = await self.get_ps_metrics("java.lang:type=Threading", host=host)
                 tval = (tb or {}).get("value", tb) if isinstance(tb, dict) else {}
                 if isinstance(tval, dict):
                     tids = tval.get("AllThreadIds") or []
@@ -1259,7 +1324,7 @@ class PuppetServerService:
                 pass
 
         # JVM heap via metrics/v2 (primary). Falls back gracefully if not enabled.
-        jvm = await self.get_ps_metrics("java.lang:type=Memory")
+        jvm = await self.get_ps_metrics("java.lang:type=Memory", host=host)
         if jvm and isinstance(jvm, dict):
             value = jvm.get("value", jvm)  # sometimes top level, sometimes wrapped
             mem = {}
@@ -1292,7 +1357,7 @@ class PuppetServerService:
                 ("gc_young", "java.lang:name=G1 Young Generation,type=GarbageCollector"),
                 ("gc_old", "java.lang:name=G1 Old Generation,type=GarbageCollector"),
             ]:
-                g = await self.get_ps_metrics(gname)
+                g = await self.get_ps_metrics(gname, host=host)
                 gval = (g or {}).get("value", g) if isinstance(g, dict) else {}
                 if isinstance(gval, dict) and (gval.get("CollectionCount") is not None or gval.get("CollectionTime") is not None):
                     result[gkey] = {
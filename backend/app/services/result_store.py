@@ -0,0 +1,272 @@
+"""
+Full execution results, compressed, one row per target.
+
+``ExecutionHistory.result_preview`` keeps the first 500 characters of a
+run, which is all the history list needs. ``finish_execution_history``
+also stores the complete result here (``execution_results``):
+
+- one row per target from Bolt's JSON items (the item as Bolt printed it)
+- one run-level row (``target=""``): return code, stderr, and stdout when
+  the run was not ``--format json``
+
+Rows are compressed JSON documents (zstd when the optional ``zstandard``
+package is installed, else gzip) and are only read when someone opens a
+target (``read_result``, with byte ranges for very large outputs; a range
+is decompressed incrementally and only up to its end). Runs
+larger than ``execution_results_max_mb`` keep the first targets and record
+how many were dropped. Rows older than ``execution_results_retention_days``
+are purged by the scheduled DB maintenance (``services.db_maintenance``).
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.execution_result import ExecutionResult
+from .bolt_orchestration import _iter_bolt_result_items, clean_bolt_console_text
+from ..utils.validation import strip_ansi
+
+logger = logging.getLogger(__name__)
+
+RUN_TARGET = ""  # run-level row
+GZIP_LEVEL = 6
+READ_CHUNK = 256 * 1024  # compressed bytes fed per step of a ranged read
+ZSTD_LEVEL = 9
+
+try:
+    import zstandard as _zstd
+except ImportError:  # optional dependency
+    _zstd = None
+
+
+def zstd_available() -> bool:
+    return _zstd is not None
+
+
+def pick_codec(preference: Optional[str] = None) -> str:
+    pref = (preference or settings.execution_results_codec or "auto").lower()
+    if pref == "gzip" or not zstd_available():
+        return "gzip"
+    return "zstd"
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return _zstd.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def decompress(blob: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if _zstd is None:
+            raise RuntimeError("result stored with zstd but the zstandard package is not installed")
+        return _zstd.ZstdDecompressor().decompress(blob)
+    return gzip.decompress(blob)
+
+
+def decompress_prefix(blob: bytes, codec: str, limit: Optional[int]) -> bytes:
+    """The first ``limit`` decompressed bytes (all when None); stops decompressing there."""
+    if limit is None:
+        return decompress(blob, codec)
+    out = bytearray()
+    if codec == "zstd":
+        if _zstd is None:
+            raise RuntimeError("result stored with zstd but the zstandard package is not installed")
+        with _zstd.ZstdDecompressor().stream_reader(blob) as reader:
+            while len(out) < limit:
+                chunk = reader.read(min(READ_CHUNK, limit - len(out)))
+                if not chunk:
+                    break
+                out += chunk
+        return bytes(out)
+    d = zlib.decompressobj(16 + zlib.MAX_WBITS)  # gzip container
+    pos = 0
+    while len(out) < limit and not d.eof:
+        data = d.unconsumed_tail
+        if not data:
+            data = blob[pos:pos + READ_CHUNK]
+            pos += len(data)
+            if not data:
+                break
+        out += d.decompress(data, limit - len(out))
+    return bytes(out)
+
+
+def result_documents(result: Dict[str, Any]) -> List[Tuple[str, Optional[str], Dict[str, Any]]]:
+    """run_bolt_command dict → ``(target, status, document)`` rows, run-level first."""
+    stdout = result.get("stdout") or ""
+    items = _iter_bolt_result_items(stdout)
+    run: Dict[str, Any] = {
+        "returncode": result.get("returncode"),
+        "stderr": strip_ansi(clean_bolt_console_text(result.get("stderr") or "")),
+    }
+    if not items:
+        run["stdout"] = strip_ansi(clean_bolt_console_text(stdout))
+    docs: List[Tuple[str, Optional[str], Dict[str, Any]]] = [(RUN_TARGET, None, run)]
+    seen = set()
+    for item in items:
+        target = str(item.get("target") or "").strip()[:255]
+        if not target or target in seen:
+            continue
+        seen.add(target)
+        docs.append((target, str(item.get("status") or "")[:20] or None, item))
+    return docs
+
+
+def _encode(
+    docs: Iterable[Tuple[str, Optional[str], Dict[str, Any]]], codec: str, max_bytes: int
+) -> List[Dict[str, Any]]:
+    """Serialise and compress (runs in a worker thread)."""
+    rows: List[Dict[str, Any]] = []
+    total, dropped = 0, 0
+    run_row: Optional[Dict[str, Any]] = None
+    for target, status, doc in docs:
+        if target == RUN_TARGET:
+            run_row = {"target": target, "status": status, "doc": doc}
+            continue
+        raw = json.dumps(doc, ensure_ascii=False).encode("utf-8")
+        if max_bytes and total + len(raw) > max_bytes:
+            dropped += 1
+            continue
+        total += len(raw)
+        rows.append({"target": target, "status": status, "raw": raw})
+    if run_row is not None:
+        doc = dict(run_row["doc"])
+        if dropped:
+            doc["targets_not_stored"] = dropped
+        raw = json.dumps(doc, ensure_ascii=False).encode("utf-8")
+        if max_bytes and len(raw) > max_bytes:
+            # Human-format output can be the whole run; keep its tail
+            for key in ("stdout", "stderr"):
+                if isinstance(doc.get(key), str) and len(doc[key]) > max_bytes // 2:
+                    doc[key] = doc[key][-(max_bytes // 2):]
+                    doc[f"{key}_truncated"] = True
+            raw = json.dumps(doc, ensure_ascii=False).encode("utf-8")
+        rows.insert(0, {"target": RUN_TARGET, "status": None, "raw": raw})
+    for row in rows:
+        raw = row.pop("raw")
+        row["size"] = len(raw)
+        row["data"] = compress(raw, codec)
+        row["stored_size"] = len(row["data"])
+        row["codec"] = codec
+    return rows
+
+
+async def store_results(db: AsyncSession, history_id: int, result: Dict[str, Any]) -> int:
+    """Store ``result`` for a history row (replacing earlier rows); returns rows stored.
+
+    Best-effort, like the history row itself: failures are logged.
+    """
+    if not settings.execution_results_enabled or history_id is None:
+        return 0
+    try:
+        max_bytes = max(0, int(settings.execution_results_max_mb or 0)) * 1024 * 1024
+        rows = await asyncio.to_thread(_encode, result_documents(result), pick_codec(), max_bytes)
+        await db.execute(delete(ExecutionResult).where(ExecutionResult.history_id == history_id))
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        db.add_all(ExecutionResult(history_id=history_id, created_at=now, **row) for row in rows)
+        await db.commit()
+    except Exception as e:
+        logger.warning("execution_results store failed for history %s: %s", history_id, e, exc_info=True)
+        try:
+            await db.rollback()
+        except Exception:
+            pass
+        return 0
+    return len(rows)
+
+
+async def list_results(db: AsyncSession, history_id: int) -> Dict[str, Any]:
+    """Targets stored for a run, without their data."""
+    rows = (
+        await db.execute(
+            select(
+                ExecutionResult.target,
+                ExecutionResult.status,
+                ExecutionResult.size,
+                ExecutionResult.stored_size,
+                ExecutionResult.codec,
+            )
+            .where(ExecutionResult.history_id == history_id)
+            .order_by(ExecutionResult.target)
+        )
+    ).all()
+    run = None
+    targets = []
+    for target, status, size, stored_size, codec in rows:
+        entry = {"target": target, "status": status, "size": size, "stored_size": stored_size, "codec": codec}
+        if target == RUN_TARGET:
+            run = entry
+        else:
+            targets.append(entry)
+    return {
+        "history_id": history_id,
+        "stored": bool(rows),
+        "run": run,
+        "targets": targets,
+        "size": sum(r[2] for r in rows),
+        "stored_size": sum(r[3] for r in rows),
+    }
+
+
+async def read_result(
+    db: AsyncSession, history_id: int, target: str = RUN_TARGET, offset: int = 0, length: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """One target's document; ``offset`` / ``length`` select a byte range of its JSON.
+
+    ``document`` (parsed) is included when the range covers the whole
+    document; otherwise ``content`` is the UTF-8 text of the range.
+    """
+    row = (
+        await db.execute(
+            select(ExecutionResult)
+            .where(ExecutionResult.history_id == history_id)
+            .where(ExecutionResult.target == target)
+        )
+    ).scalar_one_or_none()
+    if row is None:
+        return None
+    offset = max(0, int(offset or 0))
+    stop = None if length is None else offset + max(0, int(length))
+    raw = await asyncio.to_thread(decompress_prefix, row.data, row.codec, stop)
+    total = len(raw) if stop is None or row.size is None else row.size
+    end = min(len(raw), total) if stop is None else min(stop, len(raw))
+    chunk = raw[offset:end]
+    out: Dict[str, Any] = {
+        "history_id": history_id,
+        "target": row.target,
+        "status": row.status,
+        "size": row.size,
+        "offset": offset,
+        "length": len(chunk),
+        "complete": offset == 0 and end >= total,
+    }
+    if out["complete"]:
+        out["document"] = json.loads(raw.decode("utf-8"))
+    else:
+        out["content"] = chunk.decode("utf-8", errors="replace")
+    return out
+
+
+async def delete_results(db: AsyncSession, history_ids: Iterable[int]) -> None:
+    """Drop stored results with their history rows (caller commits)."""
+    ids = list(history_ids)
+    for i in range(0, len(ids), 500):
+        await db.execute(delete(ExecutionResult).where(ExecutionResult.history_id.in_(ids[i : i + 500])))
+
+
+def retention_cutoff() -> Optional[datetime]:
+    """Rows created before this are expired; None = kept with their history row."""
+    days = settings.execution_results_retention_days
+    if not days or days <= 0:
+        return None
+    return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)
@@ -0,0 +1,245 @@
+"""
+Incremental run-phase percentiles (p50/p95/p99) for Run Performance.
+
+Every agent report is folded once into DDSketches keyed by dimension:
+
+- **fleet / producer / environment** — hourly buckets kept for
+  ``RETENTION_HOURS`` so the overview's ``hours`` window is honoured.
+- **node** — two rotating ``NODE_EPOCH_HOURS`` epochs per certname (the
+  node's last 1–2 days of runs). Scoped views merge the node sketches of
+  the hosts in scope, so any location / pack / custom scope gets exact
+  rollups without re-reading reports.
+
+The store also owns the ingest watermark (newest ``receive_time`` seen)
+so callers only fetch reports newer than what has already been folded in.
+
+Per-process only, like utils.ttl_cache. A restart re-fills from the last
+``RETENTION_HOURS`` of reports on the first refresh.
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..utils.quantile_sketch import DDSketch
+
+# Phases sketched per run: PuppetDB "time" metrics plus wall-clock duration.
+PHASES = (
+    "total", "config_retrieval", "fact_generation", "plugin_sync",
+    "catalog_application", "transaction_evaluation", "convert_catalog",
+    "run_duration",
+)
+DIMENSIONS = ("fleet", "producer", "environment")
+
+RETENTION_HOURS = 168
+NODE_EPOCH_HOURS = 24
+
+_Sketches = Dict[str, DDSketch]
+
+
+def _parse_ts(value: Any) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _run_values(run: Dict) -> Dict[str, float]:
+    """Phase → seconds for one processed run (see performance._extract_metrics)."""
+    timing = run.get("timing") or {}
+    out: Dict[str, float] = {}
+    for phase in PHASES:
+        val = run.get("run_duration") if phase == "run_duration" else timing.get(phase)
+        if isinstance(val, (int, float)) and not isinstance(val, bool):
+            out[phase] = float(val)
+    return out
+
+
+def _add(bucket: _Sketches, values: Dict[str, float]) -> None:
+    for phase, v in values.items():
+        sk = bucket.get(phase)
+        if sk is None:
+            sk = bucket[phase] = DDSketch()
+        sk.add(v)
+
+
+def _merge_into(dest: _Sketches, src: _Sketches) -> None:
+    for phase, sk in src.items():
+        cur = dest.get(phase)
+        if cur is None:
+            dest[phase] = sk.copy()
+        else:
+            cur.merge(sk)
+
+
+def summarize(sketches: _Sketches) -> Dict[str, Dict[str, Optional[float]]]:
+    """Phase → {count, p50, p95, p99, mean, max} for an API payload."""
+    return {phase: sk.summary() for phase, sk in sketches.items() if sk.count}
+
+
+class RunSketchStore:
+    """Process-local sketch index over agent runs."""
+
+    def __init__(
+        self,
+        retention_hours: int = RETENTION_HOURS,
+        node_epoch_hours: int = NODE_EPOCH_HOURS,
+    ):
+        self.retention_hours = retention_hours
+        self.node_epoch_hours = node_epoch_hours
+        # hour → (dimension, key) → phase → sketch
+        self._hourly: Dict[int, Dict[Tuple[str, str], _Sketches]] = {}
+        # certname → epoch → phase → sketch (at most two epochs kept)
+        self._nodes: Dict[str, Dict[int, _Sketches]] = {}
+        self.watermark: str = ""
+        self._watermark_hashes: Set[str] = set()
+        self.ingested = 0
+        self.refreshed_at = 0.0
+        # False until a refresh has paged through to the newest report
+        self.caught_up = False
+
+    # ─── Ingest ─────────────────────────────────────────────
+
+    def seen(self, report_hash: str, receive_time: str) -> bool:
+        """True if a report at/below the watermark has already been folded in."""
+        if not receive_time or not self.watermark:
+            return False
+        if receive_time < self.watermark:
+            return True
+        return receive_time == self.watermark and report_hash in self._watermark_hashes
+
+    def ingest(self, run: Dict, receive_time: str = "", now: Optional[float] = None) -> bool:
+        """Fold one processed run into every dimension. Returns False if skipped."""
+        report_hash = str(run.get("hash") or "")
+        if self.seen(report_hash, receive_time):
+            return False
+        now = time.time() if now is None else now
+        ts = _parse_ts(run.get("start_time")) or _parse_ts(receive_time) or now
+        hour = int(ts // 3600)
+        if hour < int(now // 3600) - self.retention_hours:
+            self._advance(report_hash, receive_time)
+            return False
+
+        values = _run_values(run)
+        if values:
+            keys = [("fleet", "*")]
+            producer = str(run.get("producer") or "").strip().lower()
+            if producer:
+                keys.append(("producer", producer))
+            env = str(run.get("environment") or "").strip()
+            if env:
+                keys.append(("environment", env))
+            hourly = self._hourly.setdefault(hour, {})
+            for key in keys:
+                _add(hourly.setdefault(key, {}), values)
+
+            certname = str(run.get("certname") or "").strip().lower()
+            if certname:
+                epoch = int(ts // (self.node_epoch_hours * 3600))
+                epochs = self._nodes.setdefault(certname, {})
+                _add(epochs.setdefault(epoch, {}), values)
+                for old in sorted(epochs)[:-2]:
+                    del epochs[old]
+
+        self._advance(report_hash, receive_time)
+        self.ingested += 1
+        return True
+
+    def _advance(self, report_hash: str, receive_time: str) -> None:
+        if not receive_time:
+            return
+        if receive_time > self.watermark:
+            self.watermark = receive_time
+            self._watermark_hashes = set()
+        if receive_time == self.watermark and report_hash:
+            self._watermark_hashes.add(report_hash)
+
+    def prune(self, now: Optional[float] = None) -> None:
+        """Drop hourly buckets and node epochs that fell out of retention."""
+        now = time.time() if now is None else now
+        floor_hour = int(now // 3600) - self.retention_hours
+        for hour in [h for h in self._hourly if h < floor_hour]:
+            del self._hourly[hour]
+        floor_epoch = int(now // (self.node_epoch_hours * 3600)) - 1
+        for cn in list(self._nodes):
+            epochs = self._nodes[cn]
+            for e in [e for e in epochs if e < floor_epoch]:
+                del epochs[e]
+            if not epochs:
+                del self._nodes[cn]
+
+    # ─── Queries ────────────────────────────────────────────
+
+    def _window(self, hours: float, now: Optional[float]) -> Iterable[Dict[Tuple[str, str], _Sketches]]:
+        now = time.time() if now is None else now
+        first = int((now - float(hours) * 3600) // 3600)
+        return (b for h, b in self._hourly.items() if h >= first)
+
+    def fleet(self, hours: float = RETENTION_HOURS, now: Optional[float] = None) -> _Sketches:
+        out: _Sketches = {}
+        for bucket in self._window(hours, now):
+            sk = bucket.get(("fleet", "*"))
+            if sk:
+                _merge_into(out, sk)
+        return out
+
+    def by_dimension(
+        self, dimension: str, hours: float = RETENTION_HOURS, now: Optional[float] = None
+    ) -> Dict[str, _Sketches]:
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown sketch dimension: {dimension}")
+        out: Dict[str, _Sketches] = {}
+        for bucket in self._window(hours, now):
+            for (dim, key), sk in bucket.items():
+                if dim == dimension:
+                    _merge_into(out.setdefault(key, {}), sk)
+        return out
+
+    def node(self, certname: str) -> _Sketches:
+        out: _Sketches = {}
+        for sk in (self._nodes.get((certname or "").strip().lower()) or {}).values():
+            _merge_into(out, sk)
+        return out
+
+    def nodes(self, certnames: Iterable[str]) -> _Sketches:
+        """Merged sketches for a host set (any fleet scope)."""
+        out: _Sketches = {}
+        for cn in certnames:
+            for sk in (self._nodes.get((cn or "").strip().lower()) or {}).values():
+                _merge_into(out, sk)
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "watermark": self.watermark,
+            "ingested": self.ingested,
+            "hourly_buckets": len(self._hourly),
+            "nodes": len(self._nodes),
+            "refreshed_at": self.refreshed_at,
+            "caught_up": self.caught_up,
+        }
+
+
+def top_groups(groups: Dict[str, _Sketches], limit: int = 25) -> List[Dict[str, Any]]:
+    """Per-group summaries sorted by p95 of ``total`` (slowest first)."""
+    rows: List[Dict[str, Any]] = []
+    for key, sketches in groups.items():
+        summary = summarize(sketches)
+        if not summary:
+            continue
+        rows.append({"key": key, "phases": summary})
+    rows.sort(
+        key=lambda r: (r["phases"].get("total") or {}).get("p95") or 0,
+        reverse=True,
+    )
+    return rows[:limit]
+
+
+# Singleton
+run_sketch_store = RunSketchStore()
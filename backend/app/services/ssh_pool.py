@@ -0,0 +1,260 @@
+"""
+Pooled async SSH for short remote reads on the serving estate.
+
+Remote logs, infra settings sampling and host metrics used to start one
+Bolt process per read (3–5 s of Ruby start-up before the first byte). With
+``OPENVOX_GUI_REMOTE_TRANSPORT=ssh`` those reads go over a persistent
+``asyncssh`` connection per (user, host) instead; each read is one more
+channel on the already-authenticated connection, like OpenSSH ControlMaster.
+
+- at most ``remote_ssh_channels_per_host`` concurrent channels per host
+- connections idle for ``remote_ssh_idle_sec`` are closed on the next use
+  of the pool (or by ``evict_idle``)
+- a dropped connection is re-opened once per call before giving up
+
+``asyncssh`` is optional: without it (or with the default ``bolt``
+transport) ``ssh_enabled()`` is False and callers keep using Bolt. Callers
+also fall back to Bolt when an SSH call fails, so a host that is only
+reachable through Bolt's own inventory config keeps working.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import shlex
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+_Key = Tuple[str, str]  # (user, host)
+
+
+class SSHTransportError(Exception):
+    """The SSH connection could not be opened or was lost mid-call."""
+
+
+def asyncssh_available() -> bool:
+    return importlib.util.find_spec("asyncssh") is not None
+
+
+async def _asyncssh_connect(host: str, **opts: Any):
+    import asyncssh
+
+    return await asyncssh.connect(host, **opts)
+
+
+class _HostConn:
+    __slots__ = ("conn", "channels", "lock", "busy", "last_used")
+
+    def __init__(self, channels: int):
+        self.conn = None
+        self.channels = asyncio.Semaphore(max(1, channels))
+        self.lock = asyncio.Lock()
+        self.busy = 0
+        self.last_used = time.monotonic()
+
+
+def _is_closed(conn) -> bool:
+    check = getattr(conn, "is_closed", None)
+    try:
+        return bool(check()) if callable(check) else False
+    except Exception:
+        return True
+
+
+class SSHPool:
+    """Per-host persistent SSH connections with bounded channels."""
+
+    def __init__(
+        self,
+        *,
+        user: str = "root",
+        port: int = 22,
+        identity_file: Optional[str] = None,
+        known_hosts: Optional[str] = None,
+        channels_per_host: int = 4,
+        idle_sec: float = 300,
+        connect_timeout: float = 10.0,
+        connector: Optional[Callable[..., Awaitable[Any]]] = None,
+    ):
+        self.user = user
+        self.port = port
+        self.identity_file = identity_file
+        self.known_hosts = known_hosts
+        self.channels_per_host = channels_per_host
+        self.idle_sec = idle_sec
+        self.connect_timeout = connect_timeout
+        self._connector = connector or _asyncssh_connect
+        self._hosts: Dict[_Key, _HostConn] = {}
+
+    def _connect_opts(self, user: str) -> Dict[str, Any]:
+        opts: Dict[str, Any] = {"port": self.port, "username": user, "keepalive_interval": 30}
+        if self.identity_file:
+            opts["client_keys"] = [self.identity_file]
+        # Not passing known_hosts keeps asyncssh's default (~/.ssh/known_hosts);
+        # host keys are always verified.
+        if self.known_hosts:
+            opts["known_hosts"] = self.known_hosts
+        return opts
+
+    async def _connection(self, key: _Key, entry: _HostConn):
+        async with entry.lock:
+            if entry.conn is None or _is_closed(entry.conn):
+                user, host = key
+                try:
+                    entry.conn = await asyncio.wait_for(
+                        self._connector(host, **self._connect_opts(user)),
+                        timeout=self.connect_timeout,
+                    )
+                except asyncio.TimeoutError:
+                    raise SSHTransportError(f"SSH connect to {host} timed out after {self.connect_timeout}s") from None
+                except Exception as e:
+                    raise SSHTransportError(f"SSH connect to {host} failed: {e}") from e
+            return entry.conn
+
+    def _drop(self, entry: _HostConn) -> None:
+        conn, entry.conn = entry.conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    async def run(self, host: str, command: str, timeout: float = 60, user: Optional[str] = None) -> Dict[str, Any]:
+        """Run a shell command on ``host``; ``{"returncode", "stdout", "stderr"}``.
+
+        Raises ``SSHTransportError`` when no connection could be (re)established.
+        A command that outlives ``timeout`` returns returncode -1.
+        """
+        self.evict_idle()
+        user = user or self.user
+        key = (user, host.lower())
+        entry = self._hosts.get(key)
+        if entry is None:
+            entry = self._hosts[key] = _HostConn(self.channels_per_host)
+        if user != "root":
+            command = "sudo -n -- sh -c " + shlex.quote(command)
+
+        # Counted before queueing for a channel so eviction never drops an
+        # entry that a waiting call is about to use.
+        entry.busy += 1
+        try:
+            async with entry.channels:
+                for attempt in (0, 1):
+                    conn = await self._connection(key, entry)
+                    try:
+                        res = await asyncio.wait_for(conn.run(command, check=False), timeout=timeout)
+                        break
+                    except asyncio.TimeoutError:
+                        return {"returncode": -1, "stdout": "", "stderr": f"Command timed out after {timeout}s"}
+                    except Exception as e:
+                        # Connection went away under us (sshd restart, idle NAT drop)
+                        self._drop(entry)
+                        if attempt:
+                            raise SSHTransportError(f"SSH to {host} failed: {e}") from e
+        finally:
+            entry.busy -= 1
+            entry.last_used = time.monotonic()
+
+        rc = getattr(res, "exit_status", None)
+        return {
+            "returncode": rc if rc is not None else -1,
+            "stdout": _text(getattr(res, "stdout", "")),
+            "stderr": _text(getattr(res, "stderr", "")),
+        }
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Close connections unused for ``idle_sec``; returns how many were closed."""
+        now = time.monotonic() if now is None else now
+        closed = 0
+        for key, entry in list(self._hosts.items()):
+            if entry.busy or now - entry.last_used < self.idle_sec:
+                continue
+            if entry.conn is not None:
+                self._drop(entry)
+                closed += 1
+            del self._hosts[key]
+        return closed
+
+    async def close(self) -> None:
+        for entry in self._hosts.values():
+            self._drop(entry)
+        self._hosts.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hosts": len(self._hosts),
+            "connections": sum(1 for e in self._hosts.values() if e.conn is not None),
+            "busy": sum(e.busy for e in self._hosts.values()),
+        }
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return str(value or "")
+
+
+# ─── Process-wide pools ─────────────────────────────────────
+
+# One pool per (identity_file, user): transports that share a key share its
+# connections, and ``close_pool`` closes them all at shutdown.
+_pools: Dict[Tuple[Optional[str], str], SSHPool] = {}
+
+
+def ssh_enabled() -> bool:
+    """True when remote reads should try pooled SSH before Bolt."""
+    return (settings.remote_transport or "").strip().lower() == "ssh" and asyncssh_available()
+
+
+def get_pool(identity_file: Optional[str] = None, user: Optional[str] = None) -> SSHPool:
+    """The shared pool for ``(identity_file, user)``; defaults come from settings."""
+    identity_file = identity_file or settings.remote_ssh_identity_file
+    user = user or settings.remote_ssh_user
+    key = (identity_file, user)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = _pools[key] = SSHPool(
+            user=user,
+            port=settings.remote_ssh_port,
+            identity_file=identity_file,
+            known_hosts=settings.remote_ssh_known_hosts,
+            channels_per_host=settings.remote_ssh_channels_per_host,
+            idle_sec=settings.remote_ssh_idle_sec,
+            connect_timeout=settings.remote_ssh_connect_timeout,
+        )
+    return pool
+
+
+async def remote_shell(host: str, command: str, timeout: float = 60) -> Optional[Dict[str, Any]]:
+    """Run ``command`` over the pool; None when SSH is off or the transport failed.
+
+    None means "use Bolt instead" — the caller's existing path.
+    """
+    if not ssh_enabled():
+        return None
+    try:
+        return await get_pool().run(host, command, timeout=timeout)
+    except SSHTransportError as e:
+        logger.info("SSH transport unavailable for %s, falling back to Bolt: %s", host, e)
+        return None
+
+
+def pool_stats() -> Dict[str, int]:
+    totals = {"hosts": 0, "connections": 0, "busy": 0}
+    for pool in list(_pools.values()):
+        for k, v in pool.stats().items():
+            totals[k] = totals.get(k, 0) + v
+    return totals
+
+
+async def close_pool() -> None:
+    """Close every registered pool (app shutdown)."""
+    pools = list(_pools.values())
+    _pools.clear()
+    for pool in pools:
+        await pool.close()
@@ -0,0 +1,318 @@
+"""
+Per-host tiered series with a fleet roll-up (OpenVox Server / OpenVoxDB Health).
+
+``HostSeriesStore`` keeps one ``TieredSeries`` per host over ``fields``, a
+mapping of field → how the fleet view combines hosts at one timestamp
+(``mean``, ``sum`` or ``max``). ``poll`` samples every host with bounded
+parallelism under one shared ``ts``, so the fleet series lines up; a failed
+host leaves a gap and an error, the others still land.
+
+Series are saved (raw ring included) as ``<data_dir>/<subdir>/<host>.tiers``
+so history survives a restart without re-polling; hosts that leave the
+configuration are dropped with their files.
+
+Under ``uvicorn --workers N`` one worker per host polls and saves: the one
+holding ``WorkerLock(subdir)`` (``lead``). After each poll it ``publish``es
+the newest raw points, errors and subclass state to ``<subdir>/live.json``;
+the other workers ``follow`` that file into their own series, so every
+worker answers from the same data without polling or writing.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional
+
+from .tiered_series import TieredSeries, configured_tiers
+from .worker_lock import WorkerLock
+
+logger = logging.getLogger(__name__)
+
+Sampler = Callable[[str, float], Awaitable[Optional[Mapping[str, Any]]]]
+
+LIVE_POINTS = 6  # raw points per host in live.json (a follower may miss a read)
+
+
+def _combine(how: str, vals: List[float]) -> float:
+    if how == "sum":
+        return round(sum(vals), 3)
+    if how == "max":
+        return max(vals)
+    return round(sum(vals) / len(vals), 3)
+
+
+def _stamp(point: Dict[str, Any]) -> Dict[str, Any]:
+    point["time"] = datetime.fromtimestamp(point["ts"]).strftime("%H:%M:%S")
+    return point
+
+
+class HostSeriesStore:
+    """One multi-resolution series per host plus errors and persistence."""
+
+    def __init__(
+        self,
+        fields: Mapping[str, str],
+        subdir: str,
+        raw_max: int = 360,
+        interval_sec: int = 10,
+        data_dir: Optional[str] = None,
+    ):
+        self.fields = dict(fields)
+        self.subdir = subdir
+        self.raw_max = raw_max
+        self.interval_sec = interval_sec
+        self._data_dir = data_dir
+        self._series: Dict[str, TieredSeries] = {}
+        self._errors: Dict[str, str] = {}
+        self._loaded = False
+        self._leader = WorkerLock(subdir, lock_dir=str(Path(data_dir) / "locks") if data_dir else None)
+        self._live_mtime = 0
+
+    def _new_series(self) -> TieredSeries:
+        return TieredSeries(tuple(self.fields), configured_tiers(self.raw_max))
+
+    # ─── Samples ────────────────────────────────────────────
+
+    def record(self, host: str, point: Mapping[str, Any], ts: Optional[float] = None) -> None:
+        host = host.lower()
+        series = self._series.get(host)
+        if series is None:
+            series = self._series[host] = self._new_series()
+        series.add(time.time() if ts is None else ts, point)
+        self._errors.pop(host, None)
+
+    def set_error(self, host: str, message: str) -> None:
+        self._errors[host.lower()] = message
+
+    def errors(self) -> Dict[str, str]:
+        return dict(self._errors)
+
+    def hosts(self) -> List[str]:
+        return sorted(self._series)
+
+    def sample_count(self, raw: bool = False) -> int:
+        """Rows held in memory (``raw``: the raw rings only)."""
+        if raw:
+            return sum(len(s) for s in self._series.values())
+        return sum(s.sample_count() for s in self._series.values())
+
+    async def poll(
+        self,
+        hosts: List[str],
+        sample: Sampler,
+        concurrency: int = 4,
+        timeout: float = 20.0,
+    ) -> None:
+        """``sample(host, ts)`` for every host, at most ``concurrency`` at once.
+
+        All points of one call share ``ts``. A point is recorded when ``sample`` returns one; None records
+        nothing, an exception (or timeout) records the host's error.
+        """
+        ts = time.time()
+        sem = asyncio.Semaphore(max(1, concurrency))
+
+        async def _one(host: str) -> None:
+            async with sem:
+                try:
+                    point = await asyncio.wait_for(sample(host, ts), timeout=timeout)
+                except Exception as e:
+                    self.set_error(host, str(e) or type(e).__name__)
+                    logger.debug("%s poll %s failed: %s", self.subdir, host, e)
+                    return
+            if point is not None:
+                self.record(host, point, ts)
+
+        await asyncio.gather(*(_one(h) for h in hosts))
+
+    def retain(self, hosts: List[str], unlink: bool = True) -> List[str]:
+        """Forget hosts that left the configuration (and their files); returns them."""
+        keep = {h.lower() for h in hosts}
+        gone = [h for h in self._series if h not in keep]
+        for host in gone:
+            del self._series[host]
+            self._errors.pop(host, None)
+            path = self._path(host) if unlink else None
+            if path is not None:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+        return gone
+
+    # ─── One collector per host ─────────────────────────────
+
+    @property
+    def leader(self) -> bool:
+        return self._leader.held
+
+    def lead(self) -> bool:
+        """True when this worker polls and saves (holds the lock, already or now)."""
+        return self._leader.acquire()
+
+    def release(self) -> None:
+        self._leader.release()
+
+    def _live_extra(self) -> Dict[str, Any]:
+        """Subclass state published with the points (JSON-serialisable)."""
+        return {}
+
+    def _adopt_extra(self, extra: Dict[str, Any]) -> None:
+        pass
+
+    def publish(self) -> None:
+        """Leader: write the newest raw points, errors and extra state for followers."""
+        d = self._dir()
+        if d is None:
+            return
+        now = time.time()
+        window = self.interval_sec * LIVE_POINTS
+        doc = {
+            "ts": now,
+            "points": {
+                h: s.query(window, now, tier=0)["points"][-LIVE_POINTS:] for h, s in self._series.items()
+            },
+            "errors": self._errors,
+            "extra": self._live_extra(),
+        }
+        path = d / "live.json"
+        tmp = path.with_name(f"live.json.{os.getpid()}.tmp")
+        try:
+            d.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(doc, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.debug("%s publish failed: %s", self.subdir, e)
+
+    def follow(self) -> bool:
+        """Follower: record the leader's points newer than ours; True if the file changed."""
+        d = self._dir()
+        if d is None:
+            return False
+        path = d / "live.json"
+        try:
+            mtime = path.stat().st_mtime_ns
+            if mtime == self._live_mtime:
+                return False
+            doc = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        self._live_mtime = mtime
+        points = doc.get("points") or {}
+        for host, rows in points.items():
+            series = self._series.get(host)
+            last = series.last_ts() if series is not None else None
+            for p in rows:
+                if last is None or p["ts"] > last:
+                    self.record(host, {k: v for k, v in p.items() if k != "ts"}, p["ts"])
+        self.retain(list(points), unlink=False)
+        self._errors = dict(doc.get("errors") or {})
+        self._adopt_extra(doc.get("extra") or {})
+        return True
+
+    # ─── Queries ────────────────────────────────────────────
+
+    def _fleet(self, by_ts: Dict[float, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        fleet: List[Dict[str, Any]] = []
+        for ts in sorted(by_ts):
+            row: Dict[str, Any] = {"ts": ts}
+            for name, how in self.fields.items():
+                vals = [p[name] for p in by_ts[ts] if p.get(name) is not None and not math.isnan(p[name])]
+                row[name] = _combine(how, vals) if vals else None
+            fleet.append(_stamp(row))
+        return fleet
+
+    def raw_points(self, host: str) -> List[Dict[str, Any]]:
+        """One host's raw ring (newest last)."""
+        series = self._series.get(host.lower())
+        if series is None:
+            return []
+        return [_stamp(p) for p in series.query(math.inf, time.time(), tier=0)["points"]]
+
+    def fleet_raw(self, hosts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Per-tick fleet roll-up of the raw rings."""
+        by_ts: Dict[float, List[Dict[str, Any]]] = {}
+        for host in hosts or self.hosts():
+            for p in self.raw_points(host):
+                by_ts.setdefault(p["ts"], []).append(p)
+        return self._fleet(by_ts)[-self.raw_max:]
+
+    def history(
+        self,
+        window_sec: float,
+        hosts: Optional[List[str]] = None,
+        now: Optional[float] = None,
+        stat: str = "avg",
+    ) -> Dict[str, Any]:
+        """Per-host points and the fleet roll-up for ``window_sec``.
+
+        One tier is used for all hosts so their timestamps line up: raw
+        points share the poll tick, rollups share bucket starts.
+        """
+        now = time.time() if now is None else now
+        hosts = [h.lower() for h in (hosts or self.hosts())]
+        present = [self._series[h] for h in hosts if h in self._series]
+        tier = min((s.pick_tier(window_sec) for s in present), default=0)
+        step = next((s.tiers[tier][0] for s in present), 0)
+
+        per_host: List[Dict[str, Any]] = []
+        by_ts: Dict[float, List[Dict[str, Any]]] = {}
+        for h in hosts:
+            series = self._series.get(h)
+            points = series.query(window_sec, now, tier=tier, stat=stat)["points"] if series else []
+            for p in points:
+                by_ts.setdefault(p["ts"], []).append(_stamp(p))
+            per_host.append({"host": h, "error": self._errors.get(h), "points": points})
+        return {
+            "window_sec": window_sec,
+            "tier": tier,
+            "step_sec": step or self.interval_sec,
+            "hosts": per_host,
+            "fleet": self._fleet(by_ts),
+        }
+
+    # ─── Persistence ────────────────────────────────────────
+
+    def _dir(self) -> Optional[Path]:
+        if self._data_dir is not None:
+            base = self._data_dir
+        else:
+            from ..config import settings
+
+            base = settings.data_dir
+        return Path(base) / self.subdir if base else None
+
+    def _path(self, host: str) -> Optional[Path]:
+        d = self._dir()
+        return d / f"{host.replace('/', '_')}.tiers" if d is not None else None
+
+    def save(self) -> None:
+        for host, series in list(self._series.items()):
+            path = self._path(host)
+            if path is None:
+                return
+            try:
+                series.save(path, raw=True)
+            except Exception as e:
+                logger.debug("%s save %s failed: %s", self.subdir, host, e)
+
+    def load(self) -> None:
+        """Restore saved series once per process."""
+        if self._loaded:
+            return
+        self._loaded = True
+        d = self._dir()
+        if d is None or not d.is_dir():
+            return
+        for f in d.glob("*.tiers"):
+            series = self._new_series()
+            try:
+                if series.load(f):
+                    self._series.setdefault(f.stem.lower(), series)
+            except Exception as e:
+                logger.debug("%s load %s failed: %s", self.subdir, f.name, e)
@@ -0,0 +1,142 @@
+"""
+Learned JSON paths for documents whose layout varies by product version.
+
+Puppet Server's status document moves fields around between releases, so
+the health snapshot used to search the whole tree recursively for every
+field on every sample. ``LearnedPaths`` remembers where a recursive search
+found each field (per schema key, e.g. host + server version) and replays
+that path directly afterwards. A path that stops resolving triggers one
+fresh search; fields that were absent are remembered as absent and only
+re-searched every ``relearn_every`` samples.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+PathKey = Union[str, int]
+Path = Tuple[PathKey, ...]
+
+MISSING = object()
+_ABSENT = ()  # cached "searched, not there"; the empty path is never a field
+
+
+def get_path(obj: Any, path: Sequence[PathKey]) -> Any:
+    """Walk ``path`` (dict keys / list indices); ``MISSING`` if it breaks."""
+    cur = obj
+    for step in path:
+        if isinstance(step, int) and isinstance(cur, list):
+            if step >= len(cur):
+                return MISSING
+            cur = cur[step]
+        elif isinstance(cur, dict) and step in cur:
+            cur = cur[step]
+        else:
+            return MISSING
+    return cur
+
+
+def find_key_path(obj: Any, keys: Iterable[str], _prefix: Path = ()) -> Optional[Path]:
+    """Path to the first non-None value under any of ``keys`` (dicts only, depth-first).
+
+    Same visiting order as the old recursive ``_find_key``: direct keys of a
+    dict first, then its values.
+    """
+    if not isinstance(obj, dict):
+        return None
+    keys = tuple(keys)
+    for k in keys:
+        if k in obj and obj[k] is not None:
+            return _prefix + (k,)
+    for k, v in obj.items():
+        found = find_key_path(v, keys, _prefix + (k,))
+        if found is not None:
+            return found
+    return None
+
+
+def find_section_path(obj: Any, name: str, _prefix: Path = ()) -> Optional[Path]:
+    """Path to the first dict/list stored under ``name`` (walks dicts and lists)."""
+    if isinstance(obj, dict):
+        if name in obj and isinstance(obj[name], (list, dict)):
+            return _prefix + (name,)
+        for k, v in obj.items():
+            found = find_section_path(v, name, _prefix + (k,))
+            if found is not None:
+                return found
+    elif isinstance(obj, list):
+        for i, item in enumerate(obj):
+            found = find_section_path(item, name, _prefix + (i,))
+            if found is not None:
+                return found
+    return None
+
+
+def find_list_paths(obj: Any, names: Sequence[str], _prefix: Path = (), _out: Optional[List[Path]] = None) -> List[Path]:
+    """Paths to every list stored under any of ``names``, anywhere in the tree."""
+    out: List[Path] = [] if _out is None else _out
+    if isinstance(obj, dict):
+        for key in names:
+            if key in obj and isinstance(obj[key], list):
+                out.append(_prefix + (key,))
+        for k, v in obj.items():
+            find_list_paths(v, names, _prefix + (k,), out)
+    elif isinstance(obj, list):
+        for i, item in enumerate(obj):
+            find_list_paths(item, names, _prefix + (i,), out)
+    return out
+
+
+class LearnedPaths:
+    """Per-schema cache of where each field lives in a document."""
+
+    def __init__(self, relearn_every: int = 60):
+        self.relearn_every = relearn_every
+        self._paths: Dict[Tuple[str, str], Any] = {}
+        self._samples: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def begin(self, schema: str) -> None:
+        """Count one document; periodically forget cached absences."""
+        n = self._samples.get(schema, 0) + 1
+        self._samples[schema] = n
+        if n % self.relearn_every == 0:
+            for key in [k for k, v in self._paths.items() if k[0] == schema and v == _ABSENT]:
+                del self._paths[key]
+
+    def find(self, schema: str, field: str, root: Any, search: Callable[[Any], Optional[Path]]) -> Any:
+        """Value of ``field`` in ``root`` via the learned path, else ``search``."""
+        key = (schema, field)
+        path = self._paths.get(key)
+        if path is not None:
+            if path == _ABSENT:
+                self.hits += 1
+                return None
+            val = get_path(root, path)
+            if val is not MISSING and val is not None:
+                self.hits += 1
+                return val
+        self.misses += 1
+        path = search(root)
+        self._paths[key] = path if path else _ABSENT
+        if not path:
+            return None
+        val = get_path(root, path)
+        return None if val is MISSING else val
+
+    def find_all(self, schema: str, field: str, root: Any, search: Callable[[Any], List[Path]]) -> List[Any]:
+        """Like ``find`` for fields that occur at several paths (all must resolve)."""
+        key = (schema, field)
+        paths = self._paths.get(key)
+        if paths is not None:
+            vals = [get_path(root, p) for p in paths]
+            if all(v is not MISSING for v in vals):
+                self.hits += 1
+                return vals
+        self.misses += 1
+        paths = tuple(search(root))
+        self._paths[key] = paths
+        return [v for v in (get_path(root, p) for p in paths) if v is not MISSING]
+
+    def stats(self) -> Dict[str, int]:
+        return {"schemas": len(self._samples), "paths": len(self._paths), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,173 @@
+"""
+Mergeable quantile sketch (DDSketch-style, relative-error log buckets).
+
+Used where we need p50/p95/p99 over a stream of durations without keeping
+the raw samples: Puppet run phases per node / compiler / environment.
+
+Notes:
+- Each value lands in bucket ``ceil(log(v) / log(gamma))``; the estimate
+  returned for a bucket is within ``relative_accuracy`` of every value in
+  it. Two sketches with the same accuracy merge by adding bucket counts,
+  so per-node sketches roll up into any scope exactly.
+- Bucket count is capped (``max_bins``); the lowest buckets collapse first
+  so tail quantiles (p95/p99) keep their accuracy.
+- Values <= 0 (missing phases, clock skew) count in a dedicated zero bucket.
+"""
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, Optional
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_MAX_BINS = 512
+_MIN_INDEXABLE = 1e-9
+
+
+class DDSketch:
+    """Streaming quantile sketch with bounded relative error."""
+
+    __slots__ = (
+        "relative_accuracy", "max_bins", "_gamma", "_log_gamma",
+        "bins", "zero_count", "count", "sum", "min", "max",
+    )
+
+    def __init__(
+        self,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        max_bins: int = DEFAULT_MAX_BINS,
+    ):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max(16, int(max_bins))
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value: float) -> int:
+        return int(math.ceil(math.log(value) / self._log_gamma))
+
+    def _value(self, index: int) -> float:
+        return 2.0 * self._gamma ** index / (self._gamma + 1)
+
+    def add(self, value: float, weight: int = 1) -> None:
+        if value is None or weight <= 0:
+            return
+        v = float(value)
+        if math.isnan(v):
+            return
+        if v <= _MIN_INDEXABLE:
+            self.zero_count += weight
+        else:
+            idx = self._index(v)
+            self.bins[idx] = self.bins.get(idx, 0) + weight
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+        self.count += weight
+        self.sum += v * weight
+        self.min = min(self.min, v)
+        self.max = max(self.max, v)
+
+    def extend(self, values: Iterable[float]) -> None:
+        for v in values:
+            self.add(v)
+
+    def _collapse(self) -> None:
+        """Fold the lowest buckets together until we are back under max_bins."""
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_bins
+        if excess <= 0:
+            return
+        target = keys[excess]
+        folded = sum(self.bins.pop(k) for k in keys[:excess])
+        self.bins[target] = self.bins.get(target, 0) + folded
+
+    def merge(self, other: "DDSketch") -> "DDSketch":
+        """Add *other* into this sketch in place (same accuracy required)."""
+        if other is None or other.count == 0:
+            return self
+        if abs(other._gamma - self._gamma) > 1e-12:
+            raise ValueError("cannot merge sketches with different relative accuracy")
+        for idx, n in other.bins.items():
+            self.bins[idx] = self.bins.get(idx, 0) + n
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def copy(self) -> "DDSketch":
+        out = DDSketch(self.relative_accuracy, self.max_bins)
+        return out.merge(self)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile *q* (0..1), or None when empty."""
+        if self.count == 0:
+            return None
+        q = min(max(float(q), 0.0), 1.0)
+        if q == 0.0:
+            return self.min
+        if q == 1.0:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(0.0, self.min)
+        for idx in sorted(self.bins):
+            seen += self.bins[idx]
+            if rank < seen:
+                return min(max(self._value(idx), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def summary(self, digits: int = 2) -> Dict[str, Optional[float]]:
+        """p50/p95/p99 (+ count/mean/max) rounded for API payloads."""
+        def _r(v: Optional[float]) -> Optional[float]:
+            return round(v, digits) if v is not None else None
+
+        return {
+            "count": self.count,
+            "p50": _r(self.quantile(0.50)),
+            "p95": _r(self.quantile(0.95)),
+            "p99": _r(self.quantile(0.99)),
+            "mean": _r(self.mean),
+            "max": _r(self.max) if self.count else None,
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_bins": self.max_bins,
+            "bins": {str(k): v for k, v in self.bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DDSketch":
+        sk = cls(
+            float(data.get("relative_accuracy") or DEFAULT_RELATIVE_ACCURACY),
+            int(data.get("max_bins") or DEFAULT_MAX_BINS),
+        )
+        sk.bins = {int(k): int(v) for k, v in (data.get("bins") or {}).items()}
+        sk.zero_count = int(data.get("zero_count") or 0)
+        sk.count = int(data.get("count") or 0)
+        sk.sum = float(data.get("sum") or 0.0)
+        if sk.count:
+            sk.min = float(data.get("min") if data.get("min") is not None else 0.0)
+            sk.max = float(data.get("max") if data.get("max") is not None else 0.0)
+        return sk
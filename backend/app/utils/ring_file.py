@@ -0,0 +1,167 @@
+"""
+Fixed-record binary ring file (append-only, memory-mapped).
+
+Layout::
+
+    header  (512 bytes)  magic, field count, capacity, head slot, row count,
+                         then the comma-separated field names (NUL padded)
+    slots   capacity × record, record = little-endian doubles (NaN = missing)
+
+``append`` packs one record into the next slot and bumps ``head``/``count``
+in the header — a few dozen bytes touched per sample instead of rewriting
+the whole history. Loading is one mmap plus ``struct.iter_unpack`` over the
+two contiguous halves of the ring.
+
+A file whose field list or capacity no longer matches is re-created,
+keeping the rows it can map by field name.
+
+One process writes a ring file. Other processes ``read`` it: a plain read
+of the bytes, no mapping, never a re-create.
+"""
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+MAGIC = b"OVRING1\0"
+HEADER_SIZE = 512
+_HEAD = struct.Struct("<8sIIII")  # magic, nfields, capacity, head, count
+_NAMES_MAX = HEADER_SIZE - _HEAD.size
+
+Row = Tuple[float, ...]
+
+
+def nan_if_none(value) -> float:
+    if value is None or isinstance(value, bool) or not isinstance(value, (int, float)):
+        return math.nan
+    return float(value)
+
+
+class RingFile:
+    """One host's ring of ``fields`` rows, ``capacity`` slots, backed by ``path``."""
+
+    def __init__(self, path: Path, fields: Sequence[str], capacity: int):
+        self.path = Path(path)
+        self.fields = tuple(fields)
+        self.capacity = int(capacity)
+        names = ",".join(self.fields).encode()
+        if len(names) > _NAMES_MAX:
+            raise ValueError("too many ring fields for the header")
+        self._names = names
+        self._rec = struct.Struct(f"<{len(self.fields)}d")
+        self._fh = None
+        self._mm: Optional[mmap.mmap] = None
+        self._head = 0
+        self._count = 0
+
+    @property
+    def size(self) -> int:
+        return HEADER_SIZE + self.capacity * self._rec.size
+
+    # ─── Open / load ────────────────────────────────────────
+
+    def open(self) -> List[Row]:
+        """Map the file (creating or migrating it) and return its rows, oldest first."""
+        rows = self._read_existing()
+        if rows is None:
+            rows = self.read()
+            self._create(rows[-self.capacity:])
+        return rows[-self.capacity:]
+
+    def _read_existing(self) -> Optional[List[Row]]:
+        if not self.path.exists() or self.path.stat().st_size != self.size:
+            return None
+        fh = open(self.path, "r+b")
+        mm = mmap.mmap(fh.fileno(), self.size)
+        magic, nfields, cap, head, count = _HEAD.unpack_from(mm, 0)
+        names = bytes(mm[_HEAD.size:HEADER_SIZE]).rstrip(b"\0")
+        if magic != MAGIC or nfields != len(self.fields) or cap != self.capacity or names != self._names:
+            mm.close()
+            fh.close()
+            return None
+        self._fh, self._mm = fh, mm
+        self._head, self._count = head % cap, min(count, cap)
+        return self._rows()
+
+    def read(self) -> List[Row]:
+        """Rows on disk, oldest first, matched up by field name; read-only."""
+        try:
+            raw = self.path.read_bytes()
+        except OSError:
+            return []
+        if len(raw) < HEADER_SIZE or not raw.startswith(MAGIC):
+            return []
+        _, nfields, cap, head, count = _HEAD.unpack_from(raw, 0)
+        names = raw[_HEAD.size:HEADER_SIZE].rstrip(b"\0").decode(errors="replace").split(",")
+        rec = struct.Struct(f"<{nfields}d")
+        if len(names) != nfields or len(raw) < HEADER_SIZE + cap * rec.size or not cap:
+            return []
+        count = min(count, cap)
+        start = (head - count) % cap
+        index = [names.index(f) if f in names else -1 for f in self.fields]
+        out: List[Row] = []
+        for i in range(count):
+            vals = rec.unpack_from(raw, HEADER_SIZE + ((start + i) % cap) * rec.size)
+            out.append(tuple(vals[j] if j >= 0 else math.nan for j in index))
+        return out
+
+    def _create(self, rows: Sequence[Row]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f"{self.path.suffix}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as fh:
+            header = _HEAD.pack(MAGIC, len(self.fields), self.capacity, len(rows) % self.capacity, len(rows))
+            fh.write(header + self._names.ljust(_NAMES_MAX, b"\0"))
+            fh.write(b"".join(self._rec.pack(*r) for r in rows))
+            fh.truncate(self.size)
+        os.replace(tmp, self.path)
+        self._fh = open(self.path, "r+b")
+        self._mm = mmap.mmap(self._fh.fileno(), self.size)
+        self._head, self._count = len(rows) % self.capacity, len(rows)
+
+    def _rows(self) -> List[Row]:
+        mm, rec, cap = self._mm, self._rec, self.capacity
+        start = (self._head - self._count) % cap
+        first = min(self._count, cap - start)
+        view = memoryview(mm)
+        try:
+            a = HEADER_SIZE + start * rec.size
+            rows = list(rec.iter_unpack(view[a:a + first * rec.size]))
+            rest = self._count - first
+            if rest:
+                rows += list(rec.iter_unpack(view[HEADER_SIZE:HEADER_SIZE + rest * rec.size]))
+        finally:
+            view.release()
+        return rows
+
+    # ─── Append / close ─────────────────────────────────────
+
+    def append(self, row: Row) -> None:
+        if self._mm is None:
+            self.open()
+        self._rec.pack_into(self._mm, HEADER_SIZE + self._head * self._rec.size, *row)
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        _HEAD.pack_into(self._mm, 0, MAGIC, len(self.fields), self.capacity, self._head, self._count)
+
+    def rows(self) -> List[Row]:
+        return self._rows() if self._mm is not None else []
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm.close()
+            self._mm = None
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def unlink(self) -> None:
+        self.close()
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
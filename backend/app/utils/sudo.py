@@ -25,25 +25,46 @@ import logging
 import os
 import pty
 import shlex
+import signal
 import termios
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .upstream_metrics import observe
 
 logger = logging.getLogger(__name__)
 
 # util-linux script path on RHEL/Rocky/Alma/Ubuntu AIO hosts
 _SCRIPT_BIN = "/usr/bin/script"
 
+# sudo options that take a value (skipped when naming the command for metrics)
+_SUDO_VALUE_OPTS = {"-u", "-g", "-C", "-D", "-h", "-p", "-r", "-t", "-U"}
+
+
+def command_label(cmd: List[str]) -> str:
+    """Basename of the program sudo runs: ``sudo -E -u bolt /opt/.../bolt`` → ``bolt``."""
+    i = 0
+    if cmd and os.path.basename(cmd[0]) == "sudo":
+        i = 1
+        while i < len(cmd) and cmd[i].startswith("-"):
+            if cmd[i] == "--":
+                i += 1
+                break
+            i += 2 if cmd[i] in _SUDO_VALUE_OPTS else 1
+    return os.path.basename(cmd[i]) if i < len(cmd) else "sudo"
+
 
 async def run_sudo(
     cmd: List[str],
     timeout: int = 30,
     env: Optional[dict] = None,
+    on_line: Optional[Callable[[str], None]] = None,
 ) -> Dict[str, object]:
     """Run a command (typically prefixed with ``sudo``) with a pseudo-TTY.
 
     Returns a dict with ``returncode``, ``stdout``, and ``stderr`` keys.
     Never raises into FastAPI — unexpected failures are logged and
-    returned as a non-zero result.
+    returned as a non-zero result. ``on_line`` is called with each stdout
+    line as it arrives (live Bolt output); the full stdout is still returned.
     """
     if not cmd:
         return {"returncode": -1, "stdout": "", "stderr": "Empty command"}
@@ -51,22 +72,81 @@ async def run_sudo(
     if env is None:
         env = os.environ.copy()
 
-    if os.path.isfile(_SCRIPT_BIN):
-        result = await _run_via_script(cmd, timeout=timeout, env=env)
-        if result is not None:
-            return result
-        logger.warning(
-            "script(1) runner failed to start; falling back to manual PTY for %s",
-            cmd[:3],
-        )
+    async with observe("sudo", command_label(cmd)) as obs:
+        result = None
+        if os.path.isfile(_SCRIPT_BIN):
+            result = await _run_via_script(cmd, timeout=timeout, env=env, on_line=on_line)
+            if result is None:
+                logger.warning(
+                    "script(1) runner failed to start; falling back to manual PTY for %s",
+                    cmd[:3],
+                )
+        if result is None:
+            result = await _run_via_pty(cmd, timeout=timeout, env=env, on_line=on_line)
+        obs.exit(result)
+    return result
+
+
+async def _communicate(
+    proc: asyncio.subprocess.Process,
+    on_line: Optional[Callable[[str], None]],
+) -> Tuple[bytes, bytes]:
+    """``proc.communicate()``, feeding stdout lines to ``on_line`` as they arrive.
+
+    Reads fixed-size chunks rather than ``readline`` so one huge line (a
+    Bolt JSON document) cannot overrun the StreamReader limit.
+    """
+    if on_line is None:
+        return await proc.communicate()
+    out = bytearray()
+    pending = b""
 
-    return await _run_via_pty(cmd, timeout=timeout, env=env)
+    def _emit(raw: bytes) -> None:
+        try:
+            on_line(raw.decode("utf-8", errors="replace").rstrip("\r"))
+        except Exception as e:  # a broken subscriber must not break the run
+            logger.debug("on_line callback failed: %s", e)
+
+    async def _stdout() -> None:
+        nonlocal pending
+        while True:
+            chunk = await proc.stdout.read(65536)
+            if not chunk:
+                break
+            out.extend(chunk)
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for raw in lines:
+                _emit(raw)
+        if pending:
+            _emit(pending)
+
+    _, err, _ = await asyncio.gather(_stdout(), proc.stderr.read(), proc.wait())
+    return bytes(out), err
+
+
+def _terminate(proc, group: bool = False) -> None:
+    """Stop a child that timed out or whose caller was cancelled (job cancel, shutdown).
+
+    sudo relays SIGTERM to the command it runs; ``group`` signals the whole
+    session for the PTY path, which starts one.
+    """
+    if proc is None or proc.returncode is not None:
+        return
+    try:
+        if group:
+            os.killpg(proc.pid, signal.SIGTERM)
+        else:
+            proc.terminate()
+    except (ProcessLookupError, PermissionError, OSError) as e:
+        logger.warning("Could not terminate cancelled command (pid %s): %s", proc.pid, e)
 
 
 async def _run_via_script(
     cmd: List[str],
     timeout: int,
     env: dict,
+    on_line: Optional[Callable[[str], None]] = None,
 ) -> Optional[Dict[str, object]]:
     """Run argv under util-linux script for a controlling terminal.
 
@@ -77,6 +157,7 @@ async def _run_via_script(
     # -e / --return: propagate child exit code (util-linux). Without it,
     # script often exits 0 even when sudo/r10k failed.
     wrapped_cmd = [_SCRIPT_BIN, "-q", "-e", "-c", shlex.join(cmd), "/dev/null"]
+    proc = None
     try:
         proc = await asyncio.create_subprocess_exec(
             *wrapped_cmd,
@@ -84,7 +165,7 @@ async def _run_via_script(
             stderr=asyncio.subprocess.PIPE,
             env=env,
         )
-        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        stdout, stderr = await asyncio.wait_for(_communicate(proc, on_line), timeout=timeout)
         return {
             "returncode": proc.returncode,
             "stdout": stdout.decode("utf-8", errors="replace"),
@@ -92,7 +173,11 @@ async def _run_via_script(
         }
     except asyncio.TimeoutError:
         logger.error("Command timed out after %ss: %s", timeout, cmd[:6])
+        _terminate(proc)
         return {"returncode": -1, "stdout": "", "stderr": "Command timed out"}
+    except asyncio.CancelledError:
+        _terminate(proc)
+        raise
     except FileNotFoundError:
         # script vanished between exists check and exec
         return None
@@ -114,9 +199,11 @@ async def _run_via_pty(
     cmd: List[str],
     timeout: int,
     env: dict,
+    on_line: Optional[Callable[[str], None]] = None,
 ) -> Dict[str, object]:
     """Manual PTY fallback when script(1) is unavailable."""
     master_fd, slave_fd = pty.openpty()
+    proc = None
     try:
 
         def preexec() -> None:
@@ -143,7 +230,7 @@ async def _run_via_pty(
         os.close(slave_fd)
         slave_fd = -1
 
-        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        stdout, stderr = await asyncio.wait_for(_communicate(proc, on_line), timeout=timeout)
         return {
             "returncode": proc.returncode,
             "stdout": stdout.decode("utf-8", errors="replace"),
@@ -151,7 +238,11 @@ async def _run_via_pty(
         }
     except asyncio.TimeoutError:
         logger.error("Command timed out after %ss: %s", timeout, cmd[:6])
+        _terminate(proc, group=True)
         return {"returncode": -1, "stdout": "", "stderr": "Command timed out"}
+    except asyncio.CancelledError:
+        _terminate(proc, group=True)
+        raise
     except (OSError, ValueError) as e:
         logger.error("Error running via PTY %s: %s", cmd[0:3], e, exc_info=True)
         return {"returncode": -1, "stdout": "", "stderr": str(e)}
@@ -0,0 +1,261 @@
+"""
+Multi-resolution in-memory time series (raw → 1m → 10m style rollups).
+
+Each tier is a fixed-size ring. The finest tier keeps every sample; coarser
+tiers keep one row per ``step`` seconds holding min/avg/max/last of the
+samples that fell into that step. A query picks the finest tier whose
+retention still covers the requested window, so a 7-day chart reads ~1000
+rollup rows instead of 60 000 raw points.
+
+Rows are float tuples (NaN = missing) to keep long horizons cheap; they are
+turned into dicts only at query time. ``save``/``load`` persist the rollup
+tiers (optionally the raw tier too) as packed doubles so a 30-day view
+survives restarts; raw samples replayed after ``load`` only re-open the
+current buckets, they never duplicate a rollup row that was already saved.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import struct
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+_NAN = float("nan")
+
+# (step seconds, ring length). Step 0 = raw samples.
+DEFAULT_TIERS: Tuple[Tuple[int, int], ...] = ((0, 360), (60, 1440), (600, 1008))
+
+STATS = ("min", "avg", "max", "last")
+
+_MAGIC = b"OVTS1\n"
+
+
+def rollup_tiers(raw_len: int, horizons: Sequence[Tuple[int, float]]) -> Tuple[Tuple[int, int], ...]:
+    """Tier spec from ``(step seconds, horizon seconds)`` pairs; horizon ≤ 0 drops the tier."""
+    tiers = [(0, int(raw_len))]
+    for step, horizon in horizons:
+        n = int(horizon // step) if step > 0 else 0
+        if n > 0:
+            tiers.append((int(step), n))
+    return tuple(tiers)
+
+
+def configured_tiers(raw_len: int) -> Tuple[Tuple[int, int], ...]:
+    """Raw ring plus the 1m / 10m / 1h rollups sized from settings."""
+    from ..config import settings
+
+    return rollup_tiers(raw_len, (
+        (60, settings.metrics_rollup_1m_hours * 3600),
+        (600, settings.metrics_rollup_10m_days * 86400),
+        (3600, settings.metrics_rollup_1h_days * 86400),
+    ))
+
+
+def _num(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return _NAN
+    return float(value)
+
+
+class _Bucket:
+    __slots__ = ("start", "n", "sum", "min", "max", "last")
+
+    def __init__(self, start: float, width: int):
+        self.start = start
+        self.n = [0] * width
+        self.sum = [0.0] * width
+        self.min = [math.inf] * width
+        self.max = [-math.inf] * width
+        self.last = [_NAN] * width
+
+    def add(self, values: Sequence[float]) -> None:
+        for i, v in enumerate(values):
+            if math.isnan(v):
+                continue
+            self.n[i] += 1
+            self.sum[i] += v
+            if v < self.min[i]:
+                self.min[i] = v
+            if v > self.max[i]:
+                self.max[i] = v
+            self.last[i] = v
+
+    def row(self) -> Tuple[float, ...]:
+        """(start, then min/avg/max/last per field; NaN where no samples)."""
+        out: List[float] = [self.start]
+        for i, n in enumerate(self.n):
+            if n:
+                out.extend((self.min[i], self.sum[i] / n, self.max[i], self.last[i]))
+            else:
+                out.extend((_NAN, _NAN, _NAN, _NAN))
+        return tuple(out)
+
+
+class TieredSeries:
+    """One host's (or one stream's) multi-resolution series over ``fields``."""
+
+    def __init__(self, fields: Sequence[str], tiers: Sequence[Tuple[int, int]] = DEFAULT_TIERS):
+        if not tiers or tiers[0][0] != 0:
+            raise ValueError("first tier must be the raw tier (step 0)")
+        self.fields = tuple(fields)
+        self.tiers = tuple((int(s), int(n)) for s, n in tiers)
+        self._rings: List[Deque[Tuple[float, ...]]] = [deque(maxlen=n) for _, n in self.tiers]
+        self._open: List[Optional[_Bucket]] = [None] * len(self.tiers)
+
+    def add(self, ts: float, values: Union[Mapping[str, Any], Sequence[float]]) -> None:
+        """One sample: a dict by field name, or a tuple already in ``fields`` order."""
+        if isinstance(values, Mapping):
+            vals = tuple(_num(values.get(f)) for f in self.fields)
+        else:
+            vals = tuple(_num(v) for v in values)
+        self._rings[0].append((float(ts),) + vals)
+        self._roll(ts, vals)
+
+    def _roll(self, ts: float, vals: Tuple[float, ...]) -> None:
+        for i, (step, _) in enumerate(self.tiers[1:], start=1):
+            start = ts - ts % step
+            ring = self._rings[i]
+            if ring and start <= ring[-1][0]:
+                continue  # bucket already closed (replay after load, clock step back)
+            bucket = self._open[i]
+            if bucket is not None and bucket.start != start:
+                self._rings[i].append(bucket.row())
+                bucket = None
+            if bucket is None:
+                bucket = self._open[i] = _Bucket(start, len(self.fields))
+            bucket.add(vals)
+
+    def __len__(self) -> int:
+        return len(self._rings[0])
+
+    def sample_count(self) -> int:
+        return sum(len(r) for r in self._rings)
+
+    def last_ts(self) -> Optional[float]:
+        """Timestamp of the newest raw sample (None when empty)."""
+        ring = self._rings[0]
+        return ring[-1][0] if ring else None
+
+    # ─── Persistence ────────────────────────────────────────
+
+    def save(self, path: Path, raw: bool = False) -> None:
+        """Write closed rollup rows (and the raw ring if ``raw``) atomically."""
+        path = Path(path)
+        keep = [i for i in range(len(self.tiers)) if i or raw]
+        header = {
+            "fields": list(self.fields),
+            "tiers": [[self.tiers[i][0], len(self._rings[i])] for i in keep],
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(_MAGIC + json.dumps(header, separators=(",", ":")).encode() + b"\n")
+            for i in keep:
+                rec = struct.Struct(f"<{len(self._rings[i][0]) if self._rings[i] else 0}d")
+                fh.write(b"".join(rec.pack(*row) for row in self._rings[i]))
+        os.replace(tmp, path)
+
+    def load(self, path: Path) -> bool:
+        """Restore tiers saved by ``save``; columns are matched by field name, tiers by step."""
+        try:
+            raw = Path(path).read_bytes()
+        except OSError:
+            return False
+        if not raw.startswith(_MAGIC):
+            return False
+        nl = raw.index(b"\n", len(_MAGIC))
+        header = json.loads(raw[len(_MAGIC):nl])
+        stored = list(header.get("fields") or [])
+        index = [stored.index(f) if f in stored else -1 for f in self.fields]
+        by_step = {step: i for i, (step, _) in enumerate(self.tiers)}
+        offset = nl + 1
+        for step, count in header.get("tiers") or []:
+            per = 1 + len(stored) * (4 if step else 1)
+            rec = struct.Struct(f"<{per}d")
+            body = raw[offset:offset + count * rec.size]
+            offset += count * rec.size
+            i = by_step.get(step)
+            if i is None:
+                continue
+            ring = self._rings[i]
+            ring.clear()
+            for vals in rec.iter_unpack(body):
+                row: List[float] = [vals[0]]
+                for j in index:
+                    if step == 0:
+                        row.append(vals[1 + j] if j >= 0 else _NAN)
+                    else:
+                        row.extend(vals[1 + 4 * j:5 + 4 * j] if j >= 0 else (_NAN,) * 4)
+                ring.append(tuple(row))
+        # Open buckets are not saved; rebuild them from a restored raw ring
+        self._open = [None] * len(self.tiers)
+        for row in self._rings[0]:
+            self._roll(row[0], row[1:])
+        return True
+
+    # ─── Queries ────────────────────────────────────────────
+
+    def horizon(self, tier: int) -> int:
+        """Seconds a tier retains (raw tier: estimated from its own spacing)."""
+        step, n = self.tiers[tier]
+        if step:
+            return step * n
+        ring = self._rings[0]
+        if len(ring) < 2:
+            return 0
+        spacing = (ring[-1][0] - ring[0][0]) / (len(ring) - 1)
+        return int(spacing * n)
+
+    def pick_tier(self, window_sec: float) -> int:
+        """Finest tier whose retention covers ``window_sec``; else the coarsest."""
+        for i in range(len(self.tiers)):
+            if self.horizon(i) >= window_sec:
+                return i
+        return len(self.tiers) - 1
+
+    def rows(self, tier: int, since: Optional[float] = None) -> Iterable[Tuple[float, ...]]:
+        ring: Iterable[Tuple[float, ...]] = self._rings[tier]
+        if tier and self._open[tier] is not None:
+            ring = list(ring) + [self._open[tier].row()]
+        if since is None:
+            return ring
+        return [r for r in ring if r[0] >= since]
+
+    def query(
+        self,
+        window_sec: float,
+        now: float,
+        tier: Optional[int] = None,
+        stat: str = "avg",
+        bounds: bool = False,
+    ) -> Dict[str, Any]:
+        """Points for ``[now - window_sec, now]`` from the best tier.
+
+        Rollup tiers report ``stat`` (min/avg/max/last) under the field name;
+        ``bounds`` also adds ``<field>_min`` / ``<field>_max`` for bands.
+        """
+        if stat not in STATS:
+            raise ValueError(f"Unknown stat: {stat}")
+        t = self.pick_tier(window_sec) if tier is None else max(0, min(tier, len(self.tiers) - 1))
+        step = self.tiers[t][0]
+        k = STATS.index(stat)
+        points: List[Dict[str, Any]] = []
+        for row in self.rows(t, since=now - window_sec):
+            p: Dict[str, Any] = {"ts": row[0]}
+            for i, name in enumerate(self.fields):
+                if step == 0:
+                    v = row[1 + i]
+                    p[name] = None if math.isnan(v) else v
+                    continue
+                base = 1 + 4 * i
+                v = row[base + k]
+                p[name] = None if math.isnan(v) else round(v, 3)
+                if bounds:
+                    lo, hi = row[base], row[base + 2]
+                    p[f"{name}_min"] = None if math.isnan(lo) else lo
+                    p[f"{name}_max"] = None if math.isnan(hi) else hi
+            points.append(p)
+        return {"tier": t, "step": step, "points": points}
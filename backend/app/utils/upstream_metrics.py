@@ -0,0 +1,469 @@
+"""
+Latency histograms and SLOs for upstream calls (PuppetDB, Puppet Server, CA,
+Bolt, sudo).
+
+"Is the GUI slow, or is PuppetDB slow?" — every upstream call is timed here
+and exported on ``/metrics`` and ``/api/insights/upstream-latency``:
+
+- ``observe(dependency, endpoint, host)`` times one call and records its
+  outcome (``ok``, ``http_4xx``, ``http_5xx``, ``exit_nonzero``, ``timeout``,
+  ``error``) plus an in-flight gauge per dependency. The outermost block
+  owns the call: a nested ``observe`` (``run_sudo`` inside the Bolt wrapper)
+  records nothing, so one Bolt run is not also counted against sudo
+- ``InstrumentedTransport`` wraps ``httpx.AsyncHTTPTransport`` so every
+  request on a shared client is observed; for streamed responses the time is
+  to response headers. Long-lived pools register for utilisation reporting
+  (active / idle / max connections, requests waiting for a connection)
+- a per-minute ring (last hour) of DDSketches per dependency gives window
+  p50/p95/p99 and SLO compliance (share of calls that succeeded within the
+  dependency's latency threshold)
+
+Label cardinality is bounded: endpoint paths are normalised (certnames,
+hashes and ids become ``:id``, PQL becomes ``pql:<entity>``), at most
+``MAX_HOSTS`` hosts and ``MAX_SERIES`` histogram series are kept per
+dependency and anything beyond lands in ``other``.
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+from .quantile_sketch import DDSketch
+
+# Prometheus histogram buckets (seconds): sub-10ms PuppetDB reads up to
+# multi-minute Bolt plans.
+BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0,
+)
+
+# dependency → (latency threshold seconds, target % of calls good within it)
+SLO_TARGETS: Dict[str, Tuple[float, float]] = {
+    "puppetdb": (1.0, 99.0),
+    "puppetserver": (1.0, 99.0),
+    "ca": (2.0, 99.0),
+    "bolt": (60.0, 95.0),
+    "sudo": (10.0, 99.0),
+}
+DEPENDENCIES = tuple(SLO_TARGETS)
+
+MAX_HOSTS = 32
+MAX_SERIES = 200
+RING_MINUTES = 60
+OTHER = "other"
+
+_ID_AFTER = {
+    "nodes", "reports", "catalogs", "factsets", "facts", "fact-contents", "edges",
+    "certificate", "certificate_status", "certificate_request", "certificate_revocation_list",
+    "certificate_statuses", "environment", "environments", "catalog", "node", "file_metadata",
+    "file_content", "file_metadatas", "resource_type", "resource_types", "mbeans",
+}
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{16,}|.*[.@:].*)$", re.I)
+_PQL_ENTITY = re.compile(r"^\s*([a-z][a-z_-]{0,31})")
+_MAX_SEGMENTS = 6
+
+
+def endpoint_label(path: str, query: Optional[str] = None) -> str:
+    """Bounded endpoint label: ``/pdb/query/v4/nodes/:id/facts``, ``pql:reports``."""
+    path = (path or "/").split("?", 1)[0]
+    segments = [s for s in path.split("/") if s]
+    if query is not None and segments[-3:] == ["pdb", "query", "v4"] and len(segments) == 3:
+        m = _PQL_ENTITY.match(query)
+        return f"pql:{m.group(1)}" if m else "pql"
+    out: List[str] = []
+    prev = ""
+    for seg in segments[:_MAX_SEGMENTS]:
+        out.append(":id" if prev in _ID_AFTER or _ID_SEGMENT.match(seg) else seg)
+        prev = seg
+    if len(segments) > _MAX_SEGMENTS:
+        out.append("…")
+    return "/" + "/".join(out)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def add(self, seconds: float) -> None:
+        i = 0
+        while i < len(BUCKETS) and seconds > BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+class _Minute:
+    __slots__ = ("minute", "sketch", "total", "good", "errors")
+
+    def __init__(self, minute: int):
+        self.minute = minute
+        self.sketch = DDSketch()
+        self.total = 0
+        self.good = 0
+        self.errors = 0
+
+
+class _Dependency:
+    def __init__(self, name: str):
+        self.name = name
+        self.in_flight = 0
+        self.hosts: Dict[str, None] = {}
+        self.series: Dict[Tuple[str, str, str], _Histogram] = {}
+        self.dropped = 0
+        self.minutes: Deque[_Minute] = deque(maxlen=RING_MINUTES)
+
+    def host_label(self, host: Optional[str]) -> str:
+        host = (host or "").lower()
+        if host in self.hosts or not host:
+            return host
+        if len(self.hosts) >= MAX_HOSTS:
+            return OTHER
+        self.hosts[host] = None
+        return host
+
+    def series_for(self, endpoint: str, host: str, outcome: str) -> _Histogram:
+        key = (endpoint, host, outcome)
+        hist = self.series.get(key)
+        if hist is None:
+            if len(self.series) >= MAX_SERIES:
+                self.dropped += 1
+                key = (OTHER, OTHER, outcome)
+                hist = self.series.get(key)
+            if hist is None:
+                hist = self.series[key] = _Histogram()
+        return hist
+
+    def minute_slot(self, now: float) -> _Minute:
+        minute = int(now // 60)
+        if not self.minutes or self.minutes[-1].minute != minute:
+            self.minutes.append(_Minute(minute))
+        return self.minutes[-1]
+
+
+class UpstreamMetrics:
+    """Process-wide registry of upstream call timings."""
+
+    def __init__(self):
+        self._deps: Dict[str, _Dependency] = {}
+        self._pools: "weakref.WeakSet[InstrumentedTransport]" = weakref.WeakSet()
+
+    def _dep(self, name: str) -> _Dependency:
+        dep = self._deps.get(name)
+        if dep is None:
+            dep = self._deps[name] = _Dependency(name)
+        return dep
+
+    def record(
+        self,
+        dependency: str,
+        endpoint: str,
+        host: Optional[str],
+        outcome: str,
+        seconds: float,
+        now: Optional[float] = None,
+    ) -> None:
+        dep = self._dep(dependency)
+        dep.series_for(endpoint, dep.host_label(host), outcome).add(seconds)
+        slot = dep.minute_slot(time.time() if now is None else now)
+        slot.sketch.add(seconds)
+        slot.total += 1
+        if outcome != "ok":
+            slot.errors += 1
+        elif seconds <= SLO_TARGETS.get(dependency, (float("inf"), 0.0))[0]:
+            slot.good += 1
+
+    def register_pool(self, transport: "InstrumentedTransport") -> None:
+        self._pools.add(transport)
+
+    def reset(self) -> None:
+        self._deps.clear()
+        self._pools = weakref.WeakSet()
+
+    # ─── Readers ────────────────────────────────────────────
+
+    def pool_stats(self) -> List[Dict[str, Any]]:
+        rows = []
+        for transport in list(self._pools):
+            stats = transport.pool_stats()
+            if stats is not None:
+                rows.append(stats)
+        rows.sort(key=lambda r: (r["dependency"], r["host"]))
+        return rows
+
+    def summary(self, window_sec: int = 900, now: Optional[float] = None) -> Dict[str, Any]:
+        """Window p50/p95/p99, error rate and SLO compliance per dependency."""
+        now = time.time() if now is None else now
+        first_minute = int((now - window_sec) // 60) + 1
+        pools = self.pool_stats()
+        out = []
+        for name in list(DEPENDENCIES) + sorted(set(self._deps) - set(DEPENDENCIES)):
+            dep = self._deps.get(name)
+            threshold, target = SLO_TARGETS.get(name, (None, None))
+            sketch = DDSketch()
+            total = good = errors = 0
+            for slot in list(dep.minutes) if dep else []:
+                if slot.minute >= first_minute:
+                    sketch.merge(slot.sketch)
+                    total += slot.total
+                    good += slot.good
+                    errors += slot.errors
+            compliance = round(100.0 * good / total, 2) if total else None
+            budget = None
+            if compliance is not None and target is not None and target < 100:
+                # Share of the window's error budget still unspent
+                budget = round(max(0.0, 100.0 * (1 - (100.0 - compliance) / (100.0 - target))), 1)
+            endpoints: Dict[str, Dict[str, Any]] = {}
+            for (endpoint, _host, outcome), hist in (dep.series.items() if dep else []):
+                row = endpoints.setdefault(endpoint, {"endpoint": endpoint, "count": 0, "errors": 0, "sum": 0.0})
+                row["count"] += hist.count
+                row["sum"] += hist.sum
+                if outcome != "ok":
+                    row["errors"] += hist.count
+            top = sorted(endpoints.values(), key=lambda r: -r["sum"])[:8]
+            for row in top:
+                row["mean_ms"] = round(1000 * row.pop("sum") / row["count"], 1) if row["count"] else None
+            out.append({
+                "dependency": name,
+                "count": total,
+                "errors": errors,
+                "error_rate_pct": round(100.0 * errors / total, 2) if total else None,
+                "p50_ms": _ms(sketch.quantile(0.5)),
+                "p95_ms": _ms(sketch.quantile(0.95)),
+                "p99_ms": _ms(sketch.quantile(0.99)),
+                "in_flight": dep.in_flight if dep else 0,
+                "slo": {
+                    "threshold_ms": threshold * 1000 if threshold is not None else None,
+                    "target_pct": target,
+                    "compliance_pct": compliance,
+                    "error_budget_remaining_pct": budget,
+                },
+                "pools": [p for p in pools if p["dependency"] == name],
+                "top_endpoints": top,
+                "series_dropped": dep.dropped if dep else 0,
+            })
+        return {"window_sec": window_sec, "dependencies": out}
+
+    def render_prometheus(self) -> List[str]:
+        lines: List[str] = []
+        name = "openvox_gui_upstream_request_duration_seconds"
+        lines.append(f"# HELP {name} Upstream call latency by dependency, endpoint, host and outcome")
+        lines.append(f"# TYPE {name} histogram")
+        for dep_name, dep in sorted(self._deps.items()):
+            for (endpoint, host, outcome), hist in sorted(dep.series.items()):
+                labels = (
+                    f'dependency="{_escape(dep_name)}",endpoint="{_escape(endpoint)}",'
+                    f'host="{_escape(host)}",outcome="{outcome}"'
+                )
+                cumulative = 0
+                for bound, n in zip(BUCKETS, hist.counts):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+                lines.append(f"{name}_sum{{{labels}}} {hist.sum:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+        lines.append("# HELP openvox_gui_upstream_in_flight Upstream calls currently in progress")
+        lines.append("# TYPE openvox_gui_upstream_in_flight gauge")
+        for dep_name in sorted(set(DEPENDENCIES) | set(self._deps)):
+            dep = self._deps.get(dep_name)
+            lines.append(f'openvox_gui_upstream_in_flight{{dependency="{dep_name}"}} {dep.in_flight if dep else 0}')
+
+        lines.append("# HELP openvox_gui_upstream_series_dropped_total Observations folded into endpoint=\"other\" (series cap)")
+        lines.append("# TYPE openvox_gui_upstream_series_dropped_total counter")
+        for dep_name, dep in sorted(self._deps.items()):
+            lines.append(f'openvox_gui_upstream_series_dropped_total{{dependency="{dep_name}"}} {dep.dropped}')
+
+        lines.append("# HELP openvox_gui_upstream_slo_compliance_ratio Calls ok within the SLO threshold, last hour")
+        lines.append("# TYPE openvox_gui_upstream_slo_compliance_ratio gauge")
+        for row in self.summary(RING_MINUTES * 60)["dependencies"]:
+            pct = row["slo"]["compliance_pct"]
+            if pct is not None:
+                lines.append(f'openvox_gui_upstream_slo_compliance_ratio{{dependency="{row["dependency"]}"}} {pct / 100:.4f}')
+
+        pools = self.pool_stats()
+        for metric, key, help_text in (
+            ("openvox_gui_upstream_pool_connections_active", "active", "httpx pool connections serving a request"),
+            ("openvox_gui_upstream_pool_connections_idle", "idle", "httpx pool keep-alive connections"),
+            ("openvox_gui_upstream_pool_connections_max", "max", "httpx pool max_connections"),
+            ("openvox_gui_upstream_pool_requests_waiting", "waiting", "Requests queued for an httpx pool connection"),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for p in pools:
+                if p.get(key) is not None:
+                    lines.append(
+                        f'{metric}{{dependency="{p["dependency"]}",host="{_escape(p["host"])}"}} {p[key]}'
+                    )
+        return lines
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+upstream_metrics = UpstreamMetrics()
+
+
+# ─── Instrumentation ────────────────────────────────────────
+
+
+class Observation:
+    """Outcome holder for one ``observe`` block."""
+
+    __slots__ = ("outcome",)
+
+    def __init__(self):
+        self.outcome = "ok"
+
+    def status(self, code: int) -> None:
+        if code >= 500:
+            self.outcome = "http_5xx"
+        elif code >= 400:
+            self.outcome = "http_4xx"
+        elif code <= 0:
+            self.outcome = "error"
+        else:
+            self.outcome = "ok"
+
+    def exit(self, result: Dict[str, Any]) -> None:
+        """Outcome from a ``run_sudo``-style result dict."""
+        rc = result.get("returncode")
+        if rc == 0:
+            self.outcome = "ok"
+        elif rc == -1 and "timed out" in str(result.get("stderr") or "").lower():
+            self.outcome = "timeout"
+        elif rc == -1:
+            self.outcome = "error"
+        else:
+            self.outcome = "exit_nonzero"
+
+
+# Dependency of the observation enclosing the current task, if any
+_outer: ContextVar[Optional[str]] = ContextVar("upstream_observation", default=None)
+
+
+@asynccontextmanager
+async def observe(
+    dependency: str,
+    endpoint: str,
+    host: Optional[str] = None,
+    registry: Optional[UpstreamMetrics] = None,
+) -> AsyncIterator[Observation]:
+    """Time the block; exceptions are recorded as ``timeout`` / ``error`` and re-raised.
+
+    Cancelled calls (hedged probes, client disconnects) and blocks nested
+    in another observation are not recorded.
+    """
+    if _outer.get() is not None:
+        yield Observation()
+        return
+    reg = registry or upstream_metrics
+    dep = reg._dep(dependency)
+    obs = Observation()
+    token = _outer.set(dependency)
+    dep.in_flight += 1
+    start = time.monotonic()
+    try:
+        yield obs
+    except asyncio.CancelledError:
+        obs = None  # type: ignore[assignment]
+        raise
+    except (httpx.TimeoutException, asyncio.TimeoutError):
+        obs.outcome = "timeout"
+        raise
+    except Exception:
+        obs.outcome = "error"
+        raise
+    finally:
+        _outer.reset(token)
+        dep.in_flight -= 1
+        if obs is not None:
+            reg.record(dependency, endpoint, host, obs.outcome, time.monotonic() - start)
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """``httpx.AsyncHTTPTransport`` that observes every request.
+
+    Pass it as ``transport=`` with the ``verify`` / ``limits`` that used to
+    go on the client. ``track_pool`` registers the pool for utilisation
+    gauges (shared clients only; per-call clients would just be noise).
+    """
+
+    def __init__(
+        self,
+        dependency: str,
+        *,
+        inner: Optional[httpx.AsyncBaseTransport] = None,
+        host: Optional[str] = None,
+        track_pool: bool = True,
+        registry: Optional[UpstreamMetrics] = None,
+        **transport_kwargs: Any,
+    ):
+        self.dependency = dependency
+        self.host = host
+        self._registry = registry or upstream_metrics
+        self._inner = inner or httpx.AsyncHTTPTransport(**transport_kwargs)
+        limits = transport_kwargs.get("limits")
+        self._max_connections = getattr(limits, "max_connections", None) if limits else 100
+        if track_pool:
+            self._registry.register_pool(self)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        query = request.url.params.get("query") if request.url.params else None
+        endpoint = endpoint_label(request.url.path, query)
+        async with observe(self.dependency, endpoint, request.url.host, self._registry) as obs:
+            resp = await self._inner.handle_async_request(request)
+            obs.status(resp.status_code)
+            return resp
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+    def pool_stats(self) -> Optional[Dict[str, Any]]:
+        """Active / idle / max / waiting from the httpcore pool (None once closed).
+
+        httpx keeps the pool private, so every attribute is read with a
+        fallback: a version that renames one reports None (``waiting``) or
+        no stats at all instead of raising into ``/metrics``.
+        """
+        pool = getattr(self._inner, "_pool", None)
+        conns = getattr(pool, "connections", None)
+        if pool is None or conns is None:
+            return None
+        try:
+            conns = list(conns)
+            idle = sum(1 for c in conns if getattr(c, "is_idle", lambda: False)())
+            requests = getattr(pool, "_requests", None)
+            waiting = (
+                sum(1 for r in list(requests) if getattr(r, "connection", None) is None)
+                if requests is not None else None
+            )
+        except Exception:
+            return None
+        max_conns = self._max_connections
+        active = len(conns) - idle
+        return {
+            "dependency": self.dependency,
+            "host": self.host or "",
+            "active": active,
+            "idle": idle,
+            "max": max_conns,
+            "waiting": waiting,
+            "utilisation_pct": round(100.0 * active / max_conns, 1) if max_conns else None,
+        }
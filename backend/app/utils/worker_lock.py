@@ -0,0 +1,73 @@
+"""
+One-per-host leadership for background loops under ``uvicorn --workers N``.
+
+Every worker runs the app lifespan, so a schedule started there runs once
+per worker. ``WorkerLock`` is a non-blocking ``flock`` on
+``<data_dir>/locks/<name>.lock``: the worker that holds it does the work,
+the others call ``acquire`` again on their own schedule and take over when
+the holder exits (the kernel drops the lock with the process).
+
+Per host only: consoles of a cluster each hold their own lock.
+"""
+from __future__ import annotations
+
+import fcntl
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerLock:
+    """Non-blocking, process-lifetime exclusive lock file."""
+
+    def __init__(self, name: str, lock_dir: Optional[str] = None):
+        self.name = name
+        self._lock_dir = lock_dir
+        self._fd: Optional[int] = None
+
+    @property
+    def path(self) -> Path:
+        if self._lock_dir is not None:
+            base = Path(self._lock_dir)
+        else:
+            from ..config import settings
+
+            base = Path(settings.data_dir) / "locks"
+        return base / f"{self.name}.lock"
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """True when this process holds the lock (already, or now)."""
+        if self._fd is not None:
+            return True
+        path = self.path
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            # No writable data_dir (tests, read-only installs): run unguarded
+            logger.debug("Worker lock %s unavailable (%s); running without it", self.name, e)
+            return True
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
@@ -0,0 +1,53 @@
+"""Bolt task/plan/inventory cache: fingerprint, hits, single-flight loads, invalidation."""
+import asyncio
+import json
+from pathlib import Path
+
+from app.services.bolt_catalog import BoltCatalogCache, fingerprint, modulepath
+
+
+def test_fingerprint_follows_project_and_modulepath(tmp_path):
+    (tmp_path / "bolt-project.yaml").write_text("name: openvox\nmodulepath:\n  - modules\n  - /nonexistent/mods\n")
+    (tmp_path / "modules" / "ntp").mkdir(parents=True)
+    assert modulepath(tmp_path) == [tmp_path / "modules", Path("/nonexistent/mods"), tmp_path / ".modules"]
+
+    before = fingerprint("tasks", tmp_path)
+    assert fingerprint("tasks", tmp_path) == before
+    (tmp_path / "modules" / "ntp" / "tasks").mkdir()
+    after_task = fingerprint("tasks", tmp_path)
+    assert after_task != before
+    (tmp_path / "modules" / "ssh").mkdir()
+    assert fingerprint("tasks", tmp_path) != after_task
+
+
+def test_cache_hits_until_fingerprint_changes_or_invalidated():
+    calls = []
+    fp = {"value": "a"}
+
+    async def runner(args):
+        calls.append(args[0])
+        await asyncio.sleep(0.01)
+        if args[0] == "plan":
+            return {"returncode": 1, "stdout": "", "stderr": "bolt broke"}
+        return {"returncode": 0, "stdout": json.dumps([{"name": "facts"}]), "stderr": ""}
+
+    cache = BoltCatalogCache(runner=runner, fingerprint_fn=lambda kind: fp["value"])
+
+    async def scenario():
+        first = await asyncio.gather(*(cache.get("tasks") for _ in range(5)))
+        assert all(r == {"tasks": [{"name": "facts"}]} for r in first)
+        await cache.get("tasks")
+        assert calls == ["task"]  # five concurrent opens, one Bolt process
+        fp["value"] = "b"
+        await cache.get("tasks")
+        cache.invalidate("test")
+        await cache.get("tasks")
+        await cache.get("tasks", refresh=True)
+        # errors are returned but not cached
+        assert (await cache.get("plans"))["error"] == "bolt broke"
+        await cache.get("plans")
+
+    asyncio.run(scenario())
+    assert calls == ["task", "task", "task", "task", "plan", "plan"]
+    assert cache.hits == 5 and cache.misses == 6
+    assert cache.stats()["invalidated_by"] == "test"
@@ -0,0 +1,65 @@
+"""Bolt fan-out: chunking, bounded parallelism, timeouts and the merged JSON result."""
+import asyncio
+import json
+
+from app.services import bolt_fanout
+from app.services.bolt_orchestration import _iter_bolt_result_items, sanitize_bolt_result
+
+
+def _doc(targets, status="success"):
+    return json.dumps({"items": [
+        {"target": t, "status": status, "value": {"stdout": f"hi from {t}", "exit_code": 0}} for t in targets
+    ]})
+
+
+def test_salvage_items_from_truncated_document():
+    text = '{ "items": [\n{"target": "a", "status": "success", "value": {}},\n{"target": "b", "status": "fail'
+    assert [i["target"] for i in bolt_fanout.salvage_items(text)] == ["a"]
+    assert bolt_fanout.salvage_items(_doc(["x"]))[0]["target"] == "x"
+    assert bolt_fanout.salvage_items("Bolt blew up") == []
+    assert bolt_fanout.chunk_targets(list("abcde"), 2) == [["a", "b"], ["c", "d"], ["e"]]
+
+
+def test_fanout_bounds_parallelism_and_merges_results():
+    targets = [f"web{i:02d}" for i in range(10)]
+    active, peak, chunks = 0, 0, []
+
+    async def runner(args, timeout, on_line=None):
+        nonlocal active, peak
+        chunk = args[args.index("--targets") + 1].split(",")
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        if "web09" in chunk:
+            # hung target: Bolt printed web08 before the chunk timed out
+            on_line('{ "items": [')
+            on_line('{"target": "web08", "status": "success", "value": {"exit_code": 0}},')
+            return {"returncode": -1, "stdout": "", "stderr": "Command timed out"}
+        if "web04" in chunk:
+            items = json.loads(_doc(chunk[:1]))["items"] + json.loads(_doc(chunk[1:], "failure"))["items"]
+            return {"returncode": 2, "stdout": json.dumps({"items": items}), "stderr": ""}
+        return {"returncode": 0, "stdout": _doc(chunk), "stderr": ""}
+
+    result = asyncio.run(bolt_fanout.run_fanout(
+        lambda chunk: ["command", "run", "uptime", "--targets", ",".join(chunk), "--format", "json"],
+        targets,
+        target_timeout=60,
+        chunk_size=2,
+        parallel=2,
+        on_chunk=lambda summary, items: chunks.append(summary),
+        runner=runner,
+    ))
+
+    assert peak == 2
+    assert sorted(c["chunk"] for c in chunks) == [1, 2, 3, 4, 5]
+    assert [c["chunks_done"] for c in chunks] == [1, 2, 3, 4, 5]
+    items = {i["target"]: i for i in _iter_bolt_result_items(result["stdout"])}
+    assert list(items) == targets
+    assert items["web08"]["status"] == "success"
+    assert items["web09"]["value"]["_error"]["kind"] == bolt_fanout.TIMEOUT_KIND
+    assert items["web05"]["status"] == "failure"
+    assert result["returncode"] == 2
+    assert json.loads(result["stdout"])["fanout"]["timed_out"] == ["web09"]
+    assert "1 target(s) returned no result within 60s" in result["stderr"]
+    assert "web09" in sanitize_bolt_result(result).error
@@ -0,0 +1,48 @@
+"""Bolt file upload: chunked staging with SHA-256 and the remote checksum pre-check."""
+import asyncio
+import hashlib
+import io
+import json
+from unittest.mock import patch
+
+from fastapi import UploadFile
+
+from app.routers import bolt_files
+
+
+def test_stage_upload_streams_in_chunks_and_hashes(tmp_path):
+    payload = b"x" * (bolt_files.UPLOAD_CHUNK_BYTES * 2 + 123)
+    reads = []
+
+    class Spy(io.BytesIO):
+        def read(self, n=-1):
+            reads.append(n)
+            return super().read(n)
+
+    upload = UploadFile(file=Spy(payload), filename="../../etc/app.tar")
+    dest = tmp_path / "app.tar"
+    size, digest = asyncio.run(bolt_files._stage_upload(upload, dest))
+    assert size == len(payload) and dest.read_bytes() == payload
+    assert digest == hashlib.sha256(payload).hexdigest()
+    assert reads and all(n == bolt_files.UPLOAD_CHUNK_BYTES for n in reads)
+
+
+def test_checksum_precheck_returns_identical_targets():
+    sha = hashlib.sha256(b"config").hexdigest()
+    seen = {}
+
+    async def fake_bolt(args, timeout=120, on_line=None):
+        seen["args"] = args
+        return {"returncode": 0, "stderr": "", "stdout": json.dumps({"items": [
+            {"target": "web01", "status": "success", "value": {"stdout": f"{sha}  /etc/app/app.conf\n"}},
+            {"target": "web02", "status": "success", "value": {"stdout": f"{'0' * 64}  /etc/app/app.conf\n"}},
+            {"target": "web03", "status": "success", "value": {"stdout": ""}},
+        ]})}
+
+    with patch.object(bolt_files, "run_bolt_command", fake_bolt):
+        same = asyncio.run(bolt_files._targets_with_checksum("web01,web02,web03", "/etc/app", "app.conf", sha))
+    assert same == {"web01"}
+    assert seen["args"][:2] == ["command", "run"] and "sha256sum" in seen["args"][2]
+    assert bolt_files._remote_sha256_command("/tmp/a b", "x;y") == (
+        "f='/tmp/a b'; [ -d \"$f\" ] && f=\"$f\"/'x;y'; sha256sum \"$f\" 2>/dev/null || true"
+    )
@@ -0,0 +1,153 @@
+"""Live Bolt output: incremental stdout reads and per-run SSE event buffers."""
+import asyncio
+import json
+
+import pytest
+
+from app.services.bolt_stream import BoltStreamRegistry
+from app.utils.sudo import run_sudo
+
+
+def test_run_sudo_feeds_lines_as_they_arrive():
+    seen = []
+
+    async def scenario():
+        return await run_sudo(
+            ["sh", "-c", "echo 'Started on web01...'; sleep 0.2; echo 'Finished on web01:'; printf tail"],
+            timeout=10,
+            on_line=seen.append,
+        )
+
+    result = asyncio.run(scenario())
+    assert result["returncode"] == 0
+    assert [line for line in seen if line] == ["Started on web01...", "Finished on web01:", "tail"]
+    assert "Finished on web01:" in result["stdout"]
+
+
+def test_stream_replays_and_reports_targets():
+    reg = BoltStreamRegistry()
+    stream = reg.create("alice", "command", "run-0001")
+    with pytest.raises(ValueError):
+        reg.create("bob", "command", "run-0001")
+    with pytest.raises(ValueError):
+        reg.create("bob", "command", "bad id!")
+
+    stream.line("\x1b[32mStarted on web01...\x1b[0m")
+    stream.line("Failed on web02: The command failed with exit code 2")
+    stdout = json.dumps({"items": [
+        {"target": "web01", "status": "success", "value": {"exit_code": 0}},
+        {"target": "web02", "status": "failure", "value": {"exit_code": 2}},
+    ]})
+    stream.finish({"returncode": 2, "output": "", "error": ""}, stdout)
+
+    async def collect(after=0):
+        return [ev async for ev in stream.follow(after) if ev is not None]
+
+    events = asyncio.run(collect())
+    kinds = [(e[1], e[2].get("target"), e[2].get("state")) for e in events]
+    assert kinds == [
+        ("line", None, None),
+        ("target", "web01", "started"),
+        ("line", None, None),
+        ("target", "web02", "failure"),
+        ("target", "web01", "success"),
+        ("result", None, None),
+    ]
+    assert events[0][2]["line"] == "Started on web01..."
+    assert events[-1][2]["execution_id"] == "run-0001"
+    # Last-Event-ID resume only returns what came after
+    assert [e[0] for e in asyncio.run(collect(after=5))] == [6]
+
+
+def test_live_subscriber_sees_events_until_result():
+    reg = BoltStreamRegistry()
+
+    async def scenario():
+        waiter = asyncio.ensure_future(reg.wait_for("late-run-01", timeout=2))
+        await asyncio.sleep(0.05)
+        stream = reg.create("alice", "task", "late-run-01")
+        assert await waiter is stream
+
+        async def consume():
+            return [ev[1] async for ev in stream.follow() if ev is not None]
+
+        reader = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.01)
+        stream.line("Finished on db01:")
+        stream.finish({"returncode": 0, "output": "ok", "error": ""})
+        return await asyncio.wait_for(reader, timeout=2)
+
+    assert asyncio.run(scenario()) == ["line", "target", "result"]
+
+
+def test_json_items_report_targets_as_they_finish():
+    stream = BoltStreamRegistry().create("alice", "command", "json-run-01")
+    stream.line('{ "items": [')
+    assert not [e for e in stream.events if e[1] == "target"]
+    stream.line('{"target":"web01","status":"success","value":{"exit_code":0}},')
+    assert stream.events[-1][2] == {"target": "web01", "state": "success", "exit_code": 0}
+    stream.line('{"target":"web02","status":"failure",')
+    stream.line('"value":{"exit_code":2}}')
+    stream.line('], "target_count": 2 }')
+    assert [(e[2]["target"], e[2]["state"]) for e in stream.events if e[1] == "target"] == [
+        ("web01", "success"), ("web02", "failure"),
+    ]
+    # The final document does not repeat targets already reported
+    stream.finish({"returncode": 2}, '{"items": [{"target": "web01", "status": "success"}]}')
+    assert sum(1 for e in stream.events if e[1] == "target") == 2
+
+
+def test_other_worker_replays_from_shared_table(tmp_path):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.database import Base
+
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        runner, other = BoltStreamRegistry(factory), BoltStreamRegistry(factory)
+
+        stream = runner.create("alice", "command", "shared-run-1")
+        stream.line("Started on web01...")
+        waiter = asyncio.ensure_future(other.wait_for("shared-run-1", timeout=5))
+        remote = await waiter
+        assert remote is not None and remote.owner == "alice" and remote.kind == "command"
+
+        async def consume(after=0):
+            return [ev async for ev in remote.follow(after) if ev is not None]
+
+        reader = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.1)
+        stream.line("Finished on web01:")
+        stream.finish({"returncode": 0, "output": "ok", "error": ""})
+        events = await asyncio.wait_for(reader, timeout=5)
+        resumed = await asyncio.wait_for(consume(after=3), timeout=5)
+        assert await other.find("missing-run-1") is None
+        await engine.dispose()
+        return events, resumed
+
+    events, resumed = asyncio.run(scenario())
+    assert [e[1] for e in events] == ["line", "target", "line", "target", "result"]
+    assert events[-1][2]["execution_id"] == "shared-run-1"
+    assert [e[0] for e in resumed] == [4, 5]
+
+
+def test_waiting_for_an_unknown_id_backs_off_the_shared_lookup():
+    reg = BoltStreamRegistry(shared=True)
+    lookups = []
+
+    async def find(execution_id):
+        lookups.append(execution_id)
+        return None
+
+    reg.find = find
+
+    async def scenario():
+        assert await reg.wait_for("bad id!", timeout=2) is None
+        assert await reg.wait_for("never-run-1", timeout=3) is None
+
+    asyncio.run(scenario())
+    # t = 0, 0.2, 0.6, 1.4, 3.0 instead of one query every 0.2 s
+    assert 4 <= len(lookups) <= 6 and set(lookups) == {"never-run-1"}
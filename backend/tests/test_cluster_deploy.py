@@ -1,146 +1,59 @@
-"""Clustered Code Deployment stage/activate — isolated from FastAPI/Bolt.
+"""Clustered Code Deployment stage/activate — no real Bolt or SSH.
 
 Production uvicorn maps uncaught exceptions to a generic 500. These tests
-load ``deploy.py`` with stubs so we can prove stage/activate return a
-structured failure instead of raising.
+patch the deploy router's Bolt, cluster-config and audit hooks (monkeypatch,
+undone after each test) to prove stage/activate return a structured failure
+instead of raising.
 """
 from __future__ import annotations
 
 import asyncio
 import json
-import sys
-import types
 from pathlib import Path
 from unittest.mock import AsyncMock
 
+import pytest
 
-def _pkg(name: str) -> types.ModuleType:
-    if name in sys.modules:
-        return sys.modules[name]
-    m = types.ModuleType(name)
-    m.__path__ = []  # type: ignore[attr-defined]
-    sys.modules[name] = m
-    return m
 
+@pytest.fixture
+def d(monkeypatch):
+    """The deploy router module, with local ``run_sudo`` stubbed out."""
+    from app.routers import deploy
 
-def _install_stubs() -> None:
-    if getattr(_install_stubs, "_done", False):
-        return
+    monkeypatch.setattr(deploy, "run_sudo", AsyncMock(return_value={"returncode": 0, "stdout": "", "stderr": ""}))
+    return deploy
 
-    fastapi = types.ModuleType("fastapi")
 
-    class HTTPException(Exception):
-        def __init__(self, status_code, detail=None, headers=None):
-            self.status_code = status_code
-            self.detail = detail
-            self.headers = headers
+@pytest.fixture
+def seed(monkeypatch):
+    """``seed(find_bolt, run_bolt)``: clustered config plus fake Bolt for this test."""
+    from app.routers import bolt_runtime
+    from app.services import cluster_config
+    from app.utils import audit
 
-    class APIRouter:
-        def __init__(self, *a, **k):
-            pass
+    def _seed(find_bolt, run_bolt):
+        monkeypatch.setattr(cluster_config, "load_cluster_config", lambda: {
+            "staging_codedir": "/etc/puppetlabs/code-staging",
+            "live_codedir": "/etc/puppetlabs/code",
+            "deployment_mode": "clustered",
+        })
+        monkeypatch.setattr(cluster_config, "is_clustered", lambda: True)
+        monkeypatch.setattr(cluster_config, "deploy_targets", lambda: ["ovcompiler1.example.com"])
+        monkeypatch.setattr(bolt_runtime, "find_bolt", find_bolt)
+        monkeypatch.setattr(bolt_runtime, "run_bolt_command", run_bolt)
+        monkeypatch.setattr(audit, "audit_event", lambda *a, **k: None)
 
-        def post(self, *a, **k):
-            return lambda fn: fn
+    return _seed
 
-        def get(self, *a, **k):
-            return lambda fn: fn
 
-    fastapi.APIRouter = APIRouter
-    fastapi.HTTPException = HTTPException
-    fastapi.Request = object
-    fastapi.Depends = lambda *a, **k: None
-    sys.modules["fastapi"] = fastapi
-
-    responses = types.ModuleType("fastapi.responses")
-    responses.PlainTextResponse = object
-    sys.modules["fastapi.responses"] = responses
-
-    pydantic = types.ModuleType("pydantic")
-
-    class BaseModel:
-        def __init__(self, **kwargs):
-            for k, v in kwargs.items():
-                setattr(self, k, v)
-
-    pydantic.BaseModel = BaseModel
-    sys.modules["pydantic"] = pydantic
-
-    sec = types.ModuleType("app.middleware.security")
-    sec.rate_limit_heavy = lambda: (lambda fn: fn)
-    sec.concurrency_heavy = object()
-    sys.modules["app.middleware.security"] = sec
-
-    deps = types.ModuleType("app.dependencies")
-    deps.require_role = lambda *a, **k: None
-    sys.modules["app.dependencies"] = deps
-
-    sudo = types.ModuleType("app.utils.sudo")
-
-    async def _run_sudo(*a, **k):
-        return {"returncode": 0, "stdout": "", "stderr": ""}
-
-    sudo.run_sudo = _run_sudo
-    sys.modules["app.utils.sudo"] = sudo
-
-    hist = types.ModuleType("app.services.deploy_history")
-    hist.add_json_history_entry = lambda *a, **k: None
-    hist.load_json_history = lambda: []
-    sys.modules["app.services.deploy_history"] = hist
-
-    _pkg("app")
-    _pkg("app.routers")
-    _pkg("app.utils")
-    _pkg("app.middleware")
-    _pkg("app.services")
-    _install_stubs._done = True  # type: ignore[attr-defined]
-
-
-def _load_deploy():
-    _install_stubs()
-    if "app.routers.deploy" in sys.modules:
-        return sys.modules["app.routers.deploy"]
-    import importlib.util
-
-    path = Path(__file__).resolve().parents[1] / "app" / "routers" / "deploy.py"
-    spec = importlib.util.spec_from_file_location("app.routers.deploy", path)
-    assert spec and spec.loader
-    mod = importlib.util.module_from_spec(spec)
-    sys.modules["app.routers.deploy"] = mod
-    spec.loader.exec_module(mod)
-    return mod
-
-
-def _seed_cluster_and_bolt(find_bolt, run_bolt):
-    cc = types.ModuleType("app.services.cluster_config")
-    cc.load_cluster_config = lambda: {
-        "staging_codedir": "/etc/puppetlabs/code-staging",
-        "live_codedir": "/etc/puppetlabs/code",
-        "deployment_mode": "clustered",
-    }
-    cc.is_clustered = lambda: True
-    cc.deploy_targets = lambda: ["ovcompiler1.example.com"]
-    sys.modules["app.services.cluster_config"] = cc
-
-    br = types.ModuleType("app.routers.bolt_runtime")
-    br.find_bolt = find_bolt
-    br.run_bolt_command = run_bolt
-    sys.modules["app.routers.bolt_runtime"] = br
-
-    audit = types.ModuleType("app.utils.audit")
-    audit.audit_event = lambda *a, **k: None
-    sys.modules["app.utils.audit"] = audit
-
-
-def test_cluster_env_args_all_environments():
-    d = _load_deploy()
+def test_cluster_env_args_all_environments(d):
     assert d._cluster_env_args("stage", None) == ["stage"]
     assert d._cluster_env_args("stage", "") == ["stage"]
     assert d._cluster_env_args("stage", "all") == ["stage"]
     assert d._cluster_env_args("stage", "production") == ["stage", "production"]
 
 
-def test_cluster_env_args_rejects_injection():
-    d = _load_deploy()
+def test_cluster_env_args_rejects_injection(d):
     try:
         d._cluster_env_args("stage", "prod; rm -rf /")
         assert False, "expected ValueError"
@@ -148,10 +61,9 @@ def test_cluster_env_args_rejects_injection():
         assert "Invalid environment" in str(e)
 
 
-def test_run_on_targets_missing_script(tmp_path: Path):
-    d = _load_deploy()
-    d.STAGE_ACTIVATE_SCRIPT = str(tmp_path / "missing.sh")
-    _seed_cluster_and_bolt(lambda: "/opt/puppetlabs/bin/bolt", AsyncMock())
+def test_run_on_targets_missing_script(d, seed, monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(d, "STAGE_ACTIVATE_SCRIPT", str(tmp_path / "missing.sh"))
+    seed(lambda: "/opt/puppetlabs/bin/bolt", AsyncMock())
     result = asyncio.run(
         d._run_on_targets("stage", None, ["ovcompiler1.example.com"])
     )
@@ -160,12 +72,11 @@ def test_run_on_targets_missing_script(tmp_path: Path):
     assert any("Missing" in line for line in result["output"])
 
 
-def test_run_on_targets_no_bolt_remote_is_error(tmp_path: Path):
-    d = _load_deploy()
+def test_run_on_targets_no_bolt_remote_is_error(d, seed, monkeypatch, tmp_path: Path):
     script = tmp_path / "r10k-stage-activate.sh"
     script.write_text("#!/bin/bash\n")
-    d.STAGE_ACTIVATE_SCRIPT = str(script)
-    _seed_cluster_and_bolt(lambda: None, AsyncMock())
+    monkeypatch.setattr(d, "STAGE_ACTIVATE_SCRIPT", str(script))
+    seed(lambda: None, AsyncMock())
     result = asyncio.run(
         d._run_on_targets("stage", None, ["ovcompiler1.example.com"])
     )
@@ -174,15 +85,14 @@ def test_run_on_targets_no_bolt_remote_is_error(tmp_path: Path):
     assert result["hosts"][0]["via"] == "no-bolt"
 
 
-def test_run_on_targets_probe_auth_error_is_not_exception(tmp_path: Path):
-    d = _load_deploy()
+def test_run_on_targets_probe_auth_error_is_not_exception(d, seed, monkeypatch, tmp_path: Path):
     script = tmp_path / "r10k-stage-activate.sh"
     script.write_text("#!/bin/bash\n")
-    d.STAGE_ACTIVATE_SCRIPT = str(script)
+    monkeypatch.setattr(d, "STAGE_ACTIVATE_SCRIPT", str(script))
     probe = AsyncMock(
         return_value={"returncode": 1, "stdout": "", "stderr": "AUTH_ERROR: publickey"}
     )
-    _seed_cluster_and_bolt(lambda: "/opt/puppetlabs/bin/bolt", probe)
+    seed(lambda: "/opt/puppetlabs/bin/bolt", probe)
     result = asyncio.run(
         d._run_on_targets(
             "stage", None, ["ovcompiler1.example.com", "ovcompiler2.example.com"]
@@ -194,11 +104,10 @@ def test_run_on_targets_probe_auth_error_is_not_exception(tmp_path: Path):
     assert probe.call_count == 1
 
 
-def test_run_on_targets_probe_missing_r10k(tmp_path: Path):
-    d = _load_deploy()
+def test_run_on_targets_probe_missing_r10k(d, seed, monkeypatch, tmp_path: Path):
     script = tmp_path / "r10k-stage-activate.sh"
     script.write_text("#!/bin/bash\n")
-    d.STAGE_ACTIVATE_SCRIPT = str(script)
+    monkeypatch.setattr(d, "STAGE_ACTIVATE_SCRIPT", str(script))
     payload = {
         "items": [
             {
@@ -215,7 +124,7 @@ def test_run_on_targets_probe_missing_r10k(tmp_path: Path):
     probe = AsyncMock(
         return_value={"returncode": 2, "stdout": json.dumps(payload), "stderr": ""}
     )
-    _seed_cluster_and_bolt(lambda: "/opt/puppetlabs/bin/bolt", probe)
+    seed(lambda: "/opt/puppetlabs/bin/bolt", probe)
     result = asyncio.run(
         d._run_on_targets("stage", None, ["ovcompiler2.example.com"])
     )
@@ -225,11 +134,10 @@ def test_run_on_targets_probe_missing_r10k(tmp_path: Path):
     assert probe.call_count == 1
 
 
-def test_run_on_targets_script_run_after_probe_ok(tmp_path: Path):
-    d = _load_deploy()
+def test_run_on_targets_script_run_after_probe_ok(d, seed, monkeypatch, tmp_path: Path):
     script = tmp_path / "r10k-stage-activate.sh"
     script.write_text("#!/bin/bash\n")
-    d.STAGE_ACTIVATE_SCRIPT = str(script)
+    monkeypatch.setattr(d, "STAGE_ACTIVATE_SCRIPT", str(script))
 
     async def fake_bolt(args, timeout=120):
         if args and args[0] == "command":
@@ -237,7 +145,7 @@ def test_run_on_targets_script_run_after_probe_ok(tmp_path: Path):
         return {"returncode": 0, "stdout": "stage complete", "stderr": ""}
 
     run = AsyncMock(side_effect=fake_bolt)
-    _seed_cluster_and_bolt(lambda: "/opt/puppetlabs/bin/bolt", run)
+    seed(lambda: "/opt/puppetlabs/bin/bolt", run)
     result = asyncio.run(
         d._run_on_targets("stage", None, ["ovcompiler1.example.com"])
     )
@@ -258,8 +166,7 @@ def test_run_on_targets_script_run_after_probe_ok(tmp_path: Path):
     assert "--no-tty" in script_argv
 
 
-def test_flatten_bolt_json_surfaces_script_stderr():
-    d = _load_deploy()
+def test_flatten_bolt_json_surfaces_script_stderr(d):
     payload = {
         "items": [
             {
@@ -285,8 +192,7 @@ def test_flatten_bolt_json_surfaces_script_stderr():
     assert any("noexec" in ln.lower() for ln in lines)
 
 
-def test_flatten_redacts_proxy_password():
-    d = _load_deploy()
+def test_flatten_redacts_proxy_password(d):
     payload = {
         "items": [
             {
@@ -311,8 +217,7 @@ def test_flatten_redacts_proxy_password():
     assert "user:***@" in blob
 
 
-def test_flatten_bolt_json_strips_ansi_and_raw_blob():
-    d = _load_deploy()
+def test_flatten_bolt_json_strips_ansi_and_raw_blob(d):
     payload = {
         "items": [
             {
@@ -353,8 +258,7 @@ def test_flatten_bolt_json_strips_ansi_and_raw_blob():
     assert any("FAIL" in ln and "ovcompiler1.example.com" in ln for ln in lines)
 
 
-def test_flatten_bolt_json_surfaces_tmpdir_error():
-    d = _load_deploy()
+def test_flatten_bolt_json_surfaces_tmpdir_error(d):
     payload = {
         "items": [
             {
@@ -382,17 +286,83 @@ def test_flatten_bolt_json_surfaces_tmpdir_error():
     assert any("mkdir -m 700" in ln for ln in lines)
 
 
-def test_cluster_deploy_swallows_unexpected_exception():
-    d = _load_deploy()
-    _seed_cluster_and_bolt(lambda: "/opt/puppetlabs/bin/bolt", AsyncMock())
+def test_cluster_deploy_swallows_unexpected_exception(d, seed, monkeypatch):
+    seed(lambda: "/opt/puppetlabs/bin/bolt", AsyncMock())
 
     async def boom(*a, **k):
         raise RuntimeError("boom")
 
-    d._run_on_targets = boom
+    monkeypatch.setattr(d, "_run_on_targets", boom)
     req = d.ClusterDeployRequest(environment=None)
     result = asyncio.run(
         d._cluster_deploy("stage", req, "admin")
     )
     assert result["success"] is False
     assert any("boom" in line for line in result["output"])
+
+
+class _FakeStream:
+    def __init__(self):
+        self.lines = []
+        self.targets = {}
+        self.progress = []
+
+    def line(self, text):
+        self.lines.append(text)
+
+    def target_state(self, target, state, **extra):
+        self.targets[target] = {"state": state, **extra}
+
+    def publish(self, event, data):
+        if event == "progress":
+            self.progress.append(data)
+
+
+def test_live_r10k_is_one_bolt_run_streamed_per_host(d, seed):
+    targets = ["ovcompiler1.example.com", "ovcompiler2.example.com"]
+    calls = []
+
+    def item(target, ok):
+        return json.dumps({
+            "target": target,
+            "status": "success" if ok else "failure",
+            "value": {"merged_output": f"INFO -> Deploying environment on {target}", "exit_code": 0 if ok else 1},
+        })
+
+    async def fake_bolt(args, timeout=120, on_line=None):
+        calls.append((args[args.index("--targets") + 1], timeout))
+        if "LIVE_R10K" not in args[2]:  # shared SSH probe
+            items = [{"target": t, "status": "success", "value": {"stdout": "ok", "exit_code": 0}}
+                     for t in targets]
+            return {"returncode": 0, "stdout": json.dumps({"items": items}), "stderr": ""}
+        # Bolt prints each item as its target finishes
+        lines = ['{ "items": [', item(targets[0], True) + ","]
+        for ln in lines:
+            on_line(ln)
+        await asyncio.sleep(0.3)
+        lines += [item(targets[1], False), "],", '"target_count": 2 }']
+        for ln in lines[2:]:
+            on_line(ln)
+        return {"returncode": 2, "stdout": "\n".join(lines), "stderr": ""}
+
+    seed(lambda: "/opt/puppetlabs/bin/bolt", fake_bolt)
+    stream = _FakeStream()
+    result = asyncio.run(d._run_live_r10k_on_targets("production", targets, timeout=60, stream=stream))
+
+    # one probe, then one Bolt process for all compilers under one deadline
+    assert calls == [(",".join(targets), d._CLUSTER_SSH_PROBE_TIMEOUT), (",".join(targets), 60)]
+    assert result["success"] is False
+    hosts = {h["host"]: h for h in result["hosts"]}
+    assert hosts["ovcompiler1.example.com"]["success"] is True
+    assert hosts["ovcompiler2.example.com"]["duration_ms"] >= 250
+    assert hosts["ovcompiler2.example.com"]["duration_ms"] > hosts["ovcompiler1.example.com"]["duration_ms"]
+    timing = result["output"][result["output"].index("Per-host timing (slowest first):") + 1 :]
+    assert timing[0].split()[:2] == ["ovcompiler2.example.com", "FAIL"]
+
+    # the fast compiler is streamed before the slow one finishes
+    first = next(i for i, ln in enumerate(stream.lines) if "ovcompiler1.example.com" in ln)
+    second = next(i for i, ln in enumerate(stream.lines) if "ovcompiler2.example.com" in ln)
+    assert first < second
+    assert stream.targets["ovcompiler2.example.com"]["state"] == "failure"
+    assert [p["done"] for p in stream.progress] == [0, 1, 2]
+    assert stream.progress[1]["hosts"] == ["ovcompiler1.example.com"]
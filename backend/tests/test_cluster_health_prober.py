@@ -0,0 +1,100 @@
+"""Background cluster health prober: hedging, retries, caching and transitions."""
+import asyncio
+from unittest.mock import patch
+
+from app.services import cluster_health
+from app.services.cluster_health_prober import ClusterHealthProber
+
+
+def test_probe_target_hedges_slow_and_retries_unhealthy():
+    prober = ClusterHealthProber(interval_sec=30, timeout_sec=1.0, hedge_after_sec=0.05, ha_every=1, jitter=0)
+    calls = {"slow": 0, "flaky": 0, "dead": 0}
+
+    async def probe_compiler(client, fqdn):
+        calls[fqdn] += 1
+        if fqdn == "slow" and calls["slow"] == 1:
+            await asyncio.sleep(5)  # first attempt hangs; the hedge answers
+        if fqdn == "flaky" and calls["flaky"] == 1:
+            return {"fqdn": fqdn, "healthy": False, "error": "reset"}
+        if fqdn == "dead":
+            await asyncio.sleep(5)
+        return {"fqdn": fqdn, "healthy": True}
+
+    async def _run():
+        return await asyncio.gather(*(prober.probe_target(probe_compiler, None, f) for f in ("slow", "flaky", "dead")))
+
+    slow, flaky, dead = asyncio.run(_run())
+    assert slow["healthy"] and slow["attempts"] == 2 and slow["probe_ms"] < 1000
+    assert flaky["healthy"] and calls["flaky"] == 2
+    assert not dead["healthy"] and "timed out" in dead["error"] and dead["role"] == "compiler"
+
+
+def test_cache_serves_reads_and_records_transitions():
+    prober = ClusterHealthProber(interval_sec=30, timeout_sec=1.0, hedge_after_sec=0.5, ha_every=3, jitter=0)
+    up = {"ovc1": True}
+    ha_calls = []
+
+    async def fake_compiler(client, fqdn):
+        return {"fqdn": fqdn, "role": "compiler", "healthy": up[fqdn], "error": None if up[fqdn] else "down"}
+
+    async def fake_ha(cfg):
+        ha_calls.append(1)
+        return {"available": True, "method": "local_pcs", "pcs": {}, "drbd": None, "error": None}
+
+    cfg = {"deployment_mode": "clustered", "compilers": ["ovc1"]}
+
+    async def _run():
+        q = prober.subscribe()
+        first = await prober.get(cfg=cfg)
+        again = await prober.get(cfg=cfg)
+        up["ovc1"] = False
+        await prober.probe_once(cfg)
+        await prober.probe_once(cfg)
+        return first, again, q.get_nowait()
+
+    with patch.object(cluster_health, "probe_compiler", fake_compiler), \
+         patch.object(cluster_health, "probe_ha_cluster", fake_ha), \
+         patch.object(cluster_health, "_ssl_context", lambda: False):
+        first, again, event = asyncio.run(_run())
+
+    assert first["probe"]["cached"] is False and again["probe"]["cached"] is True
+    assert first["summary"]["compilers_healthy"] == 1
+    assert event["target"] == "compiler:ovc1" and event["to"] == "unhealthy"
+    assert len(ha_calls) == 1  # pcs reused between ha_every cycles
+    hist = prober.history("compiler:ovc1")
+    assert [p["healthy"] for p in hist["targets"]["compiler:ovc1"]] == [True, False, False]
+    assert len(hist["transitions"]) == 1
+
+
+def test_one_worker_probes_and_the_other_follows(tmp_path):
+    leader = ClusterHealthProber(interval_sec=30, jitter=0, state_dir=str(tmp_path))
+    follower = ClusterHealthProber(interval_sec=30, jitter=0, state_dir=str(tmp_path))
+    assert leader._leader.acquire() and not follower._leader.acquire()
+
+    doc = {"compilers": [{"fqdn": "ovc1", "healthy": True}], "summary": {}}
+    leader.doc, leader.probed_at = doc, 1000.0
+    leader._record(doc, 1000.0)
+    leader.publish()
+    assert follower.follow() and follower.doc == doc
+    q = follower.subscribe()
+
+    down = {"compilers": [{"fqdn": "ovc1", "healthy": False, "error": "down"}], "summary": {}}
+    leader.doc, leader.probed_at = down, 1030.0
+    leader._record(down, 1030.0)
+    leader.publish()
+    assert follower.follow() and not follower.follow()  # nothing newer the second time
+    assert q.get_nowait()["to"] == "unhealthy" and q.empty()
+    assert [p["healthy"] for p in follower.history("compiler:ovc1")["targets"]["compiler:ovc1"]] == [True, False]
+
+    leader._leader.release()
+    assert follower._leader.acquire()  # takes over once the holder exits
+    follower._leader.release()
+
+
+def test_start_only_in_clustered_mode():
+    from app.services import cluster_health_prober as chp
+
+    with patch("app.services.cluster_config.is_clustered", lambda: False), \
+         patch.object(chp.cluster_prober, "start") as start:
+        asyncio.run(chp.start_cluster_prober())
+    start.assert_not_called()
@@ -0,0 +1,128 @@
+"""DB maintenance: batched retention deletes, SQLite compaction, /metrics lines."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.database import Base
+from app.models import (
+    ActiveSession, ExecutionHistory, ExecutionResult, ExecutionStreamEvent, OrchestrationJob, TokenDenylist,
+)
+from app.services import db_maintenance as dbm
+from app.services.db_maintenance import DbMaintenance
+from app.utils.worker_lock import WorkerLock
+
+
+def test_run_once_deletes_in_batches_and_reclaims_space(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "execution_history_retention_days", 30)
+    monkeypatch.setattr(settings, "execution_results_retention_days", 7)
+    monkeypatch.setattr(settings, "db_maintenance_batch_rows", 40)
+    monkeypatch.setattr(settings, "db_maintenance_batch_pause_sec", 0)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    now = datetime.utcnow()
+    blob = b"\x00" * 4096
+
+    async def seed():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with factory() as db:
+            for i in range(150):
+                old = i < 100
+                db.add(ExecutionHistory(
+                    id=i + 1, execution_type="command", node_name="web01", status="success", executed_by="admin",
+                    executed_at=now - timedelta(days=60 if old else 1),
+                ))
+                db.add(ExecutionResult(
+                    history_id=i + 1, target="", codec="gzip", size=1, stored_size=len(blob), data=blob,
+                    created_at=now - timedelta(days=60 if old else (10 if i < 120 else 1)),
+                ))
+            db.add(OrchestrationJob(id="old", kind="command", status="succeeded", submitted_by="admin",
+                                    payload={}, created_at=now - timedelta(days=60)))
+            db.add(OrchestrationJob(id="queued", kind="command", status="queued", submitted_by="admin",
+                                    payload={}, created_at=now - timedelta(days=60)))
+            aware = datetime.now(timezone.utc)
+            db.add(ActiveSession(token_hash="stale", username="a", last_seen=aware - timedelta(hours=1), created_at=aware))
+            db.add(ActiveSession(token_hash="live", username="a", last_seen=aware, created_at=aware))
+            db.add(TokenDenylist(jti="gone", expires_at=now - timedelta(hours=1)))
+            db.add(TokenDenylist(jti="kept", expires_at=now + timedelta(hours=1)))
+            db.add(ExecutionStreamEvent(execution_id="old-run-1", seq=1, event="line", data={"line": "x"},
+                                        created_at=now - timedelta(days=2)))
+            db.add(ExecutionStreamEvent(execution_id="new-run-1", seq=1, event="line", data={"line": "y"},
+                                        created_at=now))
+            await db.commit()
+
+    async def counts():
+        async with factory() as db:
+            out = {}
+            for model in (ExecutionHistory, ExecutionResult, OrchestrationJob, ActiveSession, TokenDenylist,
+                          ExecutionStreamEvent):
+                out[model.__tablename__] = (await db.execute(select(func.count()).select_from(model))).scalar()
+            return out
+
+    async def scenario():
+        await seed()
+        maint = DbMaintenance(factory, engine, interval_sec=0)
+        first = await maint.run_once(convert_sqlite=True)
+        left = await counts()
+        # freed pages from a second purge go back to the OS via incremental_vacuum
+        async with factory() as db:
+            await db.execute(ExecutionResult.__table__.delete())
+            await db.commit()
+        second = await maint.run_once()
+        await engine.dispose()
+        return maint, first, left, second
+
+    maint, first, left, second = asyncio.run(scenario())
+    assert first["deleted"] == {
+        "execution_history": 100,
+        "orchestration_jobs": 1,
+        "execution_results": 20,
+        "execution_stream_events": 1,
+        "active_sessions": 1,
+        "token_denylist": 1,
+    }
+    assert first["converted_to_incremental"] and "error" not in first
+    assert left == {
+        "execution_history": 50, "execution_results": 30, "orchestration_jobs": 1,
+        "active_sessions": 1, "token_denylist": 1, "execution_stream_events": 1,
+    }
+    assert second["reclaimed_bytes"] > 0 and second["free_bytes"] == 0
+    metrics = "\n".join(maint.render_prometheus())
+    assert 'openvox_gui_db_maintenance_deleted_rows_total{table="execution_history"} 100' in metrics
+    assert f"openvox_gui_db_reclaimed_bytes_total {maint.reclaimed_bytes_total}" in metrics
+    assert maint.runs == 2
+
+
+def test_vacuum_is_opt_in_needs_disk_and_runs_in_one_worker(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        maint = DbMaintenance(factory, engine, interval_sec=0.05)
+        default = await maint.run_once()
+        monkeypatch.setattr(dbm.shutil, "disk_usage", lambda _p: SimpleNamespace(free=1024))
+        no_room = await maint.run_once(convert_sqlite=True)
+
+        maint.runs = 0
+        maint._leader = WorkerLock("db_maintenance", lock_dir=str(tmp_path))
+        sibling = WorkerLock("db_maintenance", lock_dir=str(tmp_path))
+        assert sibling.acquire()
+        await maint.start()
+        await asyncio.sleep(0.2)
+        skipped = maint.runs
+        sibling.release()
+        await asyncio.sleep(0.2)
+        await maint.stop()
+        await engine.dispose()
+        return default, no_room, skipped, maint.runs
+
+    default, no_room, skipped, ran = asyncio.run(scenario())
+    assert not default["converted_to_incremental"] and default["convert_skipped"] is None
+    assert not no_room["converted_to_incremental"] and "MiB free" in no_room["convert_skipped"]
+    assert skipped == 0 and ran > 0
@@ -66,3 +66,21 @@ def test_record_deploy_writes_json(tmp_path):
     )
     assert entry["triggered_by"] == "admin"
     assert g["load_json_history"]()[0]["exit_code"] == 0
+
+
+def test_record_deploy_keeps_per_host_durations(tmp_path):
+    g = _load_mod(tmp_path / "dh.json")
+    g["record_deploy"](
+        environment="production",
+        triggered_by="admin",
+        success=False,
+        exit_code=1,
+        duration_ms=9100,
+        hosts=[
+            {"host": "ovcompiler1", "success": True, "exit_code": 0, "via": "bolt-live-r10k", "duration_ms": 4200},
+            {"host": "ovcompiler2", "success": False, "exit_code": 1, "via": "bolt-live-r10k", "duration_ms": 9000},
+        ],
+    )
+    entry = g["load_json_history"]()[0]
+    assert entry["duration_ms"] == 9100
+    assert entry["hosts"][1] == {"host": "ovcompiler2", "success": False, "exit_code": 1, "duration_ms": 9000}
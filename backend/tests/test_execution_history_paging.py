@@ -0,0 +1,128 @@
+"""Execution history: keyset pages, SQL aggregate stats, streamed audit export."""
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import app.database as database
+from app.database import Base
+from app.models import ExecutionHistory
+from app.routers import execution_history as eh
+
+
+# Newest first; rows sharing executed_at come highest id first
+ORDER = [i for k in range(13) for i in (2 * k + 2, 2 * k + 1) if i <= 25]
+
+
+def _seed(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'history.db'}")
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    now = datetime.utcnow().replace(microsecond=0)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with factory() as db:
+            for i in range(25):
+                db.add(ExecutionHistory(
+                    execution_type="task" if i % 5 == 0 else "command",
+                    node_name="web01" if i % 2 else "db01",
+                    command_name="uptime",
+                    status="failure" if i % 4 == 0 else "success",
+                    # pairs share a timestamp, so the id tie-break matters
+                    executed_at=now - timedelta(minutes=i // 2),
+                    executed_by="admin",
+                    duration_ms=100 * i if i < 10 else None,
+                ))
+            await db.commit()
+
+    return engine, factory, setup
+
+
+def test_keyset_pages_cover_every_row_once_and_stats_aggregate(tmp_path):
+    engine, factory, setup = _seed(tmp_path)
+
+    async def scenario():
+        await setup()
+        seen, before, before_id = [], None, None
+        async with factory() as db:
+            while True:
+                page = await eh.get_execution_history(
+                    days=14, execution_type=None, node_name=None, status=None, limit=7,
+                    before=before, before_id=before_id, db=db, current_user="admin",
+                )
+                seen.extend(e.id for e in page)
+                if len(page) < 7:
+                    break
+                before, before_id = page[-1].executed_at, page[-1].id
+            stats = await eh.get_execution_stats(days=14, db=db, current_user="admin")
+        await engine.dispose()
+        return seen, stats
+
+    seen, stats = asyncio.run(scenario())
+    assert seen == ORDER
+    assert stats["total_executions"] == 25
+    assert (stats["successful"], stats["failed"], stats["running"]) == (18, 7, 0)
+    assert stats["by_type"] == {"command": 20, "task": 5, "plan": 0}
+    assert stats["top_nodes"] == [{"node": "db01", "count": 13}, {"node": "web01", "count": 12}]
+    assert stats["avg_duration_ms"] == 450
+
+
+def test_audit_export_streams_batches(tmp_path, monkeypatch):
+    engine, factory, setup = _seed(tmp_path)
+    monkeypatch.setattr(database, "async_session", factory)
+    monkeypatch.setattr(eh, "EXPORT_BATCH", 10)
+
+    async def body(fmt):
+        response = await eh.export_audit_history(days=30, format=fmt, current_user="admin")
+        chunks = [c async for c in response.body_iterator]
+        return response, "".join(chunks), len(chunks)
+
+    async def scenario():
+        await setup()
+        out = {fmt: await body(fmt) for fmt in ("json", "ndjson", "csv")}
+        await engine.dispose()
+        return out
+
+    out = asyncio.run(scenario())
+    response, text, n_chunks = out["json"]
+    doc = json.loads(text)
+    assert doc["count"] == 25 and [e["id"] for e in doc["entries"]] == ORDER
+    assert doc["exported_by"] == "admin" and n_chunks == 5  # header, 3 batches, footer
+    assert response.media_type == "application/json"
+
+    _, text, _ = out["ndjson"]
+    assert [json.loads(line)["id"] for line in text.splitlines()] == ORDER
+
+    response, text, _ = out["csv"]
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert len(rows) == 25 and rows[0]["id"] == "2" and rows[1]["status"] == "failure"
+    assert "execution-history-" in response.headers["content-disposition"]
+
+
+def test_export_failure_is_marked_and_cursor_needs_before(tmp_path):
+    async def failing():
+        yield [{"id": 1}]
+        raise RuntimeError("database is locked")
+
+    async def body(fmt):
+        return "".join([c async for c in eh._export_body(fmt, {"exported_by": "admin"}, failing())])
+
+    doc = json.loads(asyncio.run(body("json")))
+    assert doc["count"] == 1 and doc["truncated"] is True and "RuntimeError" in doc["error"]
+    last = json.loads(asyncio.run(body("ndjson")).splitlines()[-1])
+    assert last["truncated"] is True and last["count"] == 1
+    with pytest.raises(RuntimeError):
+        asyncio.run(body("csv"))
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(eh.get_execution_history(
+            days=14, execution_type=None, node_name=None, status=None, limit=7,
+            before=None, before_id=5, db=None, current_user="admin",
+        ))
+    assert exc.value.status_code == 400
@@ -0,0 +1,60 @@
+"""Fact overview / distribution counted in PuppetDB (fact_contents group by)."""
+import asyncio
+from unittest.mock import patch
+
+from app.services.puppetdb import _pql_fact_path, _pql_literal, puppetdb_service
+
+
+def test_pql_fact_path_quotes_segments():
+    assert _pql_fact_path("os.release.full") == '["os", "release", "full"]'
+    assert _pql_fact_path("processors.models.0") == '["processors", "models", 0]'
+    assert _pql_fact_path('os.na"me') == '["os", "na\\"me"]'
+    assert _pql_literal(True) == "true"
+    assert _pql_literal(4) == "4"
+    assert _pql_literal('Red"Hat') == '"Red\\"Hat"'
+
+
+def test_fact_overview_entry_uses_aggregate_and_caches():
+    from app.routers import metrics
+    from app.utils import ttl_cache
+
+    ttl_cache.invalidate("fact_")
+    calls = []
+
+    async def fake_pql(query, limit=5000):
+        calls.append(query)
+        if "count()" in query:
+            return [{"value": "RedHat", "count": 9}, {"value": "Debian", "count": 1}]
+        assert 'value = "Debian"' in query
+        return [{"certname": "deb1.example", "value": "Debian"}]
+
+    with patch.object(puppetdb_service, "pql", new=fake_pql):
+        entry = asyncio.run(metrics._fact_overview_entry("os.family"))
+        again = asyncio.run(metrics._fact_overview_entry("os.family"))
+
+    assert entry["total_nodes"] == 10
+    assert entry["outliers"] == [{"value": "Debian", "count": 1, "nodes": ["deb1.example"]}]
+    assert again["outliers"] == entry["outliers"]
+    assert sum(1 for q in calls if "count()" in q) == 1
+    assert not any(q.startswith("facts ") for q in calls)
+    assert not any(q.startswith("factsets") for q in calls)  # no whole-factset fingerprint
+
+
+def test_node_values_keyed_on_path_counts():
+    from app.routers import metrics
+    from app.utils import ttl_cache
+
+    ttl_cache.invalidate("fact_")
+    lookups = []
+
+    async def fake_values(fact_path, values=None, limit=100000):
+        lookups.append(fact_path)
+        return [{"certname": "a.example", "value": 4}]
+
+    with patch.object(puppetdb_service, "get_fact_path_values", new=fake_values):
+        asyncio.run(metrics._fact_node_values("processors.count", {"4": 9, "8": 1}))
+        # Same counts for this path: cached whatever else changed in the factsets
+        asyncio.run(metrics._fact_node_values("processors.count", {"8": 1, "4": 9}))
+        assert lookups == ["processors.count"]
+        asyncio.run(metrics._fact_node_values("processors.count", {"4": 8, "8": 2}))
+    assert len(lookups) == 2
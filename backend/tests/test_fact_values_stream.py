@@ -0,0 +1,61 @@
+"""Path-targeted fact values streamed from fact_contents."""
+import asyncio
+import json
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import facts as facts_router
+from app.services.puppetdb import PuppetDBService
+
+
+def _service(handler) -> PuppetDBService:
+    svc = PuppetDBService()
+    svc._client = httpx.AsyncClient(
+        base_url="https://pdb.example:8081",
+        transport=httpx.MockTransport(handler),
+    )
+    return svc
+
+
+def test_stream_pql_decodes_rows_across_chunks():
+    rows = [{"certname": f"n{i}.example", "value": "10.0.0.%d" % i} for i in range(50)]
+    body = json.dumps(rows).encode()
+
+    class Chunked(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            for i in range(0, len(body), 7):
+                yield body[i:i + 7]
+
+    seen = {}
+
+    def handler(request):
+        seen["query"] = request.url.params["query"]
+        return httpx.Response(200, stream=Chunked())
+
+    svc = _service(handler)
+
+    async def collect():
+        return [r async for r in svc.stream_fact_path_values("networking.ip")]
+
+    assert asyncio.run(collect()) == rows
+    assert seen["query"] == (
+        'fact_contents[certname, value, environment] { path = ["networking", "ip"] }'
+    )
+
+
+def test_fact_values_endpoint_streams_json(monkeypatch):
+    def handler(request):
+        return httpx.Response(200, json=[
+            {"certname": "a.example", "value": "RedHat", "environment": "production"},
+            {"certname": "b.example", "value": "Debian", "environment": "production"},
+        ])
+
+    monkeypatch.setattr(facts_router, "puppetdb_service", _service(handler))
+    app = FastAPI()
+    app.include_router(facts_router.router)
+    body = TestClient(app).get("/api/facts/values/os.family").json()
+    assert body["count"] == 2
+    assert body["nested_path"] == "family"
+    assert [r["certname"] for r in body["results"]] == ["a.example", "b.example"]
@@ -6,6 +6,8 @@ import sys
 import types
 from pathlib import Path
 
+import pytest
+
 
 def _install_stubs():
     if "app.services.puppetdb" in sys.modules:
@@ -106,3 +108,79 @@ def test_builtin_patterns_compile():
     m = _load()
     for pack_id, meta in m.BUILTIN_PACKS.items():
         re.compile(meta["pattern"], re.IGNORECASE)
+
+
+def test_scope_query_inlines_small_scopes():
+    import asyncio
+
+    m = _load()
+    assert m.scope_query(asyncio.run(m.resolve_scope("all"))) is None
+    pred = m.scope_query(asyncio.run(m.resolve_scope("pack:compilers")))
+    assert pred[0] == "in" and pred[1] == "certname"
+    assert sorted(pred[2][1]) == [
+        "ovcompiler1.atlc-it.corp.int-x.ai",
+        "ovcompiler1.pdxc-it.corp.int-x.ai",
+    ]
+
+
+def test_scope_query_large_scope_uses_regex_and_location():
+    m = _load()
+    many = {f"ovcompiler{i}.pdxc-it.corp.int-x.ai" for i in range(200)}
+    pack = m.ScopeResult("pack:compilers", "Compilers", "pack", many, certname_re=r"^ovcompiler")
+    assert m.scope_query(pack) == ["~", "certname", "(?i)^ovcompiler"]
+
+    loc = m.ScopeResult("location:PDXC", "Location PDXC", "location", many, location="PDXC")
+    pred = m.scope_query(loc)
+    assert pred[:2] == ["in", "certname"]
+    assert pred[2][2][0] == "select_facts"
+
+    custom = m.ScopeResult("custom", "Custom", "custom", many)
+    assert m.scope_query(custom) is None
+    assert m.combine_query([">", "receive_time", "t"], None) == '[">", "receive_time", "t"]'
+
+
+def test_scope_index_reused_until_fleet_changes():
+    import asyncio
+
+    m = _load()
+    first = asyncio.run(m.get_scope_index())
+    assert bin(first.pack_bits["compilers"]).count("1") == 2
+    assert set(first.location_bits) == {"PDXC", "ATLC"}
+    # Expired TTL with an unchanged fleet keeps the same index object.
+    first.built_at -= 3600
+    assert asyncio.run(m.get_scope_index()) is first
+    r = asyncio.run(m.resolve_scope("location:PDXC", certname_re="^ovcompiler"))
+    assert r.certnames == {"ovcompiler1.pdxc-it.corp.int-x.ai"}
+    with pytest.raises(ValueError):
+        asyncio.run(m.resolve_scope("all", certname_re="("))
+    m.invalidate_scope_index()
+    assert asyncio.run(m.get_scope_index()) is not first
+
+
+def test_python_filter_uses_fallback_limit(monkeypatch):
+    import asyncio
+
+    m = _load()
+    calls = []
+
+    class Reports:
+        async def get_reports(self, query=None, **kwargs):
+            calls.append((query, kwargs["limit"]))
+            return [{"certname": "ovcompiler3.pdxc-it.corp.int-x.ai"}, {"certname": "other"}]
+
+    monkeypatch.setattr(m, "puppetdb_service", Reports())
+    many = {f"ovcompiler{i}.pdxc-it.corp.int-x.ai" for i in range(200)}
+    custom = m.ScopeResult("custom", "Custom", "custom", many)
+    rows = asyncio.run(m.get_scoped_reports(custom, limit=50, fallback_limit=2000))
+    # Custom in-list too large to push down: wide sample, filtered in Python
+    assert calls == [(None, 2000)]
+    assert [r["certname"] for r in rows] == ["ovcompiler3.pdxc-it.corp.int-x.ai"]
+
+
+def test_location_scope_ids_keep_fact_case():
+    m = _load()
+    live = {"a.example.com", "b.example.com"}
+    idx = m.ScopeIndex(live, {"a.example.com": "pdx-c", "b.example.com": "PDX-C"})
+    # Listed as the fact values (existing scope ids), matched case-insensitively
+    assert set(idx.location_bits) == {"pdx-c", "PDX-C"}
+    assert idx.members(idx.location_match_bits("Pdx-C")) == frozenset(live)
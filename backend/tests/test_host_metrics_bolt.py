@@ -0,0 +1,39 @@
+"""Remote host metrics: one multi-target Bolt run for the whole estate."""
+import asyncio
+import json
+from unittest.mock import patch
+
+from app.services import host_metrics as hm
+
+_OUT = (
+    "HOST:{h}\nLOAD:0.50 0.40 0.30 1/200 999\nMEMTOTAL:8000000\nMEMAVAIL:2000000\n"
+    "SWAPTOTAL:0\nSWAPFREE:0\ncpu  100 0 50 800 50 0 0 0 0 0\n"
+)
+
+
+def test_single_bolt_run_parses_per_target_items():
+    calls = []
+
+    async def fake_run(args, timeout=120):
+        calls.append(args)
+        items = [
+            {"target": "ovcompiler1.example", "status": "success", "value": {"stdout": _OUT.format(h="c1"), "exit_code": 0}},
+            {"target": "ssh://ovdb1.example:22", "status": "success", "value": {"stdout": _OUT.format(h="db1"), "exit_code": 0}},
+            {"target": "ovca1.example", "status": "failure",
+             "value": {"_error": {"msg": "Host key verification failed"}}},
+        ]
+        return {"returncode": 1, "stdout": json.dumps({"items": items}), "stderr": ""}
+
+    hosts = ["ovcompiler1.example", "ovdb1.example", "ovca1.example", "ovcompiler2.example"]
+    with patch("app.routers.bolt.run_bolt_command", fake_run):
+        snaps = asyncio.run(hm.collect_remotes_via_bolt(hosts))
+
+    assert len(calls) == 1
+    args = calls[0]
+    assert args[args.index("--targets") + 1] == ",".join(hosts)
+    assert args[args.index("--concurrency") + 1] == "4"
+    assert snaps["ovcompiler1.example"]["load1"] == 0.5
+    assert snaps["ovcompiler1.example"]["mem_used_pct"] == 75.0
+    assert snaps["ovdb1.example"]["source"] == "bolt"
+    assert snaps["ovca1.example"]["errors"] == ["Host key verification failed"]
+    assert snaps["ovcompiler2.example"]["source"] == "bolt_error"
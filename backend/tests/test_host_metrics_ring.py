@@ -0,0 +1,98 @@
+"""host_metrics on-disk rings: append-only mmap records, aliases, reload."""
+import json
+import math
+from unittest.mock import patch
+
+from app.services import host_metrics as hm
+from app.utils.ring_file import RingFile
+from app.utils.worker_lock import WorkerLock
+
+
+def test_ring_file_wraps_and_reopens(tmp_path):
+    path = tmp_path / "h.ring"
+    rf = RingFile(path, ("ts", "v"), capacity=4)
+    assert rf.open() == []
+    for i in range(6):
+        rf.append((float(i), float(i * 10)))
+    size = path.stat().st_size
+    rf.close()
+    assert path.stat().st_size == size  # fixed size: no growth per sample
+
+    again = RingFile(path, ("ts", "v"), capacity=4)
+    assert [r[0] for r in again.open()] == [2.0, 3.0, 4.0, 5.0]
+    again.close()
+
+    # A new field list keeps the matching columns
+    wider = RingFile(path, ("ts", "v", "w"), capacity=8)
+    rows = wider.open()
+    assert rows[-1][:2] == (5.0, 50.0) and math.isnan(rows[-1][2])
+    wider.close()
+
+
+def _reset():
+    hm._close_ring_files()
+    hm._history.clear()
+    hm._latest.clear()
+    hm._series.clear()
+    hm._followed.clear()
+    hm._persisted_loaded = False
+    hm._leader.release()
+
+
+def test_store_aliases_share_ring_and_reload(tmp_path):
+    _reset()
+    legacy_dir = tmp_path / "host_metrics"
+    legacy_dir.mkdir()
+    (legacy_dir / "old.example.json").write_text(json.dumps([{"ts": 1.0, "load1": 0.5}]))
+    with patch.object(hm.settings, "data_dir", str(tmp_path)):
+        hm._load_persisted()
+        assert hm._history["old.example"][0]["load1"] == 0.5
+        assert not (legacy_dir / "old.example.json").exists()
+
+        for i in range(3):
+            hm._store(
+                {"host": "ovcompiler1.example", "ts": 100.0 + i, "cpu_used_pct": 10.0 * i,
+                 "saturation": {"level": "yellow"}},
+                also_keys=["ovcompiler1"],
+            )
+        assert hm._history["ovcompiler1"] is hm._history["ovcompiler1.example"]
+        assert len(hm._history["ovcompiler1.example"]) == 3
+
+        _reset()
+        hm._load_persisted()
+        pts = list(hm._history["ovcompiler1.example"])
+        assert [p["cpu_used_pct"] for p in pts] == [0.0, 10.0, 20.0]
+        assert pts[-1]["saturation"] == "yellow"
+        assert pts[-1]["time"] == "1970-01-01T00:01:42Z"
+    _reset()
+
+
+def test_only_the_lock_holder_writes_rings_others_follow(tmp_path):
+    _reset()
+    with patch.object(hm.settings, "data_dir", str(tmp_path)):
+        writer = WorkerLock("host_metrics")  # another worker collecting
+        assert writer.acquire()
+        rf = RingFile(hm._ring_path("ovc1.example"), hm.HISTORY_FIELDS, hm.HISTORY_MAX)
+        rf.open()
+        for ts in (100.0, 101.0):
+            rf.append(hm._point_row({"ts": ts, "load1": ts}))
+
+        hm._load_persisted()
+        assert [p["ts"] for p in hm._history["ovc1.example"]] == [100.0, 101.0]
+        hm._store({"host": "ovc1.example", "ts": 150.0, "load1": 1.0})
+        assert not hm._ring_files and len(rf.read()) == 2
+        assert hm._series["ovc1.example"].last_ts() == 101.0
+
+        rf.append(hm._point_row({"ts": 102.0, "load1": 102.0}))
+        hm._follow_rings()
+        assert [p["ts"] for p in hm._history["ovc1.example"]] == [100.0, 101.0, 102.0]
+        assert hm._series["ovc1.example"].last_ts() == 102.0
+        assert sorted(p.name for p in hm._history_dir().iterdir()) == ["ovc1.example.ring"]
+
+        # The collecting worker exits: the next store takes over the ring
+        rf.close()
+        writer.release()
+        hm._store({"host": "ovc1.example", "ts": 103.0, "load1": 3.0})
+        assert hm._leader.held
+        assert [r[0] for r in rf.read()] == [100.0, 101.0, 102.0, 103.0]
+    _reset()
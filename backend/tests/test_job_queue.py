@@ -0,0 +1,161 @@
+"""Orchestration job queue: priority lanes, per-user limits, cancel and lost workers."""
+import asyncio
+import os
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import Base
+from app.models.execution_history import ExecutionHistory, _utc_naive
+from app.models.orchestration_job import OrchestrationJob
+from app.services.bolt_orchestration import BoltRunResultModel
+from app.services.job_queue import JobQueue
+
+
+async def _queue(tmp_path, **kw) -> JobQueue:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return JobQueue(async_sessionmaker(engine, expire_on_commit=False), **kw)
+
+
+def test_claims_interactive_first_and_respects_limits(tmp_path):
+    async def scenario():
+        q = await _queue(tmp_path, workers=3, per_user=1, scheduled_slots=1, global_limit=0)
+        sched = await q.submit("plan", {"plan": "nightly::patch", "params": {}}, "cron", lane="scheduled")
+        await q.submit("plan", {"plan": "nightly::audit", "params": {}}, "cron2", lane="scheduled")
+        a1 = await q.submit("command", {"command": "uptime", "targets": "web01"}, "alice")
+        a2 = await q.submit("command", {"command": "hostname", "targets": "web01"}, "alice")
+        b1 = await q.submit("task", {"task": "facts", "targets": "db01", "params": {}}, "bob")
+
+        claimed = []
+        while True:
+            job = await q.claim_next()
+            if job is None:
+                break
+            claimed.append(job.id)
+            q._running[job.id] = asyncio.ensure_future(asyncio.sleep(0))
+            q._lanes[job.id] = job.lane
+        assert await q.position(await q.get(a2.id)) == 1
+        async with q._session() as db:
+            history = await db.get(ExecutionHistory, a2.history_id)
+        return claimed, [a1.id, b1.id, sched.id], history
+
+    claimed, expected, history = asyncio.run(scenario())
+    # alice's second job waits for her first; one scheduled slot; pool of 3
+    assert claimed == expected
+    assert history.status == "queued" and history.queued_at is not None and history.started_at is None
+
+
+def test_runs_job_and_cancels_queued(tmp_path):
+    async def runner(db, job, stream, history_entry):
+        stream.line("Finished on web01:")
+        return BoltRunResultModel(returncode=0, output="ok", error="")
+
+    async def scenario():
+        q = await _queue(tmp_path, workers=1, per_user=0, runner=runner)
+        first = await q.submit("command", {"command": "uptime", "targets": "web01"}, "alice")
+        second = await q.submit("command", {"command": "uptime", "targets": "web02"}, "alice")
+        cancelled = await q.cancel(second.id, "alice")
+        assert cancelled.status == "cancelled"
+        assert await q.tick() == 1
+        await asyncio.gather(*q._running.values())
+        assert await q.tick() == 0
+        async with q._session() as db:
+            return (
+                await db.get(OrchestrationJob, first.id),
+                await db.get(ExecutionHistory, second.history_id),
+            )
+
+    done, cancelled_history = asyncio.run(scenario())
+    assert done.status == "succeeded" and done.returncode == 0
+    assert done.result["output"] == "ok" and done.finished_at is not None
+    assert cancelled_history.status == "cancelled" and cancelled_history.finished_at is not None
+
+
+def test_cancel_running_job_terminates_it(tmp_path):
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def runner(db, job, stream, history_entry):
+            gate.set()
+            await asyncio.sleep(30)
+
+        q = await _queue(tmp_path, workers=1, per_user=0, runner=runner)
+        job = await q.submit("plan", {"plan": "slow", "params": {}}, "alice")
+        await q.tick()
+        await asyncio.wait_for(gate.wait(), 2)
+        await q.cancel(job.id, "alice")
+        await asyncio.gather(*q._running.values(), return_exceptions=True)
+        return await q.get(job.id)
+
+    job = asyncio.run(scenario())
+    assert job.status == "cancelled" and job.cancel_requested
+
+
+def test_lost_worker_jobs_fail_without_rerun(tmp_path):
+    async def scenario():
+        q = await _queue(tmp_path, stale_sec=60)
+        job = await q.submit("command", {"command": "uptime", "targets": "web01"}, "alice")
+        async with q._session() as db:
+            row = await db.get(OrchestrationJob, job.id)
+            row.status = "running"
+            row.worker = "other-console:123"
+            row.heartbeat_at = _utc_naive() - timedelta(seconds=300)
+            await db.commit()
+        assert await q.fail_stale() == 1
+        assert await q.claim_next() is None
+        async with q._session() as db:
+            return await db.get(OrchestrationJob, job.id), await db.get(ExecutionHistory, job.history_id)
+
+    job, history = asyncio.run(scenario())
+    assert job.status == "failed" and "not re-run" in job.error
+    assert history.status == "failure"
+
+
+def test_sibling_worker_jobs_survive_and_share_the_console_limit(tmp_path):
+    async def scenario():
+        q = await _queue(tmp_path, workers=2, per_user=0, stale_sec=60)
+        sibling = f"{q.host_prefix}{os.getppid()}"  # live process on this host
+        dead = f"{q.host_prefix}999999999"
+        ids = []
+        for worker in (sibling, dead):
+            job = await q.submit("command", {"command": "uptime", "targets": "web01"}, "alice")
+            async with q._session() as db:
+                row = await db.get(OrchestrationJob, job.id)
+                row.status, row.worker, row.heartbeat_at = "running", worker, _utc_naive()
+                await db.commit()
+            ids.append(job.id)
+        failed = await q.fail_stale()
+        await q.submit("command", {"command": "hostname", "targets": "web01"}, "bob")
+        first = await q.claim_next()
+        second = await q.claim_next()
+        return failed, first, second, [(await q.get(i)).status for i in ids]
+
+    failed, first, second, statuses = asyncio.run(scenario())
+    # the dead PID is lost at once; the sibling's fresh job is left alone
+    assert failed == 1 and statuses == ["running", "failed"]
+    # the sibling's job counts toward this host's two workers
+    assert first is not None and second is None
+
+def test_sibling_workers_claiming_at_once_stay_within_the_limits(tmp_path):
+    async def scenario():
+        q = await _queue(tmp_path, workers=1, per_user=0)
+        sibling = JobQueue(q._session_factory, workers=1, per_user=0)
+        sibling.worker_id = f"{q.host_prefix}{os.getpid() + 1}"
+        for cmd in ("uptime", "hostname"):
+            await q.submit("command", {"command": cmd, "targets": "web01"}, "alice")
+        claimed = await asyncio.gather(q.claim_next(), sibling.claim_next())
+        (tmp_path / "users").mkdir()
+        users = await _queue(tmp_path / "users", workers=5, per_user=1)
+        await users.submit("command", {"command": "id", "targets": "web01"}, "bob")
+        await users.submit("command", {"command": "w", "targets": "web01"}, "bob")
+        other = JobQueue(users._session_factory, workers=5, per_user=1)
+        other.worker_id, other.host_prefix = "console2:1", "console2:"
+        by_user = await asyncio.gather(users.claim_next(), other.claim_next())
+        return claimed, by_user
+
+    claimed, by_user = asyncio.run(scenario())
+    # both read "nothing running" before either UPDATE; only one may win
+    assert sum(job is not None for job in claimed) == 1
+    assert sum(job is not None for job in by_user) == 1
@@ -0,0 +1,65 @@
+"""Tiered retention for host / Puppet Server health: tiers, persistence, window queries."""
+from unittest.mock import patch
+
+from app.services import host_metrics as hm
+from app.services.ps_health_history import PSHealthHistory
+from app.utils.tiered_series import TieredSeries, rollup_tiers
+
+
+def test_rollup_tiers_and_reload_does_not_duplicate(tmp_path):
+    tiers = rollup_tiers(6, ((60, 600), (600, 0), (3600, 7200)))
+    assert tiers == ((0, 6), (60, 10), (3600, 2))  # zero horizon drops the tier
+
+    s = TieredSeries(("v",), tiers)
+    raw = []
+    for i in range(30):
+        ts, v = 1000.0 + i * 10, float(i)
+        s.add(ts, {"v": v})
+        raw.append((ts, v))
+    s.save(tmp_path / "h.tiers")
+    closed = list(s.rows(1))[:-1]
+
+    again = TieredSeries(("v", "w"), tiers)  # a new field loads as missing
+    assert again.load(tmp_path / "h.tiers")
+    for ts, v in raw[-6:]:  # raw replay after restart, as the collectors do
+        again.add(ts, (v, None))
+    rows = list(again.rows(1))
+    assert [r[:5] for r in rows[:-1]] == closed
+    assert len(rows) == len(closed) + 1  # only the open bucket was rebuilt
+    assert again.query(1200, now=1300, tier=1)["points"][0]["w"] is None
+
+
+def test_host_and_ps_history_pick_tier_by_window(tmp_path):
+    hm._close_ring_files()
+    hm._history.clear()
+    hm._latest.clear()
+    hm._series.clear()
+    hm._leader.release()
+    start = 1_699_999_980.0  # minute-aligned
+    with patch.object(hm.settings, "data_dir", str(tmp_path)):
+        for i in range(400):  # 400 × 15 s ≈ 100 min, more than the raw ring
+            level = "red" if i == 2 else "green"
+            hm._store(
+                {"host": "ovc1.example", "ts": start + i * 15, "cpu_used_pct": float(i % 10),
+                 "saturation": {"level": level}},
+                also_keys=["ovc1"], persist=False,
+            )
+        now = start + 400 * 15
+        short = hm.get_series_history("ovc1", window_sec=600, now=now)
+        long = hm.get_series_history("ovc1.example", window_sec=86400, now=now, bounds=True)
+    assert short["tier"] == 0 and short["step_sec"] == hm.COLLECT_INTERVAL_SEC
+    assert long["step_sec"] == 60 and len(long["points"]) <= 101
+    assert long["points"][0]["saturation"] == "red"  # worst level in the bucket
+    assert long["points"][1]["cpu_used_pct_max"] == 7.0  # samples 4..7
+
+    ps = PSHealthHistory(maxlen=6, data_dir=str(tmp_path))
+    for i in range(20):
+        for host, heap in (("c1", 40.0), ("c2", 70.0)):
+            ps.add(host, {"jvm_heap": {"pct": heap}, "compile_time_ms": 100 + i}, ts=start + i * 10)
+    out = ps.history(3600, now=start + 200)
+    assert out["step_sec"] == 60 and [h["host"] for h in out["hosts"]] == ["c1", "c2"]
+    assert out["fleet"][0]["heap_pct"] == 70.0  # fleet takes the max heap %
+    ps.save()
+    reloaded = PSHealthHistory(maxlen=6, data_dir=str(tmp_path))
+    reloaded.load()
+    assert reloaded.history(3600, now=start + 200)["fleet"] == out["fleet"]
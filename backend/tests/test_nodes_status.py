@@ -242,28 +242,99 @@ def test_get_newest_report_no_pql_order_by():
     assert row["status"] == "unchanged"
 
 
-def test_apply_live_run_flips_stale_failed():
-    from unittest.mock import AsyncMock, MagicMock
+def _agent_db(tmp_path):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from app.database import Base
+    import app.models  # noqa: F401
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'agent.db'}")
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    return engine, async_sessionmaker(engine, expire_on_commit=False), setup
+
+
+def test_apply_live_run_flips_stale_failed(tmp_path):
     import asyncio
     from app.routers import nodes as nodes_mod
+    from app.services.agent_runs import upsert_last_success
 
-    class Row:
-        def __init__(self):
-            self.node_name = "ovcompiler1"
-            self.executed_at = datetime.utcnow()
-            self.status = "success"
-            self.command_name = "/opt/puppetlabs/bin/puppet agent -t"
-
-    result = MagicMock()
-    result.scalars.return_value.all.return_value = [Row()]
-    db = AsyncMock()
-    db.execute = AsyncMock(return_value=result)
-
-    node = {
-        "certname": "ovcompiler1.pdxc-it.corp.int-x.ai",
-        "latest_report_status": "failed",
-        "report_timestamp": (datetime.utcnow() - timedelta(hours=2)).isoformat() + "Z",
-    }
-    asyncio.run(nodes_mod.apply_live_run_status([node], db))
-    assert node["latest_report_status"] == "unchanged"
-    assert node["status_source"] == "live_run"
+    engine, factory, setup = _agent_db(tmp_path)
+    now = datetime.utcnow()
+    stale = (now - timedelta(hours=2)).isoformat() + "Z"
+    nodes = [
+        # short-name run, one matching certname
+        {"certname": "ovcompiler1.pdxc-it.corp.int-x.ai", "latest_report_status": "failed", "report_timestamp": stale},
+        # recorded as a shorter FQDN prefix
+        {"certname": "ovca1.pdxc-it.corp.int-x.ai", "latest_report_status": "failed", "report_timestamp": stale},
+        # short name recorded for two sites: ambiguous, left alone
+        {"certname": "web1.dc1.example", "latest_report_status": "failed", "report_timestamp": stale},
+        # failed report newer than the run wins
+        {"certname": "db1.example", "latest_report_status": "failed", "report_timestamp": now.isoformat() + "Z"},
+    ]
+
+    async def scenario():
+        await setup()
+        async with factory() as db:
+            await upsert_last_success(db, ["ovcompiler1", "ovca1.pdxc-it", "web1.dc2.example", "web1.dc3.example"], now)
+            await upsert_last_success(db, ["db1.example"], now - timedelta(hours=1))
+            await db.commit()
+        async with factory() as db:
+            await nodes_mod.apply_live_run_status(nodes, db)
+        await engine.dispose()
+
+    asyncio.run(scenario())
+    assert [n["latest_report_status"] for n in nodes] == ["unchanged", "unchanged", "failed", "failed"]
+    assert nodes[0]["status_source"] == "live_run"
+
+
+def test_finish_history_records_agent_success_per_target(tmp_path):
+    import asyncio
+    import json
+    import time
+    from sqlalchemy import select
+    from app.models import AgentLastSuccess
+    from app.services import agent_runs
+    from app.services.bolt_orchestration import finish_execution_history, start_execution_history
+
+    engine, factory, setup = _agent_db(tmp_path)
+    doc = json.dumps({"items": [
+        {"target": "Web01.example", "status": "success", "value": {"exit_code": 2}},
+        {"target": "web02.example", "status": "failure", "value": {"exit_code": 1}},
+    ]})
+
+    async def scenario():
+        await setup()
+        async with factory() as db:
+            # history from before the table existed
+            old = await start_execution_history(
+                db, execution_type="command", node_name="db1.example, all", executed_by="admin",
+                command_name="puppet agent -t",
+            )
+            await finish_execution_history(db, old, {"returncode": 0, "stdout": ""}, time.time())
+            await db.execute(AgentLastSuccess.__table__.delete())
+            await db.commit()
+        assert await agent_runs.backfill_agent_last_success(factory) == 1
+        assert await agent_runs.backfill_agent_last_success(factory) == 0
+
+        async with factory() as db:
+            entry = await start_execution_history(
+                db, execution_type="command", node_name="all", executed_by="admin",
+                command_name="/opt/puppetlabs/bin/puppet agent -t",
+            )
+            await finish_execution_history(
+                db, entry, {"returncode": 2, "stdout": doc}, time.time(), original_command="puppet agent -t"
+            )
+            other = await start_execution_history(
+                db, execution_type="command", node_name="web03.example", executed_by="admin", command_name="uptime",
+            )
+            await finish_execution_history(db, other, {"returncode": 0, "stdout": ""}, time.time())
+            rows = (await db.execute(select(AgentLastSuccess))).scalars().all()
+            found = {r.certname: (r.short_name, r.history_id) for r in rows}
+        await engine.dispose()
+        return entry.id, found
+
+    entry_id, found = asyncio.run(scenario())
+    assert found == {"db1.example": ("db1", None), "web01.example": ("web01", entry_id)}
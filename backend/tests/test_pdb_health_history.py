@@ -0,0 +1,64 @@
+"""OpenVoxDB queue/JVM collector: rates, tiers and fleet roll-up."""
+import asyncio
+from unittest.mock import patch
+
+from app.services import pdb_health_history as pdbh
+from app.utils.tiered_series import TieredSeries
+
+
+def test_tiered_series_rollups_and_tier_pick():
+    s = TieredSeries(("v",), tiers=((0, 6), (60, 10)))
+    for i in range(12):
+        s.add(1000 + i * 10, {"v": i})
+    raw = s.query(60, now=1110)
+    assert raw["tier"] == 0 and len(raw["points"]) == 6
+
+    rolled = s.query(600, now=1110, bounds=True)
+    assert rolled["step"] == 60
+    first, last = rolled["points"][0], rolled["points"][-1]
+    assert first["ts"] == 960 and first["v_max"] == 1  # 1000..1010 land in [960, 1020)
+    assert last["v_min"] == 8 and last["v_max"] == 11  # open bucket is visible
+    assert s.query(600, now=1110, stat="last")["points"][1]["v"] == 7
+
+
+def _metrics(depth, processed, heap_used):
+    mq = "puppetlabs.puppetdb.mq:name=global."
+    return {
+        mq + "depth": {"Count": depth},
+        mq + "processed": {"Count": processed, "OneMinuteRate": 0.5},
+        mq + "processing-time": {"Mean": 12.0},
+        "java.lang:type=Memory": {"HeapMemoryUsage": {"used": heap_used, "max": 1048576 * 100}},
+    }
+
+
+def test_collect_rates_and_fleet_rollup(tmp_path):
+    store = pdbh.PDBHealthHistory(data_dir=str(tmp_path))
+    calls = {"n": 0}
+
+    class FakePDB:
+        async def read_pdb_metrics(self, mbeans, host=None):
+            calls["n"] += 1
+            step = calls["n"]
+            if host == "pdb2.example":
+                return _metrics(5, 200 + step * 20, 1048576 * 80)
+            return _metrics(3, 100 + step * 10, 1048576 * 40)
+
+    times = iter([1000.0, 1010.0])
+    with patch("app.services.puppetdb.puppetdb_service", FakePDB()), \
+         patch("app.utils.host_series.time.time", lambda: next(times)):
+        hosts = ["pdb1.example", "pdb2.example"]
+        asyncio.run(store.collect_once(hosts))
+        asyncio.run(store.collect_once(hosts))
+
+    hist = store.get_history(window_sec=3600, now=1010.0)
+    assert [h["host"] for h in hist["hosts"]] == ["pdb1.example", "pdb2.example"]
+    first, second = hist["fleet"]
+    assert first["processed_rate"] == 1.0  # first sample falls back to OneMinuteRate (0.5 × 2)
+    assert second["queue_depth"] == 8  # depth sums across nodes
+    assert second["processed_rate"] > 1.0  # counter delta / 10s summed across nodes
+    assert second["heap_pct"] == 80  # heap % is the worst node
+
+    store.save()
+    reloaded = pdbh.PDBHealthHistory(data_dir=str(tmp_path))
+    reloaded.load()
+    assert reloaded.get_history(window_sec=3600, now=1010.0)["fleet"] == hist["fleet"]
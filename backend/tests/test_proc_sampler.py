@@ -0,0 +1,57 @@
+"""/proc delta sampler: interval CPU, disk busy and per-process CPU/RSS."""
+from unittest.mock import patch
+
+from app.services import proc_sampler
+from app.services.proc_sampler import ProcDeltaSampler
+
+
+def test_interval_deltas(tmp_path):
+    procs = {
+        101: ("java", "/usr/bin/java -cp puppet-server-release.jar clojure.main -m puppetlabs.trapperkeeper.main", 1000, 25600),
+        202: ("postgres", "postgres: checkpointer", 50, 2560),
+        303: ("sshd", "sshd: root", 5, 100),
+    }
+    (tmp_path / "stat").write_text("cpu  100 0 50 800 50 0 0 0\n")
+    (tmp_path / "diskstats").write_text("   8 0 sda 1 0 1000 0 1 0 2000 0 0 100 0\n")
+    _write_proc_pids(tmp_path, procs)
+
+    clock = iter([0.0, 10.0])
+    with patch.object(proc_sampler.time, "monotonic", lambda: next(clock)), \
+         patch.object(proc_sampler, "_CLK_TCK", 100), patch.object(proc_sampler, "_PAGE_SIZE", 4096):
+        sampler = ProcDeltaSampler(r"java|postgres", proc_root=str(tmp_path))
+        first = sampler.sample()
+        assert first["cpu_window"] == "boot"
+
+        # 10s later: 1000 ticks elapsed, 200 user, 100 iowait, 50 steal, 650 idle
+        (tmp_path / "stat").write_text("cpu  300 0 50 1450 150 0 0 50\n")
+        (tmp_path / "diskstats").write_text("   8 0 sda 1 0 3048 0 1 0 4048 0 0 5100 0\n")
+        procs[101] = procs[101][:2] + (1500, 25600)  # +500 ticks over 10s = 50%
+        _write_proc_pids(tmp_path, procs)
+        second = sampler.sample()
+
+    assert second["cpu_window"] == "interval"
+    assert second["cpu_user_pct"] == 20.0
+    assert second["cpu_iowait_pct"] == 10.0
+    assert second["cpu_steal_pct"] == 5.0
+    assert second["cpu_used_pct"] == 35.0
+    assert second["disk_busy_pct"] == 50.0  # 5000 ms busy in 10 s
+    assert second["disk_read_kbps"] == 102.4
+    by_pid = {p["pid"]: p for p in second["processes"]}
+    assert set(by_pid) == {101, 202}
+    assert by_pid[101]["role"] == "puppetserver"
+    assert by_pid[101]["cpu_pct"] == 50.0
+    assert by_pid[101]["rss_mb"] == 100.0
+    assert by_pid[202]["role"] == "postgres"
+
+
+def _write_proc_pids(root, procs):
+    for pid, (comm, cmdline, ticks, rss_pages) in procs.items():
+        d = root / str(pid)
+        d.mkdir(exist_ok=True)
+        (d / "comm").write_text(comm + "\n")
+        (d / "cmdline").write_text(cmdline.replace(" ", "\0"))
+        # after "(comm)": state ppid pgrp session tty tpgid flags minflt cminflt majflt cmajflt
+        #                 utime stime cutime cstime priority nice threads itrealvalue starttime vsize rss
+        rest = ["S", "1", "1", "1", "0", "-1", "0", "0", "0", "0", "0",
+                str(ticks), "0", "0", "0", "20", "0", "40", "0", "5000", "0", str(rss_pages)]
+        (d / "stat").write_text(f"{pid} ({comm}) " + " ".join(rest) + "\n")
@@ -0,0 +1,86 @@
+"""Per-compiler Puppet Server health rings, fleet aggregate and persistence."""
+import asyncio
+
+from app.services.ps_health_history import PSHealthHistory
+
+
+def _snap(heap_pct, compile_ms):
+    return {
+        "status": "running",
+        "jvm_heap": {"used_mb": heap_pct * 10, "pct": heap_pct},
+        "compile_time_ms": compile_ms,
+        "http_metrics": [{"route": "puppet-v3-catalog", "mean": compile_ms}],
+    }
+
+
+def test_poll_all_hosts_bounded_and_aggregates(tmp_path):
+    hist = PSHealthHistory(maxlen=3, data_dir=str(tmp_path))
+    in_flight = peak = 0
+
+    async def fetch(host):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if host == "c3.example":
+            raise RuntimeError("connect refused")
+        return _snap(40 if host == "c1.example" else 80, 100 if host == "c1.example" else 300)
+
+    hosts = ["c1.example", "c2.example", "c3.example"]
+    for _ in range(5):
+        asyncio.run(hist.poll(hosts, fetch, concurrency=2))
+
+    assert peak <= 2
+    assert len(hist.host_series("c1.example")) == 3  # ring is fixed-size
+    assert "c3.example" in hist.errors()
+    fleet = hist.fleet_series(hosts)
+    assert len(fleet) == 3
+    assert fleet[-1]["heap_pct"] == 80  # max across compilers
+    assert fleet[-1]["compile_time_ms"] == 200  # mean across compilers
+    assert fleet[-1]["http_catalog_mean"] == 200
+    assert fleet[-1]["gc_old_time"] is None
+
+
+def test_save_load_roundtrip_and_retain(tmp_path):
+    hist = PSHealthHistory(maxlen=10, data_dir=str(tmp_path))
+    hist.add("c1.example", _snap(50, 120), ts=1000.0)
+    hist.add("c2.example", _snap(60, 130), ts=1000.0)
+    hist.save()
+
+    loaded = PSHealthHistory(maxlen=10, data_dir=str(tmp_path))
+    loaded.load()
+    assert loaded.hosts() == ["c1.example", "c2.example"]
+    assert loaded.host_series("c1.example")[0]["compile_time_ms"] == 120
+
+    loaded.retain(["c1.example"])
+    assert loaded.hosts() == ["c1.example"]
+    assert not (tmp_path / "ps_health" / "c2.example.tiers").exists()
+
+
+def test_one_worker_polls_the_others_follow(tmp_path):
+    leader = PSHealthHistory(maxlen=10, data_dir=str(tmp_path))
+    follower = PSHealthHistory(maxlen=10, data_dir=str(tmp_path))
+    assert leader.lead() and not follower.lead()
+
+    async def fetch(host):
+        if host == "c2.example":
+            raise RuntimeError("connect refused")
+        return _snap(50, 120)
+
+    asyncio.run(leader.poll(["c1.example", "c2.example"], fetch))
+    leader.publish()
+    assert follower.follow() and not follower.follow()  # unchanged file is not re-read
+    assert follower.host_series("c1.example")[0]["compile_time_ms"] == 120
+    assert "c2.example" in follower.errors()
+    assert follower.latest("c1.example") == {"status": "running"}
+
+    asyncio.run(leader.poll(["c1.example"], fetch))
+    leader.publish()
+    follower.follow()
+    assert len(follower.host_series("c1.example")) == 2  # only the new point is added
+    assert follower.hosts() == ["c1.example"]
+    assert not list((tmp_path / "ps_health").glob("*.tiers"))  # followers never write
+
+    leader.release()
+    assert follower.lead()
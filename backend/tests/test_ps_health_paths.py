@@ -0,0 +1,77 @@
+"""Puppet Server health snapshot: learned status paths and round-trips."""
+import asyncio
+import json
+
+import httpx
+
+from app.services.puppetserver import PuppetServerService
+from app.utils.json_paths import LearnedPaths, find_key_path
+
+STATUS = {
+    "master": {
+        "service_version": "8.6.1",
+        "state": "running",
+        "status": {
+            "experimental": {
+                "http-metrics": [
+                    {"route-id": "puppet-v3-catalog-/*/", "mean": 410, "count": 90},
+                    {"route-id": "puppet-v3-report-/*/", "mean": 35, "count": 80},
+                    {"route-id": "total", "mean": 120, "count": 400},
+                ],
+                "puppetdb-metrics": [{"metric": "catalog_save", "mean": 20}],
+            },
+        },
+    },
+    "jruby-metrics": {"status": {"experimental": {"metrics": {"num-jrubies": 4}}}},
+}
+MEMORY = {"value": {"HeapMemoryUsage": {"used": 512 * 1048576, "max": 2048 * 1048576, "committed": 1024 * 1048576}}}
+
+
+def test_learned_paths_replay_and_relearn():
+    lp = LearnedPaths(relearn_every=2)
+    doc = {"a": {"b": {"compile_time_ms": 5}}}
+    search = lambda o: find_key_path(o, ["compile_time_ms"])  # noqa: E731
+    lp.begin("s")
+    assert lp.find("s", "compile", doc, search) == 5
+    assert lp.find("s", "compile", {"a": {"b": {"compile_time_ms": 7}}}, search) == 7
+    assert lp.stats()["hits"] == 1
+    # Layout change: the stale path misses once, then the new path is learned
+    moved = {"x": {"compile_time_ms": 9}}
+    assert lp.find("s", "compile", moved, search) == 9
+    assert lp.find("s", "compile", moved, search) == 9
+    assert lp.stats()["misses"] == 2
+
+
+def test_snapshot_second_sample_uses_one_status_call():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.raw_path.decode())
+        if request.url.path == "/status/v1/services":
+            return httpx.Response(200, json=STATUS)
+        if "Memory" in request.url.raw_path.decode():
+            return httpx.Response(200, json=MEMORY)
+        return httpx.Response(404, json={})
+
+    svc = PuppetServerService()
+    client = httpx.AsyncClient(base_url="https://ps.example:8140", transport=httpx.MockTransport(handler))
+
+    async def _client(host=None):
+        return client
+
+    svc._get_ps_client = _client
+
+    async def _run():
+        first = await svc.get_ps_health_snapshot()
+        calls.clear()
+        second = await svc.get_ps_health_snapshot()
+        return first, second
+
+    first, second = asyncio.run(_run())
+    assert first["compile_time_ms"] == 410
+    assert first["jvm_heap"]["pct"] == 25.0
+    assert json.dumps(first, sort_keys=True, default=str) == json.dumps(second, sort_keys=True, default=str)
+    assert sum(1 for c in calls if c.startswith("/status/")) == 1
+    # Memory mbean answered on the first encoding tried; no retries on the second sample
+    assert sum(1 for c in calls if "Memory" in c) == 1
+    assert svc._ps_paths.stats()["hits"] > 0
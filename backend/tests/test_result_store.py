@@ -0,0 +1,152 @@
+"""Stored full execution results: per-target rows, lazy ranged reads, limits, retention."""
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.database import Base
+from app.models import ExecutionResult
+from app.routers import execution_history as eh
+from app.services import result_store
+from app.services.db_maintenance import delete_in_batches
+from app.services.bolt_orchestration import finish_execution_history, start_execution_history
+
+
+def _db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'results.db'}")
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    return engine, async_sessionmaker(engine, expire_on_commit=False), setup
+
+
+def test_finish_history_stores_targets_for_lazy_reads(tmp_path):
+    engine, factory, setup = _db(tmp_path)
+    big = "line of output\n" * 5000
+    stdout = json.dumps({"items": [
+        {"target": "web01", "status": "success", "value": {"stdout": big, "exit_code": 0}},
+        {"target": "web02", "status": "failure", "value": {"stderr": "boom", "exit_code": 1}},
+    ]})
+
+    async def scenario():
+        await setup()
+        async with factory() as db:
+            entry = await start_execution_history(
+                db, execution_type="command", node_name="web01,web02", executed_by="admin", command_name="cat log"
+            )
+            await finish_execution_history(
+                db, entry, {"returncode": 2, "stdout": stdout, "stderr": "\x1b[31mfailed on 1 target\x1b[0m"},
+                time.time(),
+            )
+            listing = await result_store.list_results(db, entry.id)
+            whole = await result_store.read_result(db, entry.id, "web01")
+            ranged = await result_store.read_result(db, entry.id, "web01", offset=10, length=100)
+            run = await result_store.read_result(db, entry.id)
+            missing = await result_store.read_result(db, entry.id, "web03")
+        await engine.dispose()
+        return entry, listing, whole, ranged, run, missing
+
+    entry, listing, whole, ranged, run, missing = asyncio.run(scenario())
+    assert len(entry.result_preview) == 500
+    assert [(t["target"], t["status"]) for t in listing["targets"]] == [("web01", "success"), ("web02", "failure")]
+    assert listing["run"]["codec"] in ("gzip", "zstd")
+    assert listing["stored_size"] < listing["size"] / 10
+    assert whole["complete"] and whole["document"]["value"]["stdout"] == big
+    assert not ranged["complete"] and ranged["length"] == 100 and "document" not in ranged
+    assert ranged["content"] == json.dumps(whole["document"], ensure_ascii=False)[10:110]
+    assert run["document"] == {"returncode": 2, "stderr": "failed on 1 target"}
+    assert missing is None
+
+
+def test_size_cap_and_retention(tmp_path, monkeypatch):
+    engine, factory, setup = _db(tmp_path)
+    monkeypatch.setattr(settings, "execution_results_max_mb", 1)
+    chunk = "x" * (400 * 1024)
+    stdout = json.dumps({"items": [
+        {"target": f"web{i}", "status": "success", "value": {"stdout": chunk}} for i in range(4)
+    ]})
+
+    async def scenario():
+        await setup()
+        async with factory() as db:
+            assert await result_store.store_results(db, 7, {"returncode": 0, "stdout": stdout}) == 3
+            listing = await result_store.list_results(db, 7)
+            run = await result_store.read_result(db, 7)
+            # human output only: one run-level row, tail kept
+            await result_store.store_results(db, 8, {"returncode": 0, "stdout": "y" * (3 * 1024 * 1024)})
+            human = await result_store.read_result(db, 8)
+
+            old = (await db.execute(select(ExecutionResult).where(ExecutionResult.history_id == 7))).scalars().all()
+            for row in old:
+                row.created_at = datetime.utcnow() - timedelta(days=40)
+            await db.commit()
+            monkeypatch.setattr(settings, "execution_results_retention_days", 30)
+            purged = await delete_in_batches(
+                factory, ExecutionResult.id, ExecutionResult.created_at < result_store.retention_cutoff(), batch=2
+            )
+            await result_store.delete_results(db, [8])
+            await db.commit()
+            left = (await db.execute(select(func.count()).select_from(ExecutionResult))).scalar()
+        await engine.dispose()
+        return listing, run, human, purged, left
+
+    listing, run, human, purged, left = asyncio.run(scenario())
+    assert [t["target"] for t in listing["targets"]] == ["web0", "web1"]
+    assert run["document"]["targets_not_stored"] == 2
+    assert human["document"]["stdout_truncated"] and len(human["document"]["stdout"]) == 512 * 1024
+    assert purged == 3 and left == 0
+
+
+def test_ranged_reads_stop_early_and_results_are_owner_only(tmp_path, monkeypatch):
+    engine, factory, setup = _db(tmp_path)
+    raw = json.dumps({"stdout": "".join(f"{i:08d}\n" for i in range(200000))}).encode()
+    blob = result_store.compress(raw, "gzip")
+    fed = []
+    real = result_store.zlib.decompressobj
+
+    class Counting:
+        def __init__(self, *a):
+            self._d = real(*a)
+
+        def decompress(self, data, max_length=0):
+            fed.append(len(data))
+            return self._d.decompress(data, max_length)
+
+        def __getattr__(self, name):
+            return getattr(self._d, name)
+
+    monkeypatch.setattr(result_store.zlib, "decompressobj", Counting)
+    assert result_store.decompress_prefix(blob, "gzip", 1000) == raw[:1000]
+    assert sum(fed) < len(blob)  # never fed the whole blob
+    assert result_store.decompress_prefix(blob, "gzip", len(raw) + 5) == raw
+
+    def request(role):
+        return SimpleNamespace(state=SimpleNamespace(user={"user_id": "u", "role": role}))
+
+    async def scenario():
+        await setup()
+        async with factory() as db:
+            entry = await start_execution_history(db, execution_type="command", node_name="web01",
+                                                  executed_by="alice", command_name="uptime")
+            await result_store.store_results(db, entry.id, {"returncode": 0, "stdout": "up 3 days"})
+            whole = await eh.get_execution_result_output(
+                entry.id, request("operator"), "", 0, 10_000, db=db, current_user="alice")
+            admin = await eh.get_execution_results(entry.id, request("admin"), db=db, current_user="root")
+            with pytest.raises(HTTPException) as exc:
+                await eh.get_execution_results(entry.id, request("operator"), db=db, current_user="bob")
+        await engine.dispose()
+        return whole, admin, exc.value.status_code
+
+    whole, admin, denied = asyncio.run(scenario())
+    assert whole["complete"] and whole["document"]["stdout"] == "up 3 days"
+    assert admin["stored"] and denied == 404
@@ -0,0 +1,127 @@
+"""Run-phase percentile sketches (DDSketch + per-dimension store)."""
+import random
+
+from app.services.run_sketches import RunSketchStore, summarize
+from app.utils.quantile_sketch import DDSketch
+
+
+def test_ddsketch_quantiles_within_relative_error():
+    rnd = random.Random(7)
+    values = [rnd.lognormvariate(3.0, 0.8) for _ in range(5000)]
+    sk = DDSketch(relative_accuracy=0.01)
+    sk.extend(values)
+    values.sort()
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sk.quantile(q) - exact) / exact < 0.03
+
+
+def test_ddsketch_merge_equals_single_stream():
+    a, b, both = DDSketch(), DDSketch(), DDSketch()
+    for i in range(1, 500):
+        (a if i % 2 else b).add(i / 10)
+        both.add(i / 10)
+    a.merge(b)
+    assert a.count == both.count
+    assert a.quantile(0.95) == both.quantile(0.95)
+    assert DDSketch.from_dict(a.to_dict()).quantile(0.99) == a.quantile(0.99)
+
+
+def _run(cn, producer, total, start, h):
+    return {
+        "hash": h,
+        "certname": cn,
+        "producer": producer,
+        "environment": "production",
+        "start_time": start,
+        "run_duration": total + 1,
+        "timing": {"total": total, "config_retrieval": total / 2},
+    }
+
+
+def test_store_dimensions_and_watermark():
+    store = RunSketchStore()
+    now = 1_790_000_000.0
+    start = "2026-09-21T12:00:00Z"
+    rt = "2026-09-21T12:00:05.000Z"
+    assert store.ingest(_run("a.example", "ovcompiler1", 10, start, "h1"), rt, now=now)
+    assert store.ingest(_run("b.example", "ovcompiler2", 90, start, "h2"), rt, now=now)
+    # Same hash at the watermark is not folded in twice.
+    assert not store.ingest(_run("b.example", "ovcompiler2", 90, start, "h2"), rt, now=now)
+
+    fleet = summarize(store.fleet(hours=168, now=now))
+    assert fleet["total"]["count"] == 2
+    producers = store.by_dimension("producer", hours=168, now=now)
+    assert set(producers) == {"ovcompiler1", "ovcompiler2"}
+    scoped = summarize(store.nodes(["A.example"]))
+    assert scoped["total"]["count"] == 1
+    assert abs(scoped["total"]["p95"] - 10) < 0.2
+
+
+def test_cold_fill_runs_in_background(monkeypatch):
+    import asyncio
+
+    from app.routers import performance
+
+    store = RunSketchStore()
+    calls = []
+    release = asyncio.Event()
+
+    async def slow_reports(**kwargs):
+        calls.append(kwargs["offset"])
+        await release.wait()
+        return []
+
+    monkeypatch.setattr(performance, "run_sketch_store", store)
+    monkeypatch.setattr(performance, "_sketch_task", None)
+    monkeypatch.setattr(performance.puppetdb_service, "get_reports", slow_reports)
+
+    async def scenario():
+        assert performance._kick_run_sketches() is True  # returns at once, fill pending
+        await asyncio.sleep(0)
+        assert performance._kick_run_sketches() is True  # no second fill while one runs
+        await asyncio.sleep(0)
+        assert calls == [0]
+        release.set()
+        await performance._sketch_task
+        assert performance._kick_run_sketches() is False
+
+    asyncio.run(scenario())
+
+
+def test_catch_up_pages_to_the_end_and_warms_until_then(monkeypatch):
+    import asyncio
+
+    from app.routers import performance
+
+    store = RunSketchStore()
+    offsets = []
+    pages = {0: 2, 2: 2, 4: 1}  # two full pages, then a short one
+
+    async def reports(**kwargs):
+        offsets.append(kwargs["offset"])
+        n = pages[kwargs["offset"]]
+        return [{"hash": f"h{kwargs['offset']}-{i}", "certname": "a.example",
+                 "receive_time": f"2026-09-21T12:00:0{kwargs['offset'] + i}.000Z"} for i in range(n)]
+
+    async def failing(**kwargs):
+        raise RuntimeError("PuppetDB down")
+
+    monkeypatch.setattr(performance, "run_sketch_store", store)
+    monkeypatch.setattr(performance, "_sketch_task", None)
+    monkeypatch.setattr(performance, "_SKETCH_PAGE", 2)
+    monkeypatch.setattr(performance.puppetdb_service, "get_reports", failing)
+
+    async def scenario():
+        assert performance._kick_run_sketches() is True
+        await performance._sketch_task
+        failed_warming = performance._kick_run_sketches()  # refreshed, but not caught up
+        store.refreshed_at = 0.0
+        monkeypatch.setattr(performance.puppetdb_service, "get_reports", reports)
+        assert performance._kick_run_sketches() is True
+        await performance._sketch_task
+        return failed_warming, performance._kick_run_sketches()
+
+    failed_warming, warming = asyncio.run(scenario())
+    assert failed_warming is True
+    assert offsets == [0, 2, 4] and warming is False
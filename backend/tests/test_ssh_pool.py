@@ -0,0 +1,91 @@
+"""Pooled SSH transport: connection reuse, channel bound, reconnect, idle eviction."""
+import asyncio
+from types import SimpleNamespace
+
+from app.services.command_execution import SSHRemoteTransport
+from app.services.ssh_pool import SSHPool
+
+
+class FakeConn:
+    def __init__(self, log):
+        self.log = log
+        self.closed = False
+        self.fail_next = False
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+    async def run(self, command, check=False):
+        if self.fail_next:
+            self.fail_next = False
+            raise ConnectionResetError("connection lost")
+        self.log["active"] += 1
+        self.log["peak"] = max(self.log["peak"], self.log["active"])
+        await asyncio.sleep(0.01)
+        self.log["active"] -= 1
+        self.log["commands"].append(command)
+        return SimpleNamespace(exit_status=0, stdout=f"ran {command}\n", stderr="")
+
+
+def _pool(log, **kw):
+    async def connector(host, **opts):
+        log["connects"].append((host, opts["username"]))
+        conn = FakeConn(log)
+        log["conns"].append(conn)
+        return conn
+
+    return SSHPool(connector=connector, **kw)
+
+
+def test_reuses_connection_and_bounds_channels():
+    log = {"active": 0, "peak": 0, "commands": [], "connects": [], "conns": []}
+    pool = _pool(log, channels_per_host=2)
+
+    async def _run():
+        t = SSHRemoteTransport("ovc1.example", pool=pool)
+        results = await asyncio.gather(*(t.run(["cat", "/etc/x y"]) for _ in range(6)))
+        await pool.run("ovdb1", "uptime")
+        return results
+
+    results = asyncio.run(_run())
+    assert all(r["returncode"] == 0 for r in results)
+    assert log["commands"][0] == "cat '/etc/x y'"
+    assert log["connects"] == [("ovc1.example", "root"), ("ovdb1", "root")]
+    assert log["peak"] == 2
+
+
+def test_reconnects_once_and_evicts_idle():
+    log = {"active": 0, "peak": 0, "commands": [], "connects": [], "conns": []}
+    pool = _pool(log, user="svc", idle_sec=60)
+
+    async def _run():
+        await pool.run("ovc1", "true")
+        log["conns"][0].fail_next = True
+        return await pool.run("ovc1", "id")
+
+    res = asyncio.run(_run())
+    assert res["stdout"].startswith("ran sudo -n -- sh -c id")  # non-root goes through sudo
+    assert len(log["connects"]) == 2 and log["conns"][0].closed
+    assert pool.stats()["connections"] == 1
+    entry = next(iter(pool._hosts.values()))
+    assert pool.evict_idle(now=entry.last_used + 30) == 0
+    assert pool.evict_idle(now=entry.last_used + 61) == 1
+    assert log["conns"][1].closed and pool.stats()["hosts"] == 0
+
+
+def test_transports_share_registered_pools():
+    from app.services import ssh_pool
+
+    asyncio.run(ssh_pool.close_pool())
+    a = SSHRemoteTransport("ovc1", identity_file="/k/bolt", user="svc")
+    b = SSHRemoteTransport("ovc2", identity_file="/k/bolt", user="svc")
+    c = SSHRemoteTransport("ovc1", identity_file="/k/other", user="svc")
+    assert a._pool is b._pool and a._pool is not c._pool
+    assert a._pool.identity_file == "/k/bolt" and a._pool.user == "svc"
+    assert len(ssh_pool._pools) == 2
+
+    asyncio.run(ssh_pool.close_pool())
+    assert ssh_pool._pools == {} and ssh_pool.pool_stats()["hosts"] == 0
@@ -0,0 +1,98 @@
+"""Upstream latency histograms: outcomes, label bounds, SLO summary and pool gauges."""
+import asyncio
+
+import httpx
+import pytest
+
+from app.utils import upstream_metrics as um
+from app.utils.sudo import command_label
+from app.utils.upstream_metrics import InstrumentedTransport, UpstreamMetrics, endpoint_label, observe
+
+
+def test_endpoint_labels_are_bounded():
+    assert endpoint_label("/pdb/query/v4/nodes/web01.example.com/facts") == "/pdb/query/v4/nodes/:id/facts"
+    assert endpoint_label("/pdb/query/v4/reports/0123456789abcdef0123/logs") == "/pdb/query/v4/reports/:id/logs"
+    assert endpoint_label("/puppet-ca/v1/certificate_status/web01") == "/puppet-ca/v1/certificate_status/:id"
+    assert endpoint_label("/pdb/query/v4", "reports[certname] { latest_report? = true }") == "pql:reports"
+    assert endpoint_label("/status/v1/services", None) == "/status/v1/services"
+    assert command_label(["sudo", "-E", "-u", "bolt", "/opt/puppetlabs/bin/bolt", "task", "run"]) == "bolt"
+    assert command_label(["sudo", "/opt/puppetlabs/bin/puppetserver", "ca", "list"]) == "puppetserver"
+
+    reg = UpstreamMetrics()
+    for i in range(um.MAX_HOSTS + 5):
+        reg.record("puppetdb", "/x", f"pdb{i}.example.com", "ok", 0.01)
+    hosts = {host for (_e, host, _o) in reg._deps["puppetdb"].series}
+    assert len(hosts) == um.MAX_HOSTS + 1 and "other" in hosts
+    for i in range(um.MAX_SERIES + 10):
+        reg.record("ca", f"/e{i}", "ca", "ok", 0.01)
+    assert len(reg._deps["ca"].series) == um.MAX_SERIES + 1
+    assert reg._deps["ca"].dropped == 10
+
+
+def test_transport_records_outcomes_and_summary():
+    reg = UpstreamMetrics()
+
+    def handler(request):
+        if request.url.path.endswith("/boom"):
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(503 if "down" in request.url.path else 200, json=[])
+
+    async def scenario():
+        transport = InstrumentedTransport("puppetdb", inner=httpx.MockTransport(handler), host="pdb1", registry=reg)
+        async with httpx.AsyncClient(base_url="https://pdb1:8081", transport=transport) as client:
+            await client.get("/pdb/query/v4", params={"query": "nodes[certname] {}"})
+            await client.get("/pdb/query/v4/nodes/web01.example.com")
+            await client.get("/status/down")
+            with pytest.raises(httpx.ConnectError):
+                await client.get("/status/boom")
+        async with observe("bolt", "task run", registry=reg) as obs:
+            obs.exit({"returncode": -1, "stderr": "Command timed out"})
+
+    asyncio.run(scenario())
+
+    series = reg._deps["puppetdb"].series
+    assert series[("pql:nodes", "pdb1", "ok")].count == 1
+    assert series[("/pdb/query/v4/nodes/:id", "pdb1", "ok")].count == 1
+    assert series[("/status/down", "pdb1", "http_5xx")].count == 1
+    assert series[("/status/boom", "pdb1", "error")].count == 1
+    assert reg._deps["puppetdb"].in_flight == 0
+
+    summary = {d["dependency"]: d for d in reg.summary(900)["dependencies"]}
+    pdb = summary["puppetdb"]
+    assert pdb["count"] == 4 and pdb["errors"] == 2
+    assert pdb["slo"]["compliance_pct"] == 50.0
+    assert pdb["slo"]["error_budget_remaining_pct"] == 0.0
+    assert pdb["p50_ms"] is not None
+    assert summary["bolt"]["errors"] == 1
+    assert summary["sudo"]["count"] == 0
+
+    text = "\n".join(reg.render_prometheus())
+    assert 'openvox_gui_upstream_request_duration_seconds_count{dependency="puppetdb",endpoint="pql:nodes",host="pdb1",outcome="ok"} 1' in text
+    assert 'outcome="timeout"' in text
+    assert 'openvox_gui_upstream_in_flight{dependency="ca"} 0' in text
+
+
+def test_pool_stats_from_real_transport():
+    reg = UpstreamMetrics()
+    transport = InstrumentedTransport("puppetserver", host="ps1", registry=reg, limits=httpx.Limits(max_connections=8))
+    stats = reg.pool_stats()
+    assert stats == [transport.pool_stats()]
+    assert stats[0]["max"] == 8 and stats[0]["active"] == 0 and stats[0]["waiting"] == 0
+
+
+def test_nested_observation_is_recorded_once():
+    reg = UpstreamMetrics()
+
+    async def _run():
+        async with observe("bolt", "command run", registry=reg) as obs:
+            async with observe("sudo", "bolt", registry=reg) as inner:
+                inner.exit({"returncode": 0})
+            obs.exit({"returncode": 0})
+        async with observe("sudo", "systemctl", registry=reg):
+            pass
+
+    asyncio.run(_run())
+    text = "\n".join(reg.render_prometheus())
+    assert 'dependency="bolt",endpoint="command run"' in text
+    assert 'endpoint="bolt"' not in text  # run_sudo inside the Bolt wrapper is not a sudo call
+    assert 'dependency="sudo",endpoint="systemctl"' in text
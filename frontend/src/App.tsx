@@ -77,6 +77,7 @@ const MetricsHeatmapPage = lazyWithRetry(() => import('./pages/MetricsHeatmap').
 const MetricsEnvironmentsPage = lazyWithRetry(() => import('./pages/MetricsEnvironments').then(m => ({ default: m.MetricsEnvironmentsPage })));
 const MetricsClassCoveragePage = lazyWithRetry(() => import('./pages/MetricsClassCoverage').then(m => ({ default: m.MetricsClassCoveragePage })));
 const MetricsHostHealthPage = lazyWithRetry(() => import('./pages/MetricsHostHealth').then(m => ({ default: m.MetricsHostHealthPage })));
+const MetricsUpstreamLatencyPage = lazyWithRetry(() => import('./pages/MetricsUpstreamLatency').then(m => ({ default: m.MetricsUpstreamLatencyPage })));
 
 function PageLoader() {
   return (
@@ -166,6 +167,7 @@ function AppRoutes() {
           <Route path="/insights/openvox-server-health" element={<MetricsPuppetServerHealthPage />} />
           <Route path="/insights/openvoxdb-health" element={<MetricsPuppetDBHealthPage />} />
           <Route path="/insights/host-health" element={<MetricsHostHealthPage />} />
+          <Route path="/insights/upstream-latency" element={<MetricsUpstreamLatencyPage />} />
           <Route path="/insights/node-health" element={<MetricsNodeHealthPage />} />
           <Route path="/insights/heatmap" element={<MetricsHeatmapPage />} />
           <Route path="/insights/environments" element={<MetricsEnvironmentsPage />} />
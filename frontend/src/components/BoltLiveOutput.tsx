@@ -0,0 +1,116 @@
+/**
+ * Live Bolt output while a run is in flight.
+ *
+ * The run tabs pick an execution ID, open the SSE stream
+ * (/api/bolt/executions/{id}/stream) and then POST the run with that ID.
+ * Lines and per-target completions appear as Bolt prints them; the final
+ * result still comes back on the POST and renders in ResultPane.
+ */
+import { useCallback, useEffect, useRef, useState } from 'react';
+import { Badge, Card, Code, Group, ScrollArea, Text } from '@mantine/core';
+
+const MAX_LINES = 2000;
+
+export interface BoltLiveState {
+  lines: string[];
+  targets: Record<string, string>;
+  connected: boolean;
+  active: boolean;
+  start: () => string;
+  stop: () => void;
+}
+
+function newExecutionId(): string {
+  const c: any = typeof crypto !== 'undefined' ? crypto : null;
+  if (c?.randomUUID) return c.randomUUID().replace(/-/g, '');
+  return `${Date.now().toString(36)}${Math.random().toString(36).slice(2, 12)}`;
+}
+
+export function useBoltLiveOutput(): BoltLiveState {
+  const [lines, setLines] = useState<string[]>([]);
+  const [targets, setTargets] = useState<Record<string, string>>({});
+  const [connected, setConnected] = useState(false);
+  const [active, setActive] = useState(false);
+  const esRef = useRef<EventSource | null>(null);
+
+  const stop = useCallback(() => {
+    esRef.current?.close();
+    esRef.current = null;
+    setConnected(false);
+    setActive(false);
+  }, []);
+
+  const start = useCallback(() => {
+    stop();
+    const id = newExecutionId();
+    setLines([]);
+    setTargets({});
+    setActive(true);
+    // Same-origin SSE: the httpOnly session cookie authenticates it.
+    const es = new EventSource(`/api/bolt/executions/${id}/stream`);
+    esRef.current = es;
+    es.onopen = () => setConnected(true);
+    es.addEventListener('line', (ev) => {
+      const { line } = JSON.parse((ev as MessageEvent).data);
+      setLines((prev) => {
+        const next = [...prev, line];
+        return next.length > MAX_LINES ? next.slice(-MAX_LINES) : next;
+      });
+    });
+    es.addEventListener('target', (ev) => {
+      const { target, state } = JSON.parse((ev as MessageEvent).data);
+      setTargets((prev) => ({ ...prev, [target]: state }));
+    });
+    es.addEventListener('result', () => {
+      es.close();
+      setConnected(false);
+    });
+    es.onerror = () => setConnected(false);
+    return id;
+  }, [stop]);
+
+  useEffect(() => () => esRef.current?.close(), []);
+
+  return { lines, targets, connected, active, start, stop };
+}
+
+const STATE_COLORS: Record<string, string> = { started: 'blue', success: 'green', failure: 'red' };
+
+/** Rendered only while a run is in flight (the final ResultPane replaces it). */
+export function BoltLiveOutput({ live, running }: { live: BoltLiveState; running: boolean }) {
+  const viewportRef = useRef<HTMLDivElement>(null);
+
+  useEffect(() => {
+    if (viewportRef.current) viewportRef.current.scrollTop = viewportRef.current.scrollHeight;
+  }, [live.lines]);
+
+  if (!running || !live.active) return null;
+  const entries = Object.entries(live.targets);
+  const done = entries.filter(([, s]) => s !== 'started').length;
+
+  return (
+    <Card withBorder shadow="sm">
+      <Group justify="space-between" mb="xs">
+        <Group gap="xs">
+          <Text size="sm" fw={600}>Live output</Text>
+          <Badge color={live.connected ? 'green' : 'gray'} size="xs" variant="dot">
+            {live.connected ? 'streaming' : 'waiting'}
+          </Badge>
+        </Group>
+        {entries.length > 0 && <Text size="xs" c="dimmed">{done}/{entries.length} targets finished</Text>}
+      </Group>
+      {entries.length > 0 && (
+        <Group gap={4} mb="xs">
+          {entries.map(([t, s]) => (
+            <Badge key={t} size="xs" variant="light" color={STATE_COLORS[s] || 'gray'}>{t}</Badge>
+          ))}
+        </Group>
+      )}
+      <ScrollArea h={260} type="auto" viewportRef={viewportRef}>
+        <Code block style={{ whiteSpace: 'pre-wrap' }}>
+          {live.lines.length ? live.lines.join('\n') : 'Waiting for Bolt output…'}
+        </Code>
+      </ScrollArea>
+    </Card>
+  );
+}
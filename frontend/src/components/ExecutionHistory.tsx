@@ -39,11 +39,88 @@ import {
   IconHistory
 } from '@tabler/icons-react';
 import { notifications } from '@mantine/notifications';
-import { executionHistory, ExecutionHistoryEntry } from '../services/api';
+import {
+  executionHistory,
+  ExecutionHistoryEntry,
+  StoredResults,
+  StoredResultOutput,
+} from '../services/api';
 import { PrettyJson } from './PrettyJson';
 
+// Larger stored results are shown as their first bytes (raw JSON text)
+const RESULT_VIEW_BYTES = 1024 * 1024;
+
+/** Full stored output of one run: target list first, each target fetched when picked. */
+function StoredResultsView({ historyId }: { historyId: number }) {
+  const [results, setResults] = useState<StoredResults | null>(null);
+  const [target, setTarget] = useState<string | null>(null);
+  const [output, setOutput] = useState<StoredResultOutput | null>(null);
+  const [loading, setLoading] = useState(false);
+
+  useEffect(() => {
+    setResults(null);
+    setTarget(null);
+    setOutput(null);
+    executionHistory.getResults(historyId).then(setResults).catch(() => setResults(null));
+  }, [historyId]);
+
+  useEffect(() => {
+    if (target === null) return;
+    setLoading(true);
+    executionHistory
+      .getResultOutput(historyId, target, 0, RESULT_VIEW_BYTES)
+      .then(setOutput)
+      .catch((err: any) => {
+        setOutput(null);
+        notifications.show({ title: 'Error loading result', message: err.message, color: 'red' });
+      })
+      .finally(() => setLoading(false));
+  }, [historyId, target]);
+
+  if (!results?.stored) return null;
+  const options = [
+    ...(results.run ? [{ value: '', label: 'Run output (stdout / stderr)' }] : []),
+    ...results.targets.map((t) => ({ value: t.target, label: `${t.target} (${t.status || '?'})` })),
+  ];
+
+  return (
+    <>
+      <Divider />
+      <Group justify="space-between">
+        <Text fw={500}>Full Result:</Text>
+        <Text size="xs" c="dimmed">
+          {results.targets.length} target(s), {(results.size / 1024).toFixed(1)} KB
+        </Text>
+      </Group>
+      <Select
+        size="xs"
+        placeholder="Pick a target to load its output"
+        searchable
+        data={options}
+        value={target}
+        onChange={setTarget}
+      />
+      {loading && <Loader size="sm" />}
+      {!loading && output && (output.complete ? (
+        <PrettyJson data={output.document} maxHeight={400} />
+      ) : (
+        <>
+          <Code block>{output.content}</Code>
+          <Text size="xs" c="dimmed">
+            First {(output.length / 1024).toFixed(0)} KB of {(output.size / 1024).toFixed(0)} KB
+          </Text>
+        </>
+      ))}
+    </>
+  );
+}
+
+const PAGE_SIZE = 500;
+
 export function ExecutionHistory() {
   const [history, setHistory] = useState<ExecutionHistoryEntry[]>([]);
+  const [hasMore, setHasMore] = useState(false);
+  const [loadingOlder, setLoadingOlder] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [selectedEntry, setSelectedEntry] = useState<ExecutionHistoryEntry | null>(null);
@@ -57,18 +134,21 @@ export function ExecutionHistory() {
   // Auto-refresh
   const [autoRefresh, setAutoRefresh] = useState(true);
 
+  const filters = () => ({
+    days: filterDays,
+    execution_type: filterType || undefined,
+    status: filterStatus || undefined,
+    node_name: filterNode || undefined,
+    limit: PAGE_SIZE,
+  });
+
   const loadHistory = async () => {
     try {
       setLoading(true);
       setError(null);
-      const data = await executionHistory.getHistory({
-        days: filterDays,
-        execution_type: filterType || undefined,
-        status: filterStatus || undefined,
-        node_name: filterNode || undefined,
-        limit: 500
-      });
+      const data = await executionHistory.getHistory(filters());
       setHistory(data);
+      setHasMore(data.length === PAGE_SIZE);
     } catch (err: any) {
       setError(err.message);
       notifications.show({
@@ -81,6 +161,32 @@ export function ExecutionHistory() {
     }
   };
 
+  // Next page after the oldest loaded entry. Auto-refresh reloads only the
+  // newest page, so it is switched off while older pages are shown.
+  const loadOlder = async () => {
+    const last = history[history.length - 1];
+    if (!last) return;
+    try {
+      setLoadingOlder(true);
+      setAutoRefresh(false);
+      const data = await executionHistory.getHistory({
+        ...filters(),
+        before: last.executed_at,
+        before_id: last.id,
+      });
+      setHistory((prev) => [...prev, ...data]);
+      setHasMore(data.length === PAGE_SIZE);
+    } catch (err: any) {
+      notifications.show({
+        title: 'Error loading execution history',
+        message: err.message,
+        color: 'red',
+      });
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   useEffect(() => {
     loadHistory();
     
@@ -368,6 +474,13 @@ export function ExecutionHistory() {
             />
           )}
         </Box>
+        {hasMore && !error && (
+          <Group justify="center">
+            <Button size="xs" variant="light" onClick={loadOlder} loading={loadingOlder}>
+              Load older entries
+            </Button>
+          </Group>
+        )}
       </Stack>
 
       {/* Detail Modal */}
@@ -438,6 +551,8 @@ export function ExecutionHistory() {
                 <Text size="xs" c="dimmed">First 500 characters</Text>
               </>
             )}
+
+            <StoredResultsView historyId={selectedEntry.id} />
           </Stack>
         )}
       </Modal>
@@ -18,6 +18,7 @@ import { useAppTheme } from '../hooks/ThemeContext';
 import { OutputPane } from '../components/OutputPane';
 import { LoadingState } from '../components/StateComponents';
 import { ConfirmModal } from '../components/ConfirmModal';
+import { BoltLiveOutput, useBoltLiveOutput } from '../components/BoltLiveOutput';
 import { useActivity } from '../hooks/ActivityContext';
 import { useSkipAdhocConfirm } from '../hooks/useSkipAdhocConfirm';
 
@@ -262,6 +263,7 @@ export function CodeDeploymentPage() {
   const [pageTab, setPageTab] = useState<string | null>('deploy');
   const { begin, end } = useActivity();
   const skipConfirm = useSkipAdhocConfirm();
+  const live = useBoltLiveOutput();
 
   const [restartingStack, setRestartingStack] = useState(false);
   const clustered = clusterCfg?.deployment_mode === 'clustered';
@@ -296,6 +298,7 @@ export function CodeDeploymentPage() {
     const hostLines: string[] = Array.isArray(result.hosts)
       ? result.hosts.map((h: any) =>
           `  ${h.success ? 'ok  ' : 'FAIL'}  ${h.host}  exit ${h.exit_code ?? '?'}`
+          + (h.duration_ms != null ? `  ${(h.duration_ms / 1000).toFixed(1)}s` : '')
         )
       : [];
     setOutputLog((prev) => [
@@ -345,7 +348,7 @@ export function CodeDeploymentPage() {
           + 'Set them under Settings → Application → Cluster (or the Configuration tab).',
         );
       }
-      const result = await deploy.run(selectedEnv || undefined);
+      const result = await deploy.run(selectedEnv || undefined, live.start());
       appendResult(result, 'Deploy');
       end(actId, result.success ? 'done' : 'error', `exit ${result.exit_code}`);
       refetchStatus();
@@ -355,6 +358,7 @@ export function CodeDeploymentPage() {
       setOutputLog((prev) => [...prev, `ERROR: ${errMsg}`, '']);
       end(actId, 'error', errMsg);
     } finally {
+      live.stop();
       setBusy(null);
     }
   };
@@ -521,6 +525,8 @@ export function CodeDeploymentPage() {
         </Alert>
       )}
 
+      <BoltLiveOutput live={live} running={busy === 'deploy'} />
+
       {/* Output window — always visible, full scrollback */}
       <Card withBorder shadow="sm" padding="lg">
         <Group mb="md" justify="space-between">
@@ -632,6 +638,7 @@ function DeployHistory() {
               <Table.Th>Environment</Table.Th>
               <Table.Th>User</Table.Th>
               <Table.Th>Result</Table.Th>
+              <Table.Th>Duration</Table.Th>
             </Table.Tr>
           </Table.Thead>
           <Table.Tbody>
@@ -647,6 +654,17 @@ function DeployHistory() {
                     {h.success ? 'Success' : 'Failed'} (exit {h.exit_code})
                   </Badge>
                 </Table.Td>
+                <Table.Td>
+                  <Text size="sm">{h.duration_ms != null ? `${(h.duration_ms / 1000).toFixed(1)}s` : '—'}</Text>
+                  {Array.isArray(h.hosts) && h.hosts.some((x: any) => x.duration_ms != null) && (
+                    <Text size="xs" c="dimmed">
+                      {h.hosts
+                        .filter((x: any) => x.duration_ms != null)
+                        .map((x: any) => `${x.host} ${(x.duration_ms / 1000).toFixed(1)}s${x.success ? '' : ' (failed)'}`)
+                        .join(', ')}
+                    </Text>
+                  )}
+                </Table.Td>
               </Table.Tr>
             ))}
           </Table.Tbody>
@@ -20,6 +20,7 @@ import {
   IconLayoutDashboard,
   IconArrowLeft,
   IconServer2,
+  IconGauge,
 } from '@tabler/icons-react';
 
 const CARDS: { path: string; title: string; description: string; icon: any; color: string }[] = [
@@ -32,6 +33,7 @@ const CARDS: { path: string; title: string; description: string; icon: any; colo
   { path: '/insights/openvox-server-health', title: 'OpenVox Server Health', description: 'Puppet Server JVM and service metrics', icon: IconServer, color: 'indigo' },
   { path: '/insights/openvoxdb-health', title: 'OpenVoxDB Health', description: 'PuppetDB command and storage health', icon: IconHeartRateMonitor, color: 'pink' },
   { path: '/insights/host-health', title: 'Host Health', description: 'OS CPU/memory/load/pidstat for serving estate (not agents)', icon: IconServer2, color: 'cyan' },
+  { path: '/insights/upstream-latency', title: 'Upstream Latency', description: 'p50/p95/p99 and SLOs for OpenVoxDB, Server, CA and Bolt calls', icon: IconGauge, color: 'orange' },
   { path: '/insights/node-health', title: 'Node Health', description: 'Per-node status and staleness', icon: IconHeartbeat, color: 'red' },
   { path: '/insights/heatmap', title: 'Node Heatmap', description: 'Visual density of node outcomes', icon: IconGridDots, color: 'lime' },
   { path: '/insights/environments', title: 'Environments', description: 'Nodes and activity by environment', icon: IconWorld, color: 'green' },
@@ -29,6 +29,13 @@ const REFRESH_OPTIONS = [
   { value: '60', label: '1m' },
 ];
 
+const WINDOW_OPTIONS = [
+  { value: 'live', label: 'Last hour' },
+  { value: '86400', label: '24 hours' },
+  { value: '604800', label: '7 days' },
+  { value: '2592000', label: '30 days' },
+];
+
 const TOOLTIP_STYLE = {
   contentStyle: {
     backgroundColor: 'rgba(20,20,33,0.95)', border: '1px solid rgba(255,255,255,0.1)',
@@ -67,6 +74,7 @@ function StatCard({ label, value, color, description }: {
 export function MetricsHostHealthPage({ embedded = false }: { embedded?: boolean } = {}) {
   const [selectedHost, setSelectedHost] = useState<string | null>(null);
   const [refreshRate, setRefreshRate] = useState('30');
+  const [windowSec, setWindowSec] = useState('live');
   const intervalRef = useRef<ReturnType<typeof setInterval> | null>(null);
 
   const { data, loading, refreshing, error, refetch } = useApi(
@@ -91,9 +99,17 @@ export function MetricsHostHealthPage({ embedded = false }: { embedded?: boolean
     return hosts.find((h: any) => h.host === name) || hosts[0];
   }, [hosts, selectedHost]);
 
-  const history = (activeHost?.history || []).map((p: any) => ({
+  // Longer windows come from the server-side 1m / 10m / 1h rollups.
+  const { data: rollup } = useApi(
+    () => (windowSec === 'live' || !activeHost?.host
+      ? Promise.resolve(null)
+      : metrics.hostHealthHistory(activeHost.host, Number(windowSec))),
+    [windowSec, activeHost?.host],
+  );
+  const longWindow = windowSec !== 'live' && Number(windowSec) > 86400;
+  const history = ((windowSec === 'live' ? activeHost?.history : rollup?.points) || []).map((p: any) => ({
     ...p,
-    label: p.time ? String(p.time).slice(11, 19) : '',
+    label: p.time ? String(p.time).slice(longWindow ? 5 : 11, longWindow ? 16 : 19).replace('T', ' ') : '',
   }));
   const latest = activeHost?.latest || {};
   const sat = latest.saturation || {};
@@ -120,6 +136,14 @@ export function MetricsHostHealthPage({ embedded = false }: { embedded?: boolean
             </Text>
           </div>
           <Group>
+            <Select
+              size="xs"
+              w={100}
+              data={WINDOW_OPTIONS}
+              value={windowSec}
+              onChange={(v) => setWindowSec(v || 'live')}
+              allowDeselect={false}
+            />
             <Select
               size="xs"
               w={90}
@@ -268,7 +292,7 @@ export function MetricsHostHealthPage({ embedded = false }: { embedded?: boolean
           <Card withBorder padding="sm">
             <Text size="sm" fw={700} mb="xs">
               OpenVox-related processes
-              {latest.tools?.pidstat ? ' (pidstat)' : ' (/proc fallback)'}
+              {latest.cpu_window === 'interval' ? ' (/proc interval)' : ' (/proc, first sample)'}
             </Text>
             {(latest.processes || []).length === 0 ? (
               <Text size="sm" c="dimmed">No matching processes in this sample.</Text>
@@ -278,7 +302,9 @@ export function MetricsHostHealthPage({ embedded = false }: { embedded?: boolean
                   <Table.Tr>
                     <Table.Th>PID</Table.Th>
                     <Table.Th>Command</Table.Th>
+                    <Table.Th>Role</Table.Th>
                     <Table.Th>CPU %</Table.Th>
+                    <Table.Th>RSS MiB</Table.Th>
                   </Table.Tr>
                 </Table.Thead>
                 <Table.Tbody>
@@ -286,7 +312,9 @@ export function MetricsHostHealthPage({ embedded = false }: { embedded?: boolean
                     <Table.Tr key={`${p.pid}-${p.command}`}>
                       <Table.Td>{p.pid}</Table.Td>
                       <Table.Td><Text size="sm" ff="monospace">{p.command}</Text></Table.Td>
+                      <Table.Td>{p.role ?? '—'}</Table.Td>
                       <Table.Td>{p.cpu_pct ?? '—'}</Table.Td>
+                      <Table.Td>{p.rss_mb ?? '—'}</Table.Td>
                     </Table.Tr>
                   ))}
                 </Table.Tbody>
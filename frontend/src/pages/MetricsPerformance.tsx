@@ -591,6 +591,7 @@ function MetricsPerformanceContent({
         <Paper withBorder p="sm" ta="center"><Text size="xs" c="dimmed">Avg Run</Text><Text size="lg" fw={700}>{formatSeconds(stats.avg_run_time || 0)}</Text></Paper>
         <Paper withBorder p="sm" ta="center"><Text size="xs" c="dimmed">Max Run</Text><Text size="lg" fw={700} c="red">{formatSeconds(stats.max_run_time || 0)}</Text></Paper>
         <Paper withBorder p="sm" ta="center"><Text size="xs" c="dimmed">Min Run</Text><Text size="lg" fw={700} c="green">{formatSeconds(stats.min_run_time || 0)}</Text></Paper>
+        <Paper withBorder p="sm" ta="center"><Text size="xs" c="dimmed">p50 / p95 / p99</Text><Text size="lg" fw={700}>{stats.p95_run_time != null ? `${formatSeconds(stats.p50_run_time || 0)} / ${formatSeconds(stats.p95_run_time || 0)} / ${formatSeconds(stats.p99_run_time || 0)}` : '—'}</Text></Paper>
         <Paper withBorder p="sm" ta="center"><Text size="xs" c="dimmed">Failed</Text><Text size="lg" fw={700} c={stats.failed_runs > 0 ? 'red' : 'green'}>{stats.failed_runs || 0}</Text></Paper>
         <Paper withBorder p="sm" ta="center"><Text size="xs" c="dimmed">Queue</Text><Text size="lg" fw={700}>{String(jmxVal(s.cmd_depth, 'Count'))}</Text></Paper>
       </Group>
@@ -9,7 +9,7 @@ import { useState, useEffect, useCallback, useRef } from 'react';
 import { useApi } from '../hooks/useApi';
 import {
   Title, Card, Stack, Group, Text, Badge, Loader, Center, Alert,
-  Grid,
+  Grid, Select,
 } from '@mantine/core';
 import {
   ResponsiveContainer, AreaChart, Area, LineChart, Line, XAxis, YAxis,
@@ -126,6 +126,13 @@ export function MetricsPuppetDBHealthPage({ embedded = false }: { embedded?: boo
     },
   );
 
+  // Server-side queue/JVM series (background collector, all PuppetDB nodes)
+  const [historyWindow, setHistoryWindow] = useState<string>('3600');
+  const { data: serverHistory, refetch: refetchHistory } = useApi(
+    () => metrics.puppetdbHealthHistory(parseInt(historyWindow, 10)),
+    [historyWindow],
+  );
+
   useEffect(() => {
     if (!data) return;
     const result = data;
@@ -162,7 +169,7 @@ export function MetricsPuppetDBHealthPage({ embedded = false }: { embedded?: boo
     setLastRefresh(new Date());
   }, [data]);
 
-  const fetchData = useCallback(() => { refetch(); }, [refetch]);
+  const fetchData = useCallback(() => { refetch(); refetchHistory(); }, [refetch, refetchHistory]);
 
   useEffect(() => {
     intervalRef.current = setInterval(fetchData, effectivePollIntervalMs(30000) ?? 30000);
@@ -190,8 +197,37 @@ export function MetricsPuppetDBHealthPage({ embedded = false }: { embedded?: boo
   const storeRepData = smoothTimeSeries(heapHistory.map(h => ({ time: h.time, mean: h.store_report_mean })));
   const repFactsData = smoothTimeSeries(heapHistory.map(h => ({ time: h.time, mean: h.replace_facts_mean })));
 
+  const fleetSeries: any[] = (serverHistory?.fleet || []).map((p: any) => ({
+    time: new Date(p.ts * 1000).toLocaleTimeString([], historyWindow === '3600'
+      ? { hour: '2-digit', minute: '2-digit', second: '2-digit' }
+      : { month: 'numeric', day: 'numeric', hour: '2-digit', minute: '2-digit' }),
+    depth: p.queue_depth,
+    rate: p.processed_rate,
+  }));
+  const lastFleet = fleetSeries.length ? fleetSeries[fleetSeries.length - 1] : {};
+
   // Rich chart set for OpenVoxDB Health (DB interaction + core PDB health)
   const dbCharts: Array<{ id: string; title: string; stats?: any[]; render: () => React.ReactNode }> = [
+    {
+      id: 'queue-vs-rate',
+      title: `Command queue depth vs. processing rate (${(serverHistory?.hosts || []).length || 1} node${(serverHistory?.hosts || []).length > 1 ? 's' : ''})`,
+      stats: [
+        { label: 'Depth', value: String(lastFleet.depth ?? '—') },
+        { label: 'Processed/s', value: lastFleet.rate != null ? lastFleet.rate.toFixed(2) : '—', color: 'teal' },
+      ],
+      render: () => (
+        <LineChart data={fleetSeries} margin={{ top: 5, right: 8, left: 0, bottom: 0 }}>
+          <CartesianGrid strokeDasharray="3 3" stroke="#e0e0e0" strokeOpacity={0.5} />
+          <XAxis dataKey="time" tick={{ fontSize: 9, fill: '#8899aa' }} />
+          <YAxis yAxisId="depth" tick={{ fontSize: 9, fill: '#8899aa' }} />
+          <YAxis yAxisId="rate" orientation="right" tick={{ fontSize: 9, fill: '#8899aa' }} unit="/s" />
+          <ReTooltip {...TOOLTIP_STYLE} />
+          <Legend wrapperStyle={{ fontSize: 10 }} />
+          <Line yAxisId="depth" isAnimationActive={false} animationDuration={0} type={CHART_LINE_TYPE} dataKey="depth" stroke="#e67e22" strokeWidth={2} dot={false} name="Queue depth" />
+          <Line yAxisId="rate" isAnimationActive={false} animationDuration={0} type={CHART_LINE_TYPE} dataKey="rate" stroke="#16a085" strokeWidth={2} dot={false} name="Processed/s" />
+        </LineChart>
+      ),
+    },
     {
       id: 'pdb-heap',
       title: 'PDB JVM Heap',
@@ -319,6 +355,9 @@ export function MetricsPuppetDBHealthPage({ embedded = false }: { embedded?: boo
           {refreshing && <Badge variant="outline" color="gray" size="sm">Refreshing…</Badge>}
         </Group>
         <Group gap="xs">
+          <Select size="xs" value={historyWindow} onChange={(v) => setHistoryWindow(v || '3600')}
+            style={{ width: 90 }}
+            data={[{ value: '3600', label: '1h' }, { value: '86400', label: '24h' }, { value: '604800', label: '7d' }]} />
           <IconRefresh size={14} style={{ opacity: 0.5 }} />
           <Text size="xs" c="dimmed">
             Auto-refresh 30s &middot; Updated {lastRefresh.toLocaleTimeString()}
@@ -144,6 +144,8 @@ export function MetricsPuppetServerHealthPage({ embedded = false }: { embedded?:
   const [refreshRate, setRefreshRate] = useState<string>('30');
   const intervalRef = useRef<ReturnType<typeof setInterval> | null>(null);
   const [expanded, setExpanded] = useState<string | null>(null);
+  // 'fleet' = aggregate across compilers; otherwise one compiler's own series
+  const [hostView, setHostView] = useState<string>('fleet');
 
   const { data, loading, refreshing, error, refetch } = useApi(
     () => metrics.puppetserverHealth(),
@@ -159,8 +161,12 @@ export function MetricsPuppetServerHealthPage({ embedded = false }: { embedded?:
     if (!data) return;
     const result = data;
     let nextHistory: HistoryPoint[] | null = null;
-    if (result.history && Array.isArray(result.history) && result.history.length > 0) {
-      nextHistory = result.history.map((p: any) => ({
+    const hostEntry = hostView !== 'fleet'
+      ? (result.hosts || []).find((h: any) => h.host === hostView)
+      : null;
+    const serverHistory = hostEntry ? hostEntry.history : result.history;
+    if (serverHistory && Array.isArray(serverHistory) && serverHistory.length > 0) {
+      nextHistory = serverHistory.map((p: any) => ({
         time: p.time,
         heap_used_mb: p.heap_used_mb,
         heap_pct: p.heap_pct,
@@ -208,7 +214,7 @@ export function MetricsPuppetServerHealthPage({ embedded = false }: { embedded?:
       savePSHealthHistory(trimmed);
     }
     setLastRefresh(new Date());
-  }, [data]);
+  }, [data, hostView]);
 
   const fetchData = useCallback(() => { refetch(); }, [refetch]);
 
@@ -483,6 +489,17 @@ export function MetricsPuppetServerHealthPage({ embedded = false }: { embedded?:
           {refreshing && <Badge variant="outline" color="gray" size="sm">Refreshing…</Badge>}
         </Group>
         <Group gap="xs">
+          {(data.hosts || []).length > 1 && (
+            <Select size="xs" value={hostView} onChange={(v) => setHostView(v || 'fleet')}
+              style={{ width: 220 }}
+              data={[
+                { value: 'fleet', label: `All compilers (${data.hosts.length})` },
+                ...data.hosts.map((h: any) => ({
+                  value: h.host,
+                  label: h.error ? `${h.host} (unreachable)` : h.host,
+                })),
+              ]} />
+          )}
           <Select size="xs" data={REFRESH_OPTIONS} value={refreshRate}
             onChange={(v) => setRefreshRate(v || '10')} style={{ width: 90 }} />
           <Button size="xs" variant="light" leftSection={<IconRefresh size={14} />}
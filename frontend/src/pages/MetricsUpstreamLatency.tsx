@@ -0,0 +1,146 @@
+/**
+ * OpenVox GUI - MetricsUpstreamLatency.tsx
+ *
+ * Upstream latency — per-dependency p50/p95/p99, error rate, SLO compliance and
+ * httpx pool utilisation for PuppetDB, Puppet Server, CA, Bolt and sudo calls.
+ * Answers "is the GUI slow, or is PuppetDB slow?". Same data as /metrics.
+ */
+import { useState } from 'react';
+import {
+  Title, Card, Stack, Group, Text, Badge, Loader, Center, Alert, Table, Select, Progress, Tooltip,
+} from '@mantine/core';
+import { IconGauge } from '@tabler/icons-react';
+import { metrics } from '../services/api';
+import { useApi } from '../hooks/useApi';
+
+const WINDOW_OPTIONS = [
+  { value: '300', label: 'Last 5 min' },
+  { value: '900', label: 'Last 15 min' },
+  { value: '3600', label: 'Last hour' },
+];
+
+const LABELS: Record<string, string> = {
+  puppetdb: 'OpenVoxDB',
+  puppetserver: 'OpenVox Server',
+  ca: 'CA',
+  bolt: 'Bolt',
+  sudo: 'sudo',
+};
+
+function fmtMs(v: number | null | undefined): string {
+  if (v == null) return '—';
+  return v >= 1000 ? `${(v / 1000).toFixed(v >= 10000 ? 0 : 1)} s` : `${v.toFixed(v >= 100 ? 0 : 1)} ms`;
+}
+
+function sloColor(dep: any): string {
+  const pct = dep.slo?.compliance_pct;
+  if (pct == null) return 'gray';
+  if (pct >= (dep.slo?.target_pct ?? 99)) return 'green';
+  return (dep.slo?.error_budget_remaining_pct ?? 0) > 0 ? 'yellow' : 'red';
+}
+
+/** embedded: compact chrome for Insights | Monitoring wallboard. */
+export function MetricsUpstreamLatencyPage({ embedded = false }: { embedded?: boolean } = {}) {
+  const [windowSec, setWindowSec] = useState('900');
+  const { data, loading, refreshing, error } = useApi(
+    () => metrics.upstreamLatency(Number(windowSec)),
+    [windowSec],
+    { pollIntervalMs: 30000, keepPreviousData: true },
+  );
+
+  if (loading && !data) return <Center h={embedded ? 200 : 400}><Loader size={embedded ? 'md' : 'xl'} /></Center>;
+  if (error && !data) return <Alert color="red" title="Error loading upstream latency">{error}</Alert>;
+  if (!data) return null;
+
+  const deps: any[] = data.dependencies || [];
+
+  return (
+    <Stack gap={embedded ? 'sm' : 'md'}>
+      <Group justify="space-between">
+        <Group gap="sm">
+          <IconGauge size={embedded ? 22 : 28} />
+          <Title order={embedded ? 3 : 2}>Upstream Latency</Title>
+          {refreshing && <Badge variant="outline" color="gray" size="sm">Refreshing…</Badge>}
+        </Group>
+        <Select
+          size="xs"
+          data={WINDOW_OPTIONS}
+          value={windowSec}
+          onChange={(v) => v && setWindowSec(v)}
+          allowDeselect={false}
+          w={140}
+        />
+      </Group>
+      {!embedded && (
+        <Text size="sm" c="dimmed">
+          Latency of every call this console makes to its dependencies (this worker process).
+          SLO = share of calls that succeeded within the threshold. Pool = httpx connections
+          in use of the client&apos;s maximum.
+        </Text>
+      )}
+
+      <Card withBorder padding="sm">
+        <Table striped highlightOnHover>
+          <Table.Thead>
+            <Table.Tr>
+              <Table.Th>Dependency</Table.Th>
+              <Table.Th ta="right">Calls</Table.Th>
+              <Table.Th ta="right">p50</Table.Th>
+              <Table.Th ta="right">p95</Table.Th>
+              <Table.Th ta="right">p99</Table.Th>
+              <Table.Th ta="right">Errors</Table.Th>
+              <Table.Th>SLO</Table.Th>
+              <Table.Th ta="right">In flight</Table.Th>
+              <Table.Th>Pool</Table.Th>
+            </Table.Tr>
+          </Table.Thead>
+          <Table.Tbody>
+            {deps.map((d) => {
+              const pools: any[] = d.pools || [];
+              const active = pools.reduce((a, p) => a + (p.active || 0), 0);
+              const max = pools.reduce((a, p) => a + (p.max || 0), 0);
+              const waiting = pools.reduce((a, p) => a + (p.waiting || 0), 0);
+              return (
+                <Table.Tr key={d.dependency}>
+                  <Table.Td>
+                    <Tooltip
+                      disabled={!d.top_endpoints?.length}
+                      label={(d.top_endpoints || []).map((e: any) => `${e.endpoint}: ${fmtMs(e.mean_ms)} avg × ${e.count}`).join('\n')}
+                      style={{ whiteSpace: 'pre' }}
+                    >
+                      <Text size="sm" fw={500}>{LABELS[d.dependency] || d.dependency}</Text>
+                    </Tooltip>
+                  </Table.Td>
+                  <Table.Td ta="right">{d.count}</Table.Td>
+                  <Table.Td ta="right">{fmtMs(d.p50_ms)}</Table.Td>
+                  <Table.Td ta="right">{fmtMs(d.p95_ms)}</Table.Td>
+                  <Table.Td ta="right">{fmtMs(d.p99_ms)}</Table.Td>
+                  <Table.Td ta="right">
+                    {d.error_rate_pct == null ? '—' : (
+                      <Text size="sm" c={d.errors ? 'red' : undefined}>{d.error_rate_pct}%</Text>
+                    )}
+                  </Table.Td>
+                  <Table.Td>
+                    <Tooltip label={`${d.slo?.target_pct}% within ${fmtMs(d.slo?.threshold_ms)}`}>
+                      <Badge variant="light" color={sloColor(d)}>
+                        {d.slo?.compliance_pct == null ? 'no calls' : `${d.slo.compliance_pct}%`}
+                      </Badge>
+                    </Tooltip>
+                  </Table.Td>
+                  <Table.Td ta="right">{d.in_flight}</Table.Td>
+                  <Table.Td w={160}>
+                    {max > 0 ? (
+                      <Tooltip label={`${active}/${max} active${waiting ? `, ${waiting} waiting` : ''}`}>
+                        <Progress value={(100 * active) / max} color={waiting ? 'red' : 'blue'} size="sm" />
+                      </Tooltip>
+                    ) : <Text size="xs" c="dimmed">—</Text>}
+                  </Table.Td>
+                </Table.Tr>
+              );
+            })}
+          </Table.Tbody>
+        </Table>
+      </Card>
+    </Stack>
+  );
+}
@@ -26,6 +26,7 @@ import {
 import { MetricsPerformancePage } from './MetricsPerformance';
 import { MetricsPuppetServerHealthPage } from './MetricsPuppetServerHealth';
 import { MetricsPuppetDBHealthPage } from './MetricsPuppetDBHealth';
+import { MetricsUpstreamLatencyPage } from './MetricsUpstreamLatency';
 import {
   FleetScopeSelect,
   loadStoredScope,
@@ -40,7 +41,7 @@ const MIN_WINDOW_HOURS = 0.25;
 const MAX_WINDOW_HOURS = 168;
 const DEFAULT_WINDOW_HOURS = 24;
 
-type SectionId = 'compliance' | 'performance' | 'server' | 'pdb';
+type SectionId = 'compliance' | 'performance' | 'server' | 'pdb' | 'upstream';
 
 type SectionDef = {
   id: SectionId;
@@ -54,6 +55,7 @@ const SECTION_CATALOG: SectionDef[] = [
   { id: 'performance', label: 'Run Performance', detailPath: '/insights/performance', defaultOn: true },
   { id: 'server', label: 'OpenVox Server Health', detailPath: '/insights/openvox-server-health', defaultOn: true },
   { id: 'pdb', label: 'OpenVoxDB Health', detailPath: '/insights/openvoxdb-health', defaultOn: true },
+  { id: 'upstream', label: 'Upstream Latency', detailPath: '/insights/upstream-latency', defaultOn: false },
 ];
 
 const DEFAULT_SECTION_IDS = SECTION_CATALOG.filter((s) => s.defaultOn).map((s) => s.id);
@@ -184,6 +186,8 @@ export function MonitoringDashboardPage() {
         return <MetricsPuppetServerHealthPage embedded />;
       case 'pdb':
         return <MetricsPuppetDBHealthPage embedded />;
+      case 'upstream':
+        return <MetricsUpstreamLatencyPage embedded />;
       default:
         return null;
     }
@@ -12,6 +12,7 @@ import {
 import { notifications } from '@mantine/notifications';
 import { TargetSelector } from '../components/TargetSelector';
 import { OutputPane } from '../components/OutputPane';
+import { BoltLiveOutput, useBoltLiveOutput } from '../components/BoltLiveOutput';
 import { ConfirmModal } from '../components/ConfirmModal';
 import { useSkipAdhocConfirm } from '../hooks/useSkipAdhocConfirm';
 
@@ -533,6 +534,7 @@ function RunCommandTab() {
   const [runPrivileged, setRunPrivileged] = useState(false);
   const [confirmOpen, setConfirmOpen] = useState(false);
   const skipConfirm = useSkipAdhocConfirm();
+  const live = useBoltLiveOutput();
 
   const refreshTargets = useCallback(() => {
     nodesApi.list()
@@ -567,7 +569,7 @@ function RunCommandTab() {
     setResults(null);
 
     // Single Bolt invocation (#38) — format tabs share one result (json for PrettyJson tab)
-    const payload: any = { command, targets: targets.join(','), format: 'json' };
+    const payload: any = { command, targets: targets.join(','), format: 'json', execution_id: live.start() };
     if (runPrivileged) payload.run_as = 'root';
 
     try {
@@ -577,6 +579,7 @@ function RunCommandTab() {
       const errorResult = { returncode: -1, output: '', error: e.message };
       setResults(resultsFromSingleRun(errorResult));
     }
+    live.stop();
     setRunning(false);
   };
 
@@ -638,6 +641,7 @@ function RunCommandTab() {
         danger={runPrivileged}
       />
       <ErrorBoundary>
+        <BoltLiveOutput live={live} running={running} />
         <ResultPane results={results} />
       </ErrorBoundary>
     </Stack>
@@ -660,6 +664,7 @@ function RunTaskTab() {
   const [runPrivileged, setRunPrivileged] = useState(false);
   const [confirmOpen, setConfirmOpen] = useState(false);
   const skipConfirm = useSkipAdhocConfirm();
+  const live = useBoltLiveOutput();
 
   const refreshTargets = useCallback(() => {
     nodesApi.list()
@@ -709,7 +714,9 @@ function RunTaskTab() {
     params.forEach((p) => { if (p.key.trim()) paramDict[p.key.trim()] = p.val; });
 
     // Single Bolt task run (#38) — same bug as Run Command (triple execution)
-    const taskPayload: any = { task: selectedTask, targets: targets.join(','), params: paramDict, format: 'json' };
+    const taskPayload: any = {
+      task: selectedTask, targets: targets.join(','), params: paramDict, format: 'json', execution_id: live.start(),
+    };
     if (runPrivileged) taskPayload.run_as = 'root';
 
     try {
@@ -719,6 +726,7 @@ function RunTaskTab() {
       const errorResult = { returncode: -1, output: '', error: e.message };
       setResults(resultsFromSingleRun(errorResult));
     }
+    live.stop();
     setRunning(false);
   };
 
@@ -793,6 +801,7 @@ function RunTaskTab() {
         danger={runPrivileged}
       />
       <ErrorBoundary>
+        <BoltLiveOutput live={live} running={running} />
         <ResultPane results={results} />
       </ErrorBoundary>
     </Stack>
@@ -811,6 +820,7 @@ function RunPlanTab() {
   const [loading, setLoading] = useState(true);
   const [confirmOpen, setConfirmOpen] = useState(false);
   const skipConfirm = useSkipAdhocConfirm();
+  const live = useBoltLiveOutput();
 
   useEffect(() => {
     bolt.getPlans().then((p) => setPlans(p.plans || [])).catch(() => {}).finally(() => setLoading(false));
@@ -827,12 +837,15 @@ function RunPlanTab() {
 
     try {
       // Single Bolt plan run (#38) — avoid triple execution for format tabs
-      const result = await bolt.runPlan({ plan: selectedPlan, params: paramDict, format: 'json' });
+      const result = await bolt.runPlan({
+        plan: selectedPlan, params: paramDict, format: 'json', execution_id: live.start(),
+      });
       setResults(resultsFromSingleRun(result));
     } catch (e: any) {
       const errorResult = { returncode: -1, output: '', error: e.message };
       setResults(resultsFromSingleRun(errorResult));
     }
+    live.stop();
     setRunning(false);
   };
 
@@ -882,6 +895,7 @@ function RunPlanTab() {
         loading={running}
       />
       <ErrorBoundary>
+        <BoltLiveOutput live={live} running={running} />
         <ResultPane results={results} />
       </ErrorBoundary>
     </Stack>
@@ -1093,6 +1107,7 @@ function FilesTab() {
   const [uploadFile, setUploadFile] = useState<File | null>(null);
   const [uploadTargets, setUploadTargets] = useState<string[]>([]);
   const [uploadDest, setUploadDest] = useState('');
+  const [skipUnchanged, setSkipUnchanged] = useState(false);
   const [uploading, setUploading] = useState(false);
   const [uploadResult, setUploadResult] = useState<any>(null);
   const [dragActive, setDragActive] = useState(false);
@@ -1148,10 +1163,15 @@ function FilesTab() {
     setUploading(true);
     setUploadResult(null);
     try {
-      const result = await bolt.uploadFile(uploadFile, uploadTargets.join(','), uploadDest);
+      const result = await bolt.uploadFile(uploadFile, uploadTargets.join(','), uploadDest, skipUnchanged);
       setUploadResult(result);
       if (result.success) {
-        notifications.show({ title: 'Upload Complete', message: `${uploadFile.name} uploaded to ${uploadTargets.join(', ')}`, color: 'green' });
+        const skipped = result.skipped_unchanged?.length || 0;
+        notifications.show({
+          title: 'Upload Complete',
+          message: `${uploadFile.name} uploaded to ${uploadTargets.join(', ')}${skipped ? ` (${skipped} unchanged target(s) skipped)` : ''}`,
+          color: 'green',
+        });
       } else {
         notifications.show({ title: 'Upload Failed', message: `Exit code ${result.returncode}`, color: 'red' });
       }
@@ -1275,6 +1295,12 @@ function FilesTab() {
               <TextInput label="Remote Destination Path" required
                 value={uploadDest} onChange={(e) => setUploadDest(e.currentTarget.value)}
                 placeholder="/tmp/myfile.conf or /etc/myapp/config.yaml" />
+              <Checkbox
+                label="Skip targets that already have this file"
+                description="Runs one sha256sum on all targets first and only pushes where the file is missing or different."
+                checked={skipUnchanged}
+                onChange={(e) => setSkipUnchanged(e.currentTarget.checked)}
+              />
               <Button onClick={handleUpload} loading={uploading}
                 disabled={!uploadFile || uploadTargets.length === 0 || !uploadDest}
                 leftSection={<IconFileUpload size={16} />} color="green">
@@ -225,10 +225,11 @@ export const deploy = {
   getRepos: () => fetchJSON<any>('/deploy/repos'),
   getStatus: () => fetchJSON<any>('/deploy/status'),
   getHistory: () => fetchJSON<any>('/deploy/history'),
-  run: (environment?: string) =>
+  /** Follow live output with executionId on /api/bolt/executions/{id}/stream */
+  run: (environment?: string, executionId?: string) =>
     fetchJSON<import('../types').DeployRunResult>('/deploy/run', {
       method: 'POST',
-      body: JSON.stringify({ environment: environment || null }),
+      body: JSON.stringify({ environment: environment || null, execution_id: executionId || null }),
     }),
   /** Clustered: stage code on all deploy targets */
   stage: (environment?: string) =>
@@ -320,19 +321,30 @@ export const bolt = {
   // Sync inventory from ENC hierarchy (3.x)
   syncInventoryFromEnc: () =>
     fetchJSON<any>('/bolt/inventory/sync', { method: 'POST' }),
-  runCommand: (data: { command: string; targets: string; format?: string; run_as?: string }) =>
+  runCommand: (data: { command: string; targets: string; format?: string; run_as?: string; execution_id?: string; target_timeout?: number }) =>
     fetchJSON<import('../types').BoltRunResult>('/bolt/run/command', { method: 'POST', body: JSON.stringify(data) }),
-  runTask: (data: { task: string; targets: string; params?: any; format?: string; run_as?: string }) =>
+  runTask: (data: { task: string; targets: string; params?: any; format?: string; run_as?: string; execution_id?: string; target_timeout?: number }) =>
     fetchJSON<import('../types').BoltRunResult>('/bolt/run/task', { method: 'POST', body: JSON.stringify(data) }),
-  runPlan: (data: { plan: string; params?: any; format?: string }) =>
+  runPlan: (data: { plan: string; params?: any; format?: string; execution_id?: string }) =>
     fetchJSON<import('../types').BoltRunResult>('/bolt/run/plan', { method: 'POST', body: JSON.stringify(data) }),
 
+  // Queued runs (durable; follow via /api/bolt/jobs/{id}/stream)
+  submitJob: (kind: 'command' | 'task' | 'plan', data: any, lane: 'interactive' | 'scheduled' = 'interactive') =>
+    fetchJSON<{ job_id: string; status: string; lane: string; history_id: number | null; stream_url: string }>(
+      `/bolt/jobs/${kind}?lane=${lane}`, { method: 'POST', body: JSON.stringify(data) }),
+  listJobs: (status?: string) =>
+    fetchJSON<any>(`/bolt/jobs${status ? `?status=${encodeURIComponent(status)}` : ''}`),
+  getJob: (jobId: string) => fetchJSON<any>(`/bolt/jobs/${encodeURIComponent(jobId)}`),
+  cancelJob: (jobId: string) =>
+    fetchJSON<any>(`/bolt/jobs/${encodeURIComponent(jobId)}/cancel`, { method: 'POST' }),
+
   // File transfer (upload / download)
-  uploadFile: (file: File, targets: string, destination: string) => {
+  uploadFile: (file: File, targets: string, destination: string, skipUnchanged = false) => {
     const formData = new FormData();
     formData.append('file', file);
     formData.append('targets', targets);
     formData.append('destination', destination);
+    if (skipUnchanged) formData.append('skip_unchanged', 'true');
     const headers: Record<string, string> = {};
     // Cookie-based auth preferred; no localStorage token sent here.
     // Do NOT set Content-Type — browser sets it with boundary for multipart
@@ -657,10 +669,14 @@ export const metrics = {
     fetchJSON<any>(`/insights/catalog/${certname}`),
   puppetdbHealth: () => fetchJSON<any>('/insights/puppetdb-health'),
   puppetdbPerformance: () => fetchJSON<any>('/insights/puppetdb-performance'),
+  puppetdbHealthHistory: (window = 3600, host?: string) =>
+    fetchJSON<any>(`/insights/puppetdb-health/history?window=${window}${host ? '&host=' + encodeURIComponent(host) : ''}`),
   heatmap: () => fetchJSON<any>('/insights/heatmap'),
 
   // OpenVox Server Health and OpenVoxDB Health (in Metrics section)
   puppetserverHealth: () => fetchJSON<any>('/insights/puppetserver-health'),
+  puppetserverHealthHistory: (window = 3600, host?: string) =>
+    fetchJSON<any>(`/insights/puppetserver-health/history?window=${window}${host ? '&host=' + encodeURIComponent(host) : ''}`),
   puppetserverPerformance: () => fetchJSON<any>('/insights/puppetserver-performance'),
   puppetserverMetricsList: () => fetchJSON<any>('/insights/puppetserver-metrics-list'),
   puppetserverMetric: (name: string) => fetchJSON<any>(`/insights/puppetserver-metric?name=${encodeURIComponent(name)}`),
@@ -682,7 +698,10 @@ export const metrics = {
     fetchJSON<any>(
       `/insights/host-health?refresh=${refresh ? 'true' : 'false'}&include_remote=${includeRemote ? 'true' : 'false'}`
     ),
+  hostHealthHistory: (host: string, window = 3600, stat = 'avg') =>
+    fetchJSON<any>(`/insights/host-health/history?host=${encodeURIComponent(host)}&window=${window}&stat=${stat}`),
   hostHealthTargets: () => fetchJSON<any>('/insights/host-health/targets'),
+  upstreamLatency: (window = 900) => fetchJSON<any>(`/insights/upstream-latency?window=${window}`),
   hostHealthCollect: (includeRemote: boolean = true) =>
     fetchJSON<any>(`/insights/host-health/collect?include_remote=${includeRemote ? 'true' : 'false'}`, {
       method: 'POST',
@@ -738,6 +757,35 @@ export interface ExecutionHistoryEntry {
   result_preview?: string;
 }
 
+export interface StoredResultTarget {
+  target: string;
+  status?: string | null;
+  size: number;
+  stored_size: number;
+  codec: string;
+}
+
+export interface StoredResults {
+  history_id: number;
+  stored: boolean;
+  run: StoredResultTarget | null;
+  targets: StoredResultTarget[];
+  size: number;
+  stored_size: number;
+}
+
+export interface StoredResultOutput {
+  history_id: number;
+  target: string;
+  status?: string | null;
+  size: number;
+  offset: number;
+  length: number;
+  complete: boolean;
+  document?: any;
+  content?: string;
+}
+
 export interface ExecutionStats {
   period_days: number;
   total_executions: number;
@@ -865,6 +913,9 @@ export const executionHistory = {
     node_name?: string;
     status?: string;
     limit?: number;
+    /** Keyset cursor: executed_at + id of the oldest entry already loaded */
+    before?: string;
+    before_id?: number;
   }) => {
     const qs = new URLSearchParams();
     if (params?.days) qs.set('days', params.days.toString());
@@ -872,6 +923,8 @@ export const executionHistory = {
     if (params?.node_name) qs.set('node_name', params.node_name);
     if (params?.status) qs.set('status', params.status);
     if (params?.limit) qs.set('limit', params.limit.toString());
+    if (params?.before) qs.set('before', params.before);
+    if (params?.before_id) qs.set('before_id', params.before_id.toString());
     const query = qs.toString();
     // No slash before ? — `/execution-history/?days=` can 500/404 on some proxies
     return fetchJSON<ExecutionHistoryEntry[]>(
@@ -882,6 +935,16 @@ export const executionHistory = {
   getStats: (days: number = 14) =>
     fetchJSON<ExecutionStats>(`/execution-history/stats?days=${days}`),
 
+  // Full per-target output (compressed server-side, loaded on demand)
+  getResults: (id: number) =>
+    fetchJSON<StoredResults>(`/execution-history/${id}/results`),
+
+  getResultOutput: (id: number, target: string = '', offset: number = 0, length?: number) => {
+    const qs = new URLSearchParams({ target, offset: offset.toString() });
+    if (length) qs.set('length', length.toString());
+    return fetchJSON<StoredResultOutput>(`/execution-history/${id}/results/output?${qs}`);
+  },
+
   deleteEntry: (id: number) =>
     fetchJSON<any>(`/execution-history/${id}`, { method: 'DELETE' }),
 
@@ -9,6 +9,7 @@ export interface BoltRunResult {
   returncode: number;
   output: string;
   error: string;
+  execution_id?: string | null;
 }
 
 export interface BoltStatus {
@@ -24,6 +25,9 @@ export interface DeployRunResult {
   environment: string;
   triggered_by: string;
   output?: string[];
+  duration_ms?: number;
+  hosts?: { host: string; success: boolean; exit_code: number; duration_ms?: number | null }[];
+  execution_id?: string;
 }
 
 /** Minimal ENC classify response (Puppet ENC compatible) */
@@ -956,6 +956,11 @@ configure_pip_proxy
 "${INSTALL_DIR}/venv/bin/pip" install --quiet --upgrade pip $PIP_PROXY_ARG
 # shellcheck disable=SC2086
 "${INSTALL_DIR}/venv/bin/pip" install --quiet -r "${INSTALL_DIR}/backend/requirements.txt" $PIP_PROXY_ARG
+# Optional pooled-SSH transport (backend/requirements-ssh.txt)
+if grep -q "^OPENVOX_GUI_REMOTE_TRANSPORT=\"\\?ssh" "${INSTALL_DIR}/config/.env" 2>/dev/null; then
+    # shellcheck disable=SC2086
+    "${INSTALL_DIR}/venv/bin/pip" install --quiet -r "${INSTALL_DIR}/backend/requirements-ssh.txt" $PIP_PROXY_ARG
+fi
 # NOTE (enterprise P1.9): For production supply-chain hardening, use pinned hashes:
 #   "${INSTALL_DIR}/venv/bin/pip" install --require-hashes -r "${INSTALL_DIR}/backend/requirements.txt" ...
 # Generate hashes with pip-tools or similar. SBOM should be generated at release time.
@@ -37,12 +37,18 @@ def health(
         help="Limit to a specific component (puppetserver, puppetdb, all)",
     ),
     json_output: bool = typer.Option(False, "--json", "-j"),
+    fresh: bool = typer.Option(
+        False,
+        "--fresh",
+        help="Probe the estate now instead of reading the console's cached result",
+    ),
 ):
     """
     Check the health of OpenVox infrastructure components.
 
     Reports systemd status for puppetserver, puppetdb, puppet agent,
-    and the OpenVox GUI service itself.
+    and the OpenVox GUI service itself. Estate probes come from the
+    console's background prober (age shown under the table).
     """
     client = get_client(
         base_url=ctx.obj.get("url") if ctx.obj else None,
@@ -53,7 +59,7 @@ def health(
     try:
         # Prefer dedicated infra health (cluster-aware). Fall back to config/services.
         try:
-            payload = client.get("/api/infra/health")
+            payload = client.get("/api/infra/health", params={"fresh": "true"} if fresh else None)
         except OvoxAPIError:
             payload = client.get("/api/config/services")
     except OvoxAPIError as exc:
@@ -165,6 +171,10 @@ def health(
                 f" (+vip {summary.get('ca_vips_healthy', '?')}/"
                 f"{summary.get('ca_vips_total', '?')})[/dim]"
             )
+        probe = payload.get("probe") or {}
+        if probe.get("probed_at"):
+            source = "cached" if probe.get("cached") else "probed now"
+            console.print(f"[dim]estate probe: {source}, {probe.get('age_sec', '?')}s old[/dim]")
         inv = payload.get("inventory") or {}
         if inv and not inv.get("compilers") and inv.get("compiler_vips"):
             console.print(
@@ -264,6 +264,10 @@ fi
 echo "[2/6] Updating Python dependencies..."
 "${INSTALL_DIR}/venv/bin/pip" install --quiet --upgrade pip
 "${INSTALL_DIR}/venv/bin/pip" install --quiet -r "${INSTALL_DIR}/backend/requirements.txt"
+# Optional pooled-SSH transport (backend/requirements-ssh.txt)
+if grep -q "^OPENVOX_GUI_REMOTE_TRANSPORT=\"\\?ssh" "${INSTALL_DIR}/config/.env" 2>/dev/null; then
+    "${INSTALL_DIR}/venv/bin/pip" install --quiet -r "${INSTALL_DIR}/backend/requirements-ssh.txt"
+fi
 
 # Install/refresh ovox CLI in the venv
 if [ -d "${INSTALL_DIR}/ovox" ]; then
@@ -539,6 +539,10 @@ log_step 3 "Python Dependencies"
 
 "${INSTALL_DIR}/venv/bin/pip" install --quiet --upgrade pip
 "${INSTALL_DIR}/venv/bin/pip" install --quiet -r "${INSTALL_DIR}/backend/requirements.txt"
+# Optional pooled-SSH transport (backend/requirements-ssh.txt)
+if grep -q "^OPENVOX_GUI_REMOTE_TRANSPORT=\"\\?ssh" "${INSTALL_DIR}/config/.env" 2>/dev/null; then
+    "${INSTALL_DIR}/venv/bin/pip" install --quiet -r "${INSTALL_DIR}/backend/requirements-ssh.txt"
+fi
 log_ok "Python dependencies updated"
 
 # Refresh ovox CLI (re-install from the freshly copied source)